@@ -37,84 +37,10 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from typing import Dict
-
-
-def formatar_moeda_br(valor):
-    """
-    Formata valor para padrão brasileiro: R$ 1.234,56
-    
-    GATILHO DE MANUTENÇÃO:
-    - Sempre usar este formato em todo o sistema
-    - Ponto para milhar, vírgula para decimal
-    """
-    if pd.isna(valor) or valor == 0:
-        return 'R$ 0,00'
-    return f'R$ {valor:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
-
-
-def formatar_data_br(data_str):
-    """
-    Formata data de DDMMAAAA para DD/MM/AAAA
-    
-    GATILHO DE MANUTENÇÃO:
-    - Formato entrada: DDMMAAAA (ex: 01052025)
-    - Formato saída: DD/MM/AAAA (ex: 01/05/2025)
-    """
-    if not data_str or len(str(data_str)) < 8:
-        return ''
-    
-    data_str = str(data_str)
-    dd = data_str[0:2]
-    mm = data_str[2:4]
-    aaaa = data_str[4:8]
-    
-    return f"{dd}/{mm}/{aaaa}"
-
-
-def extrair_mes_de_data(data_str):
-    """
-    Extrai nome do mês de uma data DDMMAAAA.
-    
-    GATILHO DE MANUTENÇÃO:
-    - Formato: DDMMAAAA (ex: 01052025 = 01/Maio/2025)
-    - Posições 2-3 contêm o mês
-    """
-    if not data_str or len(str(data_str)) < 6:
-        return 'Indefinido'
-    
-    meses_dict = {
-        '01': 'Janeiro', '02': 'Fevereiro', '03': 'Março',
-        '04': 'Abril', '05': 'Maio', '06': 'Junho',
-        '07': 'Julho', '08': 'Agosto', '09': 'Setembro',
-        '10': 'Outubro', '11': 'Novembro', '12': 'Dezembro'
-    }
-    
-    # Extrai MM de DDMMAAAA (posições 2-3)
-    mes_num = str(data_str)[2:4]
-    return meses_dict.get(mes_num, 'Indefinido')
-
-
-def mapear_codigo_obrigacao(cod_or):
-    """
-    Mapeia código de obrigação para descrição.
-    
-    GATILHO DE MANUTENÇÃO:
-    - Adicionar novos códigos conforme necessário
-    """
-    mapeamento = {
-        '000': 'ICMS Normal',
-        '001': 'ICMS ST',
-        '002': 'ICMS Antecipado',
-        '003': 'ICMS Diferencial de Alíquota',
-        '004': 'ICMS Substituição Tributária',
-        '005': 'ICMS Importação',
-        '006': 'FECP (Fundo Estadual de Combate à Pobreza)',
-        '007': 'FECP ST',
-        '008': 'ICMS Complementar',
-        '009': 'ICMS Outros'
-    }
-    
-    return mapeamento.get(cod_or, f'Código {cod_or}')
+from exportacao import exibir_exportacao
+from formatacao import formatar_moeda_br, estilizar_moeda_br
+# Cálculos sem interface (reexportados para os imports existentes)
+from calculos_fiscais import formatar_data_br, extrair_mes_de_data, mapear_codigo_obrigacao
 
 
 def exibir_totais_apuracao(df_e110: pd.DataFrame):
@@ -226,13 +152,14 @@ def exibir_ajustes(df_e111: pd.DataFrame):
     st.markdown('<br>', unsafe_allow_html=True)
     
     # Tabela de ajustes
-    df_exibicao = df_e111.copy()
-    df_exibicao['Código'] = df_exibicao['COD_AJ_APUR']
-    df_exibicao['Descrição'] = df_exibicao['DESCR_COMPL_AJ']
-    df_exibicao['Valor'] = df_exibicao['VL_AJ_APUR'].apply(formatar_moeda_br)
+    df_exibicao = pd.DataFrame({
+        'Código': df_e111['COD_AJ_APUR'],
+        'Descrição': df_e111['DESCR_COMPL_AJ'],
+        'Valor': df_e111['VL_AJ_APUR'],
+    })
     
     st.dataframe(
-        df_exibicao[['Código', 'Descrição', 'Valor']],
+        estilizar_moeda_br(df_exibicao, ['Valor']),
         use_container_width=True,
         hide_index=True
     )
@@ -265,27 +192,28 @@ def exibir_guias_recolhimento(df_e116: pd.DataFrame):
     st.markdown('<br>', unsafe_allow_html=True)
     
     # Tabela de guias
-    df_exibicao = df_e116.copy()
-    df_exibicao['Tipo'] = df_exibicao['COD_OR'].apply(mapear_codigo_obrigacao)
-    df_exibicao['Valor'] = df_exibicao['VL_OR'].apply(formatar_moeda_br)
-    df_exibicao['Vencimento'] = df_exibicao['DT_VCTO'].apply(formatar_data_br)
-    df_exibicao['Cód. Receita'] = df_exibicao['COD_REC']
-    df_exibicao['Descrição'] = df_exibicao['TXT_COMPL']
-    df_exibicao['Referência'] = df_exibicao['MES_REF']
+    df_exibicao = pd.DataFrame({
+        'Tipo': df_e116['COD_OR'].apply(mapear_codigo_obrigacao),
+        'Valor': df_e116['VL_OR'],
+        'Vencimento': df_e116['DT_VCTO'].apply(formatar_data_br),
+        'Cód. Receita': df_e116['COD_REC'],
+        'Descrição': df_e116['TXT_COMPL'],
+        'Referência': df_e116['MES_REF'],
+    })
     
     st.dataframe(
-        df_exibicao[['Tipo', 'Valor', 'Vencimento', 'Cód. Receita', 'Descrição', 'Referência']],
+        estilizar_moeda_br(df_exibicao, ['Valor']),
         use_container_width=True,
         hide_index=True
     )
     
-    # Download CSV
-    csv = df_e116.to_csv(index=False, encoding='utf-8-sig', sep=';', decimal=',')
-    st.download_button(
-        label='📥 Baixar Guias (CSV)',
-        data=csv,
-        file_name='guias_icms_e116.csv',
-        mime='text/csv'
+    # Download (gerado só quando solicitado)
+    exibir_exportacao(
+        df_e116,
+        'guias_icms_e116',
+        key='exportar_e116',
+        rotulo='Guias',
+        encoding_csv='utf-8-sig'
     )
     
     st.markdown('---')
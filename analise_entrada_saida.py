@@ -21,7 +21,9 @@ CAMPOS PRINCIPAIS:
 
 GATILHOS DE MANUTENÇÃO:
     1. Para adicionar novos campos: incluir em criar_resumo_entrada_saida()
+       (calculos_fiscais.py)
     2. Para mudar classificação: ajustar classificar_tipo_operacao()
+       (calculos_fiscais.py)
     3. Para novos gráficos: adicionar em criar_graficos_entrada_saida()
 
 Data de Criação: 16/12/2025
@@ -33,225 +35,19 @@ import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 from typing import Tuple, Dict
-
-
-# ============================================================================
-# FUNÇÕES DE CLASSIFICAÇÃO
-# ============================================================================
-
-def classificar_tipo_operacao(cfop: str) -> str:
-    """
-    Classifica o tipo de operação baseado no CFOP.
-    
-    GATILHO DE MANUTENÇÃO:
-    - CFOPs 1,2,3 = ENTRADA
-    - CFOPs 5,6,7 = SAÍDA
-    - Outros = OUTROS
-    """
-    if not cfop or len(str(cfop)) == 0:
-        return 'NÃO CLASSIFICADO'
-    
-    cfop_str = str(cfop).strip()
-    if len(cfop_str) == 0:
-        return 'NÃO CLASSIFICADO'
-    
-    primeiro_digito = cfop_str[0]
-    
-    if primeiro_digito in ['1', '2', '3']:
-        return 'ENTRADA'
-    elif primeiro_digito in ['5', '6', '7']:
-        return 'SAÍDA'
-    else:
-        return 'OUTROS'
-
-
-def adicionar_classificacao(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Adiciona coluna TIPO_OPERACAO ao DataFrame.
-    
-    GATILHO DE MANUTENÇÃO:
-    - Sempre aplicar antes de qualquer análise
-    - Baseado na coluna CFOP
-    """
-    if df.empty:
-        df['TIPO_OPERACAO'] = ''
-        return df
-    
-    if 'CFOP' not in df.columns:
-        df['TIPO_OPERACAO'] = 'NÃO CLASSIFICADO'
-        return df
-    
-    df['TIPO_OPERACAO'] = df['CFOP'].apply(classificar_tipo_operacao)
-    
-    return df
-
-
-# ============================================================================
-# FUNÇÕES DE ANÁLISE
-# ============================================================================
-
-def criar_resumo_entrada_saida(df_c100: pd.DataFrame, df_c190: pd.DataFrame) -> pd.DataFrame:
-    """
-    Cria resumo consolidado de entrada e saída.
-    
-    IMPORTANTE:
-    - Usa C100 para valores totais de documentos
-    - Usa C190 para detalhamento por CFOP/CST
-    
-    GATILHO DE MANUTENÇÃO:
-    - Para adicionar campos, incluir na agregação
-    - Para mudar cálculo, ajustar lógica de soma
-    """
-    if df_c190.empty:
-        return pd.DataFrame(columns=['TIPO', 'QUANTIDADE', 'VL_OPERACAO', 'VL_ICMS', 'VL_IPI', 'TOTAL'])
-    
-    # Adiciona classificação
-    df_c190 = adicionar_classificacao(df_c190)
-    
-    # Agrupa por tipo de operação
-    resumo_data = []
-    
-    for tipo in ['ENTRADA', 'SAÍDA']:
-        df_tipo = df_c190[df_c190['TIPO_OPERACAO'] == tipo]
-        
-        if not df_tipo.empty:
-            qtd = len(df_tipo)
-            vl_opr = df_tipo['VL_OPR'].sum() if 'VL_OPR' in df_tipo.columns else 0
-            vl_icms = df_tipo['VL_ICMS'].sum() if 'VL_ICMS' in df_tipo.columns else 0
-            vl_ipi = df_tipo['VL_IPI'].sum() if 'VL_IPI' in df_tipo.columns else 0
-            
-            resumo_data.append({
-                'TIPO': tipo,
-                'QUANTIDADE': qtd,
-                'VL_OPERACAO': vl_opr,
-                'VL_ICMS': vl_icms,
-                'VL_IPI': vl_ipi,
-                'TOTAL': vl_icms + vl_ipi
-            })
-    
-    df_resumo = pd.DataFrame(resumo_data)
-    return df_resumo
-
-
-def top_cfops_por_tipo(df_c190: pd.DataFrame, tipo: str, top_n: int = 10) -> pd.DataFrame:
-    """
-    Retorna os top N CFOPs por tipo de operação.
-    
-    GATILHO DE MANUTENÇÃO:
-    - Para mudar critério de ordenação, ajustar sort_values
-    - Para adicionar campos, incluir no groupby.agg
-    """
-    if df_c190.empty:
-        return pd.DataFrame()
-    
-    df_c190 = adicionar_classificacao(df_c190)
-    df_tipo = df_c190[df_c190['TIPO_OPERACAO'] == tipo].copy()
-    
-    if df_tipo.empty:
-        return pd.DataFrame()
-    
-    # Agrupa por CFOP
-    df_agrupado = df_tipo.groupby('CFOP').agg({
-        'VL_OPR': 'sum',
-        'VL_ICMS': 'sum',
-        'VL_IPI': 'sum'
-    }).reset_index()
-    
-    df_agrupado['TOTAL'] = df_agrupado['VL_ICMS'] + df_agrupado['VL_IPI']
-    df_agrupado = df_agrupado.sort_values('TOTAL', ascending=False).head(top_n)
-    
-    return df_agrupado
-
-
-def extrair_mes_de_data(data_str: str) -> str:
-    """
-    Extrai o mês de uma data no formato DDMMAAAA.
-    
-    GATILHO DE MANUTENÇÃO:
-    - Formato esperado: 06052025 (06/Maio/2025)
-    - Posições 2-3 contêm o mês
-    """
-    if not data_str or len(str(data_str)) < 6:
-        return 'Indefinido'
-    
-    meses_dict = {
-        '01': 'Janeiro', '02': 'Fevereiro', '03': 'Março',
-        '04': 'Abril', '05': 'Maio', '06': 'Junho',
-        '07': 'Julho', '08': 'Agosto', '09': 'Setembro',
-        '10': 'Outubro', '11': 'Novembro', '12': 'Dezembro'
-    }
-    
-    # Extrai MM de DDMMAAAA (posições 2 e 3)
-    mes_num = str(data_str)[2:4]
-    return meses_dict.get(mes_num, 'Indefinido')
-
-
-def evolucao_mensal_entrada_saida(df_c100: pd.DataFrame, df_c190: pd.DataFrame) -> pd.DataFrame:
-    """
-    Calcula evolução mensal de entrada e saída.
-    
-    IMPORTANTE:
-    - Usa DT_DOC do C100 para determinar o mês
-    - Usa valores do C190 para ICMS/IPI
-    
-    GATILHO DE MANUTENÇÃO:
-    - Para mudar formato de data, ajustar extrair_mes_de_data()
-    - Para adicionar campos, incluir no merge
-    """
-    if df_c100.empty or df_c190.empty:
-        return pd.DataFrame()
-    
-    # Adiciona mês ao C100
-    df_c100 = df_c100.copy()
-    df_c100['MES'] = df_c100['DT_DOC'].apply(extrair_mes_de_data)
-    
-    # Adiciona classificação ao C190
-    df_c190 = adicionar_classificacao(df_c190)
-    
-    # Merge C100 com C190 (assumindo que há relação por NUM_DOC)
-    if 'NUM_DOC' in df_c100.columns and 'NUM_DOC_PAI' in df_c190.columns:
-        df_merged = df_c190.merge(
-            df_c100[['NUM_DOC', 'MES']], 
-            left_on='NUM_DOC_PAI', 
-            right_on='NUM_DOC', 
-            how='left'
-        )
-    else:
-        # Se não houver relação, usa apenas C190
-        return pd.DataFrame()
-    
-    # Agrupa por mês e tipo
-    df_evolucao = df_merged.groupby(['MES', 'TIPO_OPERACAO']).agg({
-        'VL_ICMS': 'sum',
-        'VL_IPI': 'sum'
-    }).reset_index()
-    
-    df_evolucao['TOTAL'] = df_evolucao['VL_ICMS'] + df_evolucao['VL_IPI']
-    
-    # Ordena por ordem alfabética dos meses
-    ordem_meses = [
-        'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
-        'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
-    ]
-    df_evolucao['ORDEM'] = df_evolucao['MES'].apply(
-        lambda x: ordem_meses.index(x) if x in ordem_meses else 99
-    )
-    df_evolucao = df_evolucao.sort_values('ORDEM').drop('ORDEM', axis=1)
-    
-    return df_evolucao
+from exportacao import exibir_exportacao
+from formatacao import formatar_moeda_br, formatar_moeda_br_em_lote, formatar_inteiro_br, estilizar_moeda_br
+# Cálculos sem interface (reexportados para os imports existentes)
+from calculos_fiscais import (
+    classificar_tipo_operacao, adicionar_classificacao, criar_resumo_entrada_saida,
+    top_cfops_por_tipo, extrair_mes_de_data, evolucao_mensal_entrada_saida
+)
 
 
 # ============================================================================
 # FUNÇÕES DE VISUALIZAÇÃO
 # ============================================================================
 
-def formatar_moeda_br(valor):
-    """Formata valor no padrão brasileiro: R$ 1.234,56"""
-    if pd.isna(valor) or valor == 0:
-        return 'R$ 0,00'
-    return f'R$ {valor:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
-
-
 def criar_grafico_comparativo(df_resumo: pd.DataFrame) -> go.Figure:
     """
     Cria gráfico de barras comparando Entrada vs Saída.
@@ -271,7 +67,7 @@ def criar_grafico_comparativo(df_resumo: pd.DataFrame) -> go.Figure:
         x=df_resumo['TIPO'],
         y=df_resumo['VL_ICMS'],
         marker_color='#1f77b4',
-        text=df_resumo['VL_ICMS'].apply(formatar_moeda_br),
+        text=formatar_moeda_br_em_lote(df_resumo['VL_ICMS']),
         textposition='outside'
     ))
     
@@ -281,7 +77,7 @@ def criar_grafico_comparativo(df_resumo: pd.DataFrame) -> go.Figure:
         x=df_resumo['TIPO'],
         y=df_resumo['VL_IPI'],
         marker_color='#ff7f0e',
-        text=df_resumo['VL_IPI'].apply(formatar_moeda_br),
+        text=formatar_moeda_br_em_lote(df_resumo['VL_IPI']),
         textposition='outside'
     ))
     
@@ -396,7 +192,7 @@ def exibir_analise_entrada_saida(df_c100: pd.DataFrame, df_c190: pd.DataFrame):
     
     with col1:
         qtd_entrada = entrada['QUANTIDADE'].sum() if not entrada.empty else 0
-        st.metric('Registros Entrada', f"{qtd_entrada:,}".replace(',', '.'))
+        st.metric('Registros Entrada', formatar_inteiro_br(qtd_entrada))
     
     with col2:
         icms_entrada = entrada['VL_ICMS'].sum() if not entrada.empty else 0
@@ -404,7 +200,7 @@ def exibir_analise_entrada_saida(df_c100: pd.DataFrame, df_c190: pd.DataFrame):
     
     with col3:
         qtd_saida = saida['QUANTIDADE'].sum() if not saida.empty else 0
-        st.metric('Registros Saída', f"{qtd_saida:,}".replace(',', '.'))
+        st.metric('Registros Saída', formatar_inteiro_br(qtd_saida))
     
     with col4:
         icms_saida = saida['VL_ICMS'].sum() if not saida.empty else 0
@@ -434,21 +230,17 @@ def exibir_analise_entrada_saida(df_c100: pd.DataFrame, df_c190: pd.DataFrame):
     
     # Tabela resumida
     st.subheader('Resumo Detalhado')
-    df_exibicao = df_resumo.copy()
-    df_exibicao['VL_OPERACAO'] = df_exibicao['VL_OPERACAO'].apply(formatar_moeda_br)
-    df_exibicao['VL_ICMS'] = df_exibicao['VL_ICMS'].apply(formatar_moeda_br)
-    df_exibicao['VL_IPI'] = df_exibicao['VL_IPI'].apply(formatar_moeda_br)
-    df_exibicao['TOTAL'] = df_exibicao['TOTAL'].apply(formatar_moeda_br)
+    df_exibicao = estilizar_moeda_br(df_resumo, ['VL_OPERACAO', 'VL_ICMS', 'VL_IPI', 'TOTAL'])
     
     st.dataframe(df_exibicao, use_container_width=True, hide_index=True)
     
-    # Download
-    csv = df_resumo.to_csv(index=False, encoding='utf-8-sig', sep=';', decimal=',')
-    st.download_button(
-        label='Baixar Resumo (CSV)',
-        data=csv,
-        file_name='entrada_saida_icms_ipi.csv',
-        mime='text/csv'
+    # Download (gerado só quando solicitado)
+    exibir_exportacao(
+        df_resumo,
+        'entrada_saida_icms_ipi',
+        key='exportar_entrada_saida',
+        rotulo='Resumo',
+        encoding_csv='utf-8-sig'
     )
 
 
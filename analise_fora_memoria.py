@@ -0,0 +1,357 @@
+"""
+================================================================================
+MÓDULO: Análise Fora da Memória (base Parquet particionada) - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Analisar bases maiores que a RAM (ex.: 5 anos de 40 filiais em um
+    servidor de 16 GB). Os registros ficam em disco, no diretório gerado por
+    converter_sped.py (um Parquet por registro e arquivo de origem), e as
+    análises são somas por partes: cada lote é lido, reduzido aos seus
+    totais e descartado.
+
+FUNCIONAMENTO:
+    1. ler_lotes() percorre as partições de um registro (<destino>/C190/*.parquet)
+       em lotes de até LINHAS_POR_LOTE linhas, lendo só as colunas usadas
+    2. somar_por_grupo() reduz cada lote por grupo (CFOP, mês...) e soma
+       os parciais: a memória é a de um lote mais a dos grupos, nunca a
+       da base
+    3. As funções *_particionado() devolvem as mesmas tabelas das análises
+       em memória (calculos_fiscais.py):
+       - acumulador_cfop_particionado       -> criar_acumulador_cfop
+       - resumo_entrada_saida_particionado  -> criar_resumo_entrada_saida
+       - evolucao_mensal_particionada       -> evolucao_mensal_entrada_saida
+       - entrada_saida_particionada         -> agregar_entrada_saida
+       - linha_temporal_particionada        -> agregar_linha_temporal
+       Só a soma é feita aqui; o acabamento (classificação, totais, ordem
+       dos meses, rótulos de IND_OPER) usa as mesmas funções e constantes
+       de calculos_fiscais.py (finalizar_*, ROTULOS_IND_OPER)
+
+IMPORTANTE:
+    - A evolução mensal usa a data do documento pai gravada no próprio C190
+      (DT_DOC_PAI) em vez de cruzar C190 e C100 pelo NUM_DOC: o resultado é
+      o mesmo quando o NUM_DOC não se repete, e não exige o C100 na memória
+    - Somas por partes podem diferir da soma de uma vez na última casa
+      decimal (ordem das somas em ponto flutuante)
+    - Streamlit só dentro das funções de interface (o módulo é usado em
+      lote e em notebooks)
+
+NO APP:
+    As bases convertidas ficam em subdiretórios de SPED_DIRETORIO_BASES
+    (configurado no servidor) e são escolhidas na barra lateral; o app não
+    aceita caminho digitado (não expõe outros diretórios do servidor).
+
+USO:
+    python converter_sped.py /dados/speds --destino /dados/parquet --processos 8
+    python analise_fora_memoria.py /dados/parquet --saida /dados/resumos
+
+GATILHOS DE MANUTENÇÃO:
+    1. Nova análise: só somas e contagens por grupo (somar_por_grupo);
+       médias e distintos precisam guardar os parciais (soma e contagem)
+    2. Lote maior = menos leituras e mais memória: LINHAS_POR_LOTE
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from calculos_fiscais import (
+    CAMPOS_ACUMULAVEIS, COLUNAS_RESUMO_ENTRADA_SAIDA, ROTULOS_IND_OPER, classificar_tipo_operacao,
+    extrair_mes_de_data, finalizar_acumulador_cfop, finalizar_evolucao_mensal, finalizar_resumo_entrada_saida,
+)
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Linhas lidas por vez de cada partição
+LINHAS_POR_LOTE = 500_000
+
+
+# ============================================================================
+# LEITURA POR PARTES
+# ============================================================================
+
+def listar_particoes(destino: str, registro: str) -> List[str]:
+    """
+    Parquet do registro no diretório convertido, em ordem de nome.
+    """
+    return sorted(glob.glob(os.path.join(destino, registro, '*.parquet')))
+
+
+def ler_lotes(destino: str, registro: str, colunas: List[str],
+              linhas_por_lote: int = LINHAS_POR_LOTE) -> Iterator[pd.DataFrame]:
+    """
+    Lotes do registro com as colunas pedidas que existirem na partição.
+    """
+    for caminho in listar_particoes(destino, registro):
+        arquivo = pq.ParquetFile(caminho)
+        presentes = [coluna for coluna in colunas if coluna in arquivo.schema_arrow.names]
+        for lote in arquivo.iter_batches(batch_size=linhas_por_lote, columns=presentes):
+            yield lote.to_pandas()
+
+
+def somar_por_grupo(lotes: Iterable[pd.DataFrame], grupos: List[str], somas: List[str],
+                    contagem: str = None) -> Optional[pd.DataFrame]:
+    """
+    Soma as colunas por grupo, lote a lote.
+
+    RETORNA:
+        DataFrame indexado pelos grupos (com a coluna contagem, se pedida),
+        ou None se nenhum lote tinha as colunas dos grupos
+    """
+    acumulado = None
+    for lote in lotes:
+        if any(grupo not in lote.columns for grupo in grupos):
+            continue
+        agrupado = lote.groupby(grupos, observed=True)
+        parcial = agrupado[[coluna for coluna in somas if coluna in lote.columns]].sum()
+        if contagem:
+            parcial[contagem] = agrupado.size()
+        acumulado = parcial if acumulado is None else _somar_parciais(acumulado, parcial)
+    return acumulado
+
+
+def _somar_parciais(acumulado: pd.DataFrame, parcial: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma dois parciais alinhando os grupos, sem virar float o que era inteiro.
+    """
+    tipos = {
+        coluna: np.result_type(*(df[coluna].dtype for df in (acumulado, parcial) if coluna in df.columns))
+        for coluna in acumulado.columns.union(parcial.columns, sort=False)
+    }
+    return acumulado.add(parcial, fill_value=0).astype(tipos)
+
+
+def _com_tipo_operacao(lotes: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Lotes com TIPO_OPERACAO (classificação calculada uma vez por CFOP do lote).
+    """
+    for lote in lotes:
+        tipos = {cfop: classificar_tipo_operacao(cfop) for cfop in lote['CFOP'].unique()}
+        yield lote.assign(TIPO_OPERACAO=lote['CFOP'].map(tipos))
+
+
+# ============================================================================
+# ANÁLISES
+# ============================================================================
+
+def acumulador_cfop_particionado(destino: str, linhas_por_lote: int = LINHAS_POR_LOTE) -> pd.DataFrame:
+    """
+    Acumulador por CFOP e CST_ICMS do C190 em disco (= criar_acumulador_cfop).
+    """
+    grupos = ['CFOP', 'CST_ICMS']
+    acumulado = somar_por_grupo(ler_lotes(destino, 'C190', grupos + CAMPOS_ACUMULAVEIS, linhas_por_lote),
+                                grupos, CAMPOS_ACUMULAVEIS, 'QTD_REGISTROS')
+    if acumulado is None:
+        return pd.DataFrame()
+
+    campos_soma = [campo for campo in CAMPOS_ACUMULAVEIS if campo in acumulado.columns]
+    return finalizar_acumulador_cfop(acumulado.reset_index()[grupos + campos_soma + ['QTD_REGISTROS']],
+                                     campos_soma)
+
+
+def resumo_entrada_saida_particionado(destino: str, linhas_por_lote: int = LINHAS_POR_LOTE) -> pd.DataFrame:
+    """
+    Resumo de entradas e saídas do C190 em disco (= criar_resumo_entrada_saida).
+    """
+    somas = ['VL_OPR', 'VL_ICMS', 'VL_IPI']
+    lotes = _com_tipo_operacao(ler_lotes(destino, 'C190', ['CFOP'] + somas, linhas_por_lote))
+    acumulado = somar_por_grupo(lotes, ['TIPO_OPERACAO'], somas, 'QUANTIDADE')
+    if acumulado is None:
+        return pd.DataFrame(columns=COLUNAS_RESUMO_ENTRADA_SAIDA)
+    return finalizar_resumo_entrada_saida(acumulado)
+
+
+def evolucao_mensal_particionada(destino: str, linhas_por_lote: int = LINHAS_POR_LOTE) -> pd.DataFrame:
+    """
+    ICMS e IPI por mês e tipo de operação (= evolucao_mensal_entrada_saida,
+    com o mês do DT_DOC_PAI do C190).
+    """
+    def com_mes(lotes):
+        for lote in lotes:
+            meses = {data: extrair_mes_de_data(data) for data in lote['DT_DOC_PAI'].unique()}
+            yield lote.assign(MES=lote['DT_DOC_PAI'].map(meses))
+
+    lotes = ler_lotes(destino, 'C190', ['CFOP', 'DT_DOC_PAI', 'VL_ICMS', 'VL_IPI'], linhas_por_lote)
+    acumulado = somar_por_grupo(com_mes(_com_tipo_operacao(lotes)), ['MES', 'TIPO_OPERACAO'],
+                                ['VL_ICMS', 'VL_IPI'])
+    if acumulado is None:
+        return pd.DataFrame()
+
+    return finalizar_evolucao_mensal(acumulado.reset_index()).reset_index(drop=True)
+
+
+def entrada_saida_particionada(destino: str, linhas_por_lote: int = LINHAS_POR_LOTE) -> pd.DataFrame:
+    """
+    VL_DOC, VL_ICMS e VL_IPI do C100 em disco por IND_OPER (= agregar_entrada_saida).
+    """
+    somas = ['VL_DOC', 'VL_ICMS', 'VL_IPI']
+    acumulado = somar_por_grupo(ler_lotes(destino, 'C100', ['IND_OPER'] + somas, linhas_por_lote),
+                                ['IND_OPER'], somas)
+    if acumulado is None:
+        return pd.DataFrame()
+
+    resumo = acumulado.reset_index()
+    resumo['OPERACAO'] = resumo['IND_OPER'].map(ROTULOS_IND_OPER)
+    return resumo
+
+
+def linha_temporal_particionada(destino: str, linhas_por_lote: int = LINHAS_POR_LOTE) -> pd.DataFrame:
+    """
+    VL_DOC, VL_ICMS e VL_IPI do C100 em disco por data (= agregar_linha_temporal).
+    """
+    def com_data(lotes):
+        for lote in lotes:
+            yield lote.assign(DATA=pd.to_datetime(lote['DT_DOC'], format='%d%m%Y', errors='coerce'))
+
+    somas = ['VL_DOC', 'VL_ICMS', 'VL_IPI']
+    acumulado = somar_por_grupo(com_data(ler_lotes(destino, 'C100', ['DT_DOC'] + somas, linhas_por_lote)),
+                                ['DATA'], somas)
+    if acumulado is None or acumulado.empty:
+        return pd.DataFrame()
+    return acumulado.reset_index().sort_values('DATA')
+
+
+# Análises -> (nome do arquivo de saída, função)
+ANALISES_PARTICIONADAS: Dict[str, Callable[[str], pd.DataFrame]] = {
+    'acumulador_cfop': acumulador_cfop_particionado,
+    'entrada_saida': resumo_entrada_saida_particionado,
+    'evolucao_mensal': evolucao_mensal_particionada,
+    'dashboard_entrada_saida': entrada_saida_particionada,
+    'dashboard_linha_temporal': linha_temporal_particionada,
+}
+
+
+def calcular_analises(destino: str) -> Dict[str, pd.DataFrame]:
+    """
+    Todas as análises de ANALISES_PARTICIONADAS sobre o diretório convertido.
+    """
+    return {nome: funcao(destino) for nome, funcao in ANALISES_PARTICIONADAS.items()}
+
+
+def assinatura_diretorio(destino: str) -> str:
+    """
+    Hash dos nomes, tamanhos e datas das partições de C100 e C190: muda
+    quando o diretório é reconvertido ou recebe novos arquivos.
+    """
+    assinatura = hashlib.sha256(os.path.abspath(destino).encode('utf-8'))
+    for registro in ('C100', 'C190'):
+        for caminho in listar_particoes(destino, registro):
+            informacoes = os.stat(caminho)
+            assinatura.update(f'{caminho}\x00{informacoes.st_size}\x00{informacoes.st_mtime_ns}\x00'.encode('utf-8'))
+    return assinatura.hexdigest()
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+def listar_bases(raiz: str) -> List[str]:
+    """
+    Subdiretórios da raiz com C100 ou C190 convertidos.
+    """
+    if not raiz or not os.path.isdir(raiz):
+        return []
+    return sorted(
+        nome for nome in os.listdir(raiz)
+        if listar_particoes(os.path.join(raiz, nome), 'C100') or listar_particoes(os.path.join(raiz, nome), 'C190')
+    )
+
+
+def selecionar_base() -> Optional[str]:
+    """
+    Escolha de uma base convertida na barra lateral (só com SPED_DIRETORIO_BASES).
+
+    RETORNA:
+        Caminho da base escolhida ou None
+    """
+    import streamlit as st
+
+    raiz = os.environ.get('SPED_DIRETORIO_BASES')
+    bases = listar_bases(raiz)
+    if not bases:
+        return None
+    base = st.sidebar.selectbox(
+        "📦 Base convertida (fora da memória)",
+        options=[None] + bases,
+        format_func=lambda nome: "Nenhuma" if nome is None else nome,
+        key="base_convertida",
+        help="Bases maiores que a memória, convertidas com converter_sped.py: "
+             "as análises somam as partições em disco, sem carregar a base."
+    )
+    return None if base is None else os.path.join(raiz, base)
+
+
+def exibir_analise_fora_memoria(destino: str):
+    """
+    Análises do diretório convertido no app (resultados no cache de datasets).
+    """
+    import streamlit as st
+
+    from cache_datasets import obter_dataset
+    from formatacao import estilizar_moeda_br, formatar_moeda_br
+
+    st.subheader("📦 Base convertida (análise fora da memória)")
+    if not listar_particoes(destino, 'C100') and not listar_particoes(destino, 'C190'):
+        st.warning(f"⚠️ Nenhum C100/C190 convertido em {destino} (gerar com converter_sped.py)")
+        return
+
+    with st.spinner("🔄 Somando as partições em disco..."):
+        analises = obter_dataset(f'fora_memoria:{assinatura_diretorio(destino)}',
+                                 lambda: calcular_analises(destino), arquivos=[destino])
+
+    st.caption(f"{len(listar_particoes(destino, 'C190'))} arquivo(s) convertido(s) em {destino}")
+    resumo = analises['entrada_saida']
+    colunas = st.columns(max(len(resumo), 1))
+    for coluna, (_, linha) in zip(colunas, resumo.iterrows()):
+        with coluna:
+            st.metric(f"{linha['TIPO']} - ICMS + IPI", formatar_moeda_br(linha['TOTAL']),
+                      help=f"{linha['QUANTIDADE']} registro(s) C190")
+
+    if not analises['dashboard_linha_temporal'].empty:
+        st.markdown("**Evolução diária (C100)**")
+        st.line_chart(analises['dashboard_linha_temporal'], x='DATA', y=['VL_DOC', 'VL_ICMS', 'VL_IPI'])
+
+    for nome, titulo in (('evolucao_mensal', "Evolução mensal (C190)"), ('acumulador_cfop', "Acumulador CFOP")):
+        st.markdown(f"**{titulo}**")
+        st.dataframe(estilizar_moeda_br(analises[nome]), use_container_width=True, hide_index=True)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argumentos=None) -> int:
+    """
+    Calcula as análises de um diretório convertido e grava um Parquet por análise.
+    """
+    parser = argparse.ArgumentParser(description="Análises por partes sobre o Parquet de converter_sped.py")
+    parser.add_argument('destino', help='Diretório gerado por converter_sped.py')
+    parser.add_argument('--saida', help='Diretório dos resultados (<análise>.parquet); sem ele, só imprime')
+    args = parser.parse_args(argumentos)
+
+    for nome, df in calcular_analises(args.destino).items():
+        print(f"{nome}: {len(df)} linha(s)")
+        if args.saida:
+            os.makedirs(args.saida, exist_ok=True)
+            df.to_parquet(os.path.join(args.saida, f'{nome}.parquet'), index=False)
+        else:
+            print(df.head(20).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,14 +7,33 @@ import streamlit as st
 import pandas as pd
 import zipfile
 import io
-from sped_parser import processar_multiplos_speds
-from parser_registros_0 import processar_multiplos_speds_registros_0
-from parser_registros_e import processar_multiplos_speds_registros_e
+from ingestao import carregar_dataset
+from pipeline_ingestao import carregar_dataset_pipeline, usar_pipeline
+from cache_datasets import (
+    calcular_chave_arquivos, dataset_em_cache, dataset_na_sessao, exibir_painel_cache, obter_dataset,
+    painel_admin_habilitado
+)
 from dashboards_bigfour import exibir_dashboard_executivo
 from filtros_avancados import criar_painel_filtros, exibir_resumo_filtros
 from acumuladores_cfop import exibir_acumulador_cfop
 from analise_entrada_saida import exibir_analise_entrada_saida
 from aba_apuracao_mensal import exibir_aba_apuracao_mensal
+from indice_busca import filtrar_por_busca
+from tabela_paginada import exibir_tabela_paginada
+from exportacao import exibir_exportacao
+from instrumentacao import exibir_diagnostico
+from relatorio_memoria import avaliar_memoria_upload, exibir_alertas_memoria, exibir_relatorio_memoria
+from formatacao import formatar_moeda_br
+from perfilamento import iniciar_perfil_execucao, finalizar_perfil_execucao
+from progresso_ingestao import exibir_ingestao_cancelada, exibir_progresso_ingestao, ingestao_cancelada
+from projecao_analises import ANALISES, chave_com_projecao, projecao_para_analises, selecionar_analises
+from filtros_leitura import REGISTRO_CANCELADOS, chave_com_filtro
+from consulta_sql import exibir_consulta_sql
+from repositorio_sped import exibir_importacao_upload, obter_dataset_repositorio, selecionar_repositorio
+from analise_fora_memoria import exibir_analise_fora_memoria, selecionar_base
+from previa_ingestao import (
+    ativar_previa, carregar_previa, copiar_arquivos, exibir_selo_amostra, obter_dataset_previa, retirar_carga_completa
+)
 
 # Configuração da página
 st.set_page_config(
@@ -23,6 +42,9 @@ st.set_page_config(
     layout="wide"
 )
 
+# Perfilamento sob demanda (SPED_PROFILE=1 ou ?profile=1): cobre esta execução inteira
+iniciar_perfil_execucao()
+
 # Título principal
 st.title("📊 Analisador de SPED ICMS/IPI")
 st.markdown("### Sistema Completo de Análise Fiscal - EFD ICMS/IPI")
@@ -33,7 +55,8 @@ st.markdown("---")
 # ========================================================================
 
 st.subheader("📁 Upload de Arquivos SPED")
-st.markdown("Faça upload de até 12 arquivos SPED (.txt ou .zip)")
+st.markdown("Faça upload de até 12 arquivos SPED (.txt ou .zip). Para bases maiores que a memória, "
+            "converta os arquivos com `converter_sped.py` e escolha a base em \"📦 Base convertida\".")
 
 uploaded_files = st.file_uploader(
     "Selecione os arquivos",
@@ -42,376 +65,470 @@ uploaded_files = st.file_uploader(
     help="Arquivos SPED ICMS/IPI em formato .txt ou .zip"
 )
 
+# Painel do cache compartilhado (apenas administradores: SPED_ADMIN=1 no servidor)
+if painel_admin_habilitado():
+    exibir_painel_cache()
+
+# Abas escolhidas: definem as colunas lidas do bloco C
+analises = selecionar_analises()
+projecao = projecao_para_analises(analises)
+
+# Cancelados/denegados/inutilizados fora dos totais (listados em C100_CANCELADOS)
+excluir_cancelados = st.sidebar.checkbox(
+    "🚫 Desconsiderar documentos cancelados",
+    value=False,
+    key="excluir_cancelados",
+    help="Documentos com situação 02, 03 (cancelados), 04 (denegados) e 05 (inutilizados) e "
+         "os seus itens não entram nos totais; ficam listados na aba Documentos (C100). "
+         "Mudar a opção processa os arquivos de novo."
+)
+filtro_leitura = {'EXCLUIR_CANCELADOS': True} if excluir_cancelados else None
+
+# Prévia: amostra do bloco C na hora e o processamento completo em segundo plano
+previa = ativar_previa()
+
+# Base convertida em disco (SPED_DIRETORIO_BASES): análises por partes, sem upload
+base_convertida = selecionar_base()
+if base_convertida:
+    exibir_analise_fora_memoria(base_convertida)
+    st.markdown("---")
+
+# Repositório local (SPED_REPOSITORIO): empresa e períodos já importados, sem upload
+selecao_repositorio = selecionar_repositorio()
+
 # Inicializa variáveis de dados
 dados_c = {}
 dados_0 = {}
 dados_e = {}
+indices_busca = {}
+chaves_ordenacao = {}
 
 # ========================================================================
-# PROCESSAMENTO (SE HOUVER UPLOAD)
+# PROCESSAMENTO (UPLOAD OU REPOSITÓRIO)
 # ========================================================================
 
-if uploaded_files:
+if uploaded_files or selecao_repositorio:
     with st.spinner("🔄 Processando arquivos SPED..."):
-        # Processa registros C (documentos fiscais)
-        dados_c = processar_multiplos_speds(uploaded_files)
+        # Sem upload: empresa e períodos do repositório (só essas partições são lidas)
+        if not uploaded_files:
+            chave_dataset, dataset = obter_dataset_repositorio(selecao_repositorio, projecao)
+        else:
+            # Mesmo conteúdo enviado em outra sessão reaproveita o dataset em cache
+            chave_dataset = chave_com_filtro(chave_com_projecao(
+                calcular_chave_arquivos(uploaded_files, memo=st.session_state.setdefault('hashes_upload', {})),
+                projecao
+            ), filtro_leitura)
+        
+            # Upload cancelado pelo usuário: não processa de novo sozinho
+            if ingestao_cancelada(chave_dataset):
+                exibir_ingestao_cancelada(chave_dataset)
+                st.stop()
+        
+            # Upload novo: avisa antes de processar se pode faltar memória
+            # e mostra o progresso com a opção de cancelar
+            atualizar_progresso = None
+            area_progresso = None
+            if not dataset_em_cache(chave_dataset) and not dataset_na_sessao(chave_dataset, st.session_state):
+                exibir_alertas_memoria(avaliar_memoria_upload(uploaded_files))
+                if not previa:
+                    atualizar_progresso, area_progresso = exibir_progresso_ingestao(chave_dataset)
+        
+            # Vários SPEDs grandes: descompactação e análise sobrepostas
+            carregar = carregar_dataset_pipeline if usar_pipeline(uploaded_files) else carregar_dataset
+            nomes_arquivos = [file.name for file in uploaded_files]
         
-        # Reseta ponteiro dos arquivos para processar registros 0
-        for file in uploaded_files:
-            file.seek(0)
+            # Prévia (None se o dataset completo já está pronto)
+            dataset = None
+            if previa:
+                copias = copiar_arquivos(uploaded_files)
+                dataset = obter_dataset_previa(
+                    chave_dataset,
+                    lambda: carregar_previa(uploaded_files, chave_dataset, projecao=projecao, filtro=filtro_leitura),
+                    lambda **opcoes: carregar(copias, chave_dataset, projecao=projecao, filtro=filtro_leitura,
+                                              incremental=True, **opcoes),
+                    arquivos=nomes_arquivos
+                )
         
-        # Processa registros 0 (cadastros)
-        dados_0 = processar_multiplos_speds_registros_0(uploaded_files)
+            # Dataset completo (o da carga em segundo plano, se ficou fora do cache);
+            # arquivos já processados em uploads anteriores não são lidos de novo
+            if dataset is None:
+                dataset = obter_dataset(
+                    chave_dataset,
+                    lambda: retirar_carga_completa(chave_dataset) or carregar(
+                        uploaded_files, chave_dataset, progresso=atualizar_progresso,
+                        projecao=projecao, filtro=filtro_leitura,
+                        incremental=True, hashes=st.session_state['hashes_upload']
+                    ),
+                    arquivos=nomes_arquivos,
+                    sessao=st.session_state
+                )
+            if area_progresso is not None:
+                area_progresso.empty()
         
-        # Reseta ponteiro dos arquivos para processar registros E
-        for file in uploaded_files:
-            file.seek(0)
+        # Registros C (documentos), 0 (cadastros) e E (apuração)
+        dados_c = dataset['dados_c']
+        dados_0 = dataset['dados_0']
+        dados_e = dataset['dados_e']
         
-        # Processa registros E (apuração)
-        dados_e = processar_multiplos_speds_registros_e(uploaded_files)
+        # Índices de busca (0150 e 0200) e chaves de ordenação das tabelas
+        indices_busca = dataset['indices_busca']
+        chaves_ordenacao = dataset['chaves_ordenacao']
     
-    st.success(f"✅ {len(uploaded_files)} arquivo(s) processado(s) com sucesso!")
+    if uploaded_files:
+        st.success(f"✅ {len(uploaded_files)} arquivo(s) processado(s) com sucesso!")
+        exibir_importacao_upload(uploaded_files)
+    else:
+        st.success(f"✅ {len(dataset['arquivos'])} período(s) de {selecao_repositorio['cnpj']} carregado(s) do repositório")
+    
+    # Prévia: selo da amostra; o app roda de novo quando o completo termina
+    if dataset.get('amostra') is not None:
+        exibir_selo_amostra(dataset, chave_dataset)
+    
+    # Tempo e vazão de cada etapa da ingestão deste dataset
+    exibir_diagnostico(dataset.get('estatisticas'))
+    
+    # Memória ocupada por tabela e por coluna
+    exibir_relatorio_memoria(dataset, chave_dataset)
+    
+    # Exportação completa: uma planilha por registro (só com o bloco C inteiro)
+    with st.expander("📗 Exportar todos os registros (XLSX)"):
+        if dataset.get('amostra') is not None:
+            st.info("ℹ️ A prévia tem só uma amostra dos documentos. "
+                    "A exportação fica disponível quando o processamento completo terminar.")
+        elif dataset.get('projecao') is None:
+            exibir_exportacao(
+                {**dados_0, **dados_c, **dados_e},
+                "sped_icms_ipi_registros",
+                key="exportar_todos",
+                rotulo="Todos os Registros",
+                formatos=('xlsx',)
+            )
+        else:
+            st.info("ℹ️ Apenas as colunas usadas pelas abas escolhidas foram lidas. "
+                    "Selecione todas as análises na barra lateral para exportar todos os registros.")
     
     # ========================================================================
     # ABAS DE NAVEGAÇÃO
     # ========================================================================
     
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs([
-        "📊 Dashboard",
-        "📥📤 Entrada/Saída",
-        "💰 ICMS/IPI Apurado",
-        "📄 Documentos (C100)",
-        "📦 Itens (C170)",
-        "📈 Analítico (C190)",
-        "👥 Participantes (0150)",
-        "🏷️ Produtos (0200)",
-        "🎯 Acumulador CFOP"
-    ])
+    abas = dict(zip(analises, st.tabs([ANALISES[analise]['rotulo'] for analise in analises])))
     
     # ========================================================================
     # ABA 1: DASHBOARD EXECUTIVO
     # ========================================================================
     
-    with tab1:
-        df_c100 = dados_c.get('C100', pd.DataFrame())
-        df_c190 = dados_c.get('C190', pd.DataFrame())
+    if 'dashboard' in abas:
+        with abas['dashboard']:
+            df_c100 = dados_c.get('C100', pd.DataFrame())
+            df_c190 = dados_c.get('C190', pd.DataFrame())
         
-        if not df_c100.empty or not df_c190.empty:
-            exibir_dashboard_executivo(df_c100, df_c190)
-        else:
-            st.warning("⚠️ Não há dados para exibir o dashboard")
+            if not df_c100.empty or not df_c190.empty:
+                exibir_dashboard_executivo(df_c100, df_c190)
+            else:
+                st.warning("⚠️ Não há dados para exibir o dashboard")
     
     # ========================================================================
     # ABA 2: ANÁLISE ENTRADA/SAÍDA
     # ========================================================================
     
-    with tab2:
-        df_c100 = dados_c.get('C100', pd.DataFrame())
-        df_c190 = dados_c.get('C190', pd.DataFrame())
+    if 'entrada_saida' in abas:
+        with abas['entrada_saida']:
+            df_c100 = dados_c.get('C100', pd.DataFrame())
+            df_c190 = dados_c.get('C190', pd.DataFrame())
         
-        if not df_c100.empty or not df_c190.empty:
-            exibir_analise_entrada_saida(df_c100, df_c190)
-        else:
-            st.warning("⚠️ Não há dados para exibir a análise de entrada/saída")
+            if not df_c100.empty or not df_c190.empty:
+                exibir_analise_entrada_saida(df_c100, df_c190)
+            else:
+                st.warning("⚠️ Não há dados para exibir a análise de entrada/saída")
     
     # ========================================================================
     # ABA 3: ICMS/IPI APURADO (MENSAL)
     # ========================================================================
     
-    with tab3:
-        # Passa dados_e para a aba de apuração
-        if dados_e:
-            exibir_aba_apuracao_mensal(dados_e)
-        else:
-            st.warning("⚠️ Não há dados para exibir a apuração mensal")
+    if 'apuracao' in abas:
+        with abas['apuracao']:
+            # Passa dados_e para a aba de apuração
+            if dados_e:
+                exibir_aba_apuracao_mensal(dados_e)
+            else:
+                st.warning("⚠️ Não há dados para exibir a apuração mensal")
     
     # ========================================================================
     # ABA 4: DOCUMENTOS FISCAIS (C100)
     # ========================================================================
     
-    with tab4:
-        st.markdown("## 📄 Documentos Fiscais - Registro C100")
-        st.markdown("Notas Fiscais (NF-e, NFC-e, Modelo 01, 04, etc.)")
-        st.markdown("---")
+    if 'c100' in abas:
+        with abas['c100']:
+            st.markdown("## 📄 Documentos Fiscais - Registro C100")
+            st.markdown("Notas Fiscais (NF-e, NFC-e, Modelo 01, 04, etc.)")
+            st.markdown("---")
         
-        df_c100 = dados_c.get('C100', pd.DataFrame())
+            df_c100 = dados_c.get('C100', pd.DataFrame())
         
-        if not df_c100.empty:
-            # Aplica filtros
-            df_filtrado, filtros = criar_painel_filtros(df_c100, key_prefix="c100")
-            exibir_resumo_filtros(filtros)
+            if not df_c100.empty:
+                # Aplica filtros
+                df_filtrado, filtros = criar_painel_filtros(df_c100, key_prefix="c100")
+                exibir_resumo_filtros(filtros)
             
-            # Estatísticas
-            col1, col2, col3, col4 = st.columns(4)
+                # Estatísticas
+                col1, col2, col3, col4 = st.columns(4)
             
-            with col1:
-                st.metric("Total de Documentos", len(df_filtrado))
+                with col1:
+                    st.metric("Total de Documentos", len(df_filtrado))
             
-            with col2:
-                total_valor = df_filtrado['VL_DOC'].sum()
-                st.metric("Valor Total", f"R$ {total_valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col2:
+                    total_valor = df_filtrado['VL_DOC'].sum()
+                    st.metric("Valor Total", formatar_moeda_br(total_valor))
             
-            with col3:
-                total_icms = df_filtrado['VL_ICMS'].sum()
-                st.metric("Total ICMS", f"R$ {total_icms:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col3:
+                    total_icms = df_filtrado['VL_ICMS'].sum()
+                    st.metric("Total ICMS", formatar_moeda_br(total_icms))
             
-            with col4:
-                total_ipi = df_filtrado['VL_IPI'].sum()
-                st.metric("Total IPI", f"R$ {total_ipi:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col4:
+                    total_ipi = df_filtrado['VL_IPI'].sum()
+                    st.metric("Total IPI", formatar_moeda_br(total_ipi))
             
-            st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("<br>", unsafe_allow_html=True)
             
-            # Tabela de dados
-            st.dataframe(
-                df_filtrado,
-                use_container_width=True,
-                hide_index=True
-            )
+                # Tabela de dados (paginada: só a página visível vai ao navegador)
+                exibir_tabela_paginada(
+                    df_filtrado,
+                    df_base=df_c100,
+                    key_prefix="tabela_c100",
+                    cache=chaves_ordenacao['C100']
+                )
             
-            # Download
-            csv = df_filtrado.to_csv(index=False, sep=';', decimal=',')
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name="documentos_c100.csv",
-                mime="text/csv"
-            )
-        else:
-            st.warning("⚠️ Não há registros C100 para exibir")
+                # Download (arquivo gerado só quando solicitado)
+                exibir_exportacao(df_filtrado, "documentos_c100", key="exportar_c100", rotulo="C100")
+            else:
+                st.warning("⚠️ Não há registros C100 para exibir")
+            
+            # Documentos separados na leitura (opção "Desconsiderar documentos cancelados")
+            df_cancelados = dados_c.get(REGISTRO_CANCELADOS, pd.DataFrame())
+            if not df_cancelados.empty:
+                with st.expander(f"🚫 Documentos cancelados, denegados e inutilizados ({len(df_cancelados)})"):
+                    st.dataframe(df_cancelados, use_container_width=True, hide_index=True)
     
     # ========================================================================
     # ABA 5: ITENS DOS DOCUMENTOS (C170)
     # ========================================================================
     
-    with tab5:
-        st.markdown("## 📦 Itens dos Documentos - Registro C170")
-        st.markdown("Detalhamento de produtos/serviços das notas fiscais")
-        st.markdown("---")
+    if 'c170' in abas:
+        with abas['c170']:
+            st.markdown("## 📦 Itens dos Documentos - Registro C170")
+            st.markdown("Detalhamento de produtos/serviços das notas fiscais")
+            st.markdown("---")
         
-        df_c170 = dados_c.get('C170', pd.DataFrame())
+            df_c170 = dados_c.get('C170', pd.DataFrame())
         
-        if not df_c170.empty:
-            # Aplica filtros
-            df_filtrado, filtros = criar_painel_filtros(df_c170, key_prefix="c170")
-            exibir_resumo_filtros(filtros)
+            if not df_c170.empty:
+                # Aplica filtros
+                df_filtrado, filtros = criar_painel_filtros(df_c170, key_prefix="c170")
+                exibir_resumo_filtros(filtros)
             
-            # Estatísticas
-            col1, col2, col3, col4 = st.columns(4)
+                # Estatísticas
+                col1, col2, col3, col4 = st.columns(4)
             
-            with col1:
-                st.metric("Total de Itens", len(df_filtrado))
+                with col1:
+                    st.metric("Total de Itens", len(df_filtrado))
             
-            with col2:
-                total_valor = df_filtrado['VL_ITEM'].sum()
-                st.metric("Valor Total", f"R$ {total_valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col2:
+                    total_valor = df_filtrado['VL_ITEM'].sum()
+                    st.metric("Valor Total", formatar_moeda_br(total_valor))
             
-            with col3:
-                total_icms = df_filtrado['VL_ICMS'].sum()
-                st.metric("Total ICMS", f"R$ {total_icms:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col3:
+                    total_icms = df_filtrado['VL_ICMS'].sum()
+                    st.metric("Total ICMS", formatar_moeda_br(total_icms))
             
-            with col4:
-                total_ipi = df_filtrado['VL_IPI'].sum()
-                st.metric("Total IPI", f"R$ {total_ipi:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col4:
+                    total_ipi = df_filtrado['VL_IPI'].sum()
+                    st.metric("Total IPI", formatar_moeda_br(total_ipi))
             
-            st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("<br>", unsafe_allow_html=True)
             
-            # Tabela de dados
-            st.dataframe(
-                df_filtrado,
-                use_container_width=True,
-                hide_index=True
-            )
+                # Tabela de dados (paginada: só a página visível vai ao navegador)
+                exibir_tabela_paginada(
+                    df_filtrado,
+                    df_base=df_c170,
+                    key_prefix="tabela_c170",
+                    cache=chaves_ordenacao['C170']
+                )
             
-            # Download
-            csv = df_filtrado.to_csv(index=False, sep=';', decimal=',')
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name="itens_c170.csv",
-                mime="text/csv"
-            )
-        else:
-            st.warning("⚠️ Não há registros C170 para exibir")
+                # Download (arquivo gerado só quando solicitado)
+                exibir_exportacao(df_filtrado, "itens_c170", key="exportar_c170", rotulo="C170")
+            else:
+                st.warning("⚠️ Não há registros C170 para exibir")
     
     # ========================================================================
     # ABA 6: REGISTRO ANALÍTICO (C190)
     # ========================================================================
     
-    with tab6:
-        st.markdown("## 📈 Registro Analítico - C190")
-        st.markdown("Consolidação por CST ICMS e CFOP")
-        st.markdown("---")
+    if 'c190' in abas:
+        with abas['c190']:
+            st.markdown("## 📈 Registro Analítico - C190")
+            st.markdown("Consolidação por CST ICMS e CFOP")
+            st.markdown("---")
         
-        df_c190 = dados_c.get('C190', pd.DataFrame())
+            df_c190 = dados_c.get('C190', pd.DataFrame())
         
-        if not df_c190.empty:
-            # Aplica filtros
-            df_filtrado, filtros = criar_painel_filtros(df_c190, key_prefix="c190")
-            exibir_resumo_filtros(filtros)
+            if not df_c190.empty:
+                # Aplica filtros
+                df_filtrado, filtros = criar_painel_filtros(df_c190, key_prefix="c190")
+                exibir_resumo_filtros(filtros)
             
-            # Estatísticas
-            col1, col2, col3, col4 = st.columns(4)
+                # Estatísticas
+                col1, col2, col3, col4 = st.columns(4)
             
-            with col1:
-                st.metric("Total de Registros", len(df_filtrado))
+                with col1:
+                    st.metric("Total de Registros", len(df_filtrado))
             
-            with col2:
-                total_operacao = df_filtrado['VL_OPR'].sum()
-                st.metric("Valor Operação", f"R$ {total_operacao:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col2:
+                    total_operacao = df_filtrado['VL_OPR'].sum()
+                    st.metric("Valor Operação", formatar_moeda_br(total_operacao))
             
-            with col3:
-                total_icms = df_filtrado['VL_ICMS'].sum()
-                st.metric("Total ICMS", f"R$ {total_icms:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col3:
+                    total_icms = df_filtrado['VL_ICMS'].sum()
+                    st.metric("Total ICMS", formatar_moeda_br(total_icms))
             
-            with col4:
-                total_ipi = df_filtrado['VL_IPI'].sum()
-                st.metric("Total IPI", f"R$ {total_ipi:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+                with col4:
+                    total_ipi = df_filtrado['VL_IPI'].sum()
+                    st.metric("Total IPI", formatar_moeda_br(total_ipi))
             
-            st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("<br>", unsafe_allow_html=True)
             
-            # Tabela de dados
-            st.dataframe(
-                df_filtrado,
-                use_container_width=True,
-                hide_index=True
-            )
+                # Tabela de dados (paginada: só a página visível vai ao navegador)
+                exibir_tabela_paginada(
+                    df_filtrado,
+                    df_base=df_c190,
+                    key_prefix="tabela_c190",
+                    cache=chaves_ordenacao['C190']
+                )
             
-            # Download
-            csv = df_filtrado.to_csv(index=False, sep=';', decimal=',')
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name="analitico_c190.csv",
-                mime="text/csv"
-            )
-        else:
-            st.warning("⚠️ Não há registros C190 para exibir")
+                # Download (arquivo gerado só quando solicitado)
+                exibir_exportacao(df_filtrado, "analitico_c190", key="exportar_c190", rotulo="C190")
+            else:
+                st.warning("⚠️ Não há registros C190 para exibir")
     
     # ========================================================================
     # ABA 7: PARTICIPANTES (0150)
     # ========================================================================
     
-    with tab7:
-        st.markdown("## 👥 Cadastro de Participantes - Registro 0150")
-        st.markdown("Fornecedores, clientes e outros participantes")
-        st.markdown("---")
+    if 'participantes' in abas:
+        with abas['participantes']:
+            st.markdown("## 👥 Cadastro de Participantes - Registro 0150")
+            st.markdown("Fornecedores, clientes e outros participantes")
+            st.markdown("---")
         
-        df_0150 = dados_0.get('0150', pd.DataFrame())
+            df_0150 = dados_0.get('0150', pd.DataFrame())
         
-        if not df_0150.empty:
-            # Estatísticas
-            col1, col2, col3 = st.columns(3)
+            if not df_0150.empty:
+                # Estatísticas
+                col1, col2, col3 = st.columns(3)
             
-            with col1:
-                st.metric("Total de Participantes", len(df_0150))
+                with col1:
+                    st.metric("Total de Participantes", len(df_0150))
             
-            with col2:
-                com_cnpj = df_0150['CNPJ'].notna().sum()
-                st.metric("Com CNPJ", com_cnpj)
+                with col2:
+                    com_cnpj = df_0150['CNPJ'].notna().sum()
+                    st.metric("Com CNPJ", com_cnpj)
             
-            with col3:
-                com_cpf = df_0150['CPF'].notna().sum()
-                st.metric("Com CPF", com_cpf)
+                with col3:
+                    com_cpf = df_0150['CPF'].notna().sum()
+                    st.metric("Com CPF", com_cpf)
             
-            st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("<br>", unsafe_allow_html=True)
             
-            # Busca por nome
-            busca = st.text_input("🔍 Buscar por nome ou código", key="busca_participante")
+                # Busca por nome
+                busca = st.text_input("🔍 Buscar por nome ou código", key="busca_participante")
             
-            if busca:
-                df_filtrado = df_0150[
-                    df_0150['NOME'].str.contains(busca, case=False, na=False) |
-                    df_0150['COD_PART'].astype(str).str.contains(busca, case=False, na=False)
-                ]
-            else:
-                df_filtrado = df_0150
+                if busca:
+                    df_filtrado = filtrar_por_busca(df_0150, indices_busca['0150'], busca)
+                else:
+                    df_filtrado = df_0150
             
-            # Tabela de dados
-            st.dataframe(
-                df_filtrado,
-                use_container_width=True,
-                hide_index=True
-            )
+                # Tabela de dados (paginada: só a página visível vai ao navegador)
+                exibir_tabela_paginada(
+                    df_filtrado,
+                    df_base=df_0150,
+                    key_prefix="tabela_0150",
+                    cache=chaves_ordenacao['0150']
+                )
             
-            # Download
-            csv = df_filtrado.to_csv(index=False, sep=';', decimal=',')
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name="participantes_0150.csv",
-                mime="text/csv"
-            )
-        else:
-            st.warning("⚠️ Não há registros 0150 para exibir")
+                # Download (arquivo gerado só quando solicitado)
+                exibir_exportacao(df_filtrado, "participantes_0150", key="exportar_0150", rotulo="0150")
+            else:
+                st.warning("⚠️ Não há registros 0150 para exibir")
     
     # ========================================================================
     # ABA 8: PRODUTOS (0200)
     # ========================================================================
     
-    with tab8:
-        st.markdown("## 🏷️ Cadastro de Produtos - Registro 0200")
-        st.markdown("Itens comercializados (produtos e serviços)")
-        st.markdown("---")
+    if 'produtos' in abas:
+        with abas['produtos']:
+            st.markdown("## 🏷️ Cadastro de Produtos - Registro 0200")
+            st.markdown("Itens comercializados (produtos e serviços)")
+            st.markdown("---")
         
-        df_0200 = dados_0.get('0200', pd.DataFrame())
+            df_0200 = dados_0.get('0200', pd.DataFrame())
         
-        if not df_0200.empty:
-            # Estatísticas
-            col1, col2, col3 = st.columns(3)
+            if not df_0200.empty:
+                # Estatísticas
+                col1, col2, col3 = st.columns(3)
             
-            with col1:
-                st.metric("Total de Produtos", len(df_0200))
+                with col1:
+                    st.metric("Total de Produtos", len(df_0200))
             
-            with col2:
-                com_ncm = df_0200['COD_NCM'].notna().sum()
-                st.metric("Com NCM", com_ncm)
+                with col2:
+                    com_ncm = df_0200['COD_NCM'].notna().sum()
+                    st.metric("Com NCM", com_ncm)
             
-            with col3:
-                tipos = df_0200['TIPO_ITEM'].nunique()
-                st.metric("Tipos de Item", tipos)
+                with col3:
+                    tipos = df_0200['TIPO_ITEM'].nunique()
+                    st.metric("Tipos de Item", tipos)
             
-            st.markdown("<br>", unsafe_allow_html=True)
+                st.markdown("<br>", unsafe_allow_html=True)
             
-            # Busca por descrição
-            busca = st.text_input("🔍 Buscar por descrição ou código", key="busca_produto")
+                # Busca por descrição
+                busca = st.text_input("🔍 Buscar por descrição ou código", key="busca_produto")
             
-            if busca:
-                df_filtrado = df_0200[
-                    df_0200['DESCR_ITEM'].str.contains(busca, case=False, na=False) |
-                    df_0200['COD_ITEM'].astype(str).str.contains(busca, case=False, na=False)
-                ]
-            else:
-                df_filtrado = df_0200
+                if busca:
+                    df_filtrado = filtrar_por_busca(df_0200, indices_busca['0200'], busca)
+                else:
+                    df_filtrado = df_0200
             
-            # Tabela de dados
-            st.dataframe(
-                df_filtrado,
-                use_container_width=True,
-                hide_index=True
-            )
+                # Tabela de dados (paginada: só a página visível vai ao navegador)
+                exibir_tabela_paginada(
+                    df_filtrado,
+                    df_base=df_0200,
+                    key_prefix="tabela_0200",
+                    cache=chaves_ordenacao['0200']
+                )
             
-            # Download
-            csv = df_filtrado.to_csv(index=False, sep=';', decimal=',')
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name="produtos_0200.csv",
-                mime="text/csv"
-            )
-        else:
-            st.warning("⚠️ Não há registros 0200 para exibir")
+                # Download (arquivo gerado só quando solicitado)
+                exibir_exportacao(df_filtrado, "produtos_0200", key="exportar_0200", rotulo="0200")
+            else:
+                st.warning("⚠️ Não há registros 0200 para exibir")
     
     # ========================================================================
     # ABA 9: ACUMULADOR POR CFOP
     # ========================================================================
     
-    with tab9:
-        df_c190 = dados_c.get('C190', pd.DataFrame())
+    if 'acumulador_cfop' in abas:
+        with abas['acumulador_cfop']:
+            df_c190 = dados_c.get('C190', pd.DataFrame())
         
-        if not df_c190.empty:
-            exibir_acumulador_cfop(df_c190)
-        else:
-            st.warning("⚠️ Não há dados C190 para exibir o acumulador")
+            if not df_c190.empty:
+                exibir_acumulador_cfop(df_c190)
+            else:
+                st.warning("⚠️ Não há dados C190 para exibir o acumulador")
+
+    # ========================================================================
+    # ABA 10: CONSULTA SQL
+    # ========================================================================
+    
+    if 'sql' in abas:
+        with abas['sql']:
+            exibir_consulta_sql(dataset, chave_dataset)
 
 else:
     # Mensagem inicial quando não há upload
@@ -435,8 +552,9 @@ else:
         - ✅ Análise de itens e produtos
         - ✅ Cadastro de participantes
         - ✅ Acumuladores por CFOP e CST
+        - ✅ Consultas SQL sobre todos os registros
         - ✅ Filtros avançados
-        - ✅ Exportação para CSV
+        - ✅ Exportação para CSV e Excel (XLSX)
         
         **Desenvolvido com:**
         - Python 3.11+
@@ -476,3 +594,6 @@ st.markdown("""
     <a href='https://github.com/RAFAELSOUZA280292/EFD_ICMS_IPI_Lavoratory' target='_blank'>GitHub</a>
 </div>
 """, unsafe_allow_html=True)
+
+# Grava o perfil desta execução (se o perfilamento estiver ativo)
+finalizar_perfil_execucao()
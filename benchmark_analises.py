@@ -0,0 +1,451 @@
+"""
+================================================================================
+MÓDULO: Benchmark das Análises - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Medir como as funções de análise escalam com o volume de dados (tempo e
+    memória alocada), ajustar curvas de escala e comparar com uma linha de
+    base salva em JSON para detectar regressões.
+
+FUNÇÕES MEDIDAS (calculos_fiscais.py, sem Streamlit, direto sobre DataFrames):
+    - criar_acumulador_cfop (aba acumuladores_cfop.py)
+    - criar_resumo_entrada_saida, top_cfops_por_tipo,
+      evolucao_mensal_entrada_saida (aba analise_entrada_saida.py)
+    - aplicar_filtros, a lógica do painel de filtros (filtros_avancados.py)
+    - agregar_top10_cfop, agregar_entrada_saida, agregar_linha_temporal
+      (dashboards_bigfour.py)
+
+DADOS:
+    DataFrames C100/C190 gerados direto em NumPy, com as mesmas colunas e
+    tipos da saída do parser. "linhas" é a quantidade de C190; o C100 tem
+    linhas / C190_POR_DOCUMENTO documentos.
+
+MÉTRICAS:
+    - segundos: menor tempo entre as repetições
+    - memoria_pico_mb: pico de memória alocada (tracemalloc, em execução
+      separada para não distorcer o tempo)
+    - curvas: expoente b de tempo ≈ c · linhas^b (b ≈ 1 linear, b ≈ 2 quadrático)
+
+USO:
+    python benchmark_analises.py --linhas 10000 100000 1000000 --salvar linha_base.json
+    python benchmark_analises.py --comparar linha_base.json --limite 0.2
+
+    No modo de comparação o processo termina com código 1 se algum caso
+    ficar mais de --limite (20%) mais lento ou maior que a linha de base.
+
+GATILHOS DE MANUTENÇÃO:
+    1. Nova análise: incluir em CASOS (função que recebe o dicionário de dados)
+    2. Novas colunas usadas pelas análises: incluir em gerar_dados_analise()
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from calculos_fiscais import (
+    criar_acumulador_cfop, criar_resumo_entrada_saida, top_cfops_por_tipo,
+    evolucao_mensal_entrada_saida, aplicar_filtros,
+    agregar_top10_cfop, agregar_entrada_saida, agregar_linha_temporal
+)
+from formatacao import BYTES_POR_MB
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+LINHAS_PADRAO = [10_000, 100_000, 1_000_000, 10_000_000, 50_000_000]
+
+C190_POR_DOCUMENTO = 2
+PARTICIPANTES = 5_000
+
+CFOPS_ENTRADA = ['1102', '2102', '1403', '1101', '1556', '2556']
+CFOPS_SAIDA = ['5102', '6102', '5405', '5101', '5949', '6949']
+CSTS_ICMS = ['000', '020', '040', '060', '090']
+ALIQUOTAS_ICMS = [0.0, 4.0, 7.0, 12.0, 18.0]
+
+LIMITE_REGRESSAO_PADRAO = 0.2
+
+# Abaixo destes valores a variação é ruído e não entra na comparação
+TEMPO_MINIMO_COMPARACAO = 0.05
+MEMORIA_MINIMA_COMPARACAO_MB = 1.0
+
+
+# ============================================================================
+# DADOS SINTÉTICOS
+# ============================================================================
+
+def _textos(valores) -> np.ndarray:
+    """
+    Array de objetos str (como as colunas de texto do parser).
+    """
+    return np.asarray(pd.Series(valores).astype(str), dtype=object)
+
+
+def gerar_dados_analise(linhas: int, semente: int = 42) -> Dict[str, pd.DataFrame]:
+    """
+    Gera C100 e C190 sintéticos com as colunas e tipos da saída do parser.
+
+    IMPORTANTE:
+    - Um ano de datas (DT_DOC em DDMMAAAA) para a evolução mensal
+    - NUM_DOC único por documento, repetido nos filhos (NUM_DOC_PAI)
+    """
+    rng = np.random.default_rng(semente)
+    documentos = max(1, linhas // C190_POR_DOCUMENTO)
+
+    datas = _textos([(date(2025, 1, 1) + timedelta(days=d)).strftime('%d%m%Y') for d in range(365)])
+    participantes = _textos([f'P{p:06d}' for p in range(PARTICIPANTES)])
+
+    saida = rng.random(documentos) < 0.5
+    num_doc = _textos(np.arange(1, documentos + 1))
+    dt_doc = datas[rng.integers(0, len(datas), documentos)]
+    cod_part = participantes[rng.integers(0, PARTICIPANTES, documentos)]
+
+    # C190: cada documento tem C190_POR_DOCUMENTO linhas (a última pode ficar incompleta)
+    pai = np.arange(linhas) // C190_POR_DOCUMENTO % documentos
+    cfops = np.where(
+        saida[pai],
+        _textos(CFOPS_SAIDA)[rng.integers(0, len(CFOPS_SAIDA), linhas)],
+        _textos(CFOPS_ENTRADA)[rng.integers(0, len(CFOPS_ENTRADA), linhas)],
+    )
+    aliquota = np.asarray(ALIQUOTAS_ICMS)[rng.integers(0, len(ALIQUOTAS_ICMS), linhas)]
+    vl_opr = np.round(rng.uniform(10, 50_000, linhas), 2)
+    vl_bc_icms = np.where(aliquota > 0, vl_opr, 0.0)
+    vl_icms = np.round(vl_bc_icms * aliquota / 100, 2)
+    vl_ipi = np.where(rng.random(linhas) < 0.3, np.round(vl_opr * 0.05, 2), 0.0)
+    vl_icms_st = np.where(rng.random(linhas) < 0.1, np.round(vl_opr * 0.04, 2), 0.0)
+
+    df_c190 = pd.DataFrame({
+        'REG': 'C190',
+        'CST_ICMS': _textos(CSTS_ICMS)[rng.integers(0, len(CSTS_ICMS), linhas)],
+        'CFOP': cfops,
+        'ALIQ_ICMS': aliquota,
+        'VL_OPR': vl_opr,
+        'VL_BC_ICMS': vl_bc_icms,
+        'VL_ICMS': vl_icms,
+        'VL_BC_ICMS_ST': np.where(vl_icms_st > 0, vl_opr, 0.0),
+        'VL_ICMS_ST': vl_icms_st,
+        'VL_RED_BC': 0.0,
+        'VL_IPI': vl_ipi,
+        'COD_OBS': '',
+        'NUM_DOC_PAI': num_doc[pai],
+        'COD_PART_PAI': cod_part[pai],
+        'DT_DOC_PAI': dt_doc[pai],
+    })
+
+    def somar_por_documento(valores: np.ndarray) -> np.ndarray:
+        return np.bincount(pai, weights=valores, minlength=documentos)
+
+    df_c100 = pd.DataFrame({
+        'REG': 'C100',
+        'IND_OPER': np.where(saida, '1', '0').astype(object),
+        'IND_EMIT': np.where(saida, '0', '1').astype(object),
+        'COD_PART': cod_part,
+        'COD_MOD': '55',
+        'COD_SIT': '00',
+        'SER': '1',
+        'NUM_DOC': num_doc,
+        'DT_DOC': dt_doc,
+        'DT_E_S': dt_doc,
+        'VL_DOC': somar_por_documento(vl_opr),
+        'VL_MERC': somar_por_documento(vl_opr - vl_ipi),
+        'VL_BC_ICMS': somar_por_documento(vl_bc_icms),
+        'VL_ICMS': somar_por_documento(vl_icms),
+        'VL_ICMS_ST': somar_por_documento(vl_icms_st),
+        'VL_IPI': somar_por_documento(vl_ipi),
+    })
+
+    return {'C100': df_c100, 'C190': df_c190}
+
+
+# ============================================================================
+# CASOS MEDIDOS
+# ============================================================================
+
+CASOS: Dict[str, Callable[[Dict[str, pd.DataFrame]], object]] = {
+    'criar_acumulador_cfop': lambda d: criar_acumulador_cfop(d['C190']),
+    'criar_resumo_entrada_saida': lambda d: criar_resumo_entrada_saida(d['C100'], d['C190']),
+    'top_cfops_por_tipo': lambda d: top_cfops_por_tipo(d['C190'], 'SAÍDA'),
+    'evolucao_mensal_entrada_saida': lambda d: evolucao_mensal_entrada_saida(d['C100'], d['C190']),
+    'aplicar_filtros_c100': lambda d: aplicar_filtros(
+        d['C100'], participantes=['P000001', 'P000002', 'P000003'],
+        operador_valor='>', valor=1000.0,
+        data_inicio=date(2025, 1, 1), data_fim=date(2025, 6, 30)
+    ),
+    'aplicar_filtros_c190': lambda d: aplicar_filtros(
+        d['C190'], cfops=['5102', '6102'], csts_icms=['000', '020']
+    ),
+    'agregar_top10_cfop': lambda d: agregar_top10_cfop(d['C190'], 'VL_ICMS'),
+    'agregar_entrada_saida': lambda d: agregar_entrada_saida(d['C100']),
+    'agregar_linha_temporal': lambda d: agregar_linha_temporal(d['C100']),
+}
+
+
+# ============================================================================
+# MEDIÇÃO
+# ============================================================================
+
+def medir_caso(funcao: Callable, dados: Dict[str, pd.DataFrame], repeticoes: int = 3) -> dict:
+    """
+    Mede o menor tempo entre as repetições e o pico de memória alocada.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao(dados)
+        tempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao(dados)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'segundos': min(tempos), 'memoria_pico_mb': pico / BYTES_POR_MB}
+
+
+def executar_benchmark(linhas: List[int], casos: List[str] = None, repeticoes: int = 3,
+                       semente: int = 42) -> List[dict]:
+    """
+    Mede cada caso em cada volume de linhas.
+
+    IMPORTANTE:
+    - Os dados de um volume são gerados uma vez e liberados antes do próximo
+    - Falta de memória em um caso é registrada e os demais continuam
+    """
+    casos = casos or list(CASOS)
+    resultados = []
+
+    for quantidade in linhas:
+        print(f"Gerando {quantidade:,} linhas...", file=sys.stderr)
+        try:
+            dados = gerar_dados_analise(quantidade, semente)
+        except MemoryError:
+            resultados.extend({'caso': c, 'linhas': quantidade, 'erro': 'MemoryError'} for c in casos)
+            continue
+
+        for caso in casos:
+            print(f"  {caso}", file=sys.stderr)
+            try:
+                medicao = medir_caso(CASOS[caso], dados, repeticoes)
+            except MemoryError:
+                medicao = {'erro': 'MemoryError'}
+            resultados.append({'caso': caso, 'linhas': quantidade, **medicao})
+
+        del dados
+        gc.collect()
+
+    return resultados
+
+
+# ============================================================================
+# CURVAS DE ESCALA
+# ============================================================================
+
+def ajustar_curva(linhas: List[int], valores: List[float]) -> dict:
+    """
+    Ajusta valor ≈ coeficiente · linhas^expoente (regressão em escala log-log).
+
+    RETORNA:
+        {'expoente', 'coeficiente', 'r2'} ou None com menos de 2 pontos válidos
+    """
+    pontos = [(n, v) for n, v in zip(linhas, valores) if n > 0 and v and v > 0]
+    if len(pontos) < 2:
+        return None
+
+    x = np.log([n for n, _ in pontos])
+    y = np.log([v for _, v in pontos])
+    expoente, intercepto = np.polyfit(x, y, 1)
+    previsto = expoente * x + intercepto
+    total = np.sum((y - y.mean()) ** 2)
+    r2 = 1 - np.sum((y - previsto) ** 2) / total if total > 0 else 1.0
+
+    return {'expoente': float(expoente), 'coeficiente': float(np.exp(intercepto)), 'r2': float(r2)}
+
+
+def ajustar_curvas(resultados: List[dict]) -> Dict[str, dict]:
+    """
+    Curvas de tempo e de memória por caso.
+    """
+    curvas = {}
+    for caso in dict.fromkeys(r['caso'] for r in resultados):
+        validos = sorted((r for r in resultados if r['caso'] == caso and 'erro' not in r),
+                         key=lambda r: r['linhas'])
+        linhas = [r['linhas'] for r in validos]
+        curvas[caso] = {
+            'tempo': ajustar_curva(linhas, [r['segundos'] for r in validos]),
+            'memoria': ajustar_curva(linhas, [r['memoria_pico_mb'] for r in validos]),
+        }
+    return curvas
+
+
+# ============================================================================
+# LINHA DE BASE E COMPARAÇÃO
+# ============================================================================
+
+def montar_relatorio(resultados: List[dict]) -> dict:
+    """
+    Relatório completo (formato do arquivo JSON de linha de base).
+    """
+    return {
+        'criado_em': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'plataforma': platform.platform(),
+            'processador': platform.processor() or platform.machine(),
+        },
+        'resultados': resultados,
+        'curvas': ajustar_curvas(resultados),
+    }
+
+
+def comparar_resultados(atuais: List[dict], linha_base: List[dict],
+                        limite: float = LIMITE_REGRESSAO_PADRAO) -> List[dict]:
+    """
+    Compara cada (caso, linhas) com a linha de base.
+
+    IMPORTANTE:
+    - Razão = atual / linha de base (1.30 = 30% pior)
+    - Tempos e memórias muito pequenos na linha de base são ignorados (ruído)
+    - Caso que passou a falhar conta como regressão
+    """
+    base = {(r['caso'], r['linhas']): r for r in linha_base}
+    comparacoes = []
+
+    for atual in atuais:
+        anterior = base.get((atual['caso'], atual['linhas']))
+        if anterior is None or 'erro' in anterior:
+            continue
+
+        comparacao = {'caso': atual['caso'], 'linhas': atual['linhas'],
+                      'razao_tempo': None, 'razao_memoria': None, 'regressao': False}
+        if 'erro' in atual:
+            comparacao['regressao'] = True
+            comparacoes.append(comparacao)
+            continue
+
+        if anterior['segundos'] >= TEMPO_MINIMO_COMPARACAO:
+            comparacao['razao_tempo'] = atual['segundos'] / anterior['segundos']
+        if anterior['memoria_pico_mb'] >= MEMORIA_MINIMA_COMPARACAO_MB:
+            comparacao['razao_memoria'] = atual['memoria_pico_mb'] / anterior['memoria_pico_mb']
+
+        comparacao['regressao'] = any(
+            razao is not None and razao > 1 + limite
+            for razao in (comparacao['razao_tempo'], comparacao['razao_memoria'])
+        )
+        comparacoes.append(comparacao)
+
+    return comparacoes
+
+
+# ============================================================================
+# SAÍDA EM TEXTO
+# ============================================================================
+
+def formatar_resultados(relatorio: dict) -> str:
+    """
+    Tabela de medições seguida das curvas de escala.
+    """
+    linhas = [f"{'Caso':<32} {'Linhas':>12} {'Segundos':>10} {'Memória MB':>11}"]
+    for r in relatorio['resultados']:
+        if 'erro' in r:
+            linhas.append(f"{r['caso']:<32} {r['linhas']:>12,} {'ERRO: ' + r['erro']:>22}")
+        else:
+            linhas.append(f"{r['caso']:<32} {r['linhas']:>12,} {r['segundos']:>10.4f} {r['memoria_pico_mb']:>11.1f}")
+
+    def curva_texto(curva, campo):
+        return f'{curva[campo]:.2f}' if curva else '-'
+
+    linhas += ['', f"{'Caso':<32} {'Tempo ~ n^b':>12} {'R²':>6} {'Memória ~ n^b':>14} {'R²':>6}"]
+    for caso, curva in relatorio['curvas'].items():
+        tempo, memoria = curva['tempo'], curva['memoria']
+        linhas.append(
+            f"{caso:<32} {curva_texto(tempo, 'expoente'):>12} {curva_texto(tempo, 'r2'):>6} "
+            f"{curva_texto(memoria, 'expoente'):>14} {curva_texto(memoria, 'r2'):>6}"
+        )
+    return '\n'.join(linhas)
+
+
+def formatar_comparacao(comparacoes: List[dict], limite: float) -> str:
+    """
+    Tabela atual / linha de base, marcando regressões acima do limite.
+    """
+    def razao(valor):
+        return f'{valor:.2f}x' if valor is not None else '-'
+
+    linhas = [f"{'Caso':<32} {'Linhas':>12} {'Tempo':>8} {'Memória':>8}  (limite +{limite:.0%})"]
+    for c in comparacoes:
+        marca = '  <-- REGRESSÃO' if c['regressao'] else ''
+        linhas.append(f"{c['caso']:<32} {c['linhas']:>12,} {razao(c['razao_tempo']):>8} "
+                      f"{razao(c['razao_memoria']):>8}{marca}")
+    return '\n'.join(linhas)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark das funções de análise SPED ICMS/IPI.')
+    parser.add_argument('--linhas', type=int, nargs='+',
+                        help='Volumes de C190 (padrão: 10 mil a 50 milhões, ou os da linha de base)')
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), help='Casos medidos (padrão: todos)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--salvar', help='Grava o relatório (linha de base) neste JSON')
+    parser.add_argument('--comparar', help='Compara com a linha de base deste JSON')
+    parser.add_argument('--limite', type=float, default=LIMITE_REGRESSAO_PADRAO,
+                        help='Piora tolerada antes de acusar regressão (0.2 = 20%%)')
+    args = parser.parse_args(argumentos)
+
+    linha_base = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            linha_base = json.load(arquivo)
+
+    linhas = args.linhas
+    casos = args.casos
+    if linhas is None and linha_base:
+        linhas = sorted({r['linhas'] for r in linha_base['resultados']})
+    if casos is None and linha_base:
+        casos = [c for c in dict.fromkeys(r['caso'] for r in linha_base['resultados']) if c in CASOS]
+
+    resultados = executar_benchmark(linhas or LINHAS_PADRAO, casos, args.repeticoes, args.semente)
+    relatorio = montar_relatorio(resultados)
+    print(formatar_resultados(relatorio))
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as destino:
+            json.dump(relatorio, destino, indent=2, ensure_ascii=False)
+
+    if linha_base:
+        comparacoes = comparar_resultados(resultados, linha_base['resultados'], args.limite)
+        print()
+        print(formatar_comparacao(comparacoes, args.limite))
+        if any(c['regressao'] for c in comparacoes):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
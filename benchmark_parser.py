@@ -0,0 +1,291 @@
+"""
+================================================================================
+MÓDULO: Benchmark dos Parsers - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Medir vazão (MB/s e linhas/s) e pico de memória (RSS) dos parsers dos
+    blocos C, 0 e E em arquivos sintéticos de 10 MB a 2 GB, para que
+    mudanças nos parsers sejam medidas em vez de estimadas.
+
+FUNCIONAMENTO:
+    1. Para cada tamanho, gera (ou reaproveita) um SPED sintético com
+       gerador_sped.py no diretório de trabalho
+    2. Cada parser roda em um subprocesso próprio: o pico de RSS medido é
+       só daquele parser, sem memória deixada pelas medições anteriores
+    3. O subprocesso lê o arquivo, mede o tempo do parser e devolve JSON
+    4. Com --repeticoes > 1, vale o menor tempo e o maior pico de RSS
+    5. --importacao mede só o tempo de "import calculos_fiscais" em
+       processos novos, contra ORCAMENTO_IMPORTACAO_SEGUNDOS (fica aqui e
+       não nos testes: tempo de relógio varia com a máquina e a carga)
+
+MÉTRICAS:
+    - segundos: tempo do parser (inclui decodificação e montagem dos DataFrames)
+    - mb_s / linhas_s: vazão sobre o tamanho do arquivo
+    - rss_base_mb: RSS após importar e ler o arquivo (antes do parser)
+    - rss_pico_mb: pico de RSS do processo durante a medição
+
+USO:
+    python benchmark_parser.py
+    python benchmark_parser.py --tamanhos 10 100 --parsers C E --repeticoes 3
+    python benchmark_parser.py --tamanhos 500 2048 --diretorio /dados/bench --json resultado.json
+    python benchmark_parser.py --importacao
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novo parser: incluir em PARSERS
+    2. Mudou o gerador: os arquivos em cache têm os parâmetros no nome;
+       apague o diretório de trabalho para gerar de novo
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import argparse
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from formatacao import BYTES_POR_MB
+from gerador_sped import documentos_para_tamanho, escrever_sped
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Parser -> (módulo, função, tipo de entrada)
+PARSERS = {
+    'C': ('sped_parser', 'processar_arquivo_sped', 'bytes'),
+    'C_colunar': ('parser_colunar', 'processar_arquivo_sped_colunar', 'bytes'),
+    'C_vetorizado': ('parser_vetorizado', 'processar_arquivo_sped_vetorizado', 'bytes'),
+    '0': ('parser_registros_0', 'processar_arquivo_sped_registros_0', 'bytes'),
+    'E': ('parser_registros_e', 'processar_arquivo_sped_registros_e', 'texto'),
+}
+
+TAMANHOS_PADRAO_MB = [10, 100, 500, 2048]
+
+PARAMETROS_PADRAO_GERADOR = {
+    'itens_por_documento': 5,
+    'c190_por_documento': 2,
+    'participantes': 2000,
+    'produtos': 5000,
+    'proporcao_cancelados': 0.01,
+    'semente': 42,
+}
+
+# Tempo máximo de "import calculos_fiscais" em um processo novo (pandas incluso)
+ORCAMENTO_IMPORTACAO_SEGUNDOS = 1.5
+
+MEDIR_IMPORTACAO = ("import sys, time; inicio = time.perf_counter(); __import__(sys.argv[1]); "
+                    "print(time.perf_counter() - inicio)")
+
+
+# ============================================================================
+# MEDIÇÃO (executada no subprocesso)
+# ============================================================================
+
+def _rss_pico_mb() -> float:
+    """
+    Pico de RSS do processo atual em MB (ru_maxrss é em KB no Linux).
+    """
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (BYTES_POR_MB if sys.platform == 'darwin' else 1024)
+
+
+def medir_parser(caminho: str, parser: str) -> dict:
+    """
+    Lê o arquivo e mede o parser indicado.
+
+    IMPORTANTE:
+    - O parser E recebe texto, como em ingestao.processar_conteudo_sped();
+      a decodificação entra no tempo medido
+    """
+    modulo, funcao, entrada = PARSERS[parser]
+    processar = getattr(importlib.import_module(modulo), funcao)
+
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    linhas = conteudo.count(b'\n')
+    rss_base = _rss_pico_mb()
+
+    inicio = time.perf_counter()
+    if entrada == 'texto':
+        resultado = processar(conteudo.decode('utf-8', errors='ignore'))
+    else:
+        resultado = processar(conteudo)
+    segundos = time.perf_counter() - inicio
+
+    return {
+        'parser': parser,
+        'bytes': len(conteudo),
+        'linhas': linhas,
+        'segundos': segundos,
+        'rss_base_mb': rss_base,
+        'rss_pico_mb': _rss_pico_mb(),
+        'registros': {tipo: len(df) for tipo, df in resultado.items()},
+    }
+
+
+def medir_em_subprocesso(caminho: str, parser: str) -> dict:
+    """
+    Executa medir_parser() em um processo Python novo e devolve o resultado.
+    """
+    processo = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--medir', caminho, '--parser', parser],
+        capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if processo.returncode != 0:
+        return {'parser': parser, 'erro': processo.stderr.strip().splitlines()[-1:] or ['sem saída']}
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def medir_importacao(modulo: str = 'calculos_fiscais', repeticoes: int = 3) -> float:
+    """
+    Menor tempo de importação do módulo em processos Python novos.
+    """
+    medicoes = []
+    for _ in range(repeticoes):
+        processo = subprocess.run(
+            [sys.executable, '-c', MEDIR_IMPORTACAO, modulo],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        medicoes.append(float(processo.stdout))
+    return min(medicoes)
+
+
+# ============================================================================
+# ARQUIVOS SINTÉTICOS
+# ============================================================================
+
+def preparar_arquivo(tamanho_mb: float, diretorio: str, parametros: dict) -> str:
+    """
+    Gera o SPED sintético do tamanho pedido, reaproveitando se já existir.
+    """
+    nome = (f"sped_{tamanho_mb:g}mb_i{parametros['itens_por_documento']}"
+            f"_c{parametros['c190_por_documento']}_p{parametros['participantes']}"
+            f"_r{parametros['produtos']}_s{parametros['semente']}.txt")
+    caminho = os.path.join(diretorio, nome)
+    if os.path.exists(caminho):
+        return caminho
+
+    documentos = documentos_para_tamanho(int(tamanho_mb * BYTES_POR_MB), **parametros)
+    temporario = caminho + '.parcial'
+    with open(temporario, 'wb') as destino:
+        escrever_sped(destino, documentos=documentos, **parametros)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+# ============================================================================
+# EXECUÇÃO DO BENCHMARK
+# ============================================================================
+
+def executar_benchmark(tamanhos_mb: List[float], parsers: List[str], diretorio: str,
+                       repeticoes: int = 1, parametros: Dict = None) -> List[dict]:
+    """
+    Mede cada parser em cada tamanho e devolve uma linha de resultado por par.
+    """
+    parametros = {**PARAMETROS_PADRAO_GERADOR, **(parametros or {})}
+    resultados = []
+
+    for tamanho_mb in tamanhos_mb:
+        print(f"Preparando arquivo de {tamanho_mb:g} MB...", file=sys.stderr)
+        caminho = preparar_arquivo(tamanho_mb, diretorio, parametros)
+
+        for parser in parsers:
+            medicoes = [medir_em_subprocesso(caminho, parser) for _ in range(repeticoes)]
+            falhas = [m for m in medicoes if 'erro' in m]
+            if falhas:
+                resultados.append({'tamanho_mb': tamanho_mb, **falhas[0]})
+                continue
+
+            melhor = min(medicoes, key=lambda m: m['segundos'])
+            melhor['rss_pico_mb'] = max(m['rss_pico_mb'] for m in medicoes)
+            melhor['tamanho_mb'] = tamanho_mb
+            melhor['mb_s'] = melhor['bytes'] / BYTES_POR_MB / melhor['segundos']
+            melhor['linhas_s'] = melhor['linhas'] / melhor['segundos']
+            resultados.append(melhor)
+
+    return resultados
+
+
+def formatar_resultados(resultados: List[dict]) -> str:
+    """
+    Tabela de texto com uma linha por (tamanho, parser).
+    """
+    cabecalho = (f"{'Tamanho':>9} {'Parser':>6} {'Segundos':>9} {'MB/s':>8} "
+                 f"{'Linhas/s':>11} {'RSS base':>9} {'RSS pico':>9}")
+    linhas = [cabecalho, '-' * len(cabecalho)]
+    for r in resultados:
+        if 'erro' in r:
+            linhas.append(f"{r['tamanho_mb']:>6g} MB {r['parser']:>6}  ERRO: {' '.join(r['erro'])}")
+            continue
+        linhas.append(
+            f"{r['tamanho_mb']:>6g} MB {r['parser']:>6} {r['segundos']:>9.2f} {r['mb_s']:>8.2f} "
+            f"{r['linhas_s']:>11,.0f} {r['rss_base_mb']:>6.0f} MB {r['rss_pico_mb']:>6.0f} MB"
+        )
+    return '\n'.join(linhas)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Benchmark dos parsers SPED ICMS/IPI.')
+    parser.add_argument('--tamanhos', type=float, nargs='+', default=TAMANHOS_PADRAO_MB,
+                        help='Tamanhos dos arquivos sintéticos em MB')
+    parser.add_argument('--parsers', nargs='+', choices=sorted(PARSERS), default=list(PARSERS),
+                        help='Parsers medidos (C, 0, E)')
+    parser.add_argument('--repeticoes', type=int, default=1)
+    parser.add_argument('--diretorio', default=os.path.join(tempfile.gettempdir(), 'benchmark_sped'),
+                        help='Onde gerar/reaproveitar os arquivos sintéticos')
+    parser.add_argument('--itens-por-documento', type=int, default=PARAMETROS_PADRAO_GERADOR['itens_por_documento'])
+    parser.add_argument('--c190-por-documento', type=int, default=PARAMETROS_PADRAO_GERADOR['c190_por_documento'])
+    parser.add_argument('--participantes', type=int, default=PARAMETROS_PADRAO_GERADOR['participantes'])
+    parser.add_argument('--produtos', type=int, default=PARAMETROS_PADRAO_GERADOR['produtos'])
+    parser.add_argument('--json', help='Grava os resultados neste arquivo JSON')
+    parser.add_argument('--importacao', action='store_true',
+                        help='Mede só o import de calculos_fiscais contra o orçamento')
+    parser.add_argument('--medir', help=argparse.SUPPRESS)
+    parser.add_argument('--parser', help=argparse.SUPPRESS)
+    args = parser.parse_args(argumentos)
+
+    if args.medir:
+        print(json.dumps(medir_parser(args.medir, args.parser)))
+        return
+
+    if args.importacao:
+        segundos = medir_importacao(repeticoes=max(args.repeticoes, 3))
+        situacao = 'ok' if segundos < ORCAMENTO_IMPORTACAO_SEGUNDOS else 'ACIMA DO ORÇAMENTO'
+        print(f"import calculos_fiscais: {segundos:.2f} s (orçamento {ORCAMENTO_IMPORTACAO_SEGUNDOS:g} s): {situacao}")
+        return
+
+    os.makedirs(args.diretorio, exist_ok=True)
+    resultados = executar_benchmark(
+        args.tamanhos, args.parsers, args.diretorio, args.repeticoes,
+        parametros={
+            'itens_por_documento': args.itens_por_documento,
+            'c190_por_documento': args.c190_por_documento,
+            'participantes': args.participantes,
+            'produtos': args.produtos,
+        }
+    )
+    print(formatar_resultados(resultados))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as destino:
+            json.dump(resultados, destino, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+================================================================================
+MÓDULO: Cache de Resultados por Arquivo (ingestão incremental) - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Processar só os arquivos novos quando o upload muda: adicionar o 13º
+    mês a um conjunto de 12 não pode custar a leitura dos 13, nem remover
+    um arquivo a dos 11 restantes. O resultado dos parsers de cada arquivo
+    enviado fica guardado e o dataset é montado de novo por concatenação.
+
+FUNCIONAMENTO:
+    1. Cada arquivo enviado tem a sua chave: nome, tamanho e hash SHA-256
+       do conteúdo, mais a projeção e o filtro de leitura (chave_arquivo)
+    2. separar_arquivos() divide o upload em arquivos já processados
+       (resultados guardados) e novos (a processar)
+    3. Os novos passam pelos parsers e são guardados (guardar_arquivo);
+       ordenar_resultados() junta tudo na ordem do upload, igual a um
+       processamento do zero
+    4. Arquivos removidos do upload não entram na montagem; os seus
+       resultados saem do cache pelo LRU (o cache é do servidor: outra
+       sessão pode ainda estar usando o mesmo arquivo)
+
+IMPORTANTE:
+    - Opcional: ingestao.carregar_dataset(incremental=True) e a versão em
+      pipeline; o app liga, a conversão em lote (converter_sped.py) não
+    - ZIP é um arquivo só: guardado com os resultados de todos os .txt
+    - Arquivo com erro em algum SPED não é guardado (tenta de novo no
+      próximo upload)
+    - Resultados guardados são IMUTÁVEIS: a concatenação copia os dados
+    - Este módulo é importado pela ingestão (inclusive nos processos do
+      pipeline): streamlit não entra aqui
+
+CONFIGURAÇÃO:
+    Variável de ambiente SPED_CACHE_ARQUIVOS_MB (padrão: 1024 MB; 0 desliga)
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novo parâmetro que muda o resultado dos parsers: incluir em chave_arquivo()
+    2. Para mudar o orçamento em execução: configurar_orcamento_arquivos()
+    3. Painel administrativo (SPED_ADMIN=1): resumo e limpeza junto do cache
+       de datasets (cache_datasets.exibir_painel_cache)
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from filtros_leitura import chave_com_filtro
+from formatacao import BYTES_POR_MB
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+ORCAMENTO_PADRAO_MB = 1024
+
+# Bytes lidos por vez ao calcular o hash de arquivos sem buffer em memória
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+def _orcamento_inicial() -> int:
+    """
+    Orçamento em bytes a partir de SPED_CACHE_ARQUIVOS_MB.
+    """
+    try:
+        megabytes = float(os.environ.get('SPED_CACHE_ARQUIVOS_MB', ORCAMENTO_PADRAO_MB))
+    except ValueError:
+        megabytes = ORCAMENTO_PADRAO_MB
+    return int(megabytes * BYTES_POR_MB)
+
+
+# ============================================================================
+# ESTADO DO PROCESSO
+# ============================================================================
+
+_trava = threading.Lock()
+_entradas: "OrderedDict[str, dict]" = OrderedDict()
+_estado = {
+    'orcamento_bytes': _orcamento_inicial(),
+    'reaproveitados': 0,
+    'guardados': 0,
+}
+
+
+# ============================================================================
+# CHAVE DO ARQUIVO
+# ============================================================================
+
+def calcular_hash_arquivo(arquivo) -> str:
+    """
+    Hash SHA-256 do conteúdo de um arquivo enviado.
+
+    IMPORTANTE:
+    - UploadedFile já está em memória: getbuffer() evita copiar os bytes
+    - Demais arquivos são lidos em blocos; o ponteiro volta ao início
+    """
+    hash_arquivo = hashlib.sha256()
+    if hasattr(arquivo, 'getbuffer'):
+        hash_arquivo.update(arquivo.getbuffer())
+    else:
+        arquivo.seek(0)
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b''):
+            hash_arquivo.update(bloco)
+        arquivo.seek(0)
+    return hash_arquivo.hexdigest()
+
+
+def chave_arquivo(arquivo, projecao: dict = None, filtro: dict = None, memo: dict = None) -> str:
+    """
+    Chave dos resultados de um arquivo enviado (nome, tamanho, conteúdo,
+    projeção e filtro).
+
+    Parâmetros:
+        memo: dicionário file_id -> hash do conteúdo (o mesmo do app,
+              cache_datasets.calcular_chave_arquivos), evita recalcular
+    """
+    memo = {} if memo is None else memo
+    file_id = getattr(arquivo, 'file_id', None)
+    hash_arquivo = memo.get(file_id) if file_id else None
+    if hash_arquivo is None:
+        hash_arquivo = calcular_hash_arquivo(arquivo)
+        if file_id:
+            memo[file_id] = hash_arquivo
+
+    descricao = json.dumps(projecao, sort_keys=True)
+    chave = hashlib.sha256(f'{arquivo.name}\x00{arquivo.size}\x00{hash_arquivo}\x00{descricao}'.encode('utf-8'))
+    return chave_com_filtro(chave.hexdigest(), filtro)
+
+
+# ============================================================================
+# OPERAÇÕES DO CACHE
+# ============================================================================
+
+def _medir_resultados(resultados: List[Tuple[str, dict]]) -> int:
+    """
+    Bytes ocupados pelos DataFrames dos resultados de um arquivo.
+    """
+    return sum(
+        int(df.memory_usage(index=True, deep=True).sum())
+        for _, resultado in resultados
+        for tabelas in resultado.values()
+        for df in tabelas.values()
+    )
+
+
+def _liberar_espaco(bytes_necessarios: int):
+    """
+    Remove os arquivos usados há mais tempo até caber bytes_necessarios.
+
+    GATILHO DE MANUTENÇÃO:
+    - Chamar sempre com _trava adquirida
+    """
+    total = sum(entrada['bytes'] for entrada in _entradas.values())
+    while _entradas and total + bytes_necessarios > _estado['orcamento_bytes']:
+        _, removida = _entradas.popitem(last=False)
+        total -= removida['bytes']
+
+
+def consultar_arquivo(chave: str) -> Optional[List[Tuple[str, dict]]]:
+    """
+    Resultados guardados do arquivo [(nome_origem, resultado dos parsers)] ou None.
+    """
+    with _trava:
+        entrada = _entradas.get(chave)
+        if entrada is None:
+            return None
+        _entradas.move_to_end(chave)
+        _estado['reaproveitados'] += 1
+        return entrada['resultados']
+
+
+def guardar_arquivo(chave: str, resultados: List[Tuple[str, dict]]):
+    """
+    Guarda os resultados de um arquivo (se couberem no orçamento).
+    """
+    tamanho = _medir_resultados(resultados)
+    with _trava:
+        if tamanho > _estado['orcamento_bytes']:
+            return
+        _entradas.pop(chave, None)
+        _liberar_espaco(tamanho)
+        _entradas[chave] = {'resultados': resultados, 'bytes': tamanho}
+        _estado['guardados'] += 1
+
+
+def configurar_orcamento_arquivos(megabytes: float):
+    """
+    Altera o orçamento do cache de arquivos, removendo o excesso na hora.
+    """
+    with _trava:
+        _estado['orcamento_bytes'] = int(megabytes * BYTES_POR_MB)
+        _liberar_espaco(0)
+
+
+def limpar_cache_arquivos():
+    """
+    Remove os resultados de todos os arquivos.
+    """
+    with _trava:
+        _entradas.clear()
+
+
+def resumo_cache_arquivos() -> dict:
+    """
+    Totais do cache: arquivos, bytes usados, orçamento e contadores.
+    """
+    with _trava:
+        return {
+            'arquivos': len(_entradas),
+            'bytes_usados': sum(entrada['bytes'] for entrada in _entradas.values()),
+            'orcamento_bytes': _estado['orcamento_bytes'],
+            'reaproveitados': _estado['reaproveitados'],
+            'guardados': _estado['guardados'],
+        }
+
+
+# ============================================================================
+# INGESTÃO INCREMENTAL
+# ============================================================================
+
+def separar_arquivos(uploaded_files, projecao: dict = None, filtro: dict = None,
+                     memo: dict = None) -> Tuple[Dict[int, list], List[Tuple[int, object, str]]]:
+    """
+    Divide o upload em arquivos já processados e novos.
+
+    RETORNA:
+        (guardados: posição no upload -> resultados,
+         novos: [(posição no upload, arquivo, chave)])
+    """
+    guardados, novos = {}, []
+    for posicao, arquivo in enumerate(uploaded_files):
+        chave = chave_arquivo(arquivo, projecao, filtro, memo)
+        resultados = consultar_arquivo(chave)
+        if resultados is None:
+            novos.append((posicao, arquivo, chave))
+        else:
+            guardados[posicao] = resultados
+    return guardados, novos
+
+
+def ordenar_resultados(guardados: Dict[int, list], processados: Dict[int, list]) -> List[Tuple[str, dict]]:
+    """
+    Resultados de todos os arquivos na ordem do upload (para consolidar).
+    """
+    resultados = []
+    for posicao in sorted({**guardados, **processados}):
+        resultados.extend(guardados[posicao] if posicao in guardados else processados[posicao])
+    return resultados
@@ -0,0 +1,424 @@
+"""
+================================================================================
+MÓDULO: Cache Compartilhado de Datasets - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Manter no processo do servidor um único dataset processado por conjunto
+    de arquivos, compartilhado entre todas as sessões que enviarem os mesmos
+    arquivos.
+
+CONTEXTO:
+    Sem o cache, cada analista que abre os SPEDs do mesmo cliente processa e
+    guarda a sua própria cópia. Com o cache, a memória do servidor cresce
+    com a quantidade de datasets distintos, não com a de usuários.
+
+FUNCIONAMENTO:
+    1. A chave é o hash SHA-256 do conteúdo (e nome) dos arquivos enviados
+    2. Se a chave já está no cache, o dataset é reaproveitado
+    3. Senão, o dataset é processado uma vez (mesmo com várias sessões
+       pedindo ao mesmo tempo) e guardado com o seu tamanho em bytes
+    4. Se o total passar do orçamento, os datasets usados há mais tempo
+       saem primeiro (LRU)
+
+IMPORTANTE:
+    - Datasets em cache são IMUTÁVEIS: as abas nunca alteram os DataFrames
+      recebidos (usar .copy() ou .assign() antes de criar colunas)
+    - Sessões que já receberam um dataset removido continuam usando a sua
+      referência; a memória é liberada quando a última sessão sair
+    - Dataset maior que o orçamento inteiro não é guardado: as sessões que
+      esperavam o mesmo processamento recebem o resultado, e com
+      sessao=st.session_state ele fica na sessão (o último só) para os
+      próximos reruns não processarem de novo
+
+CONFIGURAÇÃO:
+    Variável de ambiente SPED_CACHE_MEMORIA_MB (padrão: 2048 MB)
+
+GATILHOS DE MANUTENÇÃO:
+    1. Para mudar o orçamento em execução: configurar_orcamento()
+    2. Novos tipos de objeto no dataset: incluir em medir_objeto()
+    3. Painel administrativo: só com SPED_ADMIN=1 no ambiente do servidor
+       (painel_admin_habilitado)
+
+Data de Criação: 18/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from formatacao import BYTES_POR_MB, formatar_inteiro_br, formatar_mb_br
+from cache_arquivos import calcular_hash_arquivo, limpar_cache_arquivos, resumo_cache_arquivos
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+ORCAMENTO_PADRAO_MB = 2048
+
+# Chave em st.session_state do último dataset maior que o orçamento
+CHAVE_DATASET_SESSAO = 'dataset_fora_do_cache'
+
+logger = logging.getLogger('sped.cache')
+
+
+def _orcamento_inicial() -> int:
+    """
+    Orçamento em bytes a partir de SPED_CACHE_MEMORIA_MB.
+    """
+    try:
+        megabytes = float(os.environ.get('SPED_CACHE_MEMORIA_MB', ORCAMENTO_PADRAO_MB))
+    except ValueError:
+        megabytes = ORCAMENTO_PADRAO_MB
+    return int(megabytes * BYTES_POR_MB)
+
+
+# ============================================================================
+# ESTADO DO PROCESSO (compartilhado entre sessões)
+# ============================================================================
+
+_trava = threading.Lock()
+_entradas: "OrderedDict[str, dict]" = OrderedDict()
+# Chave em processamento -> {'trava', 'usuarios', 'dataset' (se não coube no cache)}
+_carregando: Dict[str, dict] = {}
+_estado = {
+    'orcamento_bytes': _orcamento_inicial(),
+    'acertos': 0,
+    'faltas': 0,
+    'remocoes': 0,
+}
+
+
+# ============================================================================
+# CHAVE DO DATASET
+# ============================================================================
+
+def calcular_chave_arquivos(uploaded_files, memo: dict = None) -> str:
+    """
+    Chave do dataset: hash dos nomes e conteúdos dos arquivos, na ordem enviada.
+
+    Parâmetros:
+        uploaded_files: Arquivos enviados (UploadedFile ou arquivos binários)
+        memo: Dicionário opcional file_id -> hash (ex.: st.session_state),
+              evita recalcular o hash do mesmo upload a cada rerun
+
+    IMPORTANTE:
+    - O nome entra na chave porque vira ARQUIVO_ORIGEM nos DataFrames
+    """
+    memo = {} if memo is None else memo
+    chave = hashlib.sha256()
+    for arquivo in uploaded_files:
+        file_id = getattr(arquivo, 'file_id', None)
+        if file_id and file_id in memo:
+            hash_arquivo = memo[file_id]
+        else:
+            hash_arquivo = calcular_hash_arquivo(arquivo)
+            if file_id:
+                memo[file_id] = hash_arquivo
+        chave.update(f'{arquivo.name}\x00{hash_arquivo}\x00'.encode('utf-8'))
+    return chave.hexdigest()
+
+
+# ============================================================================
+# TAMANHO DOS DATASETS
+# ============================================================================
+
+def medir_objeto(objeto) -> int:
+    """
+    Estima os bytes ocupados pelo objeto (DataFrames, arrays, dicionários).
+
+    IMPORTANTE:
+    - DataFrames: memory_usage(deep=True) inclui o conteúdo das strings
+    - Arrays de objetos (textos do índice de busca): soma das strings
+    """
+    if isinstance(objeto, pd.DataFrame):
+        return int(objeto.memory_usage(index=True, deep=True).sum())
+    if isinstance(objeto, pd.Series):
+        return int(objeto.memory_usage(index=True, deep=True))
+    if isinstance(objeto, np.ndarray):
+        if objeto.dtype == object:
+            return int(objeto.nbytes + sum(map(sys.getsizeof, objeto.ravel())))
+        return int(objeto.nbytes)
+    if isinstance(objeto, dict):
+        return sum(medir_objeto(valor) for valor in objeto.values())
+    if isinstance(objeto, (list, tuple)):
+        return sum(medir_objeto(valor) for valor in objeto)
+    return sys.getsizeof(objeto)
+
+
+# ============================================================================
+# OPERAÇÕES DO CACHE
+# ============================================================================
+
+def _liberar_espaco(bytes_necessarios: int):
+    """
+    Remove entradas menos usadas até caber bytes_necessarios.
+
+    GATILHO DE MANUTENÇÃO:
+    - Chamar sempre com _trava adquirida
+    """
+    total = sum(entrada['bytes'] for entrada in _entradas.values())
+    while _entradas and total + bytes_necessarios > _estado['orcamento_bytes']:
+        _, removida = _entradas.popitem(last=False)
+        total -= removida['bytes']
+        _estado['remocoes'] += 1
+
+
+def _consultar(chave: str):
+    """
+    Retorna o dataset da chave (ou None) e marca como usado recentemente.
+    """
+    with _trava:
+        entrada = _entradas.get(chave)
+        if entrada is None:
+            return None
+        _entradas.move_to_end(chave)
+        entrada['acessos'] += 1
+        entrada['ultimo_acesso'] = time.time()
+        _estado['acertos'] += 1
+        return entrada['dataset']
+
+
+def dataset_em_cache(chave: str) -> bool:
+    """
+    True se a chave já está no cache (sem contar acerto nem alterar a ordem LRU).
+    """
+    with _trava:
+        return chave in _entradas
+
+
+def dataset_na_sessao(chave: str, sessao: dict) -> bool:
+    """
+    True se a sessão guarda o dataset da chave (maior que o orçamento do cache).
+    """
+    guardado = sessao.get(CHAVE_DATASET_SESSAO)
+    return guardado is not None and guardado['chave'] == chave
+
+
+def obter_dataset(chave: str, carregar: Callable[[], dict], arquivos: List[str] = None,
+                  sessao: dict = None) -> dict:
+    """
+    Retorna o dataset da chave, processando apenas se ainda não estiver no cache.
+
+    Parâmetros:
+        chave: Resultado de calcular_chave_arquivos()
+        carregar: Função sem argumentos que processa os arquivos
+        arquivos: Nomes dos arquivos (exibidos no painel administrativo)
+        sessao: st.session_state da sessão (guarda o dataset que não cabe
+                no cache); None nas threads de segundo plano
+
+    IMPORTANTE:
+    - Sessões pedindo a mesma chave ao mesmo tempo esperam o primeiro
+      processamento em vez de processar de novo (também quando o dataset
+      não cabe no cache)
+    - Chaves diferentes são processadas em paralelo
+    """
+    dataset = _consultar(chave)
+    if dataset is not None:
+        return dataset
+    if sessao is not None and dataset_na_sessao(chave, sessao):
+        return sessao[CHAVE_DATASET_SESSAO]['dataset']
+
+    # A entrada só sai de _carregando quando ninguém mais a usa: quem chega
+    # enquanto outro processa espera na mesma trava
+    with _trava:
+        carregamento = _carregando.setdefault(chave, {'trava': threading.Lock(), 'usuarios': 0, 'dataset': None})
+        carregamento['usuarios'] += 1
+
+    try:
+        with carregamento['trava']:
+            dataset = _consultar(chave) or carregamento['dataset']
+            if dataset is None:
+                dataset = _processar(chave, carregar, arquivos, carregamento)
+    finally:
+        with _trava:
+            carregamento['usuarios'] -= 1
+            if not carregamento['usuarios']:
+                _carregando.pop(chave, None)
+
+    if sessao is not None:
+        if dataset_em_cache(chave):
+            sessao.pop(CHAVE_DATASET_SESSAO, None)
+        else:
+            sessao[CHAVE_DATASET_SESSAO] = {'chave': chave, 'dataset': dataset}
+    return dataset
+
+
+def _processar(chave: str, carregar: Callable[[], dict], arquivos: List[str], carregamento: dict) -> dict:
+    """
+    Processa o dataset e guarda no cache (ou, se não couber, no carregamento,
+    para quem está esperando a mesma chave).
+
+    GATILHO DE MANUTENÇÃO:
+    - Chamar com a trava do carregamento adquirida
+    """
+    inicio = time.time()
+    dataset = carregar()
+    tempo_processamento = time.time() - inicio
+    tamanho = medir_objeto(dataset)
+
+    with _trava:
+        _estado['faltas'] += 1
+        if tamanho <= _estado['orcamento_bytes']:
+            _liberar_espaco(tamanho)
+            agora = time.time()
+            _entradas[chave] = {
+                'dataset': dataset,
+                'bytes': tamanho,
+                'arquivos': list(arquivos or []),
+                'criado_em': agora,
+                'ultimo_acesso': agora,
+                'acessos': 1,
+                'tempo_processamento': tempo_processamento,
+            }
+        else:
+            carregamento['dataset'] = dataset
+            logger.warning(f"evento=dataset_fora_do_cache chave={chave[:12]} bytes={tamanho} "
+                           f"orcamento_bytes={_estado['orcamento_bytes']}")
+    return dataset
+
+
+def configurar_orcamento(megabytes: float):
+    """
+    Altera o orçamento de memória do cache, removendo o excesso na hora.
+    """
+    with _trava:
+        _estado['orcamento_bytes'] = int(megabytes * BYTES_POR_MB)
+        _liberar_espaco(0)
+
+
+def remover_do_cache(chave: str) -> bool:
+    """
+    Remove um dataset do cache. Retorna False se a chave não existir.
+    """
+    with _trava:
+        return _entradas.pop(chave, None) is not None
+
+
+def limpar_cache():
+    """
+    Remove todos os datasets do cache.
+    """
+    with _trava:
+        _entradas.clear()
+
+
+def resumo_cache() -> dict:
+    """
+    Totais do cache: entradas, bytes usados, orçamento e contadores.
+    """
+    with _trava:
+        return {
+            'entradas': len(_entradas),
+            'bytes_usados': sum(entrada['bytes'] for entrada in _entradas.values()),
+            'orcamento_bytes': _estado['orcamento_bytes'],
+            'acertos': _estado['acertos'],
+            'faltas': _estado['faltas'],
+            'remocoes': _estado['remocoes'],
+        }
+
+
+def listar_cache() -> pd.DataFrame:
+    """
+    Lista os datasets em cache, do mais recente ao menos recente.
+    """
+    with _trava:
+        linhas = [
+            {
+                'CHAVE': chave,
+                'ARQUIVOS': ', '.join(entrada['arquivos']),
+                'TAMANHO_MB': entrada['bytes'] / BYTES_POR_MB,
+                'ACESSOS': entrada['acessos'],
+                'TEMPO_PROCESSAMENTO_S': entrada['tempo_processamento'],
+                'CRIADO_EM': pd.Timestamp(entrada['criado_em'], unit='s'),
+                'ULTIMO_ACESSO': pd.Timestamp(entrada['ultimo_acesso'], unit='s'),
+            }
+            for chave, entrada in reversed(_entradas.items())
+        ]
+    return pd.DataFrame(linhas, columns=[
+        'CHAVE', 'ARQUIVOS', 'TAMANHO_MB', 'ACESSOS',
+        'TEMPO_PROCESSAMENTO_S', 'CRIADO_EM', 'ULTIMO_ACESSO'
+    ])
+
+
+# ============================================================================
+# PAINEL ADMINISTRATIVO
+# ============================================================================
+
+def painel_admin_habilitado() -> bool:
+    """
+    True com SPED_ADMIN=1 no ambiente do servidor (nunca pela URL: quem
+    abre o app não consegue remover datasets das outras sessões).
+    """
+    return os.environ.get('SPED_ADMIN') == '1'
+
+
+def exibir_painel_cache():
+    """
+    Exibe na barra lateral o que está em cache, com opções de remoção.
+
+    GATILHO DE MANUTENÇÃO:
+    - Exibido pelo app.py apenas com painel_admin_habilitado()
+    """
+    resumo = resumo_cache()
+
+    with st.sidebar:
+        st.subheader("🗄️ Cache de Datasets")
+        st.metric(
+            "Memória em uso",
+            formatar_mb_br(resumo['bytes_usados']),
+            help=f"Orçamento: {formatar_inteiro_br(resumo['orcamento_bytes'] / BYTES_POR_MB)} MB"
+        )
+        st.caption(
+            f"{resumo['entradas']} dataset(s) | {resumo['acertos']} acerto(s) | "
+            f"{resumo['faltas']} processamento(s) | {resumo['remocoes']} remoção(ões)"
+        )
+        arquivos = resumo_cache_arquivos()
+        st.caption(
+            f"Resultados por arquivo: {arquivos['arquivos']} arquivo(s) | "
+            f"{formatar_mb_br(arquivos['bytes_usados'])} | {arquivos['reaproveitados']} reaproveitamento(s)"
+        )
+
+        df_cache = listar_cache()
+        if df_cache.empty:
+            st.info("Cache vazio")
+            return
+
+        st.dataframe(
+            df_cache.assign(CHAVE=df_cache['CHAVE'].str[:12]),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'TAMANHO_MB': st.column_config.NumberColumn('Tamanho (MB)', format='%.1f'),
+                'TEMPO_PROCESSAMENTO_S': st.column_config.NumberColumn('Processamento (s)', format='%.1f'),
+            }
+        )
+
+        chave = st.selectbox(
+            "Dataset",
+            options=df_cache['CHAVE'].tolist(),
+            format_func=lambda c: f"{c[:12]} - {df_cache.loc[df_cache['CHAVE'] == c, 'ARQUIVOS'].iloc[0]}",
+            key="admin_cache_chave"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("🗑️ Remover", key="admin_cache_remover"):
+                remover_do_cache(chave)
+                st.rerun()
+        with col2:
+            if st.button("🧹 Limpar tudo", key="admin_cache_limpar"):
+                limpar_cache()
+                limpar_cache_arquivos()
+                st.rerun()
@@ -0,0 +1,553 @@
+"""
+================================================================================
+MÓDULO: Cálculos Fiscais (núcleo sem interface) - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Reunir as funções de cálculo das abas (acumulador por CFOP, entrada e
+    saída, filtros, agregações dos dashboards e apuração) em um módulo que
+    só depende de pandas, para uso sem o Streamlit: conversão em lote,
+    benchmarks, processos de trabalho e notebooks.
+
+CONTEXTO:
+    Os módulos das abas importam streamlit e plotly no topo (~1 s a mais
+    por processo). Quem só precisa do cálculo importa daqui; os módulos das
+    abas reexportam estas funções, então os imports antigos continuam
+    válidos (ex.: from acumuladores_cfop import criar_acumulador_cfop).
+
+IMPORTANTE:
+    - Este módulo NÃO pode importar streamlit nem plotly, direta ou
+      indiretamente (test_calculos_fiscais.py verifica em um processo novo;
+      o tempo de importação é medido por benchmark_parser.py --importacao)
+    - Dependências permitidas: pandas/numpy e módulos sem interface
+      (formatacao.py importa o streamlit só dentro de configurar_colunas)
+
+GATILHOS DE MANUTENÇÃO:
+    1. Nova função de cálculo de uma aba: criar aqui e reexportar na aba
+    2. Novo import aqui: rodar test_calculos_fiscais.py e
+       benchmark_parser.py --importacao (orçamento)
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import pandas as pd
+
+from formatacao import formatar_moeda_br_em_lote
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Campos que serão somados no acumulador
+CAMPOS_ACUMULAVEIS = ['VL_OPR', 'VL_BC_ICMS', 'VL_ICMS', 'VL_BC_ICMS_ST', 'VL_ICMS_ST', 'VL_IPI']
+
+# Meses na ordem do calendário (evolução mensal)
+ORDEM_MESES = [
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+    'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro'
+]
+
+COLUNAS_RESUMO_ENTRADA_SAIDA = ['TIPO', 'QUANTIDADE', 'VL_OPERACAO', 'VL_ICMS', 'VL_IPI', 'TOTAL']
+
+# IND_OPER do C100 -> rótulo dos dashboards
+ROTULOS_IND_OPER = {'0': 'Entrada', '1': 'Saída'}
+
+
+# ============================================================================
+# ACUMULADOR POR CFOP (acumuladores_cfop.py)
+# ============================================================================
+
+def classificar_cfop(cfop):
+    """
+    Classifica CFOP como ENTRADA ou SAÍDA.
+    """
+    try:
+        primeiro_digito = str(cfop)[0]
+        if primeiro_digito in ['1', '2', '3']:
+            return 'ENTRADA'
+        elif primeiro_digito in ['5', '6', '7']:
+            return 'SAÍDA'
+        else:
+            return 'OUTROS'
+    except:
+        return 'INDEFINIDO'
+
+
+def criar_acumulador_cfop(df):
+    """
+    Cria DataFrame acumulado por CFOP e CST ICMS.
+    
+    Args:
+        df: DataFrame com registros C190
+        
+    Returns:
+        DataFrame acumulado
+    """
+    if df.empty:
+        return pd.DataFrame()
+    
+    # Verifica se as colunas necessárias existem
+    colunas_necessarias = ['CFOP', 'CST_ICMS'] + CAMPOS_ACUMULAVEIS
+    colunas_disponiveis = [col for col in colunas_necessarias if col in df.columns]
+    
+    if 'CFOP' not in colunas_disponiveis or 'CST_ICMS' not in colunas_disponiveis:
+        return pd.DataFrame()
+    
+    # Campos para agrupar
+    campos_grupo = ['CFOP', 'CST_ICMS']
+    
+    # Campos para somar (apenas os que existem)
+    campos_soma = [col for col in CAMPOS_ACUMULAVEIS if col in df.columns]
+    
+    # Agrupa e soma
+    agg_dict = {campo: 'sum' for campo in campos_soma}
+    df_acumulado = df.groupby(campos_grupo).agg(agg_dict).reset_index()
+    
+    # Adiciona contagem de registros
+    df_contagem = df.groupby(campos_grupo).size().reset_index(name='QTD_REGISTROS')
+    df_acumulado = df_acumulado.merge(df_contagem, on=campos_grupo, how='left')
+    
+    return finalizar_acumulador_cfop(df_acumulado, campos_soma)
+
+
+def finalizar_acumulador_cfop(df_acumulado: pd.DataFrame, campos_soma: list) -> pd.DataFrame:
+    """
+    Classificação, total de impostos, ordem das linhas e das colunas do
+    acumulador já somado por CFOP e CST_ICMS (com QTD_REGISTROS).
+    
+    GATILHO DE MANUTENÇÃO:
+    - Usada também pela soma por partes (analise_fora_memoria.py)
+    """
+    # Adiciona coluna de classificação
+    df_acumulado['TIPO'] = df_acumulado['CFOP'].apply(classificar_cfop)
+    
+    # Calcula total de impostos
+    df_acumulado['TOTAL_IMPOSTOS'] = (
+        df_acumulado.get('VL_ICMS', 0) + 
+        df_acumulado.get('VL_ICMS_ST', 0) + 
+        df_acumulado.get('VL_IPI', 0)
+    )
+    
+    # Ordena por valor total (maior para menor)
+    df_acumulado = df_acumulado.sort_values('TOTAL_IMPOSTOS', ascending=False)
+    
+    # Reordena colunas
+    colunas_ordem = ['TIPO', 'CFOP', 'CST_ICMS', 'QTD_REGISTROS'] + campos_soma + ['TOTAL_IMPOSTOS']
+    colunas_ordem = [col for col in colunas_ordem if col in df_acumulado.columns]
+    df_acumulado = df_acumulado[colunas_ordem]
+    
+    return df_acumulado
+
+
+# ============================================================================
+# ENTRADA E SAÍDA (analise_entrada_saida.py)
+# ============================================================================
+
+def classificar_tipo_operacao(cfop: str) -> str:
+    """
+    Classifica o tipo de operação baseado no CFOP.
+    
+    GATILHO DE MANUTENÇÃO:
+    - CFOPs 1,2,3 = ENTRADA
+    - CFOPs 5,6,7 = SAÍDA
+    - Outros = OUTROS
+    """
+    if not cfop or len(str(cfop)) == 0:
+        return 'NÃO CLASSIFICADO'
+    
+    cfop_str = str(cfop).strip()
+    if len(cfop_str) == 0:
+        return 'NÃO CLASSIFICADO'
+    
+    primeiro_digito = cfop_str[0]
+    
+    if primeiro_digito in ['1', '2', '3']:
+        return 'ENTRADA'
+    elif primeiro_digito in ['5', '6', '7']:
+        return 'SAÍDA'
+    else:
+        return 'OUTROS'
+
+
+def adicionar_classificacao(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adiciona coluna TIPO_OPERACAO ao DataFrame.
+    
+    GATILHO DE MANUTENÇÃO:
+    - Sempre aplicar antes de qualquer análise
+    - Baseado na coluna CFOP
+    - Retorna um novo DataFrame: o recebido pode estar no cache
+      compartilhado entre sessões (cache_datasets.py) e não pode ser alterado
+    """
+    if df.empty:
+        return df.assign(TIPO_OPERACAO='')
+    
+    if 'CFOP' not in df.columns:
+        return df.assign(TIPO_OPERACAO='NÃO CLASSIFICADO')
+    
+    return df.assign(TIPO_OPERACAO=df['CFOP'].apply(classificar_tipo_operacao))
+
+
+def criar_resumo_entrada_saida(df_c100: pd.DataFrame, df_c190: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cria resumo consolidado de entrada e saída.
+    
+    IMPORTANTE:
+    - Usa C100 para valores totais de documentos
+    - Usa C190 para detalhamento por CFOP/CST
+    
+    GATILHO DE MANUTENÇÃO:
+    - Para adicionar campos, incluir na agregação
+    - Para mudar cálculo, ajustar lógica de soma
+    """
+    if df_c190.empty:
+        return pd.DataFrame(columns=COLUNAS_RESUMO_ENTRADA_SAIDA)
+    
+    # Adiciona classificação
+    df_c190 = adicionar_classificacao(df_c190)
+    
+    # Agrupa por tipo de operação
+    agrupado = df_c190.groupby('TIPO_OPERACAO')
+    totais = agrupado[[col for col in ['VL_OPR', 'VL_ICMS', 'VL_IPI'] if col in df_c190.columns]].sum()
+    totais['QUANTIDADE'] = agrupado.size()
+    
+    return finalizar_resumo_entrada_saida(totais)
+
+
+def finalizar_resumo_entrada_saida(totais: pd.DataFrame) -> pd.DataFrame:
+    """
+    Linhas ENTRADA e SAÍDA do resumo a partir dos totais por TIPO_OPERACAO
+    (índice) com QUANTIDADE e as somas de VL_OPR, VL_ICMS e VL_IPI.
+    
+    GATILHO DE MANUTENÇÃO:
+    - Usada também pela soma por partes (analise_fora_memoria.py)
+    - Coluna de valor ausente conta como 0
+    """
+    resumo_data = []
+    
+    for tipo in ['ENTRADA', 'SAÍDA']:
+        if tipo not in totais.index:
+            continue
+        
+        linha = totais.loc[tipo]
+        vl_icms = linha.get('VL_ICMS', 0)
+        vl_ipi = linha.get('VL_IPI', 0)
+        
+        resumo_data.append({
+            'TIPO': tipo,
+            'QUANTIDADE': int(linha['QUANTIDADE']),
+            'VL_OPERACAO': linha.get('VL_OPR', 0),
+            'VL_ICMS': vl_icms,
+            'VL_IPI': vl_ipi,
+            'TOTAL': vl_icms + vl_ipi
+        })
+    
+    df_resumo = pd.DataFrame(resumo_data)
+    return df_resumo
+
+
+def top_cfops_por_tipo(df_c190: pd.DataFrame, tipo: str, top_n: int = 10) -> pd.DataFrame:
+    """
+    Retorna os top N CFOPs por tipo de operação.
+    
+    GATILHO DE MANUTENÇÃO:
+    - Para mudar critério de ordenação, ajustar sort_values
+    - Para adicionar campos, incluir no groupby.agg
+    """
+    if df_c190.empty:
+        return pd.DataFrame()
+    
+    df_c190 = adicionar_classificacao(df_c190)
+    df_tipo = df_c190[df_c190['TIPO_OPERACAO'] == tipo].copy()
+    
+    if df_tipo.empty:
+        return pd.DataFrame()
+    
+    # Agrupa por CFOP
+    df_agrupado = df_tipo.groupby('CFOP').agg({
+        'VL_OPR': 'sum',
+        'VL_ICMS': 'sum',
+        'VL_IPI': 'sum'
+    }).reset_index()
+    
+    df_agrupado['TOTAL'] = df_agrupado['VL_ICMS'] + df_agrupado['VL_IPI']
+    df_agrupado = df_agrupado.sort_values('TOTAL', ascending=False).head(top_n)
+    
+    return df_agrupado
+
+
+def extrair_mes_de_data(data_str: str) -> str:
+    """
+    Extrai o mês de uma data no formato DDMMAAAA.
+    
+    GATILHO DE MANUTENÇÃO:
+    - Formato esperado: 06052025 (06/Maio/2025)
+    - Posições 2-3 contêm o mês
+    """
+    if not data_str or len(str(data_str)) < 6:
+        return 'Indefinido'
+    
+    meses_dict = {f'{numero:02d}': mes for numero, mes in enumerate(ORDEM_MESES, start=1)}
+    
+    # Extrai MM de DDMMAAAA (posições 2 e 3)
+    mes_num = str(data_str)[2:4]
+    return meses_dict.get(mes_num, 'Indefinido')
+
+
+def evolucao_mensal_entrada_saida(df_c100: pd.DataFrame, df_c190: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula evolução mensal de entrada e saída.
+    
+    IMPORTANTE:
+    - Usa DT_DOC do C100 para determinar o mês
+    - Usa valores do C190 para ICMS/IPI
+    
+    GATILHO DE MANUTENÇÃO:
+    - Para mudar formato de data, ajustar extrair_mes_de_data()
+    - Para adicionar campos, incluir no merge
+    """
+    if df_c100.empty or df_c190.empty:
+        return pd.DataFrame()
+    
+    # Adiciona mês ao C100
+    df_c100 = df_c100.copy()
+    df_c100['MES'] = df_c100['DT_DOC'].apply(extrair_mes_de_data)
+    
+    # Adiciona classificação ao C190
+    df_c190 = adicionar_classificacao(df_c190)
+    
+    # Merge C100 com C190 (assumindo que há relação por NUM_DOC)
+    if 'NUM_DOC' in df_c100.columns and 'NUM_DOC_PAI' in df_c190.columns:
+        df_merged = df_c190.merge(
+            df_c100[['NUM_DOC', 'MES']], 
+            left_on='NUM_DOC_PAI', 
+            right_on='NUM_DOC', 
+            how='left'
+        )
+    else:
+        # Se não houver relação, usa apenas C190
+        return pd.DataFrame()
+    
+    # Agrupa por mês e tipo
+    df_evolucao = df_merged.groupby(['MES', 'TIPO_OPERACAO']).agg({
+        'VL_ICMS': 'sum',
+        'VL_IPI': 'sum'
+    }).reset_index()
+    
+    return finalizar_evolucao_mensal(df_evolucao)
+
+
+def finalizar_evolucao_mensal(df_evolucao: pd.DataFrame) -> pd.DataFrame:
+    """
+    TOTAL (ICMS + IPI) e ordem do calendário (ORDEM_MESES; 'Indefinido' por
+    último) da evolução já somada por MES e TIPO_OPERACAO.
+    
+    GATILHO DE MANUTENÇÃO:
+    - Usada também pela soma por partes (analise_fora_memoria.py)
+    """
+    df_evolucao = df_evolucao.assign(TOTAL=df_evolucao['VL_ICMS'] + df_evolucao['VL_IPI'])
+    
+    # Ordena pela ordem do calendário (estável: TIPO_OPERACAO mantém a ordem)
+    ordem = df_evolucao['MES'].map({mes: posicao for posicao, mes in enumerate(ORDEM_MESES)}).fillna(99)
+    return df_evolucao.iloc[ordem.argsort(kind='stable')]
+
+
+# ============================================================================
+# FILTROS (filtros_avancados.py)
+# ============================================================================
+
+def aplicar_filtro_numerico(df, coluna, operador, valor):
+    """
+    Aplica filtro numérico em uma coluna
+    """
+    try:
+        valor_float = float(valor)
+        
+        if operador == '=':
+            return df[df[coluna] == valor_float]
+        elif operador == '≠':
+            return df[df[coluna] != valor_float]
+        elif operador == '<':
+            return df[df[coluna] < valor_float]
+        elif operador == '>':
+            return df[df[coluna] > valor_float]
+        else:
+            return df
+    except:
+        return df
+
+
+def aplicar_filtro_texto(df, coluna, operador, valor):
+    """
+    Aplica filtro de texto em uma coluna
+    """
+    try:
+        if operador == '=':
+            return df[df[coluna].astype(str) == str(valor)]
+        elif operador == '≠':
+            return df[df[coluna].astype(str) != str(valor)]
+        else:
+            return df
+    except:
+        return df
+
+
+def aplicar_filtros(df, cfops=None, participantes=None, csts_icms=None,
+                    operador_valor=None, valor=None, data_inicio=None, data_fim=None):
+    """
+    Aplica os filtros do painel sem depender de widgets
+    
+    Args:
+        df: DataFrame a ser filtrado (não é alterado)
+        cfops, participantes, csts_icms: Valores aceitos (vazio = sem filtro)
+        operador_valor, valor: Filtro de VL_DOC (valor > 0)
+        data_inicio, data_fim: Período de DT_DOC (ambos obrigatórios)
+    
+    Returns:
+        (df_filtrado, filtros_aplicados)
+    """
+    df_filtrado = df
+    filtros_aplicados = []
+    
+    if cfops and 'CFOP' in df.columns:
+        df_filtrado = df_filtrado[df_filtrado['CFOP'].isin(cfops)]
+        filtros_aplicados.append(f"CFOP: {', '.join(map(str, cfops))}")
+    
+    if participantes and 'COD_PART' in df.columns:
+        df_filtrado = df_filtrado[df_filtrado['COD_PART'].isin(participantes)]
+        filtros_aplicados.append(f"Participante: {', '.join(map(str, participantes))}")
+    
+    if csts_icms and 'CST_ICMS' in df.columns:
+        df_filtrado = df_filtrado[df_filtrado['CST_ICMS'].isin(csts_icms)]
+        filtros_aplicados.append(f"CST ICMS: {', '.join(map(str, csts_icms))}")
+    
+    if operador_valor and valor and valor > 0 and 'VL_DOC' in df.columns:
+        df_filtrado = aplicar_filtro_numerico(df_filtrado, 'VL_DOC', operador_valor, valor)
+        filtros_aplicados.append(f"Valor {operador_valor} R$ {valor:,.2f}")
+    
+    if data_inicio is not None and data_fim is not None and 'DT_DOC' in df.columns:
+        datas = pd.to_datetime(df_filtrado['DT_DOC'], format='%d%m%Y', errors='coerce')
+        df_filtrado = df_filtrado[
+            (datas >= pd.to_datetime(data_inicio)) &
+            (datas <= pd.to_datetime(data_fim))
+        ]
+        filtros_aplicados.append(f"Data: {data_inicio} a {data_fim}")
+    
+    return df_filtrado, filtros_aplicados
+
+
+# ============================================================================
+# AGREGAÇÕES DOS DASHBOARDS (dashboards_bigfour.py)
+# ============================================================================
+
+def agregar_top10_cfop(df_c190, coluna):
+    """
+    TOP 10 CFOPs pela soma da coluna (VL_ICMS ou VL_IPI), com rótulo do gráfico
+    
+    Considera apenas registros com valor > 0 na coluna quando for VL_IPI
+    """
+    if coluna == 'VL_IPI':
+        df_c190 = df_c190[df_c190['VL_IPI'] > 0]
+    
+    if df_c190.empty:
+        return pd.DataFrame()
+    
+    # Agrupa por CFOP e soma
+    top10 = df_c190.groupby('CFOP').agg({
+        coluna: 'sum'
+    }).reset_index()
+    
+    # Ordena e pega TOP 10
+    top10 = top10.sort_values(coluna, ascending=False).head(10)
+    
+    # Cria labels com CFOP e valor
+    top10['label'] = 'CFOP ' + top10['CFOP'].astype(str) + '<br>' + formatar_moeda_br_em_lote(top10[coluna])
+    
+    return top10
+
+
+def agregar_entrada_saida(df_c100):
+    """
+    Totais de VL_DOC, VL_ICMS e VL_IPI por tipo de operação (Entrada/Saída)
+    """
+    resumo = df_c100.groupby('IND_OPER').agg({
+        'VL_DOC': 'sum',
+        'VL_ICMS': 'sum',
+        'VL_IPI': 'sum'
+    }).reset_index()
+    
+    # Mapeia indicador de operação
+    resumo['OPERACAO'] = resumo['IND_OPER'].map(ROTULOS_IND_OPER)
+    
+    return resumo
+
+
+def agregar_linha_temporal(df_c100):
+    """
+    Totais de VL_DOC, VL_ICMS e VL_IPI por data do documento (DT_DOC)
+    """
+    # Converte data
+    df_temp = df_c100.copy()
+    df_temp['DATA'] = pd.to_datetime(df_temp['DT_DOC'], format='%d%m%Y', errors='coerce')
+    df_temp = df_temp.dropna(subset=['DATA'])
+    
+    if df_temp.empty:
+        return pd.DataFrame()
+    
+    # Agrupa por data
+    timeline = df_temp.groupby('DATA').agg({
+        'VL_DOC': 'sum',
+        'VL_ICMS': 'sum',
+        'VL_IPI': 'sum'
+    }).reset_index()
+    
+    return timeline.sort_values('DATA')
+
+
+# ============================================================================
+# APURAÇÃO (aba_apuracao_mensal.py)
+# ============================================================================
+
+def formatar_data_br(data_str):
+    """
+    Formata data de DDMMAAAA para DD/MM/AAAA
+    
+    GATILHO DE MANUTENÇÃO:
+    - Formato entrada: DDMMAAAA (ex: 01052025)
+    - Formato saída: DD/MM/AAAA (ex: 01/05/2025)
+    """
+    if not data_str or len(str(data_str)) < 8:
+        return ''
+    
+    data_str = str(data_str)
+    dd = data_str[0:2]
+    mm = data_str[2:4]
+    aaaa = data_str[4:8]
+    
+    return f"{dd}/{mm}/{aaaa}"
+
+
+def mapear_codigo_obrigacao(cod_or):
+    """
+    Mapeia código de obrigação para descrição.
+    
+    GATILHO DE MANUTENÇÃO:
+    - Adicionar novos códigos conforme necessário
+    """
+    mapeamento = {
+        '000': 'ICMS Normal',
+        '001': 'ICMS ST',
+        '002': 'ICMS Antecipado',
+        '003': 'ICMS Diferencial de Alíquota',
+        '004': 'ICMS Substituição Tributária',
+        '005': 'ICMS Importação',
+        '006': 'FECP (Fundo Estadual de Combate à Pobreza)',
+        '007': 'FECP ST',
+        '008': 'ICMS Complementar',
+        '009': 'ICMS Outros'
+    }
+    
+    return mapeamento.get(cod_or, f'Código {cod_or}')
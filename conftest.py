@@ -0,0 +1,33 @@
+"""
+Ajudantes compartilhados dos testes: uploads simulados do Streamlit
+
+Uso nos testes: from conftest import arquivo_enviado, zip_enviado
+"""
+
+import io
+import zipfile
+from typing import Dict
+
+# Data fixa dos membros dos ZIPs: o mesmo ZIP gera os mesmos bytes (e o mesmo hash)
+DATA_MEMBROS_ZIP = (2026, 1, 1, 0, 0, 0)
+
+
+def arquivo_enviado(nome: str, conteudo: bytes, file_id: str = None) -> io.BytesIO:
+    """
+    Simula o UploadedFile do Streamlit: conteúdo com name, size e file_id.
+    """
+    arquivo = io.BytesIO(conteudo)
+    arquivo.name, arquivo.size, arquivo.file_id = nome, len(conteudo), file_id
+    return arquivo
+
+
+def zip_enviado(nome: str, membros: Dict[str, bytes], file_id: str = None) -> io.BytesIO:
+    """
+    UploadedFile de um ZIP com os membros pedidos (nome -> conteúdo).
+    """
+    compactado = io.BytesIO()
+    with zipfile.ZipFile(compactado, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for nome_membro, conteudo in membros.items():
+            zip_ref.writestr(zipfile.ZipInfo(nome_membro, date_time=DATA_MEMBROS_ZIP), conteudo,
+                             zipfile.ZIP_DEFLATED)
+    return arquivo_enviado(nome, compactado.getvalue(), file_id)
@@ -0,0 +1,298 @@
+"""
+================================================================================
+MÓDULO: Consulta SQL sobre os Registros - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Responder perguntas pontuais que as abas fixas não cobrem sem exportar
+    CSV: cada registro lido (C100, C170, C190, 0150, 0200, E110, E111,
+    E116...) vira uma tabela de um banco analítico em processo, consultada
+    em SQL na aba "🧮 Consulta SQL".
+
+FUNCIONAMENTO:
+    1. abrir_conexao() escolhe o motor: DuckDB se instalado (execução
+       colunar; os DataFrames são registrados como views, sem cópia), senão
+       o sqlite3 da biblioteca padrão (as tabelas usadas pela consulta são
+       copiadas para um banco em memória, até LIMITE_LINHAS_COPIA_SQLITE)
+    2. executar_consulta() roda uma instrução com tempo limite: um
+       threading.Timer chama interrupt() na conexão e a consulta termina
+       com ConsultaInterrompida. O tempo conta desde a carga das tabelas
+       (no sqlite, a cópia também é interrompida)
+    3. O resultado é lido até LIMITE_LINHAS_RESULTADO linhas e exibido pela
+       tabela paginada (só a página visível vai ao navegador)
+
+IMPORTANTE:
+    - Registros que começam com dígito vão entre aspas: SELECT * FROM "0150"
+    - Somente leitura do dataset: cada consulta usa uma conexão nova em
+      memória, descartada ao final; DuckDB sem acesso externo
+      (enable_external_access = false) e sqlite sem ATTACH (não criam nem
+      leem arquivos do servidor)
+    - DuckDB está no requirements.txt; o sqlite fica como reserva para
+      instalações sem ele e recusa consultas que copiariam mais de
+      LIMITE_LINHAS_COPIA_SQLITE linhas (ConsultaRecusada)
+
+CONFIGURAÇÃO:
+    Variável de ambiente SPED_SQL_TEMPO_LIMITE (padrão: 30 segundos)
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novo registro no dataset: entra sozinho (tabelas_do_dataset)
+    2. Novo motor: abrir_conexao() e o erro de interrupção em executar_consulta()
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from formatacao import formatar_inteiro_br
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+LIMITE_LINHAS_RESULTADO = 200_000
+
+TEMPO_LIMITE_PADRAO = 30
+
+# Reserva sqlite: total de linhas copiadas por consulta
+LIMITE_LINHAS_COPIA_SQLITE = 2_000_000
+
+CONSULTA_EXEMPLO = """SELECT c190.CFOP, COUNT(*) AS QTD, SUM(c190.VL_OPR) AS VL_OPR, SUM(c190.VL_ICMS) AS VL_ICMS
+FROM C190 c190
+GROUP BY c190.CFOP
+ORDER BY VL_OPR DESC"""
+
+
+class ConsultaInterrompida(Exception):
+    """
+    Consulta encerrada por passar do tempo limite.
+    """
+
+
+class ConsultaRecusada(Exception):
+    """
+    Consulta que exigiria copiar tabelas grandes demais para o sqlite.
+    """
+
+
+def _tempo_limite_inicial() -> float:
+    """
+    Tempo limite em segundos a partir de SPED_SQL_TEMPO_LIMITE.
+    """
+    try:
+        return float(os.environ.get('SPED_SQL_TEMPO_LIMITE', TEMPO_LIMITE_PADRAO))
+    except ValueError:
+        return TEMPO_LIMITE_PADRAO
+
+
+# ============================================================================
+# TABELAS E CONEXÃO
+# ============================================================================
+
+def tabelas_do_dataset(dataset: dict) -> Dict[str, pd.DataFrame]:
+    """
+    Registros do dataset com colunas (blocos 0, C e E), pelo nome do registro.
+    """
+    tabelas = {}
+    for bloco in ('dados_0', 'dados_c', 'dados_e'):
+        for registro, df in (dataset.get(bloco) or {}).items():
+            if len(df.columns):
+                tabelas[registro] = df
+    return tabelas
+
+
+def motor_disponivel() -> str:
+    """
+    Motor usado nas consultas: 'duckdb' ou 'sqlite'.
+    """
+    return 'sqlite' if duckdb is None else 'duckdb'
+
+
+def _bloquear_attach(acao, *_):
+    """
+    Autorizador do sqlite: nega ATTACH (criaria/leria arquivos do servidor).
+    """
+    return sqlite3.SQLITE_DENY if acao == sqlite3.SQLITE_ATTACH else sqlite3.SQLITE_OK
+
+
+def _tabelas_citadas(sql: str, tabelas: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Tabelas cujo nome aparece na consulta (o sqlite copia só estas).
+    """
+    palavras = {palavra.upper() for palavra in re.findall(r'\w+', sql)}
+    return {nome: df for nome, df in tabelas.items() if nome.upper() in palavras}
+
+
+def abrir_conexao():
+    """
+    Conexão em memória, vazia, do motor disponível.
+    """
+    if duckdb is not None:
+        return duckdb.connect(':memory:', config={'enable_external_access': False})
+    return sqlite3.connect(':memory:')
+
+
+def registrar_tabelas(conexao, tabelas: Dict[str, pd.DataFrame], sql: str = None):
+    """
+    Registra as tabelas na conexão: views sem cópia no DuckDB; no sqlite,
+    cópia só das tabelas citadas na consulta (sql=None = todas).
+
+    LEVANTA:
+        ConsultaRecusada: sqlite com mais de LIMITE_LINHAS_COPIA_SQLITE
+                          linhas a copiar
+    """
+    if duckdb is not None:
+        for nome, df in tabelas.items():
+            conexao.register(nome, df)
+        return
+
+    usadas = tabelas if sql is None else _tabelas_citadas(sql, tabelas)
+    linhas = sum(len(df) for df in usadas.values())
+    if linhas > LIMITE_LINHAS_COPIA_SQLITE:
+        raise ConsultaRecusada(
+            f"A consulta usa {formatar_inteiro_br(linhas)} linhas ({', '.join(usadas)}) e, sem o DuckDB, "
+            f"as tabelas são copiadas para o sqlite (limite: {formatar_inteiro_br(LIMITE_LINHAS_COPIA_SQLITE)}). "
+            "Instale o duckdb (requirements.txt) ou consulte menos registros."
+        )
+    for nome, df in usadas.items():
+        df.to_sql(nome, conexao, index=False)
+    conexao.set_authorizer(_bloquear_attach)
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def _erro_de_interrupcao(erro: Exception) -> bool:
+    """
+    O erro veio de interrupt() na conexão?
+    """
+    if duckdb is not None and isinstance(erro, duckdb.InterruptException):
+        return True
+    return isinstance(erro, sqlite3.OperationalError) and 'interrupted' in str(erro)
+
+
+def executar_consulta(tabelas: Dict[str, pd.DataFrame], sql: str, tempo_limite: float = None,
+                      limite_linhas: int = LIMITE_LINHAS_RESULTADO) -> Tuple[pd.DataFrame, dict]:
+    """
+    Executa uma consulta sobre as tabelas com tempo limite.
+
+    RETORNA:
+        (resultado com até limite_linhas linhas,
+         {'motor', 'segundos', 'truncado'})
+
+    LEVANTA:
+        ConsultaInterrompida: passou do tempo limite (carga incluída)
+        ConsultaRecusada: cópia grande demais para o sqlite
+        Erros do motor (sintaxe, tabela inexistente...) como vieram
+    """
+    tempo_limite = _tempo_limite_inicial() if tempo_limite is None else tempo_limite
+    inicio = time.perf_counter()
+    conexao = abrir_conexao()
+    temporizador = threading.Timer(tempo_limite, conexao.interrupt)
+    temporizador.start()
+    try:
+        registrar_tabelas(conexao, tabelas, sql)
+        cursor = conexao.execute(sql)
+        colunas = [descricao[0] for descricao in cursor.description or []]
+        linhas = cursor.fetchmany(limite_linhas + 1)
+    except Exception as erro:
+        if _erro_de_interrupcao(erro):
+            raise ConsultaInterrompida(f"Consulta interrompida após {tempo_limite:g} s") from erro
+        raise
+    finally:
+        temporizador.cancel()
+        conexao.close()
+
+    resultado = pd.DataFrame.from_records(linhas[:limite_linhas], columns=colunas)
+    return resultado, {
+        'motor': motor_disponivel(),
+        'segundos': time.perf_counter() - inicio,
+        'truncado': len(linhas) > limite_linhas,
+    }
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+def exibir_consulta_sql(dataset: dict, chave_dataset: Optional[str] = None):
+    """
+    Aba de consulta SQL: editor, resultado paginado e exportação em CSV.
+
+    Parâmetros:
+        chave_dataset: o resultado guardado na sessão vale só para este dataset
+                       (e não passa da prévia para o processamento completo)
+    """
+    import streamlit as st
+
+    from exportacao import exibir_exportacao
+    from tabela_paginada import exibir_tabela_paginada
+
+    st.markdown("## 🧮 Consulta SQL")
+    tabelas = tabelas_do_dataset(dataset)
+    if not tabelas:
+        st.warning("⚠️ Não há registros para consultar")
+        return
+
+    with st.expander("📚 Tabelas disponíveis"):
+        st.dataframe(
+            pd.DataFrame({
+                'TABELA': list(tabelas),
+                'LINHAS': [len(df) for df in tabelas.values()],
+                'COLUNAS': [', '.join(map(str, df.columns)) for df in tabelas.values()],
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption('Registros que começam com dígito vão entre aspas: SELECT * FROM "0150"')
+
+    if motor_disponivel() == 'sqlite':
+        st.caption("Motor: sqlite (reserva; o duckdb do requirements.txt não está instalado)")
+
+    with st.form("consulta_sql_form"):
+        sql = st.text_area("Consulta", value=CONSULTA_EXEMPLO, height=160, key="consulta_sql_texto")
+        executar = st.form_submit_button("▶️ Executar")
+
+    chave = (chave_dataset, dataset.get('amostra') is not None)
+    if executar and sql.strip():
+        try:
+            with st.spinner("Executando consulta..."):
+                resultado, info = executar_consulta(tabelas, sql)
+            st.session_state['consulta_sql_resultado'] = {'chave': chave, 'df': resultado, 'info': info}
+        except ConsultaRecusada as erro:
+            st.session_state.pop('consulta_sql_resultado', None)
+            st.warning(f"⚠️ {erro}")
+        except ConsultaInterrompida as erro:
+            st.session_state.pop('consulta_sql_resultado', None)
+            st.error(f"⏱️ {erro}. Restrinja a consulta (WHERE, LIMIT) ou agregue antes de juntar.")
+        except Exception as erro:
+            st.session_state.pop('consulta_sql_resultado', None)
+            st.error(f"❌ Erro na consulta: {erro}")
+
+    guardado = st.session_state.get('consulta_sql_resultado')
+    if not guardado or guardado['chave'] != chave:
+        return
+
+    resultado, info = guardado['df'], guardado['info']
+    segundos = f"{info['segundos']:.2f}".replace('.', ',')
+    st.caption(f"{formatar_inteiro_br(len(resultado))} linha(s) em {segundos} s ({info['motor']})")
+    if info['truncado']:
+        st.warning(f"⚠️ Resultado limitado às primeiras {formatar_inteiro_br(LIMITE_LINHAS_RESULTADO)} linhas")
+    exibir_tabela_paginada(resultado, key_prefix="consulta_sql")
+    exibir_exportacao(resultado, "consulta_sql", key="exportar_consulta_sql", rotulo="Resultado",
+                      formatos=('csv',))
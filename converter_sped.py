@@ -0,0 +1,391 @@
+"""
+================================================================================
+MÓDULO: Conversão em Lote para Parquet - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Converter milhares de SPEDs (arquivos, diretórios ou ZIPs) em tabelas
+    Parquet prontas para análise, sem abrir o app: mesmos parsers do app,
+    vários processos em paralelo, progresso e erros por arquivo.
+
+SAÍDA (diretório de destino):
+    <REGISTRO>/<arquivo>.parquet            uma tabela por registro e arquivo
+    resumos/acumulador_cfop/<arquivo>.parquet   (com --resumos)
+    resumos/entrada_saida/<arquivo>.parquet     (com --resumos)
+    _concluidos/<arquivo>.json              resultado de cada arquivo convertido
+    _relatorio_conversao.json               resultado de toda a execução
+
+    O conjunto <REGISTRO>/ pode ser lido de uma vez:
+        pd.read_parquet('destino/C100')
+
+IMPORTANTE:
+    - Cada arquivo de entrada é processado inteiro por um único processo;
+      os .txt de um ZIP são consolidados como no app (ARQUIVO_ORIGEM)
+    - Os Parquet de um arquivo são todos gravados em temporários e só então
+      substituem os da conversão anterior; tabelas que a reconversão não
+      gerou (ex.: com filtro) são apagadas. Falha no meio mantém a conversão
+      anterior inteira
+    - O marcador _concluidos/<arquivo>.json é apagado no início e gravado só
+      no fim: arquivo com falha volta a ser convertido com --pular-convertidos
+    - Com --pular-convertidos, arquivos com _concluidos/<arquivo>.json são
+      ignorados (reexecução da carga noturna continua de onde parou)
+    - Código de saída 1 se algum arquivo falhar
+
+USO:
+    python converter_sped.py /dados/speds --destino /dados/parquet
+    python converter_sped.py a.txt lote.zip --destino saida --processos 8 --resumos
+    python converter_sped.py /dados/speds --destino /dados/parquet --pular-convertidos
+    python converter_sped.py /dados/speds --destino q2 --ind-oper 1 --cfop 6101 6102 \
+        --data-inicial 01/04/2025 --data-final 30/06/2025
+
+FILTROS (--ind-oper, --cod-sit, --participante, --data-inicial/--data-final, --cfop):
+    Avaliados durante a leitura do bloco C (filtros_leitura.py): documentos
+    recusados e os seus filhos nunca viram DataFrame. Blocos 0 e E são
+    gravados inteiros. --excluir-cancelados separa os documentos com
+    COD_SIT 02 a 05 em C100_CANCELADOS/ (sem os filhos).
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novos blocos: entram sozinhos via ingestao.processar_conteudo_sped()
+    2. Novos resumos: incluir em RESUMOS
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zipfile
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List
+
+import pandas as pd
+
+from calculos_fiscais import criar_acumulador_cfop, criar_resumo_entrada_saida
+from filtros_leitura import preparar_filtro
+from ingestao import consolidar_resultados, processar_conteudo_sped
+from instrumentacao import criar_estatisticas
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+EXTENSOES_SPED = ('.txt', '.zip')
+
+# Resumo -> função que recebe os dados consolidados do arquivo
+RESUMOS: Dict[str, Callable[[dict], pd.DataFrame]] = {
+    'acumulador_cfop': lambda dados: criar_acumulador_cfop(dados['dados_c'].get('C190', pd.DataFrame())),
+    'entrada_saida': lambda dados: criar_resumo_entrada_saida(
+        dados['dados_c'].get('C100', pd.DataFrame()), dados['dados_c'].get('C190', pd.DataFrame())
+    ),
+}
+
+DIRETORIO_CONCLUIDOS = '_concluidos'
+ARQUIVO_RELATORIO = '_relatorio_conversao.json'
+
+
+# ============================================================================
+# ENTRADAS
+# ============================================================================
+
+def listar_entradas(caminhos: List[str]) -> List[str]:
+    """
+    Expande diretórios (recursivamente) em arquivos .txt/.zip, sem repetições.
+    """
+    entradas = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, arquivos in os.walk(caminho):
+                entradas.extend(
+                    os.path.join(raiz, nome) for nome in sorted(arquivos)
+                    if nome.lower().endswith(EXTENSOES_SPED)
+                )
+        else:
+            entradas.append(caminho)
+    return list(dict.fromkeys(entradas))
+
+
+def nome_saida(caminho: str) -> str:
+    """
+    Nome dos Parquet de um arquivo: nome original + hash curto do caminho
+    (arquivos de mesmo nome em diretórios diferentes não se sobrescrevem).
+    """
+    base = os.path.splitext(os.path.basename(caminho))[0]
+    sufixo = hashlib.sha1(os.path.abspath(caminho).encode('utf-8')).hexdigest()[:8]
+    return f"{base}_{sufixo}"
+
+
+def ler_sped_em_disco(caminho: str) -> Iterator[bytes]:
+    """
+    Conteúdo de cada SPED do arquivo (um .txt, ou os .txt de um ZIP).
+
+    IMPORTANTE:
+    - Diferente de ingestao.ler_arquivos_sped(), erros NÃO são ignorados:
+      sobem para serem registrados como falha do arquivo
+    """
+    if caminho.lower().endswith('.zip'):
+        with zipfile.ZipFile(caminho, 'r') as zip_ref:
+            for nome in zip_ref.namelist():
+                if nome.lower().endswith('.txt'):
+                    yield zip_ref.read(nome)
+    else:
+        with open(caminho, 'rb') as arquivo:
+            yield arquivo.read()
+
+
+# ============================================================================
+# CONVERSÃO DE UM ARQUIVO (executada nos processos de trabalho)
+# ============================================================================
+
+def _gravar_parquet(df: pd.DataFrame, destino: str) -> str:
+    """
+    Grava o Parquet no temporário do destino (renomeado por _publicar_parquet).
+    """
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = destino + '.parcial'
+    df.to_parquet(temporario, index=False)
+    return temporario
+
+
+def parquet_existentes(destino: str, saida: str) -> List[str]:
+    """
+    Parquet de uma conversão anterior do arquivo: <REGISTRO>/<saida>.parquet
+    e resumos/<resumo>/<saida>.parquet.
+    """
+    nome = f"{saida}.parquet"
+    pastas = [os.path.join(destino, pasta) for pasta in sorted(os.listdir(destino))] if os.path.isdir(destino) else []
+    resumos = os.path.join(destino, 'resumos')
+    if os.path.isdir(resumos):
+        pastas += [os.path.join(resumos, pasta) for pasta in sorted(os.listdir(resumos))]
+    return [os.path.join(pasta, nome) for pasta in pastas if os.path.isfile(os.path.join(pasta, nome))]
+
+
+def _publicar_parquet(destino: str, saida: str, gravados: Dict[str, str]):
+    """
+    Troca os Parquet da conversão anterior pelos novos (final -> temporário).
+    """
+    for antigo in parquet_existentes(destino, saida):
+        if antigo not in gravados:
+            os.remove(antigo)
+    for final, temporario in gravados.items():
+        os.replace(temporario, final)
+
+
+def converter_arquivo(caminho: str, destino: str, resumos: bool = False, filtro: dict = None) -> dict:
+    """
+    Converte um arquivo de entrada nos Parquet dos seus registros.
+
+    filtro: condições do bloco C aplicadas na leitura (filtros_leitura.py)
+
+    RETORNA:
+        Dicionário com 'arquivo', 'saida', 'speds', 'bytes', 'segundos',
+        'registros' (registro -> linhas) e 'erro' (None se deu certo)
+    """
+    inicio = time.perf_counter()
+    saida = nome_saida(caminho)
+    resultado = {'arquivo': caminho, 'saida': saida, 'speds': 0, 'bytes': 0,
+                 'segundos': 0.0, 'registros': {}, 'erro': None}
+    marcador = os.path.join(destino, DIRETORIO_CONCLUIDOS, f"{saida}.json")
+    if os.path.exists(marcador):
+        os.remove(marcador)
+
+    gravados = {}  # Parquet final -> temporário
+    try:
+        estatisticas = criar_estatisticas()
+        resultados = [(caminho, processar_conteudo_sped(conteudo, estatisticas, filtro=filtro))
+                      for conteudo in ler_sped_em_disco(caminho)]
+        if not resultados:
+            raise ValueError('nenhum SPED (.txt) encontrado')
+        dados = consolidar_resultados(resultados, estatisticas)
+
+        for tabelas in dados.values():
+            for registro, df in tabelas.items():
+                if df.empty:
+                    continue
+                if 'ARQUIVO_ORIGEM' not in df.columns:
+                    # Registros E não recebem a coluna no app; no lote ela identifica o arquivo
+                    df = df.assign(ARQUIVO_ORIGEM=caminho)
+                final = os.path.join(destino, registro, f"{saida}.parquet")
+                gravados[final] = _gravar_parquet(df, final)
+                resultado['registros'][registro] = len(df)
+
+        if resumos:
+            for nome, funcao in RESUMOS.items():
+                df_resumo = funcao(dados)
+                if not df_resumo.empty:
+                    final = os.path.join(destino, 'resumos', nome, f"{saida}.parquet")
+                    gravados[final] = _gravar_parquet(df_resumo.assign(ARQUIVO_ORIGEM=caminho), final)
+
+        _publicar_parquet(destino, saida, gravados)
+        resultado['speds'] = estatisticas['arquivos']
+        resultado['bytes'] = estatisticas['bytes']
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+        for temporario in gravados.values():
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    resultado['segundos'] = time.perf_counter() - inicio
+    if resultado['erro'] is None:
+        os.makedirs(os.path.dirname(marcador), exist_ok=True)
+        with open(marcador, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False)
+    return resultado
+
+
+# ============================================================================
+# EXECUÇÃO EM LOTE
+# ============================================================================
+
+def ja_convertido(caminho: str, destino: str) -> bool:
+    """
+    True se o arquivo já tem marcador em _concluidos/.
+    """
+    return os.path.exists(os.path.join(destino, DIRETORIO_CONCLUIDOS, f"{nome_saida(caminho)}.json"))
+
+
+def executar_conversao(entradas: List[str], destino: str, processos: int = None,
+                       resumos: bool = False, pular_convertidos: bool = False,
+                       progresso: Callable[[int, int, dict], None] = None, filtro: dict = None) -> List[dict]:
+    """
+    Converte os arquivos em paralelo e devolve o resultado de cada um.
+
+    Parâmetros:
+        processos: processos de trabalho (padrão: CPUs; 1 = sem paralelismo)
+        progresso: chamada a cada arquivo concluído com (feitos, total, resultado)
+        filtro: condições do bloco C aplicadas na leitura de cada arquivo
+    """
+    preparar_filtro(filtro)  # filtro inválido falha antes de converter
+    if pular_convertidos:
+        entradas = [caminho for caminho in entradas if not ja_convertido(caminho, destino)]
+    os.makedirs(destino, exist_ok=True)
+
+    total = len(entradas)
+    resultados = []
+
+    def concluir(resultado):
+        resultados.append(resultado)
+        if progresso:
+            progresso(len(resultados), total, resultado)
+
+    processos = processos or os.cpu_count() or 1
+    if processos == 1:
+        for caminho in entradas:
+            concluir(converter_arquivo(caminho, destino, resumos, filtro))
+        return resultados
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {executor.submit(converter_arquivo, caminho, destino, resumos, filtro): caminho
+                   for caminho in entradas}
+        for futuro in as_completed(futuros):
+            try:
+                concluir(futuro.result())
+            except Exception as e:
+                # Processo de trabalho morreu (ex.: falta de memória)
+                concluir({'arquivo': futuros[futuro], 'saida': nome_saida(futuros[futuro]), 'speds': 0,
+                          'bytes': 0, 'segundos': 0.0, 'registros': {}, 'erro': f"{type(e).__name__}: {e}"})
+    return resultados
+
+
+def imprimir_progresso(feitos: int, total: int, resultado: dict):
+    """
+    Uma linha por arquivo concluído no stderr.
+    """
+    if resultado['erro']:
+        situacao = f"ERRO {resultado['erro']}"
+    else:
+        linhas = sum(resultado['registros'].values())
+        situacao = f"ok {resultado['speds']} SPED(s), {linhas:,} linhas".replace(',', '.')
+    print(f"[{feitos}/{total}] {resultado['arquivo']} ({resultado['segundos']:.1f} s) {situacao}",
+          file=sys.stderr, flush=True)
+
+
+def resumir_execucao(resultados: List[dict], segundos: float) -> dict:
+    """
+    Totais da execução para o _relatorio_conversao.json.
+    """
+    falhas = [r for r in resultados if r['erro']]
+    return {
+        'arquivos': len(resultados),
+        'convertidos': len(resultados) - len(falhas),
+        'falhas': len(falhas),
+        'bytes': sum(r['bytes'] for r in resultados),
+        'segundos': segundos,
+        'erros': {r['arquivo']: r['erro'] for r in falhas},
+        'resultados': resultados,
+    }
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def _data(texto: str):
+    """
+    Data DD/MM/AAAA da linha de comando.
+    """
+    try:
+        return datetime.strptime(texto, '%d/%m/%Y').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida (use DD/MM/AAAA): {texto}")
+
+
+def montar_filtro(args) -> dict:
+    """
+    Filtro de leitura (filtros_leitura.py) a partir das opções; None sem nenhuma.
+    """
+    filtro = {
+        'IND_OPER': [args.ind_oper] if args.ind_oper is not None else None,
+        'COD_SIT': args.cod_sit,
+        'COD_PART': args.participante,
+        'CFOP': args.cfop,
+        'DT_DOC': (args.data_inicial, args.data_final) if args.data_inicial or args.data_final else None,
+        'EXCLUIR_CANCELADOS': True if args.excluir_cancelados else None,
+    }
+    return {chave: valor for chave, valor in filtro.items() if valor is not None} or None
+
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description='Converte SPEDs ICMS/IPI em tabelas Parquet.')
+    parser.add_argument('entradas', nargs='+', help='Arquivos .txt/.zip ou diretórios')
+    parser.add_argument('--destino', required=True, help='Diretório de saída dos Parquet')
+    parser.add_argument('--processos', type=int, default=None, help='Processos em paralelo (padrão: CPUs)')
+    parser.add_argument('--resumos', action='store_true', help='Grava também acumulador CFOP e resumo entrada/saída')
+    parser.add_argument('--pular-convertidos', action='store_true', help='Ignora arquivos já convertidos no destino')
+    filtros = parser.add_argument_group('filtros do bloco C (aplicados na leitura)')
+    filtros.add_argument('--ind-oper', choices=['0', '1'], help='0 = entradas, 1 = saídas')
+    filtros.add_argument('--cod-sit', nargs='+', metavar='COD', help='Situações do documento (ex.: 00 01)')
+    filtros.add_argument('--participante', nargs='+', metavar='COD_PART', help='Códigos de participante')
+    filtros.add_argument('--data-inicial', type=_data, metavar='DD/MM/AAAA', help='DT_DOC a partir de')
+    filtros.add_argument('--data-final', type=_data, metavar='DD/MM/AAAA', help='DT_DOC até')
+    filtros.add_argument('--cfop', nargs='+', metavar='CFOP', help='CFOPs dos itens (C170) e do analítico (C190)')
+    filtros.add_argument('--excluir-cancelados', action='store_true',
+                         help='Documentos cancelados/denegados/inutilizados vão para C100_CANCELADOS, sem os filhos')
+    args = parser.parse_args(argumentos)
+
+    entradas = listar_entradas(args.entradas)
+    print(f"{len(entradas)} arquivo(s) encontrado(s)", file=sys.stderr)
+
+    inicio = time.perf_counter()
+    resultados = executar_conversao(entradas, args.destino, args.processos, args.resumos,
+                                    args.pular_convertidos, progresso=imprimir_progresso, filtro=montar_filtro(args))
+    relatorio = resumir_execucao(resultados, time.perf_counter() - inicio)
+
+    with open(os.path.join(args.destino, ARQUIVO_RELATORIO), 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+
+    print(f"{relatorio['convertidos']} convertido(s), {relatorio['falhas']} falha(s) "
+          f"em {relatorio['segundos']:.1f} s", file=sys.stderr)
+    for caminho, erro in relatorio['erros'].items():
+        print(f"  {caminho}: {erro}", file=sys.stderr)
+    return 1 if relatorio['falhas'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,6 +7,9 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
+from formatacao import formatar_moeda_br, formatar_moeda_br_em_lote, formatar_inteiro_br
+# Cálculos sem interface (reexportados para os imports existentes)
+from calculos_fiscais import agregar_top10_cfop, agregar_entrada_saida, agregar_linha_temporal
 
 
 # Paleta de cores profissional (estilo Big Four)
@@ -29,16 +32,6 @@ PIZZA_COLORS = [
 ]
 
 
-def formatar_valor_br(valor):
-    """Formata valor no padrão brasileiro: R$ 1.234,56"""
-    try:
-        valor_str = f"{valor:,.2f}"
-        valor_str = valor_str.replace(',', 'TEMP').replace('.', ',').replace('TEMP', '.')
-        return f"R$ {valor_str}"
-    except:
-        return "R$ 0,00"
-
-
 def criar_kpi_card(titulo, valor, subtitulo="", cor=COLORS['primary']):
     """Cria um card KPI profissional"""
     st.markdown(f"""
@@ -70,19 +63,7 @@ def criar_grafico_pizza_top10_icms(df_c190):
     if df_c190.empty:
         return None
     
-    # Agrupa por CFOP e soma ICMS
-    top10 = df_c190.groupby('CFOP').agg({
-        'VL_ICMS': 'sum'
-    }).reset_index()
-    
-    # Ordena e pega TOP 10
-    top10 = top10.sort_values('VL_ICMS', ascending=False).head(10)
-    
-    # Cria labels com CFOP e valor
-    top10['label'] = top10.apply(
-        lambda x: f"CFOP {x['CFOP']}<br>{formatar_valor_br(x['VL_ICMS'])}", 
-        axis=1
-    )
+    top10 = agregar_top10_cfop(df_c190, 'VL_ICMS')
     
     fig = go.Figure(data=[go.Pie(
         labels=top10['label'],
@@ -124,26 +105,12 @@ def criar_grafico_pizza_top10_ipi(df_c190):
     if df_c190.empty:
         return None
     
-    # Filtra apenas registros com IPI > 0
-    df_ipi = df_c190[df_c190['VL_IPI'] > 0].copy()
+    # Apenas registros com IPI > 0
+    top10 = agregar_top10_cfop(df_c190, 'VL_IPI')
     
-    if df_ipi.empty:
+    if top10.empty:
         return None
     
-    # Agrupa por CFOP e soma IPI
-    top10 = df_ipi.groupby('CFOP').agg({
-        'VL_IPI': 'sum'
-    }).reset_index()
-    
-    # Ordena e pega TOP 10
-    top10 = top10.sort_values('VL_IPI', ascending=False).head(10)
-    
-    # Cria labels com CFOP e valor
-    top10['label'] = top10.apply(
-        lambda x: f"CFOP {x['CFOP']}<br>{formatar_valor_br(x['VL_IPI'])}", 
-        axis=1
-    )
-    
     fig = go.Figure(data=[go.Pie(
         labels=top10['label'],
         values=top10['VL_IPI'],
@@ -185,14 +152,7 @@ def criar_grafico_barras_entrada_saida(df_c100):
         return None
     
     # Agrupa por tipo de operação
-    resumo = df_c100.groupby('IND_OPER').agg({
-        'VL_DOC': 'sum',
-        'VL_ICMS': 'sum',
-        'VL_IPI': 'sum'
-    }).reset_index()
-    
-    # Mapeia indicador de operação
-    resumo['OPERACAO'] = resumo['IND_OPER'].map({'0': 'Entrada', '1': 'Saída'})
+    resumo = agregar_entrada_saida(df_c100)
     
     fig = go.Figure()
     
@@ -201,7 +161,7 @@ def criar_grafico_barras_entrada_saida(df_c100):
         x=resumo['OPERACAO'],
         y=resumo['VL_DOC'],
         marker_color=COLORS['primary'],
-        text=resumo['VL_DOC'].apply(formatar_valor_br),
+        text=formatar_moeda_br_em_lote(resumo['VL_DOC']),
         textposition='outside'
     ))
     
@@ -210,7 +170,7 @@ def criar_grafico_barras_entrada_saida(df_c100):
         x=resumo['OPERACAO'],
         y=resumo['VL_ICMS'],
         marker_color=COLORS['success'],
-        text=resumo['VL_ICMS'].apply(formatar_valor_br),
+        text=formatar_moeda_br_em_lote(resumo['VL_ICMS']),
         textposition='outside'
     ))
     
@@ -219,7 +179,7 @@ def criar_grafico_barras_entrada_saida(df_c100):
         x=resumo['OPERACAO'],
         y=resumo['VL_IPI'],
         marker_color=COLORS['accent'],
-        text=resumo['VL_IPI'].apply(formatar_valor_br),
+        text=formatar_moeda_br_em_lote(resumo['VL_IPI']),
         textposition='outside'
     ))
     
@@ -254,22 +214,11 @@ def criar_grafico_linha_temporal(df_c100):
     if df_c100.empty or 'DT_DOC' not in df_c100.columns:
         return None
     
-    # Converte data
-    df_temp = df_c100.copy()
-    df_temp['DATA'] = pd.to_datetime(df_temp['DT_DOC'], format='%d%m%Y', errors='coerce')
-    df_temp = df_temp.dropna(subset=['DATA'])
-    
-    if df_temp.empty:
-        return None
-    
     # Agrupa por data
-    timeline = df_temp.groupby('DATA').agg({
-        'VL_DOC': 'sum',
-        'VL_ICMS': 'sum',
-        'VL_IPI': 'sum'
-    }).reset_index()
+    timeline = agregar_linha_temporal(df_c100)
     
-    timeline = timeline.sort_values('DATA')
+    if timeline.empty:
+        return None
     
     fig = go.Figure()
     
@@ -339,7 +288,7 @@ def exibir_dashboard_executivo(df_c100, df_c190):
             total_docs = len(df_c100)
             criar_kpi_card(
                 "Total de Documentos",
-                f"{total_docs:,}".replace(',', '.'),
+                formatar_inteiro_br(total_docs),
                 "Notas Fiscais",
                 COLORS['primary']
             )
@@ -348,7 +297,7 @@ def exibir_dashboard_executivo(df_c100, df_c190):
             total_valor = df_c100['VL_DOC'].sum()
             criar_kpi_card(
                 "Valor Total",
-                formatar_valor_br(total_valor),
+                formatar_moeda_br(total_valor),
                 "Soma de todas as NFs",
                 COLORS['secondary']
             )
@@ -357,7 +306,7 @@ def exibir_dashboard_executivo(df_c100, df_c190):
             total_icms = df_c100['VL_ICMS'].sum()
             criar_kpi_card(
                 "Total ICMS",
-                formatar_valor_br(total_icms),
+                formatar_moeda_br(total_icms),
                 "Imposto sobre Circulação",
                 COLORS['success']
             )
@@ -366,7 +315,7 @@ def exibir_dashboard_executivo(df_c100, df_c190):
             total_ipi = df_c100['VL_IPI'].sum()
             criar_kpi_card(
                 "Total IPI",
-                formatar_valor_br(total_ipi),
+                formatar_moeda_br(total_ipi),
                 "Imposto sobre Produtos",
                 COLORS['accent']
             )
@@ -0,0 +1,201 @@
+"""
+================================================================================
+MÓDULO: Exportação Sob Demanda (CSV e XLSX) - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Gerar arquivos de exportação apenas quando o usuário pede, escrevendo em
+    blocos para não montar o arquivo inteiro em memória.
+
+CONTEXTO:
+    Antes, cada aba chamava df.to_csv() a cada rerun e passava a string para
+    st.download_button, mesmo que ninguém clicasse em download.
+
+FUNCIONAMENTO:
+    1. A aba exibe botões "Gerar CSV" / "Gerar XLSX" (baratos)
+    2. Ao clicar, o arquivo é escrito em blocos num arquivo temporário
+    3. O botão de download aparece em seguida com o arquivo pronto
+
+FORMATOS:
+    - CSV: separador ';' e decimal ',' (padrão brasileiro), em blocos
+    - XLSX: openpyxl em modo write_only, uma planilha por registro;
+      registros acima do limite de linhas do Excel continuam em
+      planilhas numeradas (C170, C170_2, ...)
+
+GATILHOS DE MANUTENÇÃO:
+    1. Para mudar o tamanho dos blocos: TAMANHO_BLOCO_EXPORTACAO
+    2. Para novos formatos: criar escrever_xxx() e incluir em exibir_exportacao()
+
+Data de Criação: 18/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import codecs
+import tempfile
+from typing import BinaryIO, Dict, Iterator
+
+import pandas as pd
+import streamlit as st
+from openpyxl import Workbook
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Linhas formatadas por vez ao escrever CSV/XLSX
+TAMANHO_BLOCO_EXPORTACAO = 100_000
+
+# Linhas de dados por planilha (limite do Excel menos o cabeçalho)
+LIMITE_LINHAS_XLSX = 1_048_575
+
+# Limite do Excel para nome de planilha
+LIMITE_NOME_PLANILHA = 31
+
+MIME_CSV = 'text/csv'
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+# ============================================================================
+# GERAÇÃO EM BLOCOS
+# ============================================================================
+
+def gerar_csv_em_blocos(df: pd.DataFrame, tamanho_bloco: int = TAMANHO_BLOCO_EXPORTACAO,
+                        encoding: str = 'utf-8') -> Iterator[bytes]:
+    """
+    Gera o CSV do DataFrame em blocos de bytes.
+
+    IMPORTANTE:
+    - Cabeçalho apenas no primeiro bloco
+    - encoding='utf-8-sig' grava o BOM uma única vez (Excel reconhece acentos)
+    """
+    codificador = codecs.getincrementalencoder(encoding)()
+
+    if df.empty:
+        yield codificador.encode(df.to_csv(index=False, sep=';', decimal=','), final=True)
+        return
+
+    for inicio in range(0, len(df), tamanho_bloco):
+        bloco = df.iloc[inicio:inicio + tamanho_bloco]
+        texto = bloco.to_csv(index=False, header=(inicio == 0), sep=';', decimal=',')
+        yield codificador.encode(texto)
+
+
+def escrever_csv(df: pd.DataFrame, destino: BinaryIO, encoding: str = 'utf-8') -> int:
+    """
+    Escreve o CSV no destino (arquivo binário) e retorna os bytes escritos.
+    """
+    total = 0
+    for bloco in gerar_csv_em_blocos(df, encoding=encoding):
+        destino.write(bloco)
+        total += len(bloco)
+    return total
+
+
+def _nome_planilha(nome: str, parte: int, usados: set) -> str:
+    """
+    Monta um nome de planilha válido e único (máx. 31 caracteres).
+    """
+    sufixo = f'_{parte}' if parte > 1 else ''
+    base = ''.join('_' if c in '[]:*?/\\' else c for c in str(nome))
+    nome_final = base[:LIMITE_NOME_PLANILHA - len(sufixo)] + sufixo
+    contador = 2
+    while nome_final in usados:
+        extra = f'~{contador}'
+        nome_final = base[:LIMITE_NOME_PLANILHA - len(sufixo) - len(extra)] + sufixo + extra
+        contador += 1
+    usados.add(nome_final)
+    return nome_final
+
+
+def escrever_xlsx(tabelas: Dict[str, pd.DataFrame], destino: BinaryIO,
+                  tamanho_bloco: int = TAMANHO_BLOCO_EXPORTACAO):
+    """
+    Escreve um XLSX com uma planilha por registro, em modo write_only.
+
+    IMPORTANTE:
+    - Modo write_only: as linhas vão direto para o arquivo, sem manter
+      a planilha em memória
+    - Valores vazios (NaN) são gravados como células vazias
+    - Tabelas vazias não geram planilha; sem nenhuma tabela, grava uma
+      planilha vazia (o Excel exige ao menos uma)
+    """
+    workbook = Workbook(write_only=True)
+    usados = set()
+
+    for nome, df in tabelas.items():
+        if df is None or df.empty:
+            continue
+
+        cabecalho = [str(col) for col in df.columns]
+        for parte, inicio_planilha in enumerate(range(0, len(df), LIMITE_LINHAS_XLSX), start=1):
+            planilha = workbook.create_sheet(_nome_planilha(nome, parte, usados))
+            planilha.append(cabecalho)
+
+            fim_planilha = min(inicio_planilha + LIMITE_LINHAS_XLSX, len(df))
+            for inicio in range(inicio_planilha, fim_planilha, tamanho_bloco):
+                bloco = df.iloc[inicio:min(inicio + tamanho_bloco, fim_planilha)]
+                bloco = bloco.astype(object).where(bloco.notna(), None)
+                for linha in bloco.itertuples(index=False, name=None):
+                    planilha.append(linha)
+
+    if not usados:
+        workbook.create_sheet('Dados')
+
+    workbook.save(destino)
+
+
+# ============================================================================
+# FUNÇÃO DE EXIBIÇÃO
+# ============================================================================
+
+def exibir_exportacao(tabelas, nome_arquivo: str, key: str, rotulo: str = "Download",
+                      formatos=('csv', 'xlsx'), encoding_csv: str = 'utf-8'):
+    """
+    Exibe botões de exportação que só geram o arquivo quando clicados.
+
+    Parâmetros:
+        tabelas: DataFrame (uma aba) ou dicionário registro -> DataFrame
+                 (XLSX com uma planilha por registro; CSV não se aplica)
+        nome_arquivo: Nome base do arquivo, sem extensão
+        key: Prefixo único para as keys dos widgets
+        rotulo: Texto dos botões
+        formatos: Formatos oferecidos ('csv' e/ou 'xlsx')
+        encoding_csv: Codificação do CSV ('utf-8-sig' para Excel)
+
+    GATILHO DE MANUTENÇÃO:
+    - O arquivo gerado vale só para o rerun do clique; qualquer outra
+      interação exige gerar de novo (evita reter arquivos grandes)
+    """
+    if isinstance(tabelas, pd.DataFrame):
+        df_unico = tabelas
+        tabelas = {nome_arquivo: tabelas}
+    else:
+        df_unico = None
+        formatos = [f for f in formatos if f != 'csv']
+
+    colunas = st.columns(len(formatos))
+    for coluna, formato in zip(colunas, formatos):
+        with coluna:
+            if not st.button(f"⚙️ Gerar {formato.upper()} - {rotulo}", key=f"{key}_gerar_{formato}"):
+                continue
+
+            with st.spinner(f"Gerando {formato.upper()}..."):
+                arquivo = tempfile.TemporaryFile(buffering=0)
+                if formato == 'csv':
+                    escrever_csv(df_unico, arquivo, encoding=encoding_csv)
+                    mime = MIME_CSV
+                else:
+                    escrever_xlsx(tabelas, arquivo)
+                    mime = MIME_XLSX
+                arquivo.seek(0)
+
+            st.download_button(
+                label=f"📥 Baixar {formato.upper()} - {rotulo}",
+                data=arquivo,
+                file_name=f"{nome_arquivo}.{formato}",
+                mime=mime,
+                key=f"{key}_baixar_{formato}"
+            )
+            arquivo.close()
@@ -6,41 +6,8 @@ Permite filtrar por múltiplos campos com operadores: =, ≠, <, >
 import pandas as pd
 import streamlit as st
 
-
-def aplicar_filtro_numerico(df, coluna, operador, valor):
-    """
-    Aplica filtro numérico em uma coluna
-    """
-    try:
-        valor_float = float(valor)
-        
-        if operador == '=':
-            return df[df[coluna] == valor_float]
-        elif operador == '≠':
-            return df[df[coluna] != valor_float]
-        elif operador == '<':
-            return df[df[coluna] < valor_float]
-        elif operador == '>':
-            return df[df[coluna] > valor_float]
-        else:
-            return df
-    except:
-        return df
-
-
-def aplicar_filtro_texto(df, coluna, operador, valor):
-    """
-    Aplica filtro de texto em uma coluna
-    """
-    try:
-        if operador == '=':
-            return df[df[coluna].astype(str) == str(valor)]
-        elif operador == '≠':
-            return df[df[coluna].astype(str) != str(valor)]
-        else:
-            return df
-    except:
-        return df
+# Cálculos sem interface (reexportados para os imports existentes)
+from calculos_fiscais import aplicar_filtro_numerico, aplicar_filtro_texto, aplicar_filtros
 
 
 def criar_painel_filtros(df, key_prefix=""):
@@ -54,8 +21,11 @@ def criar_painel_filtros(df, key_prefix=""):
     st.sidebar.markdown("---")
     st.sidebar.markdown("## 🔍 Filtros Avançados")
     
-    df_filtrado = df.copy()
-    filtros_aplicados = []
+    cfop_selecionado = []
+    part_selecionado = []
+    cst_selecionado = []
+    operador_filtro = None
+    valor_filtro = None
     
     # Filtro por CFOP
     with st.sidebar.expander("📋 Filtrar por CFOP"):
@@ -66,10 +36,6 @@ def criar_painel_filtros(df, key_prefix=""):
                 options=cfops_disponiveis,
                 key=f"{key_prefix}_filtro_cfop"
             )
-            
-            if cfop_selecionado:
-                df_filtrado = df_filtrado[df_filtrado['CFOP'].isin(cfop_selecionado)]
-                filtros_aplicados.append(f"CFOP: {', '.join(map(str, cfop_selecionado))}")
     
     # Filtro por Participante
     with st.sidebar.expander("👥 Filtrar por Participante"):
@@ -80,10 +46,6 @@ def criar_painel_filtros(df, key_prefix=""):
                 options=participantes,
                 key=f"{key_prefix}_filtro_participante"
             )
-            
-            if part_selecionado:
-                df_filtrado = df_filtrado[df_filtrado['COD_PART'].isin(part_selecionado)]
-                filtros_aplicados.append(f"Participante: {', '.join(map(str, part_selecionado))}")
     
     # Filtro por CST ICMS
     with st.sidebar.expander("🏷️ Filtrar por CST ICMS"):
@@ -94,10 +56,6 @@ def criar_painel_filtros(df, key_prefix=""):
                 options=csts,
                 key=f"{key_prefix}_filtro_cst_icms"
             )
-            
-            if cst_selecionado:
-                df_filtrado = df_filtrado[df_filtrado['CST_ICMS'].isin(cst_selecionado)]
-                filtros_aplicados.append(f"CST ICMS: {', '.join(map(str, cst_selecionado))}")
     
     # Filtro por Valor do Documento
     with st.sidebar.expander("💰 Filtrar por Valor"):
@@ -110,7 +68,7 @@ def criar_painel_filtros(df, key_prefix=""):
                     key=f"{key_prefix}_op_valor"
                 )
             with col2:
-                valor_filtro = st.number_input(
+                valor_digitado = st.number_input(
                     "Valor",
                     min_value=0.0,
                     value=0.0,
@@ -118,21 +76,26 @@ def criar_painel_filtros(df, key_prefix=""):
                     key=f"{key_prefix}_valor_filtro"
                 )
             
-            aplicar_filtro_valor = st.button("Aplicar Filtro Valor", key=f"{key_prefix}_btn_valor")
-            
-            if aplicar_filtro_valor and valor_filtro > 0:
-                df_filtrado = aplicar_filtro_numerico(df_filtrado, 'VL_DOC', operador_valor, valor_filtro)
-                filtros_aplicados.append(f"Valor {operador_valor} R$ {valor_filtro:,.2f}")
+            if st.button("Aplicar Filtro Valor", key=f"{key_prefix}_btn_valor"):
+                operador_filtro, valor_filtro = operador_valor, valor_digitado
+    
+    df_filtrado, filtros_aplicados = aplicar_filtros(
+        df,
+        cfops=cfop_selecionado,
+        participantes=part_selecionado,
+        csts_icms=cst_selecionado,
+        operador_valor=operador_filtro,
+        valor=valor_filtro
+    )
     
-    # Filtro por Data
+    # Filtro por Data (limites calculados sobre os dados já filtrados)
     with st.sidebar.expander("📅 Filtrar por Data"):
         if 'DT_DOC' in df.columns:
-            df_temp = df_filtrado.copy()
-            df_temp['DATA_CONV'] = pd.to_datetime(df_temp['DT_DOC'], format='%d%m%Y', errors='coerce')
+            datas = pd.to_datetime(df_filtrado['DT_DOC'], format='%d%m%Y', errors='coerce')
             
-            if not df_temp['DATA_CONV'].isna().all():
-                data_min = df_temp['DATA_CONV'].min()
-                data_max = df_temp['DATA_CONV'].max()
+            if not datas.isna().all():
+                data_min = datas.min()
+                data_max = datas.max()
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -156,11 +119,10 @@ def criar_painel_filtros(df, key_prefix=""):
                 aplicar_filtro_data = st.button("Aplicar Filtro Data", key=f"{key_prefix}_btn_data")
                 
                 if aplicar_filtro_data:
-                    df_filtrado = df_temp[
-                        (df_temp['DATA_CONV'] >= pd.to_datetime(data_inicio)) &
-                        (df_temp['DATA_CONV'] <= pd.to_datetime(data_fim))
-                    ].drop(columns=['DATA_CONV'])
-                    filtros_aplicados.append(f"Data: {data_inicio} a {data_fim}")
+                    df_filtrado, filtros_data = aplicar_filtros(
+                        df_filtrado, data_inicio=data_inicio, data_fim=data_fim
+                    )
+                    filtros_aplicados.extend(filtros_data)
     
     # Botão para limpar filtros
     if st.sidebar.button("🔄 Limpar Todos os Filtros", key=f"{key_prefix}_btn_limpar"):
@@ -0,0 +1,217 @@
+"""
+================================================================================
+MÓDULO: Filtros Aplicados na Leitura do Bloco C - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Responder perguntas pontuais ("vendas interestaduais do 2º trimestre",
+    "tudo do participante X") sobre anos de SPEDs sem materializar os
+    arquivos inteiros: os filtros são avaliados nos campos brutos durante
+    a leitura e o que é recusado nunca vira DataFrame.
+
+FILTRO (dicionário, todas as chaves opcionais):
+    {
+        'IND_OPER': {'1'},                        # C100: entrada (0) / saída (1)
+        'COD_SIT': {'00', '01'},                  # C100: situação do documento
+        'COD_PART': {'F0001', 'C0002'},           # C100: participante
+        'DT_DOC': (date(2025, 4, 1), date(2025, 6, 30)),   # C100: intervalo
+                                                  #   fechado; None = aberto
+        'CFOP': {'6101', '6102'},                 # C170 e C190
+        'EXCLUIR_CANCELADOS': True,               # C100 com COD_SIT 02 a 05
+    }
+
+REGRAS:
+    - Os campos do C100 decidem o documento inteiro: C100 recusado não
+      entra e TODOS os seus filhos (C110 a C197) são pulados sem leitura
+    - CFOP vale para os registros que têm CFOP (C170 e C190): os demais
+      itens do documento são descartados, o C100 continua
+    - DT_DOC vazia ou inválida é recusada quando há intervalo de datas
+    - Condições diferentes se combinam com E; valores de um conjunto, com OU
+
+CANCELADOS (EXCLUIR_CANCELADOS):
+    Documentos cancelados, denegados ou inutilizados (SITUACOES_CANCELADAS)
+    não entram no C100 nem têm os filhos lidos: assim não inflam o
+    dashboard nem o acumulador CFOP. Os que passam pelas demais condições
+    ficam no registro C100_CANCELADOS (só COLUNAS_CANCELADOS), para
+    auditoria.
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novo campo do C100: incluir em CAMPOS_FILTRO_C100
+    2. Nova situação a separar como cancelada: SITUACOES_CANCELADAS
+    3. Novo registro com CFOP: incluir em REGISTROS_CFOP
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import hashlib
+import json
+from datetime import date
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Campos do C100 filtrados por conjunto de valores
+CAMPOS_FILTRO_C100 = ('IND_OPER', 'COD_SIT', 'COD_PART')
+
+# Registros filtrados pelo próprio CFOP
+REGISTROS_CFOP = ('C170', 'C190')
+
+# COD_SIT: 02/03 cancelado, 04 denegado, 05 numeração inutilizada
+SITUACOES_CANCELADAS = frozenset({'02', '03', '04', '05'})
+
+# Tabela de auditoria dos documentos separados por EXCLUIR_CANCELADOS
+REGISTRO_CANCELADOS = 'C100_CANCELADOS'
+COLUNAS_CANCELADOS = ['IND_OPER', 'IND_EMIT', 'COD_PART', 'COD_MOD', 'COD_SIT', 'SER', 'NUM_DOC', 'CHV_NFE',
+                      'DT_DOC']
+
+CHAVES_FILTRO = set(CAMPOS_FILTRO_C100) | {'DT_DOC', 'CFOP', 'EXCLUIR_CANCELADOS'}
+
+
+# ============================================================================
+# PREPARAÇÃO
+# ============================================================================
+
+def data_ordenavel(texto: str) -> int:
+    """
+    Data do SPED (DDMMAAAA) como inteiro AAAAMMDD; 0 se vazia ou inválida.
+    """
+    if len(texto) != 8 or not (texto.isascii() and texto.isdigit()):
+        return 0
+    return int(texto[4:8] + texto[2:4] + texto[0:2])
+
+
+def preparar_filtro(filtro: Optional[dict]) -> Optional[dict]:
+    """
+    Valida o filtro (ver cabeçalho) e o converte para a forma usada na leitura.
+
+    RETORNA:
+        None se não há filtro; senão {'c100': {campo: frozenset},
+        'datas': (inicio, fim) em AAAAMMDD ou None, 'cfop': frozenset ou None,
+        'cancelados': SITUACOES_CANCELADAS ou None}
+
+    Levanta ValueError para chave desconhecida ou intervalo de datas inválido.
+    """
+    if not filtro:
+        return None
+    desconhecidas = set(filtro) - CHAVES_FILTRO
+    if desconhecidas:
+        raise ValueError(f"Filtro com chave(s) desconhecida(s): {', '.join(sorted(desconhecidas))}")
+
+    datas = None
+    if filtro.get('DT_DOC') is not None:
+        inicio, fim = filtro['DT_DOC']
+        if (inicio is not None and not isinstance(inicio, date)) or (fim is not None and not isinstance(fim, date)):
+            raise ValueError("DT_DOC deve ser (date ou None, date ou None)")
+        datas = (int(inicio.strftime('%Y%m%d')) if inicio else 1,
+                 int(fim.strftime('%Y%m%d')) if fim else 99999999)
+
+    return {
+        'c100': {campo: frozenset(str(valor) for valor in filtro[campo])
+                 for campo in CAMPOS_FILTRO_C100 if filtro.get(campo) is not None},
+        'datas': datas,
+        'cfop': frozenset(str(valor) for valor in filtro['CFOP']) if filtro.get('CFOP') is not None else None,
+        'cancelados': SITUACOES_CANCELADAS if filtro.get('EXCLUIR_CANCELADOS') else None,
+    }
+
+
+def campos_c100(filtro: dict) -> list:
+    """
+    Campos do C100 lidos pelo filtro preparado.
+    """
+    campos = list(filtro['c100']) + (['DT_DOC'] if filtro['datas'] else [])
+    if filtro['cancelados'] is not None and 'COD_SIT' not in campos:
+        campos.append('COD_SIT')
+    return campos
+
+
+def chave_com_filtro(chave: str, filtro: Optional[dict]) -> str:
+    """
+    Chave do dataset incluindo o filtro de leitura (sem filtro, a chave não muda).
+    """
+    if not filtro:
+        return chave
+    descricao = json.dumps({campo: sorted(valor) if isinstance(valor, (set, frozenset, list)) else valor
+                            for campo, valor in filtro.items()}, sort_keys=True, default=str)
+    return hashlib.sha256(f'{chave}\x00{descricao}'.encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# AVALIAÇÃO (valor a valor: parsers legado e colunar)
+# ============================================================================
+
+def c100_aceito(filtro: dict, valores: Mapping[str, str]) -> bool:
+    """
+    True se o C100 (valores: campo -> texto) passa pelo filtro preparado
+    (sem considerar os cancelados: ver c100_cancelado).
+    """
+    for campo, aceitos in filtro['c100'].items():
+        if valores[campo] not in aceitos:
+            return False
+    if filtro['datas']:
+        inicio, fim = filtro['datas']
+        return inicio <= data_ordenavel(valores['DT_DOC']) <= fim
+    return True
+
+
+def c100_cancelado(filtro: dict, valores: Mapping[str, str]) -> bool:
+    """
+    True se o C100 (valores: campo -> texto) deve ir para C100_CANCELADOS
+    em vez do C100.
+    """
+    return filtro['cancelados'] is not None and valores['COD_SIT'] in filtro['cancelados']
+
+
+def cfop_aceito(filtro: dict, cfop: str) -> bool:
+    """
+    True se o CFOP de um C170/C190 passa pelo filtro preparado.
+    """
+    return filtro['cfop'] is None or cfop in filtro['cfop']
+
+
+# ============================================================================
+# AVALIAÇÃO EM BLOCO (parser vetorizado)
+# ============================================================================
+
+def mascara_c100(filtro: dict, valores: Dict[str, np.ndarray], quantidade: int) -> np.ndarray:
+    """
+    Máscara dos C100 aceitos; valores: campo -> array de textos (um por C100).
+    """
+    mascara = np.ones(quantidade, dtype=bool)
+    for campo, aceitos in filtro['c100'].items():
+        mascara &= pd.Series(valores[campo]).isin(aceitos).to_numpy()
+    if filtro['datas']:
+        inicio, fim = filtro['datas']
+        datas = pd.Series(valores['DT_DOC'])
+        validas = datas.str.fullmatch('[0-9]{8}').fillna(False).to_numpy()
+        ordenaveis = np.zeros(quantidade, dtype=np.int64)
+        if validas.any():
+            texto = datas[validas]
+            ordenaveis[validas] = (texto.str[4:8] + texto.str[2:4] + texto.str[0:2]).astype(np.int64).to_numpy()
+        mascara &= validas & (ordenaveis >= inicio) & (ordenaveis <= fim)
+    return mascara
+
+
+def mascara_cancelados(filtro: dict, cod_sits: np.ndarray) -> np.ndarray:
+    """
+    Máscara dos C100 que vão para C100_CANCELADOS.
+    """
+    if filtro['cancelados'] is None:
+        return np.zeros(len(cod_sits), dtype=bool)
+    return pd.Series(cod_sits).isin(filtro['cancelados']).to_numpy()
+
+
+def mascara_cfop(filtro: dict, cfops: np.ndarray) -> np.ndarray:
+    """
+    Máscara dos C170/C190 aceitos pelo CFOP.
+    """
+    if filtro['cfop'] is None:
+        return np.ones(len(cfops), dtype=bool)
+    return pd.Series(cfops).isin(filtro['cfop']).to_numpy()
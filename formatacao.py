@@ -0,0 +1,127 @@
+"""
+================================================================================
+MÓDULO: Formatação Brasileira de Valores - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Camada única de formatação no padrão brasileiro (R$ 1.234,56) para todo
+    o sistema, substituindo as cópias que existiam em cada módulo.
+
+PRINCÍPIO:
+    - Colunas continuam NUMÉRICAS nos DataFrames (ordenação numérica e
+      somas corretas); a formatação acontece apenas na renderização
+    - Tabelas: estilizar_moeda_br() formata só as células exibidas
+      (combinado com a tabela paginada, apenas a página visível)
+    - Textos em lote (rótulos de gráfico, exportações): formatar_moeda_br_em_lote()
+    - Valores isolados (métricas, KPIs): formatar_moeda_br()
+    - Tamanhos em memória/disco: formatar_mb_br() e BYTES_POR_MB
+
+GATILHOS DE MANUTENÇÃO:
+    1. Sempre usar este módulo para formatar valores monetários
+    2. Ponto para milhar, vírgula para decimal
+    3. Sem import do streamlit no topo: o módulo é usado pelo núcleo sem
+       interface (calculos_fiscais.py, parsers, conversão em lote)
+
+Data de Criação: 18/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import math
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# Troca ',' (milhar) por '.' e '.' (decimal) por ',' numa única passada
+TROCA_SEPARADORES_BR = str.maketrans(',.', '.,')
+
+BYTES_POR_MB = 1024 * 1024
+
+
+def formatar_moeda_br(valor) -> str:
+    """
+    Formata um valor no padrão brasileiro: R$ 1.234,56
+
+    IMPORTANTE:
+    - Vazio, NaN ou texto não numérico -> 'R$ 0,00'
+    """
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return 'R$ 0,00'
+    if math.isnan(numero) or round(numero, 2) == 0:
+        numero = 0.0
+    return 'R$ ' + f'{numero:,.2f}'.translate(TROCA_SEPARADORES_BR)
+
+
+def formatar_moeda_br_em_lote(valores) -> pd.Series:
+    """
+    Formata uma coluna inteira de valores de uma só vez.
+
+    IMPORTANTE:
+    - Mesmo resultado de formatar_moeda_br() aplicado célula a célula,
+      mas a troca de separadores é feita numa única string (em C)
+    - Use apenas onde o texto é realmente necessário (rótulos, exportação)
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+    numeros = pd.to_numeric(serie, errors='coerce').fillna(0.0).to_numpy(dtype=float)
+    numeros = np.where(np.abs(numeros) < 0.005, 0.0, numeros)
+
+    if len(numeros) == 0:
+        return pd.Series([], index=serie.index, dtype=object)
+
+    texto = '\nR$ '.join(map('{:,.2f}'.format, numeros.tolist()))
+    formatados = ('R$ ' + texto.translate(TROCA_SEPARADORES_BR)).split('\n')
+    return pd.Series(formatados, index=serie.index, dtype=object)
+
+
+def formatar_inteiro_br(valor) -> str:
+    """
+    Formata uma contagem com ponto de milhar: 1.234.567
+    """
+    return f'{int(valor):,}'.replace(',', '.')
+
+
+def formatar_mb_br(total_bytes: float) -> str:
+    """
+    Bytes em MB no padrão brasileiro: 1.234,5 MB
+    """
+    return f"{total_bytes / BYTES_POR_MB:,.1f} MB".translate(TROCA_SEPARADORES_BR)
+
+
+def colunas_monetarias(df: pd.DataFrame) -> List[str]:
+    """
+    Colunas numéricas de valor monetário (prefixo VL_ e totais).
+    """
+    return [
+        col for col in df.columns
+        if (str(col).startswith('VL_') or str(col).startswith('TOTAL'))
+        and pd.api.types.is_numeric_dtype(df[col])
+    ]
+
+
+def estilizar_moeda_br(df: pd.DataFrame, colunas: List[str] = None):
+    """
+    Retorna um Styler que exibe as colunas em R$ sem alterar os dados.
+
+    IMPORTANTE:
+    - A formatação roda só na renderização e só nas células enviadas
+    - O navegador continua ordenando pelos valores numéricos
+    """
+    colunas = colunas_monetarias(df) if colunas is None else [c for c in colunas if c in df.columns]
+    return df.style.format(formatar_moeda_br, subset=colunas)
+
+
+def configurar_colunas(rotulos: Dict[str, str]) -> dict:
+    """
+    Monta o column_config do st.dataframe com nomes amigáveis de coluna.
+
+    GATILHO DE MANUTENÇÃO:
+    - Substitui df.rename(): os nomes internos (VL_ICMS, CFOP...) continuam
+      no DataFrame e só o rótulo exibido muda
+    """
+    import streamlit as st
+
+    return {coluna: st.column_config.Column(rotulo) for coluna, rotulo in rotulos.items()}
@@ -0,0 +1,383 @@
+"""
+================================================================================
+MÓDULO: Gerador de SPED Sintético - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Gerar arquivos EFD ICMS/IPI sintéticos, determinísticos e de tamanho
+    controlado, para benchmarks e testes dos parsers.
+
+ESTRUTURA GERADA:
+    - Bloco 0: 0000, 0001, 0005, 0100, 0150 (participantes),
+               0190 (unidades), 0200 (produtos), 0990
+    - Bloco C: C001, C100 + C170 (itens) + C190 (analítico) por documento, C990
+    - Bloco E: E001, E100, E110, E111, E116, E990
+    - Bloco 9: 9001, 9900 (um por registro), 9990, 9999
+
+IMPORTANTE:
+    - Mesma semente e mesmos parâmetros = mesmo arquivo, byte a byte
+    - Valores coerentes: C190 soma os itens do documento, C100 soma o C190,
+      E110 soma o ICMS das entradas (créditos) e saídas (débitos)
+    - Documentos cancelados (COD_SIT 02) vêm sem valores e sem filhos,
+      como no arquivo real
+    - Linhas terminam em CRLF e o arquivo é latin-1 (como os SPEDs do PVA)
+    - Geração em fluxo: arquivos de GBs são escritos sem ficar em memória
+
+USO:
+    python gerador_sped.py saida.txt --documentos 10000
+    python gerador_sped.py saida.txt --tamanho-mb 500 --itens-por-documento 8
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novos registros: gerar em gerar_linhas_sped() e contar em 'contagem'
+       (o bloco 9 é montado a partir dela)
+    2. Layouts seguem os parse_registro_*() dos parsers
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import argparse
+import random
+from collections import Counter
+from typing import BinaryIO, Iterator, List
+
+import pandas as pd
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+FIM_DE_LINHA = '\r\n'
+
+# Ordem dos blocos no arquivo (usada nas linhas 9900)
+ORDEM_BLOCOS = '0CE9'
+
+ENCODING_SPED = 'latin-1'
+
+# Linhas acumuladas antes de cada escrita no arquivo
+LINHAS_POR_ESCRITA = 50_000
+
+# Documentos gerados para estimar o tamanho médio por documento
+DOCUMENTOS_AMOSTRA = 500
+
+UNIDADES = [('UN', 'Unidade'), ('KG', 'Quilograma'), ('CX', 'Caixa'), ('LT', 'Litro'), ('PC', 'Peça')]
+
+PALAVRAS_EMPRESA = ['Comércio', 'Indústria', 'Distribuidora', 'Atacadão', 'Açougue',
+                    'Transportes', 'Alimentos', 'Metalúrgica', 'Agropecuária', 'Têxtil']
+SOBRENOMES_EMPRESA = ['São João', 'Paraná', 'Brasil', 'Nordeste', 'Guaraná', 'Ipê',
+                      'Três Irmãos', 'Boa Vista', 'União', 'Araújo']
+PRODUTOS = ['Açúcar Refinado', 'Café Torrado', 'Feijão Carioca', 'Óleo de Soja',
+            'Parafuso Sextavado', 'Cimento CP-II', 'Tecido Algodão', 'Papel A4',
+            'Leite Longa Vida', 'Detergente Neutro', 'Farinha de Trigo', 'Arroz Agulhinha']
+
+# (CFOP entrada, CFOP saída) por destino: interno e interestadual
+CFOPS = [('1102', '5102'), ('2102', '6102'), ('1403', '5405'), ('1101', '5101')]
+
+ALIQUOTAS_ICMS = [0.0, 7.0, 12.0, 18.0]
+CSTS_ICMS = ['000', '020', '060', '090']
+
+
+# ============================================================================
+# FUNÇÕES AUXILIARES
+# ============================================================================
+
+def formatar_valor(valor: float) -> str:
+    """
+    Valor no formato do SPED: sem milhar e com vírgula decimal (1234,56).
+    """
+    return f'{valor:.2f}'.replace('.', ',')
+
+
+def _linha(*campos) -> str:
+    return '|' + '|'.join(campos) + '|'
+
+
+def _data(dia: int, mes: int, ano: int) -> str:
+    return f'{dia:02d}{mes:02d}{ano:04d}'
+
+
+def _digitos(rng: random.Random, quantidade: int) -> str:
+    return ''.join(rng.choices('0123456789', k=quantidade))
+
+
+# ============================================================================
+# GERAÇÃO DAS LINHAS
+# ============================================================================
+
+def gerar_linhas_sped(documentos: int = 1000, itens_por_documento: int = 5,
+                      c190_por_documento: int = 2, participantes: int = 200,
+                      produtos: int = 500, proporcao_cancelados: float = 0.01,
+                      semente: int = 42, ano: int = 2025, mes: int = 1) -> Iterator[str]:
+    """
+    Gera as linhas (sem fim de linha) de um arquivo SPED sintético.
+
+    Parâmetros:
+        documentos: Quantidade de C100
+        itens_por_documento: C170 por documento
+        c190_por_documento: C190 por documento (itens repartidos entre eles)
+        participantes: Quantidade de 0150
+        produtos: Quantidade de 0200
+        proporcao_cancelados: Fração de documentos com COD_SIT 02
+        semente: Semente do gerador aleatório (determinismo)
+        ano, mes: Período de apuração
+    """
+    rng = random.Random(semente)
+    contagem = Counter()
+    participantes = max(1, participantes)
+    produtos = max(1, produtos)
+    c190_por_documento = max(1, c190_por_documento)
+    ultimo_dia = pd.Period(year=ano, month=mes, freq='M').days_in_month
+    dt_ini, dt_fin = _data(1, mes, ano), _data(ultimo_dia, mes, ano)
+
+    def emitir(registro: str, *campos) -> str:
+        contagem[registro] += 1
+        return _linha(registro, *campos)
+
+    # ------------------------------------------------------------------
+    # BLOCO 0
+    # ------------------------------------------------------------------
+    yield emitir('0000', '017', '0', dt_ini, dt_fin, 'EMPRESA SINTÉTICA DE TESTES LTDA',
+                 _digitos(rng, 14), '', 'SP', _digitos(rng, 12), '3550308', '', '', 'A', '0')
+    yield emitir('0001', '0')
+    yield emitir('0005', 'SINTÉTICA', '01001000', 'PRAÇA DA SÉ', '100', 'SALA 1',
+                 'CENTRO', '1133334444', '', 'fiscal@sintetica.com.br')
+    yield emitir('0100', 'CONTADOR SINTÉTICO', _digitos(rng, 11), '1SP123456', '', '01001000',
+                 'RUA DO CONTADOR', '10', '', 'CENTRO', '1133335555', '', 'contador@sintetica.com.br', '3550308')
+
+    for indice in range(participantes):
+        nome = f'{rng.choice(PALAVRAS_EMPRESA)} {rng.choice(SOBRENOMES_EMPRESA)} {indice} LTDA'
+        yield emitir('0150', f'P{indice:06d}', nome, '1058', _digitos(rng, 14), '',
+                     _digitos(rng, 12), rng.choice(['3550308', '4106902', '3304557', '2927408']),
+                     '', f'RUA {rng.choice(SOBRENOMES_EMPRESA).upper()}', str(rng.randint(1, 9999)),
+                     '', 'CENTRO')
+
+    for unidade, descricao in UNIDADES:
+        yield emitir('0190', unidade, descricao)
+
+    unidades_produto = []
+    for indice in range(produtos):
+        unidade = rng.choice(UNIDADES)[0]
+        unidades_produto.append(unidade)
+        yield emitir('0200', f'IT{indice:07d}', f'{rng.choice(PRODUTOS)} {indice}', _digitos(rng, 13),
+                     '', unidade, '00', _digitos(rng, 8), '', '', '',
+                     formatar_valor(rng.choice(ALIQUOTAS_ICMS)))
+
+    linhas_bloco_0 = sum(contagem.values()) + 1
+    yield emitir('0990', str(linhas_bloco_0))
+
+    # ------------------------------------------------------------------
+    # BLOCO C
+    # ------------------------------------------------------------------
+    inicio_bloco_c = sum(contagem.values())
+    yield emitir('C001', '0')
+
+    icms_debitos = 0.0
+    icms_creditos = 0.0
+
+    for numero in range(1, documentos + 1):
+        saida = rng.random() < 0.5
+        ind_oper = '1' if saida else '0'
+        ind_emit = '0' if saida else '1'
+        cod_part = f'P{rng.randrange(participantes):06d}'
+        dia = rng.randint(1, ultimo_dia)
+        dt_doc = _data(dia, mes, ano)
+        chave = _digitos(rng, 44)
+
+        if rng.random() < proporcao_cancelados:
+            yield emitir('C100', ind_oper, ind_emit, cod_part, '55', '02', '1', str(numero), chave,
+                         *([''] * 20))
+            continue
+
+        # Itens repartidos entre os grupos analíticos (CST/CFOP/alíquota)
+        grupos = []
+        for _ in range(c190_por_documento):
+            cfop_entrada, cfop_saida = rng.choice(CFOPS)
+            grupos.append({
+                'CST_ICMS': rng.choice(CSTS_ICMS),
+                'CFOP': cfop_saida if saida else cfop_entrada,
+                'ALIQ_ICMS': rng.choice(ALIQUOTAS_ICMS),
+                'VL_OPR': 0.0, 'VL_BC_ICMS': 0.0, 'VL_ICMS': 0.0, 'VL_IPI': 0.0,
+            })
+
+        linhas_itens = []
+        for num_item in range(1, itens_por_documento + 1):
+            grupo = grupos[(num_item - 1) % c190_por_documento]
+            produto = rng.randrange(produtos)
+            qtd = rng.randint(1, 500)
+            vl_item = round(qtd * rng.uniform(0.5, 200.0), 2)
+            vl_icms = round(vl_item * grupo['ALIQ_ICMS'] / 100, 2)
+            aliq_ipi = rng.choice([0.0, 0.0, 5.0, 10.0])
+            vl_ipi = round(vl_item * aliq_ipi / 100, 2)
+            vl_pis = round(vl_item * 0.0165, 2)
+            vl_cofins = round(vl_item * 0.076, 2)
+
+            grupo['VL_OPR'] += vl_item + vl_ipi
+            grupo['VL_BC_ICMS'] += vl_item if vl_icms else 0.0
+            grupo['VL_ICMS'] += vl_icms
+            grupo['VL_IPI'] += vl_ipi
+
+            linhas_itens.append(emitir(
+                'C170', str(num_item), f'IT{produto:07d}', '', f'{qtd},00000', unidades_produto[produto],
+                formatar_valor(vl_item), '0', '0', grupo['CST_ICMS'], grupo['CFOP'], '',
+                formatar_valor(vl_item if vl_icms else 0.0), formatar_valor(grupo['ALIQ_ICMS']),
+                formatar_valor(vl_icms), '0', '0', '0', '0', '50' if vl_ipi else '53', '999',
+                formatar_valor(vl_item if vl_ipi else 0.0), formatar_valor(aliq_ipi), formatar_valor(vl_ipi),
+                '01', formatar_valor(vl_item), '1,65', '', '', formatar_valor(vl_pis),
+                '01', formatar_valor(vl_item), '7,60', '', '', formatar_valor(vl_cofins), ''
+            ))
+
+        vl_doc = sum(grupo['VL_OPR'] for grupo in grupos)
+        vl_bc_icms = sum(grupo['VL_BC_ICMS'] for grupo in grupos)
+        vl_icms = sum(grupo['VL_ICMS'] for grupo in grupos)
+        vl_ipi = sum(grupo['VL_IPI'] for grupo in grupos)
+        vl_merc = vl_doc - vl_ipi
+
+        if saida:
+            icms_debitos += vl_icms
+        else:
+            icms_creditos += vl_icms
+
+        yield emitir('C100', ind_oper, ind_emit, cod_part, '55', '00', '1', str(numero), chave,
+                     dt_doc, dt_doc, formatar_valor(vl_doc), '1', '0', '0', formatar_valor(vl_merc),
+                     '9', '0', '0', '0', formatar_valor(vl_bc_icms), formatar_valor(vl_icms), '0', '0',
+                     formatar_valor(vl_ipi), formatar_valor(vl_merc * 0.0165),
+                     formatar_valor(vl_merc * 0.076), '0', '0')
+        yield from linhas_itens
+        for grupo in grupos:
+            yield emitir('C190', grupo['CST_ICMS'], grupo['CFOP'], formatar_valor(grupo['ALIQ_ICMS']),
+                         formatar_valor(grupo['VL_OPR']), formatar_valor(grupo['VL_BC_ICMS']),
+                         formatar_valor(grupo['VL_ICMS']), '0', '0', '0',
+                         formatar_valor(grupo['VL_IPI']), '')
+
+    linhas_bloco_c = sum(contagem.values()) - inicio_bloco_c + 1
+    yield emitir('C990', str(linhas_bloco_c))
+
+    # ------------------------------------------------------------------
+    # BLOCO E
+    # ------------------------------------------------------------------
+    inicio_bloco_e = sum(contagem.values())
+    ajuste = round(icms_debitos * 0.01, 2)
+    saldo = icms_debitos - icms_creditos - ajuste
+    recolher = max(saldo, 0.0)
+    credor = max(-saldo, 0.0)
+
+    yield emitir('E001', '0')
+    yield emitir('E100', dt_ini, dt_fin)
+    yield emitir('E110', formatar_valor(icms_debitos), '0', '0', '0', formatar_valor(icms_creditos),
+                 formatar_valor(ajuste), formatar_valor(ajuste), '0', '0', formatar_valor(recolher),
+                 '0', formatar_valor(recolher), formatar_valor(credor), '0')
+    yield emitir('E111', 'SP020799', 'CRÉDITO OUTORGADO SINTÉTICO', formatar_valor(ajuste))
+    yield emitir('E116', '000', formatar_valor(recolher), _data(20, mes % 12 + 1, ano + mes // 12),
+                 '046-2', '', '', '', '', f'{mes:02d}{ano:04d}')
+    linhas_bloco_e = sum(contagem.values()) - inicio_bloco_e + 1
+    yield emitir('E990', str(linhas_bloco_e))
+
+    # ------------------------------------------------------------------
+    # BLOCO 9
+    # ------------------------------------------------------------------
+    yield emitir('9001', '0')
+    registros_9 = ['9900', '9990', '9999']
+    total_9900 = len(contagem) + len([r for r in registros_9 if r not in contagem])
+    contagem_final = dict(contagem)
+    contagem_final['9900'] = total_9900
+    contagem_final['9990'] = 1
+    contagem_final['9999'] = 1
+    for registro in sorted(contagem_final, key=lambda r: (ORDEM_BLOCOS.index(r[0]), r)):
+        yield _linha('9900', registro, str(contagem_final[registro]))
+    linhas_bloco_9 = 1 + total_9900 + 2
+    yield _linha('9990', str(linhas_bloco_9))
+    total_linhas = sum(contagem.values()) + total_9900 + 2
+    yield _linha('9999', str(total_linhas))
+
+
+def gerar_sped(**parametros) -> bytes:
+    """
+    Gera o arquivo SPED completo em memória (para testes e arquivos pequenos).
+    """
+    texto = FIM_DE_LINHA.join(gerar_linhas_sped(**parametros)) + FIM_DE_LINHA
+    return texto.encode(ENCODING_SPED)
+
+
+def escrever_sped(destino: BinaryIO, **parametros) -> dict:
+    """
+    Escreve o SPED no destino em blocos e retorna bytes e linhas escritos.
+    """
+    total_bytes = 0
+    total_linhas = 0
+    bloco: List[str] = []
+
+    def descarregar():
+        nonlocal total_bytes
+        dados = (FIM_DE_LINHA.join(bloco) + FIM_DE_LINHA).encode(ENCODING_SPED)
+        destino.write(dados)
+        total_bytes += len(dados)
+        bloco.clear()
+
+    for linha in gerar_linhas_sped(**parametros):
+        bloco.append(linha)
+        total_linhas += 1
+        if len(bloco) >= LINHAS_POR_ESCRITA:
+            descarregar()
+    if bloco:
+        descarregar()
+
+    return {'bytes': total_bytes, 'linhas': total_linhas}
+
+
+def documentos_para_tamanho(tamanho_bytes: int, **parametros) -> int:
+    """
+    Estima quantos documentos geram um arquivo de aproximadamente tamanho_bytes.
+
+    IMPORTANTE:
+    - Mede duas amostras (para descontar o bloco 0 e o bloco 9) com os
+      mesmos parâmetros de itens, C190, participantes e produtos
+    """
+    parametros = {k: v for k, v in parametros.items() if k != 'documentos'}
+    pequeno = len(gerar_sped(documentos=1, **parametros))
+    amostra = len(gerar_sped(documentos=DOCUMENTOS_AMOSTRA + 1, **parametros))
+    bytes_por_documento = (amostra - pequeno) / DOCUMENTOS_AMOSTRA
+    return max(1, round((tamanho_bytes - pequeno) / bytes_por_documento) + 1)
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Gera um arquivo SPED ICMS/IPI sintético.')
+    parser.add_argument('saida', help='Arquivo .txt de saída')
+    tamanho = parser.add_mutually_exclusive_group()
+    tamanho.add_argument('--documentos', type=int, default=1000, help='Quantidade de C100')
+    tamanho.add_argument('--tamanho-mb', type=float, help='Tamanho aproximado do arquivo em MB')
+    parser.add_argument('--itens-por-documento', type=int, default=5)
+    parser.add_argument('--c190-por-documento', type=int, default=2)
+    parser.add_argument('--participantes', type=int, default=200)
+    parser.add_argument('--produtos', type=int, default=500)
+    parser.add_argument('--proporcao-cancelados', type=float, default=0.01)
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args(argumentos)
+
+    parametros = {
+        'itens_por_documento': args.itens_por_documento,
+        'c190_por_documento': args.c190_por_documento,
+        'participantes': args.participantes,
+        'produtos': args.produtos,
+        'proporcao_cancelados': args.proporcao_cancelados,
+        'semente': args.semente,
+    }
+    if args.tamanho_mb:
+        parametros['documentos'] = documentos_para_tamanho(int(args.tamanho_mb * 1024 * 1024), **parametros)
+    else:
+        parametros['documentos'] = args.documentos
+
+    with open(args.saida, 'wb') as destino:
+        resultado = escrever_sped(destino, **parametros)
+
+    print(f"{args.saida}: {parametros['documentos']} documentos, "
+          f"{resultado['linhas']} linhas, {resultado['bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+================================================================================
+MÓDULO: Índice de Busca por Trigramas - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Busca rápida por substring e prefixo em cadastros grandes (0150, 0200)
+    sem varrer o DataFrame inteiro com str.contains a cada tecla digitada.
+
+FUNCIONAMENTO:
+    1. Na ingestão, as colunas pesquisáveis de cada linha são normalizadas
+       (sem acento, minúsculas) e concatenadas com um separador.
+    2. Cada trigrama (3 caracteres consecutivos) vira uma lista de linhas
+       que o contêm (lista invertida), guardada em arrays NumPy ordenados.
+    3. Na busca, as listas dos trigramas do termo são intersectadas e só os
+       candidatos restantes são verificados por substring.
+    4. O resultado é ordenado por relevância:
+       igual ao campo > início do campo > início de palavra > meio do texto.
+
+USO EM OUTRAS ABAS:
+    indice = construir_indice_busca(df, ['COD_ITEM', 'DESCR_ITEM'])
+    df_resultado = filtrar_por_busca(df, indice, 'parafuso')
+
+GATILHOS DE MANUTENÇÃO:
+    1. Para indexar novas colunas: ajustar COLUNAS_BUSCA_CADASTRO
+    2. Para mudar a relevância: ajustar calcular_relevancia()
+    3. O índice vale para o DataFrame exato em que foi construído
+       (posições de linha); reconstruir se o DataFrame mudar
+
+Data de Criação: 18/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Separador entre campos do texto indexado (nunca aparece em termos de busca)
+SEPARADOR_CAMPOS = '\x1f'
+
+# Separador entre linhas ao montar o buffer de trigramas
+SEPARADOR_LINHAS = '\n'
+
+# Colunas pesquisáveis dos cadastros exibidos no app
+COLUNAS_BUSCA_CADASTRO = {
+    '0150': ['COD_PART', 'NOME'],
+    '0200': ['COD_ITEM', 'DESCR_ITEM'],
+}
+
+
+# ============================================================================
+# NORMALIZAÇÃO
+# ============================================================================
+
+def normalizar_serie(serie: pd.Series) -> pd.Series:
+    """
+    Remove acentos e converte para minúsculas, de forma vetorizada.
+
+    IMPORTANTE:
+    - 'AÇÚCAR Refinado' -> 'acucar refinado'
+    - Caracteres sem equivalente ASCII são descartados
+    - Só os valores distintos são normalizados (cadastros repetem muito
+      entre arquivos mensais do mesmo contribuinte)
+    """
+    codigos, distintos = pd.factorize(serie.fillna('').astype(str))
+    normalizados = (
+        pd.Series(distintos, dtype=object)
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.replace(SEPARADOR_LINHAS, ' ', regex=False)
+    )
+    return pd.Series(normalizados.to_numpy(dtype=object)[codigos], index=serie.index, dtype=object)
+
+
+def normalizar_termo(termo: str) -> str:
+    """
+    Normaliza o termo digitado pelo usuário com as mesmas regras do índice.
+    """
+    normalizado = normalizar_serie(pd.Series([termo])).iloc[0]
+    return normalizado.replace(SEPARADOR_CAMPOS, ' ').strip()
+
+
+def _unicos_ordenados(valores: np.ndarray) -> np.ndarray:
+    """
+    Ordena e remove duplicados (mais rápido que np.unique em arrays grandes).
+    """
+    valores = np.sort(valores)
+    if len(valores) == 0:
+        return valores
+    novos = np.empty(len(valores), dtype=bool)
+    novos[0] = True
+    np.not_equal(valores[1:], valores[:-1], out=novos[1:])
+    return valores[novos]
+
+
+def _codigos_trigramas(buffer: np.ndarray) -> np.ndarray:
+    """
+    Converte cada janela de 3 bytes do buffer em um inteiro de 24 bits.
+    """
+    b = buffer.astype(np.uint32)
+    return (b[:-2] << 16) | (b[1:-1] << 8) | b[2:]
+
+
+# ============================================================================
+# CONSTRUÇÃO DO ÍNDICE
+# ============================================================================
+
+def construir_indice_busca(df: pd.DataFrame, colunas: List[str]) -> dict:
+    """
+    Constrói o índice de trigramas para as colunas informadas.
+
+    RETORNA:
+        Dicionário com:
+        - 'textos': textos normalizados por linha (campos entre separadores)
+        - 'trigramas': códigos de trigrama ordenados e únicos
+        - 'inicios': posição de cada trigrama na lista 'linhas'
+        - 'linhas': posições de linha (iloc) agrupadas por trigrama
+        - 'total_linhas': quantidade de linhas do DataFrame indexado
+
+    GATILHO DE MANUTENÇÃO:
+    - Colunas ausentes no DataFrame são ignoradas
+    """
+    total_linhas = len(df)
+    colunas_presentes = [col for col in colunas if col in df.columns]
+
+    textos = pd.Series(SEPARADOR_CAMPOS, index=df.index, dtype=object)
+    for col in colunas_presentes:
+        textos = textos + normalizar_serie(df[col]) + SEPARADOR_CAMPOS
+    textos = textos.to_numpy(dtype=object)
+
+    indice = {
+        'colunas': colunas_presentes,
+        'textos': textos,
+        'trigramas': np.empty(0, dtype=np.uint32),
+        'inicios': np.zeros(1, dtype=np.int64),
+        'linhas': np.empty(0, dtype=np.uint32),
+        'total_linhas': total_linhas,
+    }
+
+    if total_linhas == 0:
+        return indice
+
+    # Buffer único com todas as linhas: trigramas que cruzam '\n' são descartados
+    buffer = np.frombuffer(
+        (SEPARADOR_LINHAS.join(textos) + SEPARADOR_LINHAS).encode('ascii'),
+        dtype=np.uint8
+    )
+    comprimentos = np.fromiter((len(t) + 1 for t in textos), dtype=np.int64, count=total_linhas)
+    linha_por_posicao = np.repeat(np.arange(total_linhas, dtype=np.uint64), comprimentos)
+
+    quebra = ord(SEPARADOR_LINHAS)
+    validos = (buffer[:-2] != quebra) & (buffer[1:-1] != quebra) & (buffer[2:] != quebra)
+    codigos = _codigos_trigramas(buffer)[validos].astype(np.uint64)
+    linhas = linha_por_posicao[:-2][validos]
+
+    # Par (trigrama, linha) único e ordenado: forma as listas invertidas
+    pares = _unicos_ordenados((codigos << np.uint64(32)) | linhas)
+    codigos_ordenados = (pares >> np.uint64(32)).astype(np.uint32)
+
+    novos = np.ones(len(codigos_ordenados), dtype=bool)
+    np.not_equal(codigos_ordenados[1:], codigos_ordenados[:-1], out=novos[1:])
+    inicios = np.flatnonzero(novos)
+    indice['trigramas'] = codigos_ordenados[inicios]
+    indice['inicios'] = np.append(inicios, len(pares)).astype(np.int64)
+    indice['linhas'] = (pares & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    return indice
+
+
+def construir_indices_cadastro(dados_0: Dict[str, pd.DataFrame]) -> Dict[str, dict]:
+    """
+    Constrói os índices de busca dos cadastros de participantes e produtos.
+
+    GATILHO DE MANUTENÇÃO:
+    - Chamado uma vez na ingestão, logo após o parser de registros 0
+    """
+    indices = {}
+    for registro, colunas in COLUNAS_BUSCA_CADASTRO.items():
+        df = dados_0.get(registro, pd.DataFrame())
+        if not df.empty:
+            indices[registro] = construir_indice_busca(df, colunas)
+    return indices
+
+
+# ============================================================================
+# BUSCA
+# ============================================================================
+
+def _linhas_do_trigrama(indice: dict, codigo: int) -> np.ndarray:
+    """
+    Retorna a lista invertida de um trigrama (vazia se não existir).
+    """
+    trigramas = indice['trigramas']
+    pos = np.searchsorted(trigramas, codigo)
+    if pos >= len(trigramas) or trigramas[pos] != codigo:
+        return np.empty(0, dtype=np.uint32)
+    return indice['linhas'][indice['inicios'][pos]:indice['inicios'][pos + 1]]
+
+
+def calcular_relevancia(textos: pd.Series, termo: str) -> np.ndarray:
+    """
+    Calcula a relevância de cada texto candidato (menor = mais relevante).
+
+    0 = campo igual ao termo
+    1 = campo começa com o termo
+    2 = alguma palavra começa com o termo
+    3 = termo no meio do texto
+    """
+    exato = textos.str.contains(SEPARADOR_CAMPOS + termo + SEPARADOR_CAMPOS, regex=False)
+    prefixo = textos.str.contains(SEPARADOR_CAMPOS + termo, regex=False)
+    palavra = textos.str.contains(' ' + termo, regex=False)
+    return np.select([exato, prefixo, palavra], [0, 1, 2], default=3)
+
+
+def buscar_no_indice(indice: dict, termo: str, limite: int = None) -> np.ndarray:
+    """
+    Busca o termo no índice e retorna posições de linha (iloc) por relevância.
+
+    IMPORTANTE:
+    - Termo vazio retorna todas as linhas na ordem original
+    - Termos com menos de 3 caracteres verificam todas as linhas,
+      mas sobre o texto já normalizado (sem regex e sem case folding)
+    """
+    termo = normalizar_termo(termo)
+    total = indice['total_linhas']
+
+    if not termo:
+        posicoes = np.arange(total)
+        return posicoes[:limite] if limite else posicoes
+
+    if len(termo) < 3:
+        candidatos = np.arange(total, dtype=np.uint32)
+    else:
+        buffer = np.frombuffer(termo.encode('ascii'), dtype=np.uint8)
+        listas = [_linhas_do_trigrama(indice, codigo) for codigo in _unicos_ordenados(_codigos_trigramas(buffer))]
+        listas.sort(key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            if len(candidatos) == 0:
+                break
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+
+    if len(candidatos) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    textos = pd.Series(indice['textos'][candidatos])
+    confirmados = textos.str.contains(termo, regex=False).to_numpy()
+    candidatos = candidatos[confirmados]
+    textos = textos[confirmados]
+
+    relevancia = calcular_relevancia(textos, termo)
+    comprimento = textos.str.len().to_numpy()
+    ordem = np.lexsort((candidatos, comprimento, relevancia))
+
+    posicoes = candidatos[ordem].astype(np.int64)
+    return posicoes[:limite] if limite else posicoes
+
+
+def filtrar_por_busca(df: pd.DataFrame, indice: dict, termo: str, limite: int = None) -> pd.DataFrame:
+    """
+    Retorna as linhas do DataFrame que contêm o termo, por relevância.
+
+    GATILHO DE MANUTENÇÃO:
+    - O DataFrame deve ser o mesmo usado em construir_indice_busca()
+    """
+    if indice['total_linhas'] != len(df):
+        raise ValueError('Índice de busca não corresponde ao DataFrame informado')
+
+    return df.iloc[buscar_no_indice(indice, termo, limite)]
@@ -0,0 +1,388 @@
+"""
+================================================================================
+MÓDULO: Ingestão de Arquivos SPED - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Ponto único de entrada para transformar os arquivos enviados (.txt/.zip)
+    no "dataset" usado por todas as abas do app.
+
+DATASET:
+    Dicionário com:
+    - 'dados_c': DataFrames dos registros C (parser_vetorizado.py; mesmo
+      resultado de sped_parser.py, escolhido por SPED_PARSER_BLOCO_C)
+    - 'dados_0': DataFrames dos registros 0 (parser_registros_0.py)
+    - 'dados_e': DataFrames dos registros E (parser_registros_e.py)
+    - 'indices_busca': índices de busca dos cadastros (indice_busca.py)
+    - 'chaves_ordenacao': cache das chaves das tabelas paginadas
+    - 'arquivos': nomes dos arquivos de origem
+    - 'estatisticas': tempo e vazão de cada etapa da ingestão (instrumentacao.py)
+    - 'projecao': colunas lidas do bloco C ({registro: [colunas]}) ou None
+      quando o bloco C foi lido inteiro (projecao_analises.py)
+    - 'filtro': condições aplicadas na leitura do bloco C (filtros_leitura.py)
+      ou None
+    - 'amostra': documentos lidos/total na prévia (previa_ingestao.py) ou
+      None quando o bloco C foi lido inteiro
+
+IMPORTANTE:
+    - Cada arquivo é lido (e cada ZIP descompactado) uma única vez e o
+      conteúdo alimenta os três parsers
+    - O dataset pode ser compartilhado entre sessões (cache_datasets.py):
+      as abas NÃO devem alterar os DataFrames recebidos
+    - incremental=True: o resultado dos parsers de cada arquivo enviado
+      fica guardado (cache_arquivos.py) e só os arquivos novos do upload
+      são processados; o dataset é o mesmo de um processamento do zero
+
+GATILHOS DE MANUTENÇÃO:
+    1. Para novos blocos: incluir o parser em processar_conteudo_sped()
+    2. Para novos índices/derivados: incluir em montar_dataset()
+    3. Para novas etapas: medir com instrumentacao.medir_etapa()
+    4. Parser muito mais rápido/lento: ajustar PESOS_PARSERS (progresso)
+    5. Novo parser do bloco C: incluir em PARSERS_BLOCO_C
+
+PROGRESSO E CANCELAMENTO:
+    - carregar_dataset(progresso=...) recebe um evento (dicionário de
+      evento_progresso()) a cada ~INTERVALO_PROGRESSO_SEGUNDOS por parser
+    - cancelar (threading.Event) é verificado a cada evento e entre
+      arquivos: a ingestão para com IngestaoCancelada e nada fica guardado
+
+Data de Criação: 18/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import os
+import time
+import zipfile
+from typing import Dict, Iterator, List, Tuple
+
+import pandas as pd
+
+from instrumentacao import criar_estatisticas, medir_etapa, registrar_etapa, registrar_log
+from filtros_leitura import preparar_filtro
+from cache_arquivos import guardar_arquivo, ordenar_resultados, separar_arquivos
+
+from sped_parser import processar_arquivo_sped
+from parser_colunar import processar_arquivo_sped_colunar
+from parser_vetorizado import processar_arquivo_sped_vetorizado
+from parser_registros_0 import processar_arquivo_sped_registros_0
+from parser_registros_e import processar_arquivo_sped_registros_e
+from indice_busca import construir_indices_cadastro
+
+
+# Registros exibidos em tabelas paginadas (recebem cache de ordenação)
+REGISTROS_PAGINADOS = ['C100', 'C170', 'C190', '0150', '0200']
+
+# Fração do tempo de um arquivo gasta em cada parser, na ordem de execução
+# (medida em SPED sintético de 9 MB com o parser vetorizado do bloco C)
+PESOS_PARSERS = {'bloco_c': 0.70, 'bloco_0': 0.23, 'bloco_e': 0.07}
+
+# Parsers do bloco C com o mesmo resultado (variável SPED_PARSER_BLOCO_C)
+PARSERS_BLOCO_C = {
+    'vetorizado': processar_arquivo_sped_vetorizado,
+    'colunar': processar_arquivo_sped_colunar,
+    'legado': processar_arquivo_sped,
+}
+PARSER_BLOCO_C_PADRAO = 'vetorizado'
+
+
+class IngestaoCancelada(Exception):
+    """
+    Ingestão interrompida a pedido do usuário.
+    """
+
+
+def parser_bloco_c():
+    """
+    Parser do bloco C escolhido por SPED_PARSER_BLOCO_C (padrão: vetorizado).
+    """
+    return PARSERS_BLOCO_C.get(os.environ.get('SPED_PARSER_BLOCO_C', PARSER_BLOCO_C_PADRAO),
+                               PARSERS_BLOCO_C[PARSER_BLOCO_C_PADRAO])
+
+
+# ============================================================================
+# PROGRESSO E CANCELAMENTO
+# ============================================================================
+
+def verificar_cancelamento(cancelar):
+    """
+    Levanta IngestaoCancelada se o evento cancelar estiver marcado.
+    """
+    if cancelar is not None and cancelar.is_set():
+        raise IngestaoCancelada()
+
+
+def evento_progresso(arquivo: str, sped: int, etapa: str, linhas: int, fracao_arquivo: float,
+                     bytes_arquivo: int, bytes_processados: float, bytes_total: int) -> dict:
+    """
+    Evento entregue ao callback de progresso.
+
+    Campos:
+        arquivo / sped: nome de origem e posição (1, 2, ...) do SPED atual
+        etapa / linhas: parser em execução e linha em que está
+        fracao_arquivo: 0 a 1 do SPED atual
+        bytes_processados / bytes_total: andamento de todo o upload
+    """
+    return {
+        'arquivo': arquivo,
+        'sped': sped,
+        'etapa': etapa,
+        'linhas': linhas,
+        'fracao_arquivo': fracao_arquivo,
+        'bytes_arquivo': bytes_arquivo,
+        'bytes_processados': bytes_processados,
+        'bytes_total': bytes_total,
+        'fracao_total': min(bytes_processados / bytes_total, 1.0) if bytes_total else 0.0,
+    }
+
+
+def _progresso_dos_parsers(progresso):
+    """
+    Converte os avisos dos parsers (bloco, linha, total) em
+    progresso(fracao_do_arquivo, linha, bloco), usando PESOS_PARSERS.
+    """
+    if progresso is None:
+        return None
+
+    blocos = list(PESOS_PARSERS)
+    anteriores = {bloco: sum(PESOS_PARSERS[b] for b in blocos[:i]) for i, bloco in enumerate(blocos)}
+
+    def avisar(bloco, linha, total_linhas):
+        andamento = linha / total_linhas if total_linhas else 1.0
+        progresso(anteriores[bloco] + PESOS_PARSERS[bloco] * andamento, linha, bloco)
+
+    return avisar
+
+
+# ============================================================================
+# LEITURA DOS ARQUIVOS
+# ============================================================================
+
+def ler_arquivos_sped(uploaded_files, estatisticas: dict = None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Percorre os arquivos enviados e devolve (nome_origem, conteudo) de cada SPED.
+
+    IMPORTANTE:
+    - .zip: cada .txt interno é devolvido com o nome do ZIP como origem
+    - Demais arquivos são lidos como .txt
+    - Erros de leitura são registrados e o arquivo é ignorado
+    - Etapas medidas: 'zip.descompactacao' (bytes descompactados) e 'leitura'
+    """
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+
+    for uploaded_file in uploaded_files:
+        try:
+            uploaded_file.seek(0)
+            if uploaded_file.name.endswith('.zip'):
+                with zipfile.ZipFile(uploaded_file, 'r') as zip_ref:
+                    for file_name in zip_ref.namelist():
+                        if file_name.endswith('.txt'):
+                            with medir_etapa(estatisticas, 'zip.descompactacao') as medida:
+                                with zip_ref.open(file_name) as file:
+                                    conteudo = file.read()
+                                medida['bytes'] = len(conteudo)
+                            yield uploaded_file.name, conteudo
+            else:
+                with medir_etapa(estatisticas, 'leitura') as medida:
+                    conteudo = uploaded_file.read()
+                    medida['bytes'] = len(conteudo)
+                yield uploaded_file.name, conteudo
+        except Exception as e:
+            print(f"Erro ao processar {uploaded_file.name}: {str(e)}")
+            continue
+
+
+def tamanho_descompactado(uploaded_files) -> int:
+    """
+    Bytes de SPED nos arquivos enviados (.txt internos dos ZIPs descompactados).
+    """
+    total = 0
+    for uploaded_file in uploaded_files:
+        if uploaded_file.name.endswith('.zip'):
+            try:
+                uploaded_file.seek(0)
+                with zipfile.ZipFile(uploaded_file, 'r') as zip_ref:
+                    total += sum(info.file_size for info in zip_ref.infolist() if info.filename.endswith('.txt'))
+            except zipfile.BadZipFile:
+                continue
+            finally:
+                uploaded_file.seek(0)
+        else:
+            total += uploaded_file.size
+    return total
+
+
+# ============================================================================
+# PROCESSAMENTO
+# ============================================================================
+
+def processar_conteudo_sped(conteudo: bytes, estatisticas: dict = None, progresso=None,
+                            projecao: dict = None, filtro: dict = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Executa os parsers dos blocos C, 0 e E sobre o conteúdo de um arquivo.
+
+    progresso: chamada com (fracao_do_arquivo, linha, bloco) durante os
+    parsers; uma exceção levantada nela interrompe o processamento
+    projecao: colunas do bloco C a materializar ({registro: [colunas]})
+    filtro: condições do bloco C avaliadas durante a leitura (filtros_leitura.py)
+    """
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    avisar = _progresso_dos_parsers(progresso)
+
+    with medir_etapa(estatisticas, 'bloco_e.decodificacao', len(conteudo)):
+        texto = conteudo.decode('utf-8', errors='ignore')
+
+    resultado = {
+        'dados_c': parser_bloco_c()(conteudo, estatisticas, avisar, projecao, filtro),
+        'dados_0': processar_arquivo_sped_registros_0(conteudo, estatisticas, avisar),
+        'dados_e': processar_arquivo_sped_registros_e(texto, estatisticas, avisar),
+    }
+    estatisticas['arquivos'] += 1
+    estatisticas['bytes'] += len(conteudo)
+    return resultado
+
+
+def consolidar_resultados(resultados: List[Tuple[str, Dict[str, Dict[str, pd.DataFrame]]]],
+                          estatisticas: dict = None) -> Dict[str, Dict[str, pd.DataFrame]]:
+    """
+    Concatena os resultados por arquivo em um único DataFrame por registro.
+
+    IMPORTANTE:
+    - Registros C e 0 recebem a coluna ARQUIVO_ORIGEM
+    - Registro sem dados em nenhum arquivo vira DataFrame vazio
+    """
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    consolidados = {'dados_c': {}, 'dados_0': {}, 'dados_e': {}}
+
+    for nome_origem, resultado in resultados:
+        for bloco, tabelas in resultado.items():
+            for tipo, df in tabelas.items():
+                lista = consolidados[bloco].setdefault(tipo, [])
+                if df.empty:
+                    continue
+                # assign (cópia): o df pode ser o guardado no cache por arquivo
+                if bloco != 'dados_e' and 'ARQUIVO_ORIGEM' not in df.columns:
+                    df = df.assign(ARQUIVO_ORIGEM=nome_origem)
+                lista.append(df)
+
+    with medir_etapa(estatisticas, 'consolidacao.concat') as medida:
+        for bloco, tabelas in consolidados.items():
+            for tipo, lista_dfs in tabelas.items():
+                tabelas[tipo] = pd.concat(lista_dfs, ignore_index=True) if lista_dfs else pd.DataFrame()
+                medida['linhas'] += len(tabelas[tipo])
+
+    return consolidados
+
+
+def montar_dataset(dados: Dict[str, Dict[str, pd.DataFrame]], arquivos: List[str],
+                   estatisticas: dict = None, projecao: dict = None, filtro: dict = None,
+                   amostra: dict = None) -> dict:
+    """
+    Completa os dados consolidados com os derivados usados pelas abas.
+    """
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+
+    with medir_etapa(estatisticas, 'indices_busca'):
+        indices_busca = construir_indices_cadastro(dados['dados_0'])
+
+    return {
+        'dados_c': dados['dados_c'],
+        'dados_0': dados['dados_0'],
+        'dados_e': dados['dados_e'],
+        'indices_busca': indices_busca,
+        'chaves_ordenacao': {registro: {} for registro in REGISTROS_PAGINADOS},
+        'arquivos': arquivos,
+        'estatisticas': estatisticas,
+        'projecao': projecao,
+        'filtro': filtro,
+        'amostra': amostra,
+    }
+
+
+def separar_upload(uploaded_files, estatisticas: dict, incremental: bool, projecao: dict = None,
+                   filtro: dict = None, hashes: dict = None):
+    """
+    Arquivos já processados (cache_arquivos.py) e novos do upload.
+
+    RETORNA:
+        (guardados: posição -> resultados, novos: [(posição, arquivo, chave)]);
+        sem incremental, todos são novos (chave None)
+    """
+    if not incremental:
+        return {}, [(posicao, arquivo, None) for posicao, arquivo in enumerate(uploaded_files)]
+
+    with medir_etapa(estatisticas, 'incremental.chaves'):
+        guardados, novos = separar_arquivos(uploaded_files, projecao, filtro, hashes)
+    for posicao in guardados:
+        registrar_etapa(estatisticas, 'incremental.reaproveitados', 0.0, uploaded_files[posicao].size)
+    return guardados, novos
+
+
+def carregar_dataset(uploaded_files, chave: str = '', progresso=None, cancelar=None,
+                     projecao: dict = None, filtro: dict = None, incremental: bool = False,
+                     hashes: dict = None) -> dict:
+    """
+    Lê, processa e consolida os arquivos enviados em um dataset.
+
+    Parâmetros:
+        progresso: callback que recebe os eventos de evento_progresso()
+        cancelar: threading.Event; marcado, a ingestão levanta IngestaoCancelada
+        projecao: colunas do bloco C a materializar (None = todas)
+        filtro: condições do bloco C aplicadas na leitura (None = tudo)
+        incremental: reaproveita o resultado dos arquivos já processados e
+                     processa só os novos (cache_arquivos.py)
+        hashes: file_id -> hash do conteúdo já calculado (chaves do incremental)
+
+    IMPORTANTE:
+    - As estatísticas da ingestão ficam em dataset['estatisticas'] e são
+      emitidas no logger 'sped.ingestao' (chave identifica o dataset no log)
+
+    GATILHO DE MANUTENÇÃO:
+    - Esta é a função chamada pelo app.py (via cache_datasets.obter_dataset)
+    """
+    preparar_filtro(filtro)  # filtro inválido falha antes de ler os arquivos
+    estatisticas = criar_estatisticas()
+    inicio = time.perf_counter()
+
+    guardados, novos = separar_upload(uploaded_files, estatisticas, incremental, projecao, filtro, hashes)
+
+    acompanhar = progresso is not None or cancelar is not None
+    bytes_total = tamanho_descompactado([arquivo for _, arquivo, _ in novos]) if acompanhar else 0
+    bytes_concluidos = 0
+
+    processados = {}
+    sped = 0
+    for posicao, arquivo, chave_arquivo in novos:
+        resultados = processados[posicao] = []
+        completo = True
+        for nome_origem, conteudo in ler_arquivos_sped([arquivo], estatisticas):
+            verificar_cancelamento(cancelar)
+            sped += 1
+
+            def avisar(fracao, linhas, etapa, nome_origem=nome_origem, sped=sped, bytes_arquivo=len(conteudo)):
+                verificar_cancelamento(cancelar)
+                if progresso is not None:
+                    progresso(evento_progresso(nome_origem, sped, etapa, linhas, fracao, bytes_arquivo,
+                                               bytes_concluidos + fracao * bytes_arquivo, bytes_total))
+
+            try:
+                resultados.append((nome_origem, processar_conteudo_sped(conteudo, estatisticas,
+                                                                        avisar if acompanhar else None,
+                                                                        projecao, filtro)))
+            except IngestaoCancelada:
+                raise
+            except Exception as e:
+                print(f"Erro ao processar {nome_origem}: {str(e)}")
+                completo = False
+                continue
+            finally:
+                bytes_concluidos += len(conteudo)
+        if chave_arquivo is not None and completo:
+            guardar_arquivo(chave_arquivo, resultados)
+
+    dados = consolidar_resultados(ordenar_resultados(guardados, processados), estatisticas)
+    dataset = montar_dataset(dados, [f.name for f in uploaded_files], estatisticas, projecao, filtro)
+
+    registrar_etapa(estatisticas, 'ingestao.total', time.perf_counter() - inicio, estatisticas['bytes'])
+    registrar_log(estatisticas, chave)
+    return dataset
@@ -0,0 +1,260 @@
+"""
+================================================================================
+MÓDULO: Instrumentação da Ingestão - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Saber para onde vai o tempo de um upload lento: descompactação do ZIP,
+    decodificação, divisão em linhas, parse por registro, montagem dos
+    DataFrames, conversão numérica ou concatenação.
+
+ESTATÍSTICAS:
+    Dicionário criado por criar_estatisticas() e preenchido pelos
+    processar_*() (parâmetro estatisticas=):
+    - 'etapas': etapa -> {'segundos', 'bytes', 'linhas', 'chamadas'}
+      (nomes como 'bloco_c.decodificacao', 'zip.descompactacao')
+    - 'registros': registro -> {'registros', 'segundos'}
+    - 'arquivos': quantidade de arquivos SPED processados
+    - 'bytes': bytes de SPED processados (já descompactados)
+    - 'divergencias': contagens do bloco 9 (9900/9999) que não batem com
+      as linhas lidas: {'registro', 'declarado', 'encontrado'}
+
+CUSTO:
+    - Etapas: duas leituras de relógio por etapa
+    - Parse por registro: o relógio só é lido quando o tipo de registro muda
+      de uma linha para a seguinte (o tempo do trecho vai para o tipo anterior)
+
+SAÍDAS:
+    - O próprio dicionário (dataset['estatisticas'] em ingestao.py)
+    - Linhas de log chave=valor no logger 'sped.ingestao'
+    - Painel "🩺 Diagnóstico da ingestão" no app.py
+
+GATILHOS DE MANUTENÇÃO:
+    1. Nova etapa: envolver o trecho com medir_etapa()
+    2. Novo parser: prefixar as etapas com o bloco ('bloco_x.')
+    3. Os parsers importam este módulo: streamlit só dentro do painel
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+import pandas as pd
+
+from formatacao import BYTES_POR_MB, formatar_inteiro_br, formatar_mb_br
+
+
+logger = logging.getLogger('sped.ingestao')
+
+# Intervalo mínimo entre avisos de progresso dos parsers (ver ingestao.py)
+INTERVALO_PROGRESSO_SEGUNDOS = 0.2
+
+
+# ============================================================================
+# COLETA
+# ============================================================================
+
+def criar_estatisticas() -> dict:
+    """
+    Estatísticas vazias de uma ingestão.
+    """
+    return {'etapas': {}, 'registros': {}, 'arquivos': 0, 'bytes': 0, 'divergencias': []}
+
+
+def registrar_etapa(estatisticas: dict, etapa: str, segundos: float,
+                    bytes_processados: int = 0, linhas: int = 0):
+    """
+    Acumula tempo, bytes e linhas de uma etapa.
+    """
+    atual = estatisticas['etapas'].setdefault(
+        etapa, {'segundos': 0.0, 'bytes': 0, 'linhas': 0, 'chamadas': 0}
+    )
+    atual['segundos'] += segundos
+    atual['bytes'] += bytes_processados
+    atual['linhas'] += linhas
+    atual['chamadas'] += 1
+
+
+@contextmanager
+def medir_etapa(estatisticas: dict, etapa: str, bytes_processados: int = 0, linhas: int = 0):
+    """
+    Mede o bloco with como uma etapa.
+
+    IMPORTANTE:
+    - Linhas conhecidas só dentro do bloco podem ser informadas no dicionário
+      devolvido: with medir_etapa(...) as medida: medida['linhas'] = n
+    """
+    medida = {'bytes': bytes_processados, 'linhas': linhas}
+    inicio = time.perf_counter()
+    try:
+        yield medida
+    finally:
+        registrar_etapa(estatisticas, etapa, time.perf_counter() - inicio,
+                        medida['bytes'], medida['linhas'])
+
+
+def registrar_registros(estatisticas: dict, tempos: Dict[str, float], dataframes: Dict[str, pd.DataFrame]):
+    """
+    Acumula, para cada registro do parser, o tempo de parse e os registros gerados.
+
+    Parâmetros:
+        tempos: registro -> segundos gastos nas linhas desse tipo
+        dataframes: resultado do parser (registro -> DataFrame)
+
+    IMPORTANTE:
+    - Só entram os registros que o parser produz; o tempo das linhas de
+      outros tipos (ignoradas) fica apenas na etapa de parse
+    """
+    for registro, df in dataframes.items():
+        atual = estatisticas['registros'].setdefault(registro, {'registros': 0, 'segundos': 0.0})
+        atual['registros'] += len(df)
+        atual['segundos'] += tempos.get(registro, 0.0)
+
+
+def mesclar_estatisticas(destino: dict, origem: dict) -> dict:
+    """
+    Soma as estatísticas de origem no destino (ex.: arquivos processados à parte).
+    """
+    for etapa, valores in origem['etapas'].items():
+        atual = destino['etapas'].setdefault(
+            etapa, {'segundos': 0.0, 'bytes': 0, 'linhas': 0, 'chamadas': 0}
+        )
+        for campo, valor in valores.items():
+            atual[campo] += valor
+    for registro, valores in origem['registros'].items():
+        atual = destino['registros'].setdefault(registro, {'registros': 0, 'segundos': 0.0})
+        for campo, valor in valores.items():
+            atual[campo] += valor
+    destino['arquivos'] += origem['arquivos']
+    destino['bytes'] += origem['bytes']
+    destino['divergencias'].extend(origem.get('divergencias', []))
+    return destino
+
+
+# ============================================================================
+# RESUMOS
+# ============================================================================
+
+def resumo_etapas(estatisticas: dict) -> pd.DataFrame:
+    """
+    Uma linha por etapa, da mais lenta para a mais rápida, com vazão.
+    """
+    linhas = [
+        {
+            'ETAPA': etapa,
+            'SEGUNDOS': valores['segundos'],
+            'CHAMADAS': valores['chamadas'],
+            'BYTES': valores['bytes'],
+            'LINHAS': valores['linhas'],
+            'MB_S': valores['bytes'] / BYTES_POR_MB / valores['segundos'] if valores['segundos'] and valores['bytes'] else None,
+            'LINHAS_S': valores['linhas'] / valores['segundos'] if valores['segundos'] and valores['linhas'] else None,
+        }
+        for etapa, valores in estatisticas['etapas'].items()
+    ]
+    colunas = ['ETAPA', 'SEGUNDOS', 'CHAMADAS', 'BYTES', 'LINHAS', 'MB_S', 'LINHAS_S']
+    return pd.DataFrame(linhas, columns=colunas).sort_values('SEGUNDOS', ascending=False, ignore_index=True)
+
+
+def resumo_registros(estatisticas: dict) -> pd.DataFrame:
+    """
+    Uma linha por registro com quantidade e tempo de parse.
+    """
+    linhas = [
+        {
+            'REGISTRO': registro,
+            'REGISTROS': valores['registros'],
+            'SEGUNDOS': valores['segundos'],
+            'REGISTROS_S': valores['registros'] / valores['segundos'] if valores['segundos'] else None,
+        }
+        for registro, valores in estatisticas['registros'].items()
+        if valores['registros']
+    ]
+    colunas = ['REGISTRO', 'REGISTROS', 'SEGUNDOS', 'REGISTROS_S']
+    return pd.DataFrame(linhas, columns=colunas).sort_values('SEGUNDOS', ascending=False, ignore_index=True)
+
+
+def registrar_log(estatisticas: dict, chave: str = ''):
+    """
+    Emite as estatísticas como linhas chave=valor no logger 'sped.ingestao'.
+
+    Exemplo:
+        evento=etapa dataset=3f2a... etapa=bloco_c.parse segundos=1.234 bytes=52428800 linhas=410000
+    """
+    prefixo = f'dataset={chave[:12]} ' if chave else ''
+    total = estatisticas['etapas'].get('ingestao.total', {}).get('segundos', 0.0)
+    logger.info(f"evento=ingestao {prefixo}arquivos={estatisticas['arquivos']} "
+                f"bytes={estatisticas['bytes']} segundos={total:.3f}")
+    for etapa, valores in estatisticas['etapas'].items():
+        logger.info(f"evento=etapa {prefixo}etapa={etapa} segundos={valores['segundos']:.3f} "
+                    f"bytes={valores['bytes']} linhas={valores['linhas']} chamadas={valores['chamadas']}")
+    for registro, valores in estatisticas['registros'].items():
+        if valores['registros']:
+            logger.info(f"evento=registro {prefixo}registro={registro} "
+                        f"registros={valores['registros']} segundos={valores['segundos']:.3f}")
+    for divergencia in estatisticas.get('divergencias', []):
+        logger.warning(f"evento=divergencia_bloco_9 {prefixo}registro={divergencia['registro']} "
+                       f"declarado={divergencia['declarado']} encontrado={divergencia['encontrado']}")
+
+
+# ============================================================================
+# PAINEL DE DIAGNÓSTICO
+# ============================================================================
+
+def exibir_diagnostico(estatisticas: dict):
+    """
+    Exibe o painel recolhível com o tempo de cada etapa e de cada registro.
+
+    GATILHO DE MANUTENÇÃO:
+    - Com dataset reaproveitado do cache, os tempos são os da ingestão original
+    """
+    import streamlit as st
+
+    with st.expander("🩺 Diagnóstico da ingestão"):
+        if not estatisticas or not estatisticas['etapas']:
+            st.info("Sem estatísticas de ingestão")
+            return
+
+        total = estatisticas['etapas'].get('ingestao.total', {}).get('segundos', 0.0)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Tempo total", f"{total:.2f} s".replace('.', ','))
+        with col2:
+            st.metric("Arquivos SPED", formatar_inteiro_br(estatisticas['arquivos']))
+        with col3:
+            st.metric("Volume processado", formatar_mb_br(estatisticas['bytes']))
+
+        divergencias = estatisticas.get('divergencias', [])
+        if divergencias:
+            st.warning(
+                f"⚠️ {len(divergencias)} contagem(ns) do bloco 9 não conferem com as linhas do arquivo "
+                "(arquivo truncado ou editado?)"
+            )
+            st.dataframe(pd.DataFrame(divergencias), use_container_width=True, hide_index=True)
+
+        st.markdown("**Etapas**")
+        st.dataframe(
+            resumo_etapas(estatisticas),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'SEGUNDOS': st.column_config.NumberColumn('Segundos', format='%.3f'),
+                'MB_S': st.column_config.NumberColumn('MB/s', format='%.1f'),
+                'LINHAS_S': st.column_config.NumberColumn('Linhas/s', format='%.0f'),
+            }
+        )
+
+        st.markdown("**Parse por registro**")
+        st.dataframe(
+            resumo_registros(estatisticas),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'SEGUNDOS': st.column_config.NumberColumn('Segundos', format='%.3f'),
+                'REGISTROS_S': st.column_config.NumberColumn('Registros/s', format='%.0f'),
+            }
+        )
@@ -0,0 +1,476 @@
+"""
+================================================================================
+MÓDULO: Parser Colunar do Bloco C - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Produzir os mesmos DataFrames de sped_parser.processar_arquivo_sped()
+    sem montar um dicionário por linha: cada registro recebe um bloco de
+    colunas pré-alocado com o tamanho exato e preenchido no lugar.
+
+BYTES (sem decodificar o arquivo):
+    - As linhas e os campos são divididos em bytes (b'\n' e b'|'); o arquivo
+      inteiro nunca vira str
+    - Campos numéricos (COLUNAS_NUMERICAS) vão de bytes direto para
+      float64/int64 com NumPy (converter_numerico_bytes), sem str no meio
+    - Campos de código (CFOP, CST, datas, participantes...) repetem muito:
+      cada valor distinto é decodificado uma vez e compartilhado
+    - Apenas o texto livre (CAMPOS_TEXTO_LIVRE) é decodificado valor a valor
+    - Decodificação latin-1, como em sped_parser.py
+
+BLOCO 9 (ler_bloco_9):
+    Todo EFD termina com um 9900 por tipo de registro (quantidade de
+    linhas daquele tipo) e o 9999 (total de linhas do arquivo). O final do
+    arquivo é lido ANTES do parse:
+    - As quantidades dos 9900 definem o tamanho de cada bloco de colunas,
+      limitado ao número real de linhas do arquivo (9900 corrompido ou
+      adulterado não aloca além do que o arquivo pode ter)
+    - Ao final, as linhas lidas são conferidas com o 9900/9999: diferenças
+      vão para estatisticas['divergencias'] (arquivo truncado ou editado)
+    - Arquivo sem bloco 9 (ou com contagem menor que a real) funciona: o
+      bloco cresce por duplicação e a conferência é pulada
+    - Os blocos guardam os campos em bytes (object): a largura dos campos
+      só é conhecida depois da leitura. Os tipos (int64/float64, str) saem
+      na montagem, coluna a coluna (_montar_dataframe)
+    - O parser vetorizado (padrão do app) não usa blocos: do bloco 9 fica
+      só a conferência das contagens
+
+LAYOUTS (derivar_layout):
+    As posições dos campos vêm das próprias funções parse_registro_c*() do
+    sped_parser.py, sondadas com uma linha sintética: a definição dos campos
+    continua em um único lugar.
+
+EQUIVALÊNCIA COM O PARSER ORIGINAL:
+    - Mesmas colunas, na mesma ordem, e mesmos tipos (texto em object;
+      números em int64 quando todos os valores são inteiros, como o
+      pd.to_numeric do original; vazio ou inválido = 0)
+    - Linhas com campos obrigatórios faltando são ignoradas; filhos de C100
+      só entram após um C100 válido e recebem as colunas *_PAI
+    - test_parser_colunar.py compara os dois parsers
+    - Com filtro (filtros_leitura.py), C100 recusado zera o pai: os filhos
+      dele são pulados como os que vêm antes do primeiro C100; C100
+      cancelado vira uma linha de C100_CANCELADOS
+
+PROJEÇÃO (colunas_projetadas):
+    projecao={registro: [colunas]} limita as colunas materializadas: as
+    demais nunca são copiadas, decodificadas nem guardadas. Registro ausente
+    da projeção = todas as colunas; lista vazia = registro ignorado. A
+    validade das linhas e o vínculo com o C100 não mudam com a projeção.
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novo registro C: incluir em PARSERS_REGISTROS (e COLUNAS_PAI se for
+       filho do C100)
+    2. Nova coluna em parse_registro_c*(): nada a fazer (layout sondado);
+       se for texto livre, incluir em CAMPOS_TEXTO_LIVRE
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import time
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from filtros_leitura import (
+    COLUNAS_CANCELADOS, REGISTRO_CANCELADOS, REGISTROS_CFOP, c100_aceito, c100_cancelado, campos_c100,
+    preparar_filtro,
+)
+from instrumentacao import (
+    INTERVALO_PROGRESSO_SEGUNDOS, criar_estatisticas, medir_etapa, registrar_etapa, registrar_registros
+)
+from sped_parser import (
+    COLUNAS_NUMERICAS, parse_registro_c100, parse_registro_c110,
+    parse_registro_c113, parse_registro_c170, parse_registro_c190, parse_registro_c195, parse_registro_c197,
+)
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+PARSERS_REGISTROS = {
+    'C100': parse_registro_c100,
+    'C110': parse_registro_c110,
+    'C113': parse_registro_c113,
+    'C170': parse_registro_c170,
+    'C190': parse_registro_c190,
+    'C195': parse_registro_c195,
+    'C197': parse_registro_c197,
+}
+
+# Campos do último C100 copiados para os filhos (coluna *_PAI)
+COLUNAS_PAI = {
+    'C110': ['NUM_DOC'],
+    'C113': ['NUM_DOC'],
+    'C170': ['NUM_DOC', 'COD_PART', 'DT_DOC'],
+    'C190': ['NUM_DOC', 'COD_PART', 'DT_DOC'],
+    'C195': ['NUM_DOC'],
+    'C197': ['NUM_DOC'],
+}
+
+# Campos de texto livre: decodificados valor a valor (os demais por valor distinto)
+CAMPOS_TEXTO_LIVRE = {'TXT_COMPL', 'DESCR_COMPL', 'DESCR_COMPL_AJ'}
+
+# Maior quantidade de campos sondada em derivar_layout()
+MAXIMO_CAMPOS_SONDAGEM = 80
+
+# Linhas pré-alocadas quando o 9900 do registro não existe
+CAPACIDADE_SEM_BLOCO_9 = 1024
+
+
+# ============================================================================
+# LAYOUTS
+# ============================================================================
+
+def derivar_layout(parse) -> dict:
+    """
+    Posições dos campos de um registro, sondando a sua função parse_registro_*.
+
+    RETORNA:
+        {'colunas': nomes na ordem do dicionário, 'indices': posição de cada
+         coluna em linha.split('|'), 'minimo': menor quantidade de campos
+         aceita, 'maximo': campos necessários para todas as colunas}
+    """
+    completo = parse('|'.join(str(i) for i in range(MAXIMO_CAMPOS_SONDAGEM)))
+    indices = [int(valor) for valor in completo.values()]
+
+    minimo = next(
+        quantidade for quantidade in range(2, MAXIMO_CAMPOS_SONDAGEM + 1)
+        if parse('|'.join(str(i) for i in range(quantidade))) is not None
+    )
+    return {
+        'colunas': list(completo),
+        'indices': indices,
+        'minimo': minimo,
+        'maximo': max(indices) + 1,
+    }
+
+
+LAYOUTS = {registro: derivar_layout(parse) for registro, parse in PARSERS_REGISTROS.items()}
+
+# Tipo do registro como aparece em linha.split(b'|')
+REGISTROS_BYTES = {registro.encode('ascii'): registro for registro in PARSERS_REGISTROS}
+
+
+# ============================================================================
+# PROJEÇÃO
+# ============================================================================
+
+def colunas_projetadas(registro: str, projecao: Optional[Dict[str, List[str]]]) -> List[str]:
+    """
+    Colunas do registro a materializar, na ordem do parser original (*_PAI no fim).
+
+    projecao: {registro: [colunas]}; None ou registro ausente = todas as
+    colunas, lista vazia = nenhuma. Nomes que o registro não tem são ignorados.
+    """
+    todas = LAYOUTS[registro]['colunas'] + [f'{campo}_PAI' for campo in COLUNAS_PAI.get(registro, [])]
+    if projecao is None or registro not in projecao:
+        return todas
+    pedidas = set(projecao[registro])
+    return [coluna for coluna in todas if coluna in pedidas]
+
+
+def obter_campos(indices: List[int]):
+    """
+    Como itemgetter(*indices), mas sempre devolve tupla (também com 0 ou 1 índice).
+    """
+    if not indices:
+        return lambda campos: ()
+    if len(indices) == 1:
+        indice = indices[0]
+        return lambda campos: (campos[indice],)
+    return itemgetter(*indices)
+
+
+# ============================================================================
+# BLOCO 9
+# ============================================================================
+
+def ler_bloco_9(conteudo: bytes) -> dict:
+    """
+    Lê o final do arquivo: quantidade de linhas por registro (9900) e total (9999).
+
+    RETORNA:
+        {'contagens': registro -> linhas declaradas, 'total_linhas': int ou None}
+        (contagens vazio se o arquivo não tem bloco 9)
+    """
+    # '\n|9001|' só casa com o início do bloco 9 (o 9900 do 9001 é '|9900|9001|')
+    inicio = conteudo.rfind(b'\n|9001|')
+    bloco_9 = {'contagens': {}, 'total_linhas': None}
+    if inicio < 0:
+        return bloco_9
+
+    for linha in conteudo[inicio:].split(b'\n'):
+        campos = linha.split(b'|')
+        try:
+            if campos[1] == b'9900':
+                bloco_9['contagens'][campos[2].decode('latin-1')] = int(campos[3])
+            elif campos[1] == b'9999':
+                bloco_9['total_linhas'] = int(campos[2])
+        except (IndexError, ValueError):
+            continue
+    return bloco_9
+
+
+def verificar_bloco_9(bloco_9: dict, contagens: Dict[str, int], total_linhas: int) -> List[dict]:
+    """
+    Compara as linhas lidas com as declaradas no bloco 9.
+
+    RETORNA:
+        Lista de {'registro', 'declarado', 'encontrado'}; o total do 9999
+        aparece como registro 'QTD_LIN'. Vazia se confere (ou sem bloco 9).
+    """
+    if not bloco_9['contagens']:
+        return []
+
+    divergencias = [
+        {'registro': registro, 'declarado': bloco_9['contagens'].get(registro, 0),
+         'encontrado': contagens.get(registro, 0)}
+        for registro in sorted(set(bloco_9['contagens']) | set(contagens))
+        if bloco_9['contagens'].get(registro, 0) != contagens.get(registro, 0)
+    ]
+    if bloco_9['total_linhas'] is not None and bloco_9['total_linhas'] != total_linhas:
+        divergencias.append({'registro': 'QTD_LIN', 'declarado': bloco_9['total_linhas'],
+                             'encontrado': total_linhas})
+    return divergencias
+
+
+# ============================================================================
+# BLOCOS DE COLUNAS
+# ============================================================================
+
+def _criar_bloco(registro: str, capacidade: int, colunas: List[str]) -> dict:
+    """
+    Bloco de colunas pré-alocado de um registro: matriz (linhas x colunas),
+    posição e o itemgetter dos campos projetados (os *_PAI vêm do C100).
+    """
+    layout = LAYOUTS[registro]
+    indices = [indice for coluna, indice in zip(layout['colunas'], layout['indices']) if coluna in colunas]
+    return {'matriz': np.empty((max(capacidade, 1), len(colunas)), dtype=object),
+            'colunas': colunas, 'linhas': 0, 'obter': obter_campos(indices)}
+
+
+def _ampliar(bloco: dict):
+    """
+    Dobra a capacidade do bloco (contagem do 9900 ausente ou menor que a real).
+    """
+    matriz = bloco['matriz']
+    nova = np.empty((len(matriz) * 2, matriz.shape[1]), dtype=object)
+    nova[:len(matriz)] = matriz
+    bloco['matriz'] = nova
+
+
+def converter_numerico_bytes(valores: np.ndarray) -> np.ndarray:
+    """
+    Campos numéricos em bytes ('1234,56') para números, sem passar por str.
+
+    Mesmo resultado de pd.to_numeric(..., errors='coerce').fillna(0) sobre o
+    texto: int64 se todos os valores são inteiros, senão float64 com vazio
+    ou inválido = 0 (valores fora do padrão caem no caminho do pandas).
+    """
+    pontos = np.char.replace(valores.astype('S'), b',', b'.')
+    vazios = pontos == b''
+    try:
+        if not vazios.any() and not (np.char.find(pontos, b'.') >= 0).any():
+            return pontos.astype(np.int64)
+        numeros = np.zeros(len(pontos))
+        numeros[~vazios] = pontos[~vazios].astype(np.float64)
+    except (ValueError, OverflowError):
+        texto = pd.Series([valor.decode('latin-1') for valor in pontos], dtype=object)
+        return pd.to_numeric(texto, errors='coerce').fillna(0).to_numpy()
+    numeros[np.isnan(numeros)] = 0
+    return numeros
+
+
+def decodificar_codigos(valores: np.ndarray) -> np.ndarray:
+    """
+    Campos de código em bytes para str: cada valor distinto é decodificado uma vez.
+    """
+    posicoes, distintos = pd.factorize(valores)
+    return np.array([valor.decode('latin-1') for valor in distintos], dtype=object)[posicoes]
+
+
+def decodificar_texto_livre(valores: np.ndarray) -> np.ndarray:
+    """
+    Campos de texto livre em bytes para str, valor a valor.
+    """
+    return np.array([valor.decode('latin-1') for valor in valores], dtype=object)
+
+
+def _montar_dataframe(registro: str, bloco: dict, tempos: Dict[str, float]) -> pd.DataFrame:
+    """
+    DataFrame com as linhas preenchidas (vazio, sem colunas, se não houve nenhuma).
+
+    tempos: acumula 'decodificacao' (códigos e texto) e 'conversao_numerica'
+    """
+    if not bloco['linhas']:
+        return pd.DataFrame()
+
+    matriz = bloco['matriz'][:bloco['linhas']]
+    numericas = set(COLUNAS_NUMERICAS.get(registro, []))
+    colunas = {}
+    for posicao, coluna in enumerate(bloco['colunas']):
+        inicio = time.perf_counter()
+        if coluna in numericas:
+            colunas[coluna] = converter_numerico_bytes(matriz[:, posicao])
+            etapa = 'conversao_numerica'
+        elif coluna in CAMPOS_TEXTO_LIVRE:
+            colunas[coluna] = decodificar_texto_livre(matriz[:, posicao])
+            etapa = 'decodificacao'
+        else:
+            colunas[coluna] = decodificar_codigos(matriz[:, posicao])
+            etapa = 'decodificacao'
+        tempos[etapa] += time.perf_counter() - inicio
+    return pd.DataFrame(colunas)
+
+
+# ============================================================================
+# PARSE
+# ============================================================================
+
+def processar_arquivo_sped_colunar(conteudo: bytes, estatisticas: Optional[dict] = None,
+                                   progresso=None,
+                                   projecao: Optional[Dict[str, List[str]]] = None,
+                                   filtro: Optional[dict] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Mesmo resultado de sped_parser.processar_arquivo_sped() (ver cabeçalho).
+
+    estatisticas / progresso / projecao / filtro: como em processar_arquivo_sped()
+    """
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    filtro = preparar_filtro(filtro)
+
+    with medir_etapa(estatisticas, 'bloco_c.bloco_9'):
+        bloco_9 = ler_bloco_9(conteudo)
+    projetadas = {registro: colunas_projetadas(registro, projecao) for registro in PARSERS_REGISTROS}
+    # Registro fora da projeção: None (linhas só validam o C100 pai)
+
+    with medir_etapa(estatisticas, 'bloco_c.divisao_linhas', len(conteudo)) as medida:
+        linhas = conteudo.split(b'\n')
+        medida['linhas'] = len(linhas)
+
+    # Contagem declarada limitada às linhas reais (acima disso o 9900 está errado)
+    blocos = {
+        registro: _criar_bloco(
+            registro, min(bloco_9['contagens'].get(registro, CAPACIDADE_SEM_BLOCO_9), len(linhas)), colunas
+        )
+        if colunas else None
+        for registro, colunas in projetadas.items()
+    }
+
+    contagens = {}
+    # Valores do último C100 válido copiados para os filhos (só os *_PAI projetados)
+    valores_pai = {registro: None for registro in COLUNAS_PAI}
+    indices_c100 = dict(zip(LAYOUTS['C100']['colunas'], LAYOUTS['C100']['indices']))
+    obter_pai = {
+        registro: obter_campos([indices_c100[campo] for campo in campos
+                                if f'{campo}_PAI' in projetadas[registro]])
+        for registro, campos in COLUNAS_PAI.items()
+    }
+
+    # Filtro: campos do C100 decodificados só para a comparação; CFOP comparado em bytes
+    campos_filtro = [(campo, indices_c100[campo]) for campo in campos_c100(filtro)] if filtro else []
+    cfops_aceitos = None
+    if filtro and filtro['cfop'] is not None:
+        cfops_aceitos = {cfop.encode('latin-1') for cfop in filtro['cfop']}
+    indices_cfop = {
+        registro: LAYOUTS[registro]['indices'][LAYOUTS[registro]['colunas'].index('CFOP')]
+        for registro in REGISTROS_CFOP
+    } if cfops_aceitos is not None else {}
+    # Documentos cancelados (EXCLUIR_CANCELADOS): poucos, decodificados na hora
+    cancelados = []
+    obter_cancelados = obter_campos([indices_c100[campo] for campo in COLUNAS_CANCELADOS])
+
+    tempos_registro = {}
+    tipo_atual = None
+    bloco = layout = indice_cfop = None
+    inicio_parse = inicio_tipo = ultimo_aviso = time.perf_counter()
+
+    for numero_linha, linha in enumerate(linhas):
+        if not linha.strip():
+            continue
+
+        campos = linha.split(b'|')
+        if len(campos) < 2:
+            continue
+
+        tipo_registro = campos[1]
+        contagens[tipo_registro] = contagens.get(tipo_registro, 0) + 1
+
+        # Tempo por registro e troca de bloco: só quando o tipo muda
+        if tipo_registro != tipo_atual:
+            agora = time.perf_counter()
+            tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + agora - inicio_tipo
+            tipo_atual, inicio_tipo = tipo_registro, agora
+            if progresso is not None and agora - ultimo_aviso >= INTERVALO_PROGRESSO_SEGUNDOS:
+                progresso('bloco_c', numero_linha, len(linhas))
+                ultimo_aviso = agora
+            registro = REGISTROS_BYTES.get(tipo_registro)
+            bloco = blocos.get(registro)
+            layout = LAYOUTS.get(registro)
+            pai = valores_pai.get(registro, ())
+            indice_cfop = indices_cfop.get(registro)
+
+        if layout is None or len(campos) < layout['minimo']:
+            continue
+        if len(campos) < layout['maximo']:
+            campos += [b''] * (layout['maximo'] - len(campos))
+
+        if registro == 'C100':
+            valores_filtro = {campo: campos[indice].decode('latin-1') for campo, indice in campos_filtro}
+            aceito = not campos_filtro or c100_aceito(filtro, valores_filtro)
+            if aceito and campos_filtro and c100_cancelado(filtro, valores_filtro):
+                cancelados.append(tuple(valor.decode('latin-1') for valor in obter_cancelados(campos)))
+                aceito = False
+            # Documento recusado: None faz os filhos serem pulados
+            for filho, obter in obter_pai.items():
+                valores_pai[filho] = obter(campos) if aceito else None
+            if not aceito:
+                continue
+        elif pai is None:
+            # Filho antes do primeiro C100 válido (ou de C100 recusado pelo filtro)
+            continue
+        elif indice_cfop is not None and campos[indice_cfop] not in cfops_aceitos:
+            continue
+        if bloco is None:
+            continue
+
+        if bloco['linhas'] == len(bloco['matriz']):
+            _ampliar(bloco)
+        bloco['matriz'][bloco['linhas']] = bloco['obter'](campos) + pai
+        bloco['linhas'] += 1
+
+    fim_parse = time.perf_counter()
+    tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + fim_parse - inicio_tipo
+    registrar_etapa(estatisticas, 'bloco_c.parse', fim_parse - inicio_parse, len(conteudo), len(linhas))
+    if progresso is not None:
+        progresso('bloco_c', len(linhas), len(linhas))
+    del linhas
+
+    contagens = {tipo.decode('latin-1'): quantidade for tipo, quantidade in contagens.items()}
+    estatisticas['divergencias'].extend(verificar_bloco_9(bloco_9, contagens, sum(contagens.values())))
+
+    # 'bloco_c.dataframes' fica só com a montagem; decodificação e conversão à parte
+    tempos_colunas = {'decodificacao': 0.0, 'conversao_numerica': 0.0}
+    inicio_montagem = time.perf_counter()
+    resultado = {
+        registro: _montar_dataframe(registro, bloco, tempos_colunas) if bloco else pd.DataFrame()
+        for registro, bloco in blocos.items()
+    }
+    registrar_etapa(estatisticas, 'bloco_c.dataframes',
+                    time.perf_counter() - inicio_montagem - sum(tempos_colunas.values()))
+    for etapa, segundos in tempos_colunas.items():
+        registrar_etapa(estatisticas, f'bloco_c.{etapa}', segundos,
+                        linhas=sum(len(df) for df in resultado.values()))
+
+    if filtro is not None and filtro['cancelados'] is not None:
+        resultado[REGISTRO_CANCELADOS] = (pd.DataFrame(cancelados, columns=COLUNAS_CANCELADOS)
+                                          if cancelados else pd.DataFrame())
+
+    tempos_registro = {tipo.decode('latin-1'): segundos for tipo, segundos in tempos_registro.items() if tipo}
+    registrar_registros(estatisticas, tempos_registro, resultado)
+    return resultado
@@ -5,7 +5,11 @@ Processa registros 0000, 0001, 0005, 0100, 0150, 0175, 0190, 0200, 0205, 0220
 
 import pandas as pd
 import io
+import time
 import zipfile
+from instrumentacao import (
+    INTERVALO_PROGRESSO_SEGUNDOS, criar_estatisticas, medir_etapa, registrar_etapa, registrar_registros
+)
 
 
 def parse_registro_0000(linha):
@@ -204,11 +208,22 @@ def parse_registro_0220(linha):
         return None
 
 
-def processar_arquivo_sped_registros_0(conteudo):
+def processar_arquivo_sped_registros_0(conteudo, estatisticas=None, progresso=None):
     """
     Processa registros 0 de um arquivo SPED ICMS/IPI
+    
+    estatisticas: dicionário de instrumentacao.criar_estatisticas()
+    progresso: chamada com (bloco, linha_atual, total_linhas) a cada
+    INTERVALO_PROGRESSO_SEGUNDOS; pode levantar exceção para cancelar
     """
-    linhas = conteudo.decode('latin-1').split('\n')
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    
+    with medir_etapa(estatisticas, 'bloco_0.decodificacao', len(conteudo)):
+        texto = conteudo.decode('latin-1')
+    with medir_etapa(estatisticas, 'bloco_0.divisao_linhas', len(conteudo)) as medida:
+        linhas = texto.split('\n')
+        medida['linhas'] = len(linhas)
+    del texto
     
     registros_0000 = []
     registros_0005 = []
@@ -224,7 +239,11 @@ def processar_arquivo_sped_registros_0(conteudo):
     ultimo_0150 = None
     ultimo_0200 = None
     
-    for linha in linhas:
+    tempos_registro = {}
+    tipo_atual = None
+    inicio_parse = inicio_tipo = ultimo_aviso = time.perf_counter()
+    
+    for numero_linha, linha in enumerate(linhas):
         if not linha.strip():
             continue
             
@@ -234,6 +253,15 @@ def processar_arquivo_sped_registros_0(conteudo):
             
         tipo_registro = campos[1]
         
+        # Tempo por registro: o relógio só é lido quando o tipo muda
+        if tipo_registro != tipo_atual:
+            agora = time.perf_counter()
+            tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + agora - inicio_tipo
+            tipo_atual, inicio_tipo = tipo_registro, agora
+            if progresso is not None and agora - ultimo_aviso >= INTERVALO_PROGRESSO_SEGUNDOS:
+                progresso('bloco_0', numero_linha, len(linhas))
+                ultimo_aviso = agora
+        
         if tipo_registro == '0000':
             registro = parse_registro_0000(linha)
             if registro:
@@ -284,18 +312,25 @@ def processar_arquivo_sped_registros_0(conteudo):
                 registro['COD_ITEM_PAI'] = ultimo_0200.get('COD_ITEM', '')
                 registros_0220.append(registro)
     
+    fim_parse = time.perf_counter()
+    tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + fim_parse - inicio_tipo
+    registrar_etapa(estatisticas, 'bloco_0.parse', fim_parse - inicio_parse, len(conteudo), len(linhas))
+    if progresso is not None:
+        progresso('bloco_0', len(linhas), len(linhas))
+    
     # Criar DataFrames
-    df_0000 = pd.DataFrame(registros_0000) if registros_0000 else pd.DataFrame()
-    df_0005 = pd.DataFrame(registros_0005) if registros_0005 else pd.DataFrame()
-    df_0100 = pd.DataFrame(registros_0100) if registros_0100 else pd.DataFrame()
-    df_0150 = pd.DataFrame(registros_0150) if registros_0150 else pd.DataFrame()
-    df_0175 = pd.DataFrame(registros_0175) if registros_0175 else pd.DataFrame()
-    df_0190 = pd.DataFrame(registros_0190) if registros_0190 else pd.DataFrame()
-    df_0200 = pd.DataFrame(registros_0200) if registros_0200 else pd.DataFrame()
-    df_0205 = pd.DataFrame(registros_0205) if registros_0205 else pd.DataFrame()
-    df_0220 = pd.DataFrame(registros_0220) if registros_0220 else pd.DataFrame()
+    with medir_etapa(estatisticas, 'bloco_0.dataframes'):
+        df_0000 = pd.DataFrame(registros_0000) if registros_0000 else pd.DataFrame()
+        df_0005 = pd.DataFrame(registros_0005) if registros_0005 else pd.DataFrame()
+        df_0100 = pd.DataFrame(registros_0100) if registros_0100 else pd.DataFrame()
+        df_0150 = pd.DataFrame(registros_0150) if registros_0150 else pd.DataFrame()
+        df_0175 = pd.DataFrame(registros_0175) if registros_0175 else pd.DataFrame()
+        df_0190 = pd.DataFrame(registros_0190) if registros_0190 else pd.DataFrame()
+        df_0200 = pd.DataFrame(registros_0200) if registros_0200 else pd.DataFrame()
+        df_0205 = pd.DataFrame(registros_0205) if registros_0205 else pd.DataFrame()
+        df_0220 = pd.DataFrame(registros_0220) if registros_0220 else pd.DataFrame()
     
-    return {
+    resultado = {
         '0000': df_0000,
         '0005': df_0005,
         '0100': df_0100,
@@ -306,6 +341,9 @@ def processar_arquivo_sped_registros_0(conteudo):
         '0205': df_0205,
         '0220': df_0220
     }
+    registrar_registros(estatisticas, tempos_registro, resultado)
+    
+    return resultado
 
 
 def processar_multiplos_speds_registros_0(uploaded_files):
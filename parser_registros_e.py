@@ -37,8 +37,12 @@ Autor: Sistema Lavoratory
 
 import pandas as pd
 from typing import Dict
+import time
 import zipfile
 import io
+from instrumentacao import (
+    INTERVALO_PROGRESSO_SEGUNDOS, criar_estatisticas, medir_etapa, registrar_etapa, registrar_registros
+)
 
 
 def parse_registro_e100(linha: str) -> dict:
@@ -166,7 +170,8 @@ def parse_registro_e116(linha: str) -> dict:
     }
 
 
-def processar_arquivo_sped_registros_e(conteudo: str) -> Dict[str, pd.DataFrame]:
+def processar_arquivo_sped_registros_e(conteudo: str, estatisticas: dict = None,
+                                       progresso=None) -> Dict[str, pd.DataFrame]:
     """
     Processa arquivo SPED e extrai registros E.
     
@@ -179,19 +184,42 @@ def processar_arquivo_sped_registros_e(conteudo: str) -> Dict[str, pd.DataFrame]
     
     GATILHO DE MANUTENÇÃO:
     - Para adicionar novos registros E, criar parse_registro_eXXX() e adicionar aqui
+    
+    estatisticas: dicionário de instrumentacao.criar_estatisticas() (a
+    decodificação acontece antes, em ingestao.processar_conteudo_sped)
+    progresso: chamada com (bloco, linha_atual, total_linhas) a cada
+    INTERVALO_PROGRESSO_SEGUNDOS; pode levantar exceção para cancelar
     """
-    linhas = conteudo.split('\n')
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    
+    with medir_etapa(estatisticas, 'bloco_e.divisao_linhas', len(conteudo)) as medida:
+        linhas = conteudo.split('\n')
+        medida['linhas'] = len(linhas)
     
     registros_e100 = []
     registros_e110 = []
     registros_e111 = []
     registros_e116 = []
     
-    for linha in linhas:
+    tempos_registro = {}
+    tipo_atual = None
+    inicio_parse = inicio_tipo = ultimo_aviso = time.perf_counter()
+    
+    for numero_linha, linha in enumerate(linhas):
         linha = linha.strip()
         if not linha:
             continue
         
+        # Tempo por registro: o relógio só é lido quando o tipo muda
+        tipo_registro = linha[1:5]
+        if tipo_registro != tipo_atual:
+            agora = time.perf_counter()
+            tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + agora - inicio_tipo
+            tipo_atual, inicio_tipo = tipo_registro, agora
+            if progresso is not None and agora - ultimo_aviso >= INTERVALO_PROGRESSO_SEGUNDOS:
+                progresso('bloco_e', numero_linha, len(linhas))
+                ultimo_aviso = agora
+        
         if linha.startswith('|E100|'):
             registros_e100.append(parse_registro_e100(linha))
         elif linha.startswith('|E110|'):
@@ -201,12 +229,22 @@ def processar_arquivo_sped_registros_e(conteudo: str) -> Dict[str, pd.DataFrame]
         elif linha.startswith('|E116|'):
             registros_e116.append(parse_registro_e116(linha))
     
-    return {
-        'E100': pd.DataFrame(registros_e100),
-        'E110': pd.DataFrame(registros_e110),
-        'E111': pd.DataFrame(registros_e111),
-        'E116': pd.DataFrame(registros_e116)
-    }
+    fim_parse = time.perf_counter()
+    tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + fim_parse - inicio_tipo
+    registrar_etapa(estatisticas, 'bloco_e.parse', fim_parse - inicio_parse, len(conteudo), len(linhas))
+    if progresso is not None:
+        progresso('bloco_e', len(linhas), len(linhas))
+    
+    with medir_etapa(estatisticas, 'bloco_e.dataframes'):
+        resultado = {
+            'E100': pd.DataFrame(registros_e100),
+            'E110': pd.DataFrame(registros_e110),
+            'E111': pd.DataFrame(registros_e111),
+            'E116': pd.DataFrame(registros_e116)
+        }
+    registrar_registros(estatisticas, tempos_registro, resultado)
+    
+    return resultado
 
 
 def processar_multiplos_speds_registros_e(uploaded_files) -> Dict[str, pd.DataFrame]:
@@ -0,0 +1,483 @@
+"""
+================================================================================
+MÓDULO: Parser Vetorizado do Bloco C (NumPy) - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Tirar do Python o laço por linha do bloco C (C170 e C190 dominam o
+    tempo de parse): os delimitadores de um trecho inteiro do arquivo são
+    localizados de uma vez com NumPy e os campos são convertidos por coluna.
+
+FUNCIONAMENTO (por trecho de TAMANHO_TRECHO bytes, alinhado em '\\n'):
+    1. O trecho vira um array uint8 (sem cópia) e np.flatnonzero() acha
+       todas as posições de '|' e de '\\n' em uma passada
+    2. searchsorted() dá, para cada linha, o primeiro '|' e a quantidade de
+       campos; o tipo (campos[1]) vira um inteiro de 4 bytes para comparação
+    3. Para cada registro, início/fim de cada campo saem por indexação dos
+       arrays de '|' (um par de arrays por coluna, sem laço por linha)
+    4. Conversão em bloco a partir dos deslocamentos:
+       - números: os bytes são reunidos em largura fixa e os dígitos viram
+         um inteiro por aritmética vetorizada (converter_numerico_matriz);
+         formatos fora do padrão vão para converter_numerico_bytes
+       - códigos: os valores em largura fixa são agrupados como inteiros
+         (pd.factorize) e só cada valor distinto é decodificado
+       - texto livre: decodificado valor a valor
+    5. O C100 "pai" de cada filho é o último C100 válido antes dele
+       (searchsorted nas posições), como no laço do sped_parser.py
+    Trechos limitam a memória dos arrays de posições (~8 bytes por '|').
+
+PROJEÇÃO:
+    Com projecao (parser_colunar.colunas_projetadas), os deslocamentos só
+    são calculados para as colunas pedidas e registros fora da projeção
+    nem têm as linhas selecionadas: memória e tempo de conversão caem na
+    proporção das colunas descartadas (a varredura do trecho é a mesma).
+
+FILTRO:
+    Com filtro (filtros_leitura.py), só os campos filtrados dos C100 são
+    decodificados; os filhos de C100 recusado saem na ligação com o pai,
+    antes de qualquer campo deles ser lido. O CFOP de C170/C190 é
+    comparado antes das demais colunas. C100 cancelado (EXCLUIR_CANCELADOS)
+    é recusado e só as COLUNAS_CANCELADOS dele são lidas.
+
+EQUIVALÊNCIA:
+    Mesmo resultado de sped_parser.processar_arquivo_sped() e do
+    parser_colunar.py (layouts, colunas *_PAI, regras de linha inválida e
+    conferência do bloco 9 vêm do parser_colunar). Arquivo com byte nulo
+    usa o caminho valor a valor (a largura fixa não distingue '\\x00' final).
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novo registro C: incluir em parser_colunar.PARSERS_REGISTROS
+    2. Campos de código muito largos (> LARGURA_MAXIMA_FIXA) são
+       decodificados valor a valor
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from filtros_leitura import (
+    COLUNAS_CANCELADOS, REGISTRO_CANCELADOS, REGISTROS_CFOP, campos_c100, mascara_c100, mascara_cancelados,
+    mascara_cfop, preparar_filtro,
+)
+from instrumentacao import criar_estatisticas, medir_etapa, registrar_etapa, registrar_registros
+from parser_colunar import (
+    CAMPOS_TEXTO_LIVRE, COLUNAS_PAI, LAYOUTS, PARSERS_REGISTROS, colunas_projetadas, converter_numerico_bytes,
+    ler_bloco_9, verificar_bloco_9,
+)
+from sped_parser import COLUNAS_NUMERICAS
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+TAMANHO_TRECHO = 32 * 1024 * 1024
+
+# Acima desta largura, códigos e números são lidos valor a valor
+LARGURA_MAXIMA_FIXA = 64
+
+# Dígitos que cabem sem perda no inteiro de converter_numerico_matriz()
+MAXIMO_DIGITOS = 15
+
+PIPE = ord('|')
+NOVA_LINHA = ord('\n')
+
+
+def _codigo_tipo(tipo: bytes) -> int:
+    """
+    Tipo de registro de 4 bytes como inteiro (comparação vetorizada).
+    """
+    return int.from_bytes(tipo, 'big')
+
+
+CODIGOS_REGISTROS = {_codigo_tipo(registro.encode('ascii')): registro for registro in PARSERS_REGISTROS}
+
+# Campos do C100 copiados para os filhos (união de COLUNAS_PAI)
+CAMPOS_PAI = sorted({campo for campos in COLUNAS_PAI.values() for campo in campos})
+
+
+# ============================================================================
+# VARREDURA DOS DELIMITADORES
+# ============================================================================
+
+def limites_trechos(conteudo: bytes, tamanho: int = TAMANHO_TRECHO) -> List[Tuple[int, int]]:
+    """
+    Divide o arquivo em trechos de ~tamanho bytes terminados logo após um '\\n'.
+    """
+    limites = []
+    inicio = 0
+    while inicio < len(conteudo):
+        fim = conteudo.find(b'\n', min(inicio + tamanho, len(conteudo)) - 1)
+        fim = len(conteudo) if fim < 0 else fim + 1
+        limites.append((inicio, fim))
+        inicio = fim
+    return limites
+
+
+def varrer_trecho(bytes_arquivo: np.ndarray, inicio: int, fim: int) -> dict:
+    """
+    Posições de '|' e '\\n' do trecho e, por linha, início, fim, primeiro '|',
+    quantidade de '|' e tipo do registro (posições absolutas no arquivo).
+    """
+    trecho = bytes_arquivo[inicio:fim]
+    quebras = np.flatnonzero(trecho == NOVA_LINHA) + inicio
+    pipes = np.flatnonzero(trecho == PIPE) + inicio
+
+    # Mesmas linhas de conteudo.split(b'\n'): a última pode não ter '\n'
+    fins = quebras if fim != len(bytes_arquivo) else np.append(quebras, fim)
+    inicios = np.concatenate(([inicio], quebras + 1))[:len(fins)]
+
+    primeiro = np.searchsorted(pipes, inicios)
+    quantidade_pipes = np.searchsorted(pipes, fins) - primeiro
+
+    # Tipo = campos[1]: do 1º '|' ao 2º (ou ao fim da linha)
+    tem_tipo = quantidade_pipes >= 1
+    maximo = max(len(pipes) - 1, 0)
+    inicio_tipo = pipes[np.minimum(primeiro, maximo)] + 1 if len(pipes) else np.zeros(len(fins), dtype=np.int64)
+    fim_tipo = np.where(quantidade_pipes >= 2, pipes[np.minimum(primeiro + 1, maximo)] if len(pipes) else 0, fins)
+
+    tipos = np.zeros(len(fins), dtype=np.int64)
+    quatro = tem_tipo & (fim_tipo - inicio_tipo == 4)
+    posicoes = inicio_tipo[quatro]
+    tipos[quatro] = (
+        (bytes_arquivo[posicoes].astype(np.int64) << 24) | (bytes_arquivo[posicoes + 1].astype(np.int64) << 16)
+        | (bytes_arquivo[posicoes + 2].astype(np.int64) << 8) | bytes_arquivo[posicoes + 3].astype(np.int64)
+    )
+
+    return {
+        'pipes': pipes, 'inicios': inicios, 'fins': fins, 'primeiro': primeiro,
+        'quantidade_pipes': quantidade_pipes, 'tipos': tipos, 'tem_tipo': tem_tipo,
+        'quatro': quatro, 'inicio_tipo': inicio_tipo, 'fim_tipo': fim_tipo,
+    }
+
+
+def contar_tipos(conteudo: bytes, varredura: dict, contagens: Dict[str, int]):
+    """
+    Soma em contagens as linhas de cada tipo do trecho (conferência do bloco 9).
+    """
+    codigos, quantidades = np.unique(varredura['tipos'][varredura['quatro']], return_counts=True)
+    for codigo, quantidade in zip(codigos.tolist(), quantidades.tolist()):
+        tipo = codigo.to_bytes(4, 'big').decode('latin-1')
+        contagens[tipo] = contagens.get(tipo, 0) + quantidade
+
+    # Tipos com outro tamanho (raros): um a um
+    for linha in np.flatnonzero(varredura['tem_tipo'] & ~varredura['quatro']).tolist():
+        tipo = conteudo[varredura['inicio_tipo'][linha]:varredura['fim_tipo'][linha]].decode('latin-1')
+        contagens[tipo] = contagens.get(tipo, 0) + 1
+
+
+def deslocamentos_campo(varredura: dict, linhas: np.ndarray, indice: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Início e fim de campos[indice] (linha.split(b'|')) nas linhas indicadas.
+    Campo inexistente (linha curta) vira vazio.
+    """
+    pipes = varredura['pipes']
+    primeiro = varredura['primeiro'][linhas]
+    quantidade = varredura['quantidade_pipes'][linhas]
+    maximo = len(pipes) - 1
+
+    inicios = pipes[np.minimum(primeiro + indice - 1, maximo)] + 1
+    fins = np.where(indice < quantidade, pipes[np.minimum(primeiro + indice, maximo)], varredura['fins'][linhas])
+    existe = indice <= quantidade
+    return np.where(existe, inicios, 0), np.where(existe, fins, 0)
+
+
+# ============================================================================
+# CONVERSÃO EM BLOCO
+# ============================================================================
+
+def _largura_fixa(larguras: np.ndarray) -> int:
+    """
+    Largura da matriz de bytes (múltiplo de 8, para agrupar como uint64).
+    """
+    maior = int(larguras.max()) if len(larguras) else 0
+    return max(8, -(-maior // 8) * 8)
+
+
+def _reunir(bytes_arquivo: np.ndarray, inicios: np.ndarray, fins: np.ndarray, largura: int) -> np.ndarray:
+    """
+    Matriz (linhas x largura) com os bytes de cada campo, completada com zeros.
+
+    Cada linha da matriz é uma janela do arquivo copiada de uma vez
+    (sliding_window_view), sem montar uma matriz de índices.
+    """
+    if len(bytes_arquivo) < largura:
+        bytes_arquivo = np.concatenate((bytes_arquivo, np.zeros(largura, dtype=np.uint8)))
+    janelas = np.lib.stride_tricks.sliding_window_view(bytes_arquivo, largura)
+    matriz = janelas[np.minimum(inicios, len(janelas) - 1)]
+
+    # Campo que começa perto do fim do arquivo: a janela foi recuada
+    recuados = np.flatnonzero(inicios > len(janelas) - 1)
+    for linha in recuados.tolist():
+        trecho = bytes_arquivo[inicios[linha]:fins[linha]]
+        matriz[linha] = 0
+        matriz[linha, :len(trecho)] = trecho
+
+    matriz[np.arange(largura) >= (fins - inicios)[:, None]] = 0
+    return matriz
+
+
+def _fatiar(conteudo: bytes, inicios: np.ndarray, fins: np.ndarray) -> np.ndarray:
+    """
+    Cada campo como um objeto bytes (caminho valor a valor).
+    """
+    return np.array([conteudo[a:b] for a, b in zip(inicios.tolist(), fins.tolist())], dtype=object)
+
+
+def converter_numerico_matriz(matriz: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Números no formato do SPED ('-1234,56') direto da matriz de bytes, por aritmética.
+
+    Mesmo resultado de converter_numerico_bytes(): int64 se nenhum valor tem
+    vírgula nem é vazio, senão float64 (vazio = 0). Os dígitos formam um
+    inteiro exato e a divisão pela potência de 10 arredonda como o float().
+
+    RETORNA:
+        None se algum valor foge do formato (o chamador usa o caminho geral)
+    """
+    digito = (matriz >= ord('0')) & (matriz <= ord('9'))
+    virgula = matriz == ord(',')
+    menos = matriz == ord('-')
+    quantidade_digitos = digito.sum(axis=1)
+    if (not (digito | virgula | menos | (matriz == 0)).all() or menos[:, 1:].any()
+            or (virgula.sum(axis=1) > 1).any() or quantidade_digitos.max(initial=0) > MAXIMO_DIGITOS):
+        return None
+
+    mantissa = np.zeros(len(matriz), dtype=np.int64)
+    for coluna in range(matriz.shape[1]):
+        mantissa = np.where(digito[:, coluna], mantissa * 10 + (matriz[:, coluna] - ord('0')), mantissa)
+    mantissa = np.where(menos[:, 0], -mantissa, mantissa)
+
+    if not virgula.any() and quantidade_digitos.min(initial=1) > 0:
+        return mantissa
+    decimais = (digito & (np.cumsum(virgula, axis=1) > 0)).sum(axis=1)
+    return mantissa / 10.0 ** decimais
+
+
+def coluna_numerica(conteudo: bytes, bytes_arquivo: np.ndarray, inicios: np.ndarray, fins: np.ndarray,
+                    exato: bool) -> np.ndarray:
+    """
+    Campo numérico convertido em bloco a partir dos deslocamentos.
+    """
+    largura = _largura_fixa(fins - inicios)
+    if exato or largura > LARGURA_MAXIMA_FIXA:
+        return converter_numerico_bytes(_fatiar(conteudo, inicios, fins))
+    matriz = _reunir(bytes_arquivo, inicios, fins, largura)
+    numeros = converter_numerico_matriz(matriz)
+    if numeros is None:
+        numeros = converter_numerico_bytes(matriz.view(f'S{largura}').ravel())
+    return numeros
+
+
+def coluna_codigos(conteudo: bytes, bytes_arquivo: np.ndarray, inicios: np.ndarray, fins: np.ndarray,
+                   exato: bool) -> np.ndarray:
+    """
+    Campo de código: valores agrupados como inteiros; só os distintos são decodificados.
+    """
+    larguras = fins - inicios
+    largura = _largura_fixa(larguras)
+    if exato or largura > LARGURA_MAXIMA_FIXA:
+        posicoes, distintos = pd.factorize(_fatiar(conteudo, inicios, fins))
+        return np.array([valor.decode('latin-1') for valor in distintos], dtype=object)[posicoes]
+
+    palavras = _reunir(bytes_arquivo, inicios, fins, largura).view(np.uint64)
+    grupos, _ = pd.factorize(larguras)
+    for coluna in range(palavras.shape[1]):
+        codigos, distintos = pd.factorize(palavras[:, coluna])
+        grupos, _ = pd.factorize(grupos * len(distintos) + codigos)
+
+    # Primeira ocorrência de cada grupo (factorize numera na ordem de aparição)
+    quantidade = int(grupos.max()) + 1 if len(grupos) else 0
+    primeiras = np.empty(quantidade, dtype=np.int64)
+    primeiras[grupos[::-1]] = np.arange(len(grupos) - 1, -1, -1)
+    textos = [conteudo[a:b].decode('latin-1') for a, b in zip(inicios[primeiras].tolist(), fins[primeiras].tolist())]
+    return np.array(textos, dtype=object)[grupos]
+
+
+def coluna_texto_livre(conteudo: bytes, inicios: np.ndarray, fins: np.ndarray) -> np.ndarray:
+    """
+    Campo de texto livre decodificado valor a valor.
+    """
+    return np.array([conteudo[a:b].decode('latin-1') for a, b in zip(inicios.tolist(), fins.tolist())],
+                    dtype=object)
+
+
+# ============================================================================
+# PARSE
+# ============================================================================
+
+def _ligar_pais(varredura: dict, linhas_c100: np.ndarray, aceitos: np.ndarray, linhas: np.ndarray,
+                pai_anterior: Optional[dict], campos: List[str]):
+    """
+    Para cada linha filha, o último C100 válido antes dela. Filhos sem C100
+    antes ou de C100 recusado pelo filtro (aceitos False) ficam de fora.
+
+    pai_anterior: último C100 do trecho anterior ({campo: (início, fim)} e 'aceito')
+
+    RETORNA:
+        (linhas que têm pai, {campo: (inícios, fins)} do pai de cada uma, só dos campos pedidos)
+    """
+    deslocamentos = {campo: deslocamentos_campo(varredura, linhas_c100, LAYOUTS['C100']['indices'][
+        LAYOUTS['C100']['colunas'].index(campo)]) for campo in campos}
+
+    # Posição 0: o último C100 do trecho anterior (se houver e foi aceito)
+    pai = np.searchsorted(varredura['inicios'][linhas_c100], varredura['inicios'][linhas], side='right')
+    anterior_aceito = pai_anterior is not None and pai_anterior['aceito']
+    manter = np.concatenate(([anterior_aceito], aceitos))[pai]
+    linhas, pai = linhas[manter], pai[manter]
+    return linhas, {
+        campo: (np.concatenate(([pai_anterior[campo][0] if anterior_aceito else 0], inicios))[pai],
+                np.concatenate(([pai_anterior[campo][1] if anterior_aceito else 0], fins))[pai])
+        for campo, (inicios, fins) in deslocamentos.items()
+    }
+
+
+def processar_arquivo_sped_vetorizado(conteudo: bytes, estatisticas: Optional[dict] = None,
+                                      progresso=None,
+                                      projecao: Optional[Dict[str, List[str]]] = None,
+                                      filtro: Optional[dict] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Mesmo resultado de sped_parser.processar_arquivo_sped() (ver cabeçalho).
+
+    estatisticas / progresso / projecao / filtro: como em
+    processar_arquivo_sped(); o progresso é avisado ao fim de cada trecho
+    """
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    filtro = preparar_filtro(filtro)
+    indices_c100 = dict(zip(LAYOUTS['C100']['colunas'], LAYOUTS['C100']['indices']))
+    campos_filtro = [(campo, indices_c100[campo]) for campo in campos_c100(filtro)] if filtro else []
+    filtrar_cfop = filtro is not None and filtro['cfop'] is not None
+
+    with medir_etapa(estatisticas, 'bloco_c.bloco_9'):
+        bloco_9 = ler_bloco_9(conteudo)
+
+    bytes_arquivo = np.frombuffer(conteudo, dtype=np.uint8)
+    exato = b'\x00' in conteudo
+    total_linhas = conteudo.count(b'\n') + 1
+
+    projetadas = {registro: colunas_projetadas(registro, projecao) for registro in PARSERS_REGISTROS}
+    partes = {registro: {} for registro in PARSERS_REGISTROS}
+    separar_cancelados = filtro is not None and filtro['cancelados'] is not None
+    if separar_cancelados:
+        partes[REGISTRO_CANCELADOS] = {}
+    contagens = {}
+    pai_anterior = None
+    tempos = {'parse': 0.0, 'filtro': 0.0, 'decodificacao': 0.0, 'conversao_numerica': 0.0}
+    tempos_registro = {}
+    linhas_lidas = 0
+
+    for inicio, fim in limites_trechos(conteudo, TAMANHO_TRECHO):
+        marca = time.perf_counter()
+        varredura = varrer_trecho(bytes_arquivo, inicio, fim)
+        contar_tipos(conteudo, varredura, contagens)
+
+        linhas_por_registro = {}
+        for codigo, registro in CODIGOS_REGISTROS.items():
+            # O C100 é sempre lido: define o pai (e a validade) dos filhos
+            if not projetadas[registro] and registro != 'C100':
+                continue
+            linhas = np.flatnonzero((varredura['tipos'] == codigo)
+                                    & (varredura['quantidade_pipes'] + 1 >= LAYOUTS[registro]['minimo']))
+            linhas_por_registro[registro] = linhas
+        linhas_c100 = linhas_por_registro['C100']
+        tempos['parse'] += time.perf_counter() - marca
+
+        marca = time.perf_counter()
+        aceitos = np.ones(len(linhas_c100), dtype=bool)
+        if campos_filtro:
+            valores = {
+                campo: coluna_codigos(conteudo, bytes_arquivo, *deslocamentos_campo(varredura, linhas_c100, indice),
+                                      exato)
+                for campo, indice in campos_filtro
+            }
+            aceitos = mascara_c100(filtro, valores, len(linhas_c100))
+            if separar_cancelados:
+                cancelados = aceitos & mascara_cancelados(filtro, valores['COD_SIT'])
+                if cancelados.any():
+                    linhas_canceladas = linhas_c100[cancelados]
+                    for coluna in COLUNAS_CANCELADOS:
+                        partes[REGISTRO_CANCELADOS].setdefault(coluna, []).append(coluna_codigos(
+                            conteudo, bytes_arquivo,
+                            *deslocamentos_campo(varredura, linhas_canceladas, indices_c100[coluna]), exato))
+                aceitos &= ~cancelados
+        linhas_por_registro['C100'] = linhas_c100[aceitos]
+        tempos['filtro'] += time.perf_counter() - marca
+
+        for registro, linhas in linhas_por_registro.items():
+            pedidas = projetadas[registro]
+            if not pedidas:
+                continue
+            inicio_registro = time.perf_counter()
+            layout = LAYOUTS[registro]
+            campos_pai = [campo for campo in COLUNAS_PAI.get(registro, []) if f'{campo}_PAI' in pedidas]
+            pais = {}
+            if registro in COLUNAS_PAI:
+                linhas, pais = _ligar_pais(varredura, linhas_c100, aceitos, linhas, pai_anterior, campos_pai)
+            if filtrar_cfop and registro in REGISTROS_CFOP and len(linhas):
+                marca = time.perf_counter()
+                indice = layout['indices'][layout['colunas'].index('CFOP')]
+                manter = mascara_cfop(filtro, coluna_codigos(
+                    conteudo, bytes_arquivo, *deslocamentos_campo(varredura, linhas, indice), exato))
+                linhas = linhas[manter]
+                pais = {campo: (inicios[manter], fins[manter]) for campo, (inicios, fins) in pais.items()}
+                tempos['filtro'] += time.perf_counter() - marca
+            if not len(linhas):
+                continue
+
+            numericas = set(COLUNAS_NUMERICAS.get(registro, []))
+            colunas = [(coluna, deslocamentos_campo(varredura, linhas, indice))
+                       for coluna, indice in zip(layout['colunas'], layout['indices']) if coluna in pedidas]
+            colunas += [(f'{campo}_PAI', pais[campo]) for campo in campos_pai]
+
+            for coluna, (inicios, fins) in colunas:
+                marca = time.perf_counter()
+                if coluna in numericas:
+                    valores = coluna_numerica(conteudo, bytes_arquivo, inicios, fins, exato)
+                    tempos['conversao_numerica'] += time.perf_counter() - marca
+                elif coluna in CAMPOS_TEXTO_LIVRE:
+                    valores = coluna_texto_livre(conteudo, inicios, fins)
+                    tempos['decodificacao'] += time.perf_counter() - marca
+                else:
+                    valores = coluna_codigos(conteudo, bytes_arquivo, inicios, fins, exato)
+                    tempos['decodificacao'] += time.perf_counter() - marca
+                partes[registro].setdefault(coluna, []).append(valores)
+            tempos_registro[registro] = tempos_registro.get(registro, 0.0) + time.perf_counter() - inicio_registro
+
+        # Último C100 válido segue como pai (ou como recusado) no próximo trecho
+        if len(linhas_c100):
+            ultimo = linhas_c100[-1:]
+            pai_anterior = {
+                campo: tuple(int(valor[0]) for valor in deslocamentos_campo(varredura, ultimo, indices_c100[campo]))
+                for campo in CAMPOS_PAI
+            }
+            pai_anterior['aceito'] = bool(aceitos[-1])
+
+        linhas_lidas += len(varredura['fins'])
+        if progresso is not None:
+            progresso('bloco_c', min(linhas_lidas, total_linhas), total_linhas)
+
+    registrar_etapa(estatisticas, 'bloco_c.parse', tempos['parse'], len(conteudo), total_linhas)
+    if filtro is not None:
+        registrar_etapa(estatisticas, 'bloco_c.filtro', tempos['filtro'])
+    for etapa in ('decodificacao', 'conversao_numerica'):
+        registrar_etapa(estatisticas, f'bloco_c.{etapa}', tempos[etapa])
+    if progresso is not None:
+        progresso('bloco_c', total_linhas, total_linhas)
+
+    estatisticas['divergencias'].extend(verificar_bloco_9(bloco_9, contagens, sum(contagens.values())))
+
+    with medir_etapa(estatisticas, 'bloco_c.dataframes'):
+        resultado = {
+            registro: pd.DataFrame({coluna: np.concatenate(valores) for coluna, valores in colunas.items()})
+            if colunas else pd.DataFrame()
+            for registro, colunas in partes.items()
+        }
+
+    registrar_registros(estatisticas, tempos_registro, resultado)
+    return resultado
@@ -0,0 +1,206 @@
+"""
+================================================================================
+MÓDULO: Perfilamento Sob Demanda - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Capturar o perfil completo de uma execução (rerun) do app.py com dados
+    reais, para investigar reruns lentos sem precisar de um depurador.
+
+ATIVAÇÃO (desligado por padrão):
+    - Variável de ambiente SPED_PROFILE=1 (todas as execuções)
+    - Parâmetro oculto na URL: ?profile=1 (só a sessão que abriu a URL)
+
+SAÍDA:
+    Um diretório por execução em perfis/<AAAAMMDD-HHMMSS>_<sessao>/ com:
+    - perfil.pstats: perfil determinístico (cProfile), para pstats/snakeviz
+    - pilhas.collapsed: pilhas amostradas no formato "a;b;c contagem",
+      pronto para flamegraph.pl, speedscope ou inferno
+    - resumo.txt: 40 funções com maior tempo acumulado
+
+FUNCIONAMENTO:
+    1. iniciar_perfil() liga o cProfile na thread da execução e uma thread
+       auxiliar que amostra a pilha dessa thread a cada INTERVALO_AMOSTRAGEM
+    2. finalizar_perfil() desliga os dois e grava os arquivos
+    3. Execução interrompida por um novo rerun (clique durante o
+       processamento) é finalizada no início da execução seguinte, com
+       situação "interrompida" no resumo.txt
+
+IMPORTANTE:
+    - O cProfile deixa a execução mais lenta; os tempos absolutos servem
+      para comparar funções entre si, não para medir o app em produção
+    - As pilhas amostradas incluem o custo do próprio cProfile
+
+GATILHOS DE MANUTENÇÃO:
+    1. Diretório de saída: variável SPED_PROFILE_DIR
+    2. Novo formato de saída: incluir em finalizar_perfil()
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+import streamlit as st
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+VARIAVEL_ATIVACAO = 'SPED_PROFILE'
+VARIAVEL_DIRETORIO = 'SPED_PROFILE_DIR'
+DIRETORIO_PADRAO = 'perfis'
+
+# Intervalo entre amostras da pilha (segundos)
+INTERVALO_AMOSTRAGEM = 0.005
+
+# Funções listadas no resumo.txt
+FUNCOES_RESUMO = 40
+
+
+# ============================================================================
+# CAPTURA
+# ============================================================================
+
+def _descrever_quadro(quadro) -> str:
+    """
+    Nome do quadro no formato das pilhas colapsadas: arquivo.py:funcao
+    """
+    codigo = quadro.f_code
+    return f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}"
+
+
+def _amostrar(perfil: dict):
+    """
+    Laço da thread auxiliar: conta a pilha atual da thread perfilada.
+    """
+    while not perfil['parar'].wait(perfil['intervalo']):
+        quadro = sys._current_frames().get(perfil['thread_alvo'])
+        if quadro is None:
+            continue
+        pilha = []
+        while quadro is not None:
+            pilha.append(_descrever_quadro(quadro))
+            quadro = quadro.f_back
+        perfil['pilhas'][';'.join(reversed(pilha))] += 1
+
+
+def iniciar_perfil(sessao: str, intervalo: float = INTERVALO_AMOSTRAGEM) -> dict:
+    """
+    Liga o cProfile e a amostragem de pilhas na thread atual.
+
+    RETORNA:
+        Dicionário do perfil em andamento (entregar a finalizar_perfil)
+    """
+    perfil = {
+        'sessao': sessao,
+        'inicio': datetime.now(),
+        'relogio': time.perf_counter(),
+        'intervalo': intervalo,
+        'thread_alvo': threading.get_ident(),
+        'pilhas': Counter(),
+        'parar': threading.Event(),
+        'profile': cProfile.Profile(),
+    }
+    perfil['amostrador'] = threading.Thread(
+        target=_amostrar, args=(perfil,), name='sped-perfil-amostrador', daemon=True
+    )
+    perfil['amostrador'].start()
+    perfil['profile'].enable()
+    return perfil
+
+
+def formatar_pilhas_colapsadas(pilhas: Dict[str, int]) -> str:
+    """
+    Uma linha "quadro;quadro;quadro contagem" por pilha, da mais frequente.
+    """
+    return ''.join(f"{pilha} {contagem}\n" for pilha, contagem in Counter(pilhas).most_common())
+
+
+def finalizar_perfil(perfil: dict, situacao: str = 'completa', diretorio_base: Optional[str] = None) -> str:
+    """
+    Desliga a captura e grava perfil.pstats, pilhas.collapsed e resumo.txt.
+
+    RETORNA:
+        Caminho do diretório gravado
+    """
+    perfil['profile'].disable()
+    perfil['parar'].set()
+    perfil['amostrador'].join()
+    segundos = time.perf_counter() - perfil['relogio']
+
+    diretorio_base = diretorio_base or os.environ.get(VARIAVEL_DIRETORIO, DIRETORIO_PADRAO)
+    diretorio = os.path.join(diretorio_base, f"{perfil['inicio']:%Y%m%d-%H%M%S}_{perfil['sessao']}")
+    os.makedirs(diretorio, exist_ok=True)
+
+    perfil['profile'].dump_stats(os.path.join(diretorio, 'perfil.pstats'))
+
+    with open(os.path.join(diretorio, 'pilhas.collapsed'), 'w', encoding='utf-8') as destino:
+        destino.write(formatar_pilhas_colapsadas(perfil['pilhas']))
+
+    texto = io.StringIO()
+    pstats.Stats(perfil['profile'], stream=texto).sort_stats('cumulative').print_stats(FUNCOES_RESUMO)
+    with open(os.path.join(diretorio, 'resumo.txt'), 'w', encoding='utf-8') as destino:
+        destino.write(f"Sessão: {perfil['sessao']}\n")
+        destino.write(f"Início: {perfil['inicio']:%d/%m/%Y %H:%M:%S}\n")
+        destino.write(f"Situação: {situacao}\n")
+        destino.write(f"Duração: {segundos:.3f} s\n")
+        destino.write(f"Amostras de pilha: {sum(perfil['pilhas'].values())}\n\n")
+        destino.write(texto.getvalue())
+
+    return diretorio
+
+
+# ============================================================================
+# INTEGRAÇÃO COM O APP
+# ============================================================================
+
+def perfilamento_ativo() -> bool:
+    """
+    True com SPED_PROFILE=1 no ambiente ou ?profile=1 na URL.
+    """
+    if os.environ.get(VARIAVEL_ATIVACAO, '').lower() in ('1', 'true', 'sim'):
+        return True
+    return st.query_params.get('profile') == '1'
+
+
+def iniciar_perfil_execucao():
+    """
+    Chamada no início do app.py: inicia o perfil desta execução, se ativo.
+
+    IMPORTANTE:
+    - Perfil deixado por uma execução interrompida é gravado antes
+    """
+    anterior = st.session_state.pop('_perfil_em_andamento', None)
+    if anterior is not None:
+        finalizar_perfil(anterior, situacao='interrompida')
+
+    if not perfilamento_ativo():
+        return
+
+    sessao = st.session_state.setdefault('_id_sessao_perfil', uuid.uuid4().hex[:8])
+    st.session_state['_perfil_em_andamento'] = iniciar_perfil(sessao)
+
+
+def finalizar_perfil_execucao():
+    """
+    Chamada no fim do app.py: grava o perfil desta execução, se houver.
+    """
+    perfil = st.session_state.pop('_perfil_em_andamento', None)
+    if perfil is None:
+        return
+
+    diretorio = finalizar_perfil(perfil)
+    st.caption(f"🔬 Perfil desta execução salvo em `{diretorio}`")
@@ -0,0 +1,413 @@
+"""
+================================================================================
+MÓDULO: Ingestão em Pipeline - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Sobrepor as etapas da ingestão entre arquivos e membros de ZIP: enquanto
+    um SPED é analisado, os próximos já estão sendo descompactados. Em
+    uploads com vários ZIPs, o tempo total se aproxima da etapa mais lenta
+    em vez da soma de todas.
+
+FUNCIONAMENTO (produtor/consumidor):
+    1. Threads de descompactação leem cada .txt (zlib libera o GIL) e
+       colocam o conteúdo em uma fila LIMITADA (TAMANHO_FILA)
+    2. A thread principal retira da fila e envia para processos de trabalho
+       (spawn), que executam ingestao.processar_conteudo_sped()
+    3. No máximo PROCESSOS * 2 SPEDs ficam em análise ao mesmo tempo
+    4. Fila cheia bloqueia as threads (contrapressão): a memória fica
+       limitada a ~(TAMANHO_FILA + em análise + threads) SPEDs, não ao upload
+    5. Os resultados são consolidados na ORDEM dos arquivos, igual a
+       ingestao.carregar_dataset(): o dataset é idêntico ao sequencial
+
+ESTATÍSTICAS:
+    - As etapas de cada processo são somadas (mesclar_estatisticas); como
+      rodam em paralelo, a soma das etapas passa do 'ingestao.total'
+    - 'pipeline.espera_fila': tempo esperando descompactação (ela é o gargalo)
+    - 'pipeline.espera_analise': tempo esperando os processos (a análise é)
+
+QUANDO USAR (usar_pipeline):
+    - SPED_INGESTAO_PIPELINE=1 sempre; =0 nunca; padrão 'auto': mais de um
+      SPED (vários arquivos ou ZIP), pelo menos MINIMO_MB_AUTOMATICO
+      descompactados e mais de um processo (mais de uma CPU)
+    - Abaixo disso o custo de enviar os DataFrames entre processos não
+      compensa; com uma CPU só o tempo fica igual ao sequencial
+    - O primeiro upload paga a criação dos processos (spawn + pandas)
+
+PROGRESSO E CANCELAMENTO:
+    - Mesmos parâmetros e eventos de ingestao.carregar_dataset(); os
+      processos enviam o andamento por uma fila de um Manager (criado só
+      quando há progresso/cancelamento) e a thread principal repassa
+    - Cancelar (ou qualquer exceção, inclusive a interrupção do script pelo
+      Streamlit) marca um Event do Manager: cada processo para no próximo
+      aviso do parser (~INTERVALO_PROGRESSO_SEGUNDOS) e descarta o que leu
+
+GATILHOS DE MANUTENÇÃO:
+    1. Processos: variável SPED_PIPELINE_PROCESSOS (padrão: até 4)
+    2. O pool de processos (e o Manager) é único no servidor e reaproveitado
+       entre uploads; encerrar_pipeline() os desliga (registrado no atexit)
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from ingestao import (
+    IngestaoCancelada, consolidar_resultados, evento_progresso, montar_dataset, processar_conteudo_sped,
+    separar_upload, tamanho_descompactado, verificar_cancelamento,
+)
+from cache_arquivos import guardar_arquivo, ordenar_resultados
+from filtros_leitura import preparar_filtro
+from formatacao import BYTES_POR_MB
+from instrumentacao import criar_estatisticas, medir_etapa, mesclar_estatisticas, registrar_etapa, registrar_log
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+PROCESSOS_PADRAO = min(4, os.cpu_count() or 1)
+THREADS_DESCOMPACTACAO = 2
+TAMANHO_FILA = 2
+MINIMO_MB_AUTOMATICO = 20
+
+# Espera máxima da thread principal antes de repassar progresso/cancelamento
+INTERVALO_VERIFICACAO = 0.1
+
+_trava_executor = threading.Lock()
+_executor = {'pool': None, 'processos': 0, 'gerenciador': None}
+
+
+def _processos_configurados() -> int:
+    """
+    Processos de trabalho a partir de SPED_PIPELINE_PROCESSOS.
+    """
+    try:
+        return max(1, int(os.environ.get('SPED_PIPELINE_PROCESSOS', PROCESSOS_PADRAO)))
+    except ValueError:
+        return PROCESSOS_PADRAO
+
+
+# ============================================================================
+# POOL DE PROCESSOS (compartilhado entre uploads)
+# ============================================================================
+
+def _obter_executor(processos: int) -> ProcessPoolExecutor:
+    """
+    Pool de processos do servidor, criado na primeira ingestão.
+
+    IMPORTANTE:
+    - spawn: os processos não herdam as threads do servidor Streamlit
+    - Pool quebrado (processo morto por falta de memória) é recriado
+    """
+    with _trava_executor:
+        pool = _executor['pool']
+        quebrado = pool is not None and getattr(pool, '_broken', False)
+        if pool is None or quebrado or _executor['processos'] != processos:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            _executor['pool'] = ProcessPoolExecutor(
+                max_workers=processos, mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor['processos'] = processos
+        return _executor['pool']
+
+
+def _obter_gerenciador():
+    """
+    Manager (spawn) que cria as filas de progresso e os eventos de cancelamento
+    compartilhados com o pool; criado no primeiro upload acompanhado.
+    """
+    with _trava_executor:
+        if _executor['gerenciador'] is None:
+            _executor['gerenciador'] = multiprocessing.get_context('spawn').Manager()
+        return _executor['gerenciador']
+
+
+def encerrar_pipeline():
+    """
+    Desliga o pool de processos e o Manager (se existirem).
+    """
+    with _trava_executor:
+        if _executor['pool'] is not None:
+            _executor['pool'].shutdown(wait=True, cancel_futures=True)
+            _executor['pool'] = None
+        if _executor['gerenciador'] is not None:
+            _executor['gerenciador'].shutdown()
+            _executor['gerenciador'] = None
+
+
+atexit.register(encerrar_pipeline)
+
+
+def _analisar_em_processo(conteudo: bytes, indice: int = None, fila_progresso=None,
+                          evento_cancelar=None, projecao: dict = None, filtro: dict = None) -> Tuple[dict, dict]:
+    """
+    Executado no processo de trabalho: parsers + estatísticas do SPED.
+
+    Com fila_progresso, envia (indice, fracao, linhas, etapa) a cada aviso
+    dos parsers; com evento_cancelar marcado, para com IngestaoCancelada.
+    """
+    estatisticas = criar_estatisticas()
+    avisar = None
+    if fila_progresso is not None or evento_cancelar is not None:
+        def avisar(fracao, linhas, etapa):
+            verificar_cancelamento(evento_cancelar)
+            if fila_progresso is not None:
+                fila_progresso.put((indice, fracao, linhas, etapa))
+
+    return processar_conteudo_sped(conteudo, estatisticas, avisar, projecao, filtro), estatisticas
+
+
+# ============================================================================
+# DESCOMPACTAÇÃO (threads produtoras)
+# ============================================================================
+
+def listar_speds(uploaded_files) -> List[Tuple[str, object, Optional[str]]]:
+    """
+    Lista (nome_origem, arquivo, membro) de cada SPED, na ordem do upload.
+
+    IMPORTANTE:
+    - membro é o .txt dentro do ZIP (arquivo vira um ZipFile aberto) ou
+      None para .txt enviado direto
+    - ZIP inválido é registrado e ignorado, como em ingestao.ler_arquivos_sped()
+    """
+    speds = []
+    for uploaded_file in uploaded_files:
+        try:
+            uploaded_file.seek(0)
+            if uploaded_file.name.endswith('.zip'):
+                zip_ref = zipfile.ZipFile(uploaded_file, 'r')
+                speds.extend(
+                    (uploaded_file.name, zip_ref, nome)
+                    for nome in zip_ref.namelist() if nome.endswith('.txt')
+                )
+            else:
+                speds.append((uploaded_file.name, uploaded_file, None))
+        except Exception as e:
+            print(f"Erro ao processar {uploaded_file.name}: {str(e)}")
+    return speds
+
+
+def _ler_sped(arquivo, membro: Optional[str], estatisticas: dict) -> bytes:
+    """
+    Conteúdo de um SPED: membro do ZIP descompactado ou o arquivo inteiro.
+    """
+    if membro is None:
+        with medir_etapa(estatisticas, 'leitura') as medida:
+            conteudo = arquivo.getvalue() if hasattr(arquivo, 'getvalue') else arquivo.read()
+            medida['bytes'] = len(conteudo)
+    else:
+        with medir_etapa(estatisticas, 'zip.descompactacao') as medida:
+            conteudo = arquivo.read(membro)
+            medida['bytes'] = len(conteudo)
+    return conteudo
+
+
+def _produzir(speds: list, proximos: queue.Queue, fila: queue.Queue, parar: threading.Event):
+    """
+    Laço de uma thread de descompactação: lê SPEDs e coloca na fila limitada.
+
+    Cada item da fila: (indice, nome_origem, conteudo ou exceção, estatísticas)
+    """
+    while not parar.is_set():
+        try:
+            indice = proximos.get_nowait()
+        except queue.Empty:
+            return
+        nome_origem, arquivo, membro = speds[indice]
+        estatisticas = criar_estatisticas()
+        try:
+            item = (indice, nome_origem, _ler_sped(arquivo, membro, estatisticas), estatisticas)
+        except Exception as e:
+            item = (indice, nome_origem, e, estatisticas)
+        while not parar.is_set():
+            try:
+                fila.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+
+# ============================================================================
+# INGESTÃO
+# ============================================================================
+
+def carregar_dataset_pipeline(uploaded_files, chave: str = '', processos: int = None,
+                              threads: int = THREADS_DESCOMPACTACAO,
+                              tamanho_fila: int = TAMANHO_FILA,
+                              progresso=None, cancelar=None, projecao: dict = None,
+                              filtro: dict = None, incremental: bool = False, hashes: dict = None) -> dict:
+    """
+    Mesmo resultado de ingestao.carregar_dataset(), com as etapas sobrepostas.
+
+    Parâmetros:
+        processos: processos de análise (padrão: SPED_PIPELINE_PROCESSOS)
+        threads: threads de descompactação
+        tamanho_fila: SPEDs descompactados aguardando análise
+        progresso / cancelar / projecao / filtro / incremental / hashes:
+            como em ingestao.carregar_dataset() (só os arquivos novos vão
+            para os processos)
+    """
+    preparar_filtro(filtro)  # filtro inválido falha antes de ler os arquivos
+    estatisticas = criar_estatisticas()
+    inicio = time.perf_counter()
+    processos = processos or _processos_configurados()
+    executor = _obter_executor(processos)
+
+    guardados, novos = separar_upload(uploaded_files, estatisticas, incremental, projecao, filtro, hashes)
+
+    acompanhar = progresso is not None or cancelar is not None
+    bytes_total = tamanho_descompactado([arquivo for _, arquivo, _ in novos]) if acompanhar else 0
+    fila_progresso = evento_cancelar = None
+    if acompanhar:
+        gerenciador = _obter_gerenciador()
+        fila_progresso = gerenciador.Queue() if progresso is not None else None
+        evento_cancelar = gerenciador.Event()
+
+    # SPEDs dos arquivos novos e a posição no upload do arquivo de cada um
+    speds, origens = [], []
+    for posicao, arquivo, _ in novos:
+        speds_arquivo = listar_speds([arquivo])
+        speds.extend(speds_arquivo)
+        origens.extend([posicao] * len(speds_arquivo))
+    proximos = queue.Queue()
+    for indice in range(len(speds)):
+        proximos.put(indice)
+    fila = queue.Queue(maxsize=tamanho_fila)
+    parar = threading.Event()
+    produtores = [
+        threading.Thread(target=_produzir, args=(speds, proximos, fila, parar),
+                         name=f'sped-descompactacao-{i}', daemon=True)
+        for i in range(min(threads, len(speds)))
+    ]
+    for produtor in produtores:
+        produtor.start()
+
+    resultados = {}
+    falhas = set()
+    em_analise = {}
+    # Andamento de cada SPED lido: indice -> [fracao, bytes]
+    andamento = {}
+    espera = {'pipeline.espera_fila': 0.0, 'pipeline.espera_analise': 0.0}
+
+    def avisar(indice, fracao, linhas, etapa):
+        andamento[indice][0] = fracao
+        processados = sum(f * tamanho for f, tamanho in andamento.values())
+        progresso(evento_progresso(speds[indice][0], indice + 1, etapa, linhas, fracao,
+                                   andamento[indice][1], processados, bytes_total))
+
+    def drenar():
+        verificar_cancelamento(cancelar)
+        while fila_progresso is not None:
+            try:
+                avisar(*fila_progresso.get_nowait())
+            except queue.Empty:
+                return
+
+    def coletar(concluidos):
+        for futuro in concluidos:
+            indice, nome_origem = em_analise.pop(futuro)
+            try:
+                resultado, estatisticas_sped = futuro.result()
+            except (BrokenProcessPool, IngestaoCancelada):
+                raise
+            except Exception as e:
+                print(f"Erro ao processar {nome_origem}: {str(e)}")
+                falhas.add(origens[indice])
+                continue
+            mesclar_estatisticas(estatisticas, estatisticas_sped)
+            resultados[indice] = (nome_origem, resultado)
+            if progresso is not None:
+                avisar(indice, 1.0, 0, 'concluido')
+
+    try:
+        recebidos = 0
+        while recebidos < len(speds) or em_analise:
+            drenar()
+            if recebidos < len(speds) and len(em_analise) < processos * 2:
+                inicio_espera = time.perf_counter()
+                try:
+                    item = fila.get(timeout=INTERVALO_VERIFICACAO)
+                except queue.Empty:
+                    continue
+                finally:
+                    espera['pipeline.espera_fila'] += time.perf_counter() - inicio_espera
+                indice, nome_origem, conteudo, estatisticas_leitura = item
+                recebidos += 1
+                mesclar_estatisticas(estatisticas, estatisticas_leitura)
+                if isinstance(conteudo, Exception):
+                    print(f"Erro ao processar {nome_origem}: {str(conteudo)}")
+                    falhas.add(origens[indice])
+                    continue
+
+                andamento[indice] = [0.0, len(conteudo)]
+                futuro = executor.submit(_analisar_em_processo, conteudo, indice, fila_progresso, evento_cancelar,
+                                         projecao, filtro)
+                em_analise[futuro] = (indice, nome_origem)
+                del conteudo, item
+                continue
+
+            inicio_espera = time.perf_counter()
+            concluidos, _ = wait(em_analise, timeout=INTERVALO_VERIFICACAO, return_when=FIRST_COMPLETED)
+            espera['pipeline.espera_analise'] += time.perf_counter() - inicio_espera
+            coletar(concluidos)
+        drenar()
+    except BaseException:
+        # Cancelamento, erro ou interrupção do script: os processos param no próximo aviso
+        if evento_cancelar is not None:
+            evento_cancelar.set()
+        raise
+    finally:
+        parar.set()
+        for futuro in em_analise:
+            futuro.cancel()
+        for produtor in produtores:
+            produtor.join()
+        for _, arquivo, membro in speds:
+            if membro is not None:
+                arquivo.close()
+
+    for etapa, segundos in espera.items():
+        registrar_etapa(estatisticas, etapa, segundos)
+
+    # Resultados por arquivo novo (na ordem dos SPEDs) e os reaproveitados
+    processados = {posicao: [] for posicao, _, _ in novos}
+    for indice in sorted(resultados):
+        processados[origens[indice]].append(resultados[indice])
+    for posicao, _, chave_arquivo in novos:
+        if chave_arquivo is not None and posicao not in falhas:
+            guardar_arquivo(chave_arquivo, processados[posicao])
+
+    dados = consolidar_resultados(ordenar_resultados(guardados, processados), estatisticas)
+    dataset = montar_dataset(dados, [f.name for f in uploaded_files], estatisticas, projecao, filtro)
+
+    registrar_etapa(estatisticas, 'ingestao.total', time.perf_counter() - inicio, estatisticas['bytes'])
+    registrar_log(estatisticas, chave)
+    return dataset
+
+
+def usar_pipeline(uploaded_files) -> bool:
+    """
+    Decide entre a ingestão em pipeline e a sequencial (ver cabeçalho).
+    """
+    modo = os.environ.get('SPED_INGESTAO_PIPELINE', 'auto').lower()
+    if modo in ('1', 'true', 'sim'):
+        return True
+    if modo in ('0', 'false', 'nao', 'não'):
+        return False
+
+    varios_speds = len(uploaded_files) > 1 or any(f.name.endswith('.zip') for f in uploaded_files)
+    total_mb = tamanho_descompactado(uploaded_files) / BYTES_POR_MB
+    return varios_speds and _processos_configurados() > 1 and total_mb >= MINIMO_MB_AUTOMATICO
@@ -0,0 +1,358 @@
+"""
+================================================================================
+MÓDULO: Prévia por Amostra com Carga Completa em Segundo Plano - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Dar uma primeira visão de uploads enormes sem esperar a leitura inteira:
+    a prévia lê os blocos 0 e E completos e só uma amostra dos documentos do
+    bloco C, exibe as abas na hora com o selo "AMOSTRA" e, enquanto isso,
+    o dataset completo é processado em uma thread de segundo plano. Quando
+    ele fica pronto, o app é executado de novo com os números exatos.
+
+AMOSTRA (amostrar_conteudo):
+    - Documentos inteiros: cada C100 escolhido entra com TODOS os seus
+      filhos (C110 a C197); os demais são cortados dos bytes antes dos parsers
+    - passo=1: os primeiros N documentos; passo=k: um a cada k; passo=None
+      (padrão): N documentos espalhados pelo arquivo inteiro
+    - O bloco 9 é retirado: as quantidades declaradas são as do arquivo
+      inteiro e acusariam divergência na amostra
+    - A amostra passa pelos mesmos parsers, projeção e filtros do completo
+
+CARGA COMPLETA (iniciar_carga_completa):
+    1. Uma thread por chave executa cache_datasets.obter_dataset(): o
+       dataset completo vai para o cache compartilhado, como sem prévia
+    2. Os arquivos são entregues à thread como cópias independentes
+       (copiar_arquivos): os bytes são compartilhados, não duplicados
+    3. O andamento fica na carga (último evento de progresso) e é exibido
+       sob o selo da amostra; o app é reexecutado ao terminar
+    4. Ao terminar, a prévia sai do cache
+
+IMPORTANTE:
+    - Dataset maior que o orçamento do cache não fica no cache: a thread o
+      guarda até a sessão retirá-lo (retirar_carga_completa), e a sessão o
+      mantém em st.session_state (obter_dataset(sessao=...)): os reruns
+      seguintes usam o completo, sem voltar à prévia nem processar de novo
+    - Trocar de upload na mesma sessão cancela a carga anterior dela;
+      outra sessão que esperava a mesma carga processa de novo
+    - A prévia tem a sua própria chave no cache (chave_previa)
+
+GATILHOS DE MANUTENÇÃO:
+    1. Tamanho padrão da amostra: AMOSTRA_DOCUMENTOS
+    2. Frequência da verificação da carga: INTERVALO_VERIFICACAO_SEGUNDOS
+    3. Novo bloco com documentos: ajustar amostrar_conteudo()
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import hashlib
+import io
+import re
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import streamlit as st
+
+from cache_datasets import dataset_em_cache, dataset_na_sessao, obter_dataset, remover_do_cache
+from formatacao import formatar_inteiro_br
+from ingestao import (
+    IngestaoCancelada, consolidar_resultados, ler_arquivos_sped, montar_dataset, processar_conteudo_sped,
+)
+from filtros_leitura import preparar_filtro
+from instrumentacao import criar_estatisticas, medir_etapa, registrar_etapa, registrar_log
+from progresso_ingestao import texto_progresso_total
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Documentos (C100) lidos por SPED na prévia
+AMOSTRA_DOCUMENTOS = 2000
+
+# Intervalo entre as verificações da carga completa pelo app
+INTERVALO_VERIFICACAO_SEGUNDOS = 2
+
+CHAVE_CARGA_SESSAO = 'carga_completa_sessao'
+
+# Início de linha de documento, de registro do bloco C e de outro bloco
+_INICIO_C100 = re.compile(rb'(?:^|\n)\|C100\|')
+_INICIO_BLOCO_C = re.compile(rb'(?:^|\n)\|C')
+_FIM_BLOCO_C = re.compile(rb'\n\|(?!C)')
+_INICIO_BLOCO_9 = re.compile(rb'\n\|9')
+
+_trava = threading.Lock()
+_cargas = {}
+
+
+# ============================================================================
+# AMOSTRA
+# ============================================================================
+
+def _inicio_linha(correspondencia) -> int:
+    """
+    Posição do '|' inicial da linha encontrada por um dos padrões acima.
+    """
+    return correspondencia.start() + (correspondencia.group().startswith(b'\n'))
+
+
+def amostrar_conteudo(conteudo: bytes, documentos: int = AMOSTRA_DOCUMENTOS,
+                      passo: Optional[int] = None) -> Tuple[bytes, int, int]:
+    """
+    Corta do SPED os documentos do bloco C fora da amostra (ver cabeçalho).
+
+    Parâmetros:
+        documentos: máximo de C100 mantidos
+        passo: 1 = primeiros; k = um a cada k; None = espalhados pelo arquivo
+
+    RETORNA:
+        (conteúdo da amostra, documentos mantidos, documentos no arquivo)
+    """
+    inicio_c = _INICIO_BLOCO_C.search(conteudo)
+    if inicio_c is None:
+        inicio_9 = _INICIO_BLOCO_9.search(conteudo)
+        return (conteudo[:inicio_9.start() + 1] if inicio_9 else conteudo), 0, 0
+
+    inicio_c = _inicio_linha(inicio_c)
+    fim_c = _FIM_BLOCO_C.search(conteudo, inicio_c)
+    fim_c = fim_c.start() + 1 if fim_c else len(conteudo)
+    inicio_9 = _INICIO_BLOCO_9.search(conteudo, fim_c - 1)
+    fim_arquivo = inicio_9.start() + 1 if inicio_9 else len(conteudo)
+
+    # O último documento termina no fechamento do bloco (C990), que é mantido
+    fim_documentos = conteudo.rfind(b'\n|C990|', inicio_c, fim_c)
+    fim_documentos = fim_documentos + 1 if fim_documentos >= 0 else fim_c
+
+    inicios = [_inicio_linha(c) for c in _INICIO_C100.finditer(conteudo, inicio_c, fim_documentos)]
+    total = len(inicios)
+    if passo is None:
+        passo = max(1, -(-total // documentos)) if documentos else 1
+    escolhidos = range(0, total, passo)[:documentos]
+
+    # Abertura do bloco (C001), documentos escolhidos, C990 e os demais blocos
+    fins = inicios[1:] + [fim_documentos]
+    partes = [conteudo[:inicios[0] if inicios else fim_documentos]]
+    partes.extend(conteudo[inicios[i]:fins[i]] for i in escolhidos)
+    partes.append(conteudo[fim_documentos:fim_arquivo])
+    return b''.join(partes), len(escolhidos), total
+
+
+def chave_previa(chave: str) -> str:
+    """
+    Chave da prévia no cache (diferente da do dataset completo).
+    """
+    return hashlib.sha256(f'{chave}\x00previa'.encode('utf-8')).hexdigest()
+
+
+def carregar_previa(uploaded_files, chave: str = '', documentos: int = AMOSTRA_DOCUMENTOS,
+                    passo: Optional[int] = None, projecao: dict = None, filtro: dict = None) -> dict:
+    """
+    Dataset da prévia: blocos 0 e E inteiros e uma amostra do bloco C.
+
+    RETORNA:
+        Dataset como o de ingestao.carregar_dataset(), com
+        dataset['amostra'] = {'documentos': mantidos, 'total': no upload}
+    """
+    preparar_filtro(filtro)
+    estatisticas = criar_estatisticas()
+    inicio = time.perf_counter()
+    mantidos = total = 0
+
+    resultados = []
+    for nome_origem, conteudo in ler_arquivos_sped(uploaded_files, estatisticas):
+        with medir_etapa(estatisticas, 'previa.amostra', len(conteudo)):
+            amostra, mantidos_arquivo, total_arquivo = amostrar_conteudo(conteudo, documentos, passo)
+        del conteudo
+        mantidos += mantidos_arquivo
+        total += total_arquivo
+        try:
+            resultados.append((nome_origem, processar_conteudo_sped(amostra, estatisticas, None, projecao, filtro)))
+        except Exception as e:
+            print(f"Erro ao processar {nome_origem}: {str(e)}")
+
+    dados = consolidar_resultados(resultados, estatisticas)
+    dataset = montar_dataset(dados, [f.name for f in uploaded_files], estatisticas, projecao, filtro,
+                             amostra={'documentos': mantidos, 'total': total})
+
+    registrar_etapa(estatisticas, 'ingestao.total', time.perf_counter() - inicio, estatisticas['bytes'])
+    registrar_log(estatisticas, f'{chave} (prévia)')
+    return dataset
+
+
+# ============================================================================
+# CARGA COMPLETA EM SEGUNDO PLANO
+# ============================================================================
+
+def copiar_arquivos(uploaded_files) -> List[io.BytesIO]:
+    """
+    Cópias independentes (posição de leitura própria) dos arquivos enviados.
+
+    IMPORTANTE:
+    - getvalue() de um BytesIO sem alterações devolve os mesmos bytes: a
+      cópia não duplica o conteúdo na memória
+    """
+    copias = []
+    for arquivo in uploaded_files:
+        copia = io.BytesIO(arquivo.getvalue())
+        copia.name = arquivo.name
+        copia.size = arquivo.size
+        copias.append(copia)
+    return copias
+
+
+def _executar_carga(chave: str, carga: dict, carregar: Callable[..., dict], arquivos: List[str]):
+    """
+    Corpo da thread: processa o dataset completo pelo cache compartilhado.
+    """
+    def progresso(evento):
+        carga['evento'] = evento
+
+    try:
+        dataset = obter_dataset(
+            chave, lambda: carregar(progresso=progresso, cancelar=carga['cancelar']), arquivos=arquivos
+        )
+        remover_do_cache(chave_previa(chave))
+        if not dataset_em_cache(chave):
+            carga['dataset'] = dataset  # maior que o orçamento: fica até a sessão retirar
+    except IngestaoCancelada:
+        carga['erro'] = 'cancelada'
+    except Exception as e:
+        print(f"Erro na carga completa {chave[:12]}: {str(e)}")
+        carga['erro'] = str(e)
+    finally:
+        with _trava:
+            carga['concluida'] = True
+            if carga['dataset'] is None and carga['erro'] is None:
+                _cargas.pop(chave, None)
+
+
+def iniciar_carga_completa(chave: str, carregar: Callable[..., dict], arquivos: List[str] = None) -> dict:
+    """
+    Inicia (uma vez por chave) o processamento completo em segundo plano.
+
+    Parâmetros:
+        carregar: recebe progresso= e cancelar= (mesmos de
+                  ingestao.carregar_dataset) e devolve o dataset
+
+    RETORNA:
+        A carga: {'concluida', 'evento', 'erro', 'dataset', ...}; concluída
+        com sucesso e no cache, ela já saiu da lista de cargas
+    """
+    with _trava:
+        carga = _cargas.get(chave)
+        if carga is not None:
+            return carga
+        carga = {
+            'cancelar': threading.Event(),
+            'evento': None,
+            'erro': None,
+            'dataset': None,
+            'concluida': False,
+            'iniciada_em': time.time(),
+        }
+        _cargas[chave] = carga
+
+    threading.Thread(target=_executar_carga, args=(chave, carga, carregar, list(arquivos or [])),
+                     name=f'carga-completa-{chave[:12]}', daemon=True).start()
+    return carga
+
+
+def consultar_carga(chave: str) -> Optional[dict]:
+    """
+    Carga da chave (None se não há carga pendente).
+    """
+    with _trava:
+        return _cargas.get(chave)
+
+
+def cancelar_carga(chave: str):
+    """
+    Pede a interrupção da carga em andamento (no próximo aviso de progresso).
+    """
+    carga = consultar_carga(chave)
+    if carga is not None and not carga['concluida']:
+        carga['cancelar'].set()
+
+
+def retirar_carga_completa(chave: str) -> Optional[dict]:
+    """
+    Remove a carga concluída e devolve o dataset guardado fora do cache (ou None).
+    """
+    with _trava:
+        carga = _cargas.get(chave)
+        if carga is None or not carga['concluida']:
+            return None
+        del _cargas[chave]
+    return carga['dataset']
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+def ativar_previa() -> bool:
+    """
+    Opção da prévia na barra lateral (padrão: desligada).
+    """
+    return st.sidebar.checkbox(
+        "⚡ Prévia rápida (amostra)",
+        value=False,
+        key="previa_amostra",
+        help=f"Mostra as abas na hora com até {formatar_inteiro_br(AMOSTRA_DOCUMENTOS)} documentos "
+             "por arquivo enquanto o processamento completo continua em segundo plano; "
+             "os números exatos aparecem sozinhos quando ele terminar."
+    )
+
+
+def obter_dataset_previa(chave: str, carregar_amostra: Callable[[], dict],
+                         carregar_completo: Callable[..., dict], arquivos: List[str] = None) -> Optional[dict]:
+    """
+    Prévia do upload, com a carga completa iniciada em segundo plano.
+
+    RETORNA:
+        O dataset da prévia, ou None quando o completo já pode ser usado
+        (no cache ou na sessão, ou concluído: retirar com retirar_carga_completa)
+    """
+    if dataset_em_cache(chave) or dataset_na_sessao(chave, st.session_state):
+        return None
+
+    anterior = st.session_state.get(CHAVE_CARGA_SESSAO)
+    if anterior not in (None, chave):
+        cancelar_carga(anterior)
+    st.session_state[CHAVE_CARGA_SESSAO] = chave
+
+    carga = iniciar_carga_completa(chave, carregar_completo, arquivos)
+    if carga['concluida']:
+        return None
+    return obter_dataset(chave_previa(chave), carregar_amostra, arquivos=arquivos)
+
+
+@st.fragment(run_every=INTERVALO_VERIFICACAO_SEGUNDOS)
+def _acompanhar_carga(chave: str):
+    """
+    Andamento da carga completa; ao terminar, executa o app de novo.
+    """
+    carga = consultar_carga(chave)
+    if carga is None or carga['concluida']:
+        st.rerun()
+    evento = carga['evento']
+    if evento is None:
+        st.progress(0.0, text="Processamento completo: lendo arquivos...")
+    else:
+        st.progress(evento['fracao_total'], text=f"Processamento completo: {texto_progresso_total(evento)}")
+
+
+def exibir_selo_amostra(dataset: dict, chave: str):
+    """
+    Selo "AMOSTRA" da prévia e andamento do processamento completo.
+    """
+    amostra = dataset['amostra']
+    st.warning(
+        f"🧪 **AMOSTRA** — {formatar_inteiro_br(amostra['documentos'])} de "
+        f"{formatar_inteiro_br(amostra['total'])} documentos. Totais e gráficos são parciais "
+        "e serão trocados pelos exatos quando o processamento completo terminar."
+    )
+    _acompanhar_carga(chave)
@@ -0,0 +1,138 @@
+"""
+================================================================================
+MÓDULO: Progresso e Cancelamento da Ingestão - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Mostrar o andamento do processamento de um upload (barra total e barra
+    do arquivo atual) e permitir cancelar um upload grande no meio.
+
+FUNCIONAMENTO:
+    1. exibir_progresso_ingestao() desenha o botão de cancelar e as barras,
+       e devolve o callback entregue a carregar_dataset(progresso=...)
+    2. Os eventos chegam a cada ~INTERVALO_PROGRESSO_SEGUNDOS por parser
+       (ver ingestao.evento_progresso)
+    3. O clique em "Cancelar" dispara um novo rerun: o Streamlit interrompe
+       o script na próxima atualização das barras, a exceção atravessa os
+       parsers (e marca o cancelamento dos processos do pipeline) e nada vai
+       para o cache; os DataFrames parciais são liberados com a pilha
+    4. No rerun, o upload marcado como cancelado mostra o aviso de
+       exibir_ingestao_cancelada() em vez de processar de novo
+
+IMPORTANTE:
+    - O cancelamento é por upload (chave do dataset): enviar outros arquivos
+      processa normalmente
+    - Sessões esperando o mesmo upload em outro navegador não são afetadas:
+      a primeira que pedir de novo processa
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novos campos de progresso: incluir em ingestao.evento_progresso()
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+from typing import Callable, Tuple
+
+import streamlit as st
+
+from formatacao import formatar_inteiro_br, formatar_mb_br
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+CHAVE_CANCELADA = 'ingestao_cancelada'
+
+NOMES_ETAPAS = {
+    'bloco_c': 'documentos (bloco C)',
+    'bloco_0': 'cadastros (bloco 0)',
+    'bloco_e': 'apuração (bloco E)',
+    'concluido': 'concluído',
+}
+
+
+# ============================================================================
+# FORMATAÇÃO
+# ============================================================================
+
+def texto_progresso_total(evento: dict) -> str:
+    """
+    Texto da barra total: "SPED 2 · 35,2 MB de 120,0 MB (29%)"
+    """
+    return (
+        f"SPED {evento['sped']} · {formatar_mb_br(evento['bytes_processados'])} de "
+        f"{formatar_mb_br(evento['bytes_total'])} ({evento['fracao_total']:.0%})"
+    )
+
+
+def texto_progresso_arquivo(evento: dict) -> str:
+    """
+    Texto da barra do arquivo: "empresa.zip · documentos (bloco C) · linha 12.345"
+    """
+    etapa = NOMES_ETAPAS.get(evento['etapa'], evento['etapa'])
+    texto = f"{evento['arquivo']} · {etapa}"
+    if evento['linhas']:
+        texto += f" · linha {formatar_inteiro_br(evento['linhas'])}"
+    return texto
+
+
+# ============================================================================
+# EXIBIÇÃO
+# ============================================================================
+
+def _marcar_cancelamento(chave: str):
+    """
+    Callback do botão "Cancelar": roda no início do rerun disparado pelo clique.
+    """
+    st.session_state[CHAVE_CANCELADA] = chave
+
+
+def _desmarcar_cancelamento():
+    """
+    Callback do botão "Processar novamente".
+    """
+    st.session_state.pop(CHAVE_CANCELADA, None)
+
+
+def ingestao_cancelada(chave: str) -> bool:
+    """
+    True se o usuário cancelou o processamento deste upload.
+    """
+    return st.session_state.get(CHAVE_CANCELADA) == chave
+
+
+def exibir_ingestao_cancelada(chave: str):
+    """
+    Aviso do upload cancelado, com a opção de processar de novo.
+    """
+    st.warning("⏹️ Processamento cancelado. Envie outros arquivos ou processe estes novamente.")
+    st.button("🔄 Processar novamente", key=f"reprocessar_{chave}", on_click=_desmarcar_cancelamento)
+
+
+def exibir_progresso_ingestao(chave: str) -> Tuple[Callable[[dict], None], object]:
+    """
+    Desenha o botão de cancelar e as barras de progresso do upload.
+
+    RETORNA:
+        (callback de progresso, área) - a área deve ser limpa com area.empty()
+        ao fim do processamento
+    """
+    area = st.empty()
+    with area.container():
+        st.button(
+            "⏹️ Cancelar processamento",
+            key=f"cancelar_{chave}",
+            on_click=_marcar_cancelamento,
+            args=(chave,)
+        )
+        barra_total = st.progress(0.0, text="Lendo arquivos...")
+        barra_arquivo = st.progress(0.0, text=" ")
+
+    def atualizar(evento: dict):
+        barra_total.progress(evento['fracao_total'], text=texto_progresso_total(evento))
+        barra_arquivo.progress(min(evento['fracao_arquivo'], 1.0), text=texto_progresso_arquivo(evento))
+
+    return atualizar, area
@@ -0,0 +1,141 @@
+"""
+================================================================================
+MÓDULO: Projeção de Colunas por Análise - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Ler do bloco C só as colunas que as análises abertas usam. O C170 tem
+    ~37 campos e os painéis usam poucos; com a projeção, os campos não
+    usados nunca são copiados, decodificados nem guardados no dataset.
+
+FUNCIONAMENTO:
+    1. ANALISES lista cada aba do app com as colunas que ela lê de cada
+       registro C (None = todas, como as tabelas completas)
+    2. O usuário escolhe as análises na barra lateral (selecionar_analises)
+    3. projecao_para_analises() une as colunas das análises escolhidas em
+       {registro: [colunas]}, entregue aos parsers do bloco C
+       (parser_colunar.colunas_projetadas); registro que nenhuma análise
+       usa recebe lista vazia e não é materializado
+    4. Todas as análises escolhidas = sem projeção (None): dataset completo,
+       com a exportação de todos os registros
+
+IMPORTANTE:
+    - A projeção faz parte da chave do cache (chave_com_projecao): o mesmo
+      upload com outras análises é outro dataset
+    - Os blocos 0 e E são pequenos e sempre lidos por inteiro
+
+GATILHOS DE MANUTENÇÃO:
+    1. Nova aba no app.py: incluir em ANALISES (mesma ordem das abas)
+    2. Aba passou a usar outra coluna do bloco C: incluir na lista dela
+       (coluna fora da projeção vira KeyError na aba)
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+import streamlit as st
+
+from calculos_fiscais import CAMPOS_ACUMULAVEIS
+from parser_colunar import PARSERS_REGISTROS
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+# Abas do app e colunas do bloco C lidas por cada uma (None = todas)
+ANALISES = {
+    'dashboard': {
+        'rotulo': "📊 Dashboard",
+        'colunas': {
+            'C100': ['IND_OPER', 'DT_DOC', 'VL_DOC', 'VL_ICMS', 'VL_IPI'],
+            'C190': ['CFOP', 'VL_ICMS', 'VL_IPI'],
+        },
+    },
+    'entrada_saida': {
+        'rotulo': "📥📤 Entrada/Saída",
+        'colunas': {
+            'C100': ['NUM_DOC', 'DT_DOC'],
+            'C190': ['CFOP', 'VL_OPR', 'VL_ICMS', 'VL_IPI', 'NUM_DOC_PAI'],
+        },
+    },
+    'apuracao': {'rotulo': "💰 ICMS/IPI Apurado", 'colunas': {}},
+    'c100': {'rotulo': "📄 Documentos (C100)", 'colunas': {'C100': None}},
+    'c170': {'rotulo': "📦 Itens (C170)", 'colunas': {'C170': None}},
+    'c190': {'rotulo': "📈 Analítico (C190)", 'colunas': {'C190': None}},
+    'participantes': {'rotulo': "👥 Participantes (0150)", 'colunas': {}},
+    'produtos': {'rotulo': "🏷️ Produtos (0200)", 'colunas': {}},
+    'acumulador_cfop': {
+        'rotulo': "🎯 Acumulador CFOP",
+        'colunas': {'C190': ['CFOP', 'CST_ICMS'] + CAMPOS_ACUMULAVEIS},
+    },
+    # Consultas livres: todos os registros inteiros
+    'sql': {'rotulo': "🧮 Consulta SQL", 'colunas': {registro: None for registro in PARSERS_REGISTROS}},
+}
+
+
+# ============================================================================
+# PROJEÇÃO
+# ============================================================================
+
+def projecao_para_analises(analises: List[str]) -> Optional[Dict[str, List[str]]]:
+    """
+    Colunas do bloco C usadas pelas análises escolhidas.
+
+    RETORNA:
+        None se todas as análises foram escolhidas (dataset completo); senão
+        {registro: [colunas]}, sem os registros que alguma análise lê
+        inteiros (None) e com lista vazia para os que nenhuma lê
+    """
+    if set(ANALISES) <= set(analises):
+        return None
+
+    projecao = {registro: set() for registro in PARSERS_REGISTROS}
+    for analise in analises:
+        for registro, colunas in ANALISES[analise]['colunas'].items():
+            if colunas is None:
+                projecao[registro] = None
+            elif projecao[registro] is not None:
+                projecao[registro].update(colunas)
+    return {registro: sorted(colunas) for registro, colunas in projecao.items() if colunas is not None}
+
+
+def chave_com_projecao(chave: str, projecao: Optional[Dict[str, List[str]]]) -> str:
+    """
+    Chave do dataset incluindo a projeção (sem projeção, a chave não muda).
+    """
+    if projecao is None:
+        return chave
+    descricao = json.dumps(projecao, sort_keys=True)
+    return hashlib.sha256(f'{chave}\x00{descricao}'.encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+def selecionar_analises() -> List[str]:
+    """
+    Escolha das análises na barra lateral (padrão: todas).
+
+    Nenhuma escolhida conta como todas.
+    """
+    with st.sidebar:
+        st.markdown("## 🧭 Análises")
+        analises = st.multiselect(
+            "Abas exibidas",
+            options=list(ANALISES),
+            default=list(ANALISES),
+            format_func=lambda analise: ANALISES[analise]['rotulo'],
+            key="analises_selecionadas",
+            help="Só as colunas usadas pelas abas escolhidas são lidas do bloco C: "
+                 "menos memória e processamento mais rápido. Mudar a escolha "
+                 "processa os arquivos de novo."
+        )
+    # Ordem das abas, não a dos cliques
+    return [analise for analise in ANALISES if analise in analises] or list(ANALISES)
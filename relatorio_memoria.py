@@ -0,0 +1,272 @@
+"""
+================================================================================
+MÓDULO: Relatório de Memória dos Datasets - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Mostrar quanta memória RAM cada tabela de registro (e cada coluna) ocupa
+    no dataset carregado, e avisar ANTES de processar um upload que pode
+    levar o servidor a usar swap.
+
+RELATÓRIO (gerar_relatorio_memoria):
+    - 'tabelas': uma linha por registro de dados_c, dados_0 e dados_e com
+      linhas, colunas, bytes e bytes por linha
+    - 'colunas': as colunas que mais ocupam memória
+    - 'total_bytes' / 'total_linhas': totais do dataset
+    - No app, fica guardado na sessão (st.session_state) após o 1º cálculo,
+      junto com a chave do dataset; o dataset compartilhado não é alterado
+    Medição com memory_usage(deep=True): inclui o conteúdo das strings
+
+AVISO DE MEMÓRIA (avaliar_memoria_upload):
+    - Estima o pico da ingestão pelo tamanho descompactado dos arquivos
+      (FATOR_PICO_INGESTAO bytes de RAM por byte de SPED, medido com
+      gerador_sped.py; o dataset final fica em torno de FATOR_DATASET)
+    - Compara com a memória disponível do sistema (/proc/meminfo) e com o
+      limite flexível SPED_LIMITE_MEMORIA_MB (RSS atual + pico estimado)
+    - Apenas avisa: o processamento não é bloqueado
+
+GATILHOS DE MANUTENÇÃO:
+    1. Parser mudou de forma relevante: medir de novo os fatores
+    2. Novo bloco no dataset: incluir em BLOCOS_DATASET
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import os
+from typing import Dict, Optional
+
+import pandas as pd
+import streamlit as st
+
+from formatacao import BYTES_POR_MB, formatar_inteiro_br, formatar_mb_br
+from ingestao import tamanho_descompactado
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+BLOCOS_DATASET = {
+    'dados_c': 'C',
+    'dados_0': '0',
+    'dados_e': 'E',
+}
+
+# Bytes de RAM por byte de SPED (arquivo de 6 MB do gerador_sped.py)
+FATOR_PICO_INGESTAO = 17
+FATOR_DATASET = 9
+
+VARIAVEL_LIMITE = 'SPED_LIMITE_MEMORIA_MB'
+
+COLUNAS_EM_DESTAQUE = 15
+
+
+# ============================================================================
+# RELATÓRIO DO DATASET
+# ============================================================================
+
+def relatorio_tabelas(dataset: dict) -> pd.DataFrame:
+    """
+    Uma linha por tabela de registro, da que mais ocupa para a que menos ocupa.
+    """
+    linhas = []
+    for bloco in BLOCOS_DATASET:
+        for registro, df in dataset.get(bloco, {}).items():
+            total = int(df.memory_usage(index=True, deep=True).sum())
+            linhas.append({
+                'BLOCO': BLOCOS_DATASET[bloco],
+                'REGISTRO': registro,
+                'LINHAS': len(df),
+                'COLUNAS': len(df.columns),
+                'BYTES': total,
+                'BYTES_POR_LINHA': total / len(df) if len(df) else None,
+            })
+    colunas = ['BLOCO', 'REGISTRO', 'LINHAS', 'COLUNAS', 'BYTES', 'BYTES_POR_LINHA']
+    return pd.DataFrame(linhas, columns=colunas).sort_values('BYTES', ascending=False, ignore_index=True)
+
+
+def relatorio_colunas(dataset: dict) -> pd.DataFrame:
+    """
+    Uma linha por coluna de todas as tabelas, da que mais ocupa para a que menos ocupa.
+    """
+    linhas = []
+    for bloco in BLOCOS_DATASET:
+        for registro, df in dataset.get(bloco, {}).items():
+            if df.empty:
+                continue
+            for coluna, total in df.memory_usage(index=False, deep=True).items():
+                linhas.append({
+                    'REGISTRO': registro,
+                    'COLUNA': coluna,
+                    'DTYPE': str(df[coluna].dtype),
+                    'BYTES': int(total),
+                    'BYTES_POR_LINHA': total / len(df),
+                })
+    colunas = ['REGISTRO', 'COLUNA', 'DTYPE', 'BYTES', 'BYTES_POR_LINHA']
+    return pd.DataFrame(linhas, columns=colunas).sort_values('BYTES', ascending=False, ignore_index=True)
+
+
+def gerar_relatorio_memoria(dataset: dict, colunas_em_destaque: int = COLUNAS_EM_DESTAQUE) -> dict:
+    """
+    Relatório de memória do dataset (ver cabeçalho do módulo).
+
+    EXEMPLO:
+        relatorio = gerar_relatorio_memoria(carregar_dataset(arquivos))
+        relatorio['tabelas'].head()
+    """
+    tabelas = relatorio_tabelas(dataset)
+    return {
+        'tabelas': tabelas,
+        'colunas': relatorio_colunas(dataset).head(colunas_em_destaque),
+        'total_bytes': int(tabelas['BYTES'].sum()),
+        'total_linhas': int(tabelas['LINHAS'].sum()),
+    }
+
+
+# ============================================================================
+# MEMÓRIA DO SISTEMA E ESTIMATIVA DO UPLOAD
+# ============================================================================
+
+def _ler_kb(caminho: str, campo: str) -> Optional[int]:
+    """
+    Valor em bytes de um campo "Nome:   123 kB" de /proc (None fora do Linux).
+    """
+    try:
+        with open(caminho, encoding='ascii') as arquivo:
+            for linha in arquivo:
+                if linha.startswith(campo + ':'):
+                    return int(linha.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def memoria_disponivel() -> Optional[int]:
+    """
+    Memória disponível no sistema sem usar swap (MemAvailable), em bytes.
+    """
+    return _ler_kb('/proc/meminfo', 'MemAvailable')
+
+
+def memoria_processo() -> Optional[int]:
+    """
+    Memória residente (RSS) atual deste processo, em bytes.
+    """
+    return _ler_kb('/proc/self/status', 'VmRSS')
+
+
+def limite_memoria() -> Optional[int]:
+    """
+    Limite flexível em bytes a partir de SPED_LIMITE_MEMORIA_MB (None = sem limite).
+    """
+    try:
+        megabytes = float(os.environ.get(VARIAVEL_LIMITE, 0))
+    except ValueError:
+        return None
+    return int(megabytes * BYTES_POR_MB) if megabytes > 0 else None
+
+
+def avaliar_memoria_upload(uploaded_files) -> Dict:
+    """
+    Estima a memória da ingestão dos arquivos e compara com o disponível.
+
+    RETORNA:
+        Dicionário com 'bytes_sped', 'pico_estimado', 'dataset_estimado',
+        'disponivel', 'processo', 'limite' e 'alertas' (lista de textos)
+    """
+    bytes_sped = tamanho_descompactado(uploaded_files)
+    pico = bytes_sped * FATOR_PICO_INGESTAO
+    disponivel = memoria_disponivel()
+    processo = memoria_processo()
+    limite = limite_memoria()
+
+    alertas = []
+    if disponivel is not None and pico > disponivel:
+        alertas.append(
+            f"O processamento deve usar cerca de {formatar_mb_br(pico)}, mas o servidor tem "
+            f"{formatar_mb_br(disponivel)} livres: risco de uso de swap e lentidão geral."
+        )
+    if limite is not None and (processo or 0) + pico > limite:
+        alertas.append(
+            f"O servidor já usa {formatar_mb_br(processo or 0)} e este upload deve precisar de mais "
+            f"{formatar_mb_br(pico)}, acima do limite configurado de {formatar_mb_br(limite)}."
+        )
+
+    return {
+        'bytes_sped': bytes_sped,
+        'pico_estimado': pico,
+        'dataset_estimado': bytes_sped * FATOR_DATASET,
+        'disponivel': disponivel,
+        'processo': processo,
+        'limite': limite,
+        'alertas': alertas,
+    }
+
+
+# ============================================================================
+# EXIBIÇÃO
+# ============================================================================
+
+def exibir_alertas_memoria(avaliacao: Dict):
+    """
+    Exibe os avisos de avaliar_memoria_upload(), se houver.
+    """
+    for alerta in avaliacao['alertas']:
+        st.warning(f"⚠️ {alerta}")
+
+
+def exibir_relatorio_memoria(dataset: dict, chave_dataset: Optional[str] = None):
+    """
+    Exibe o painel recolhível com a memória ocupada pelo dataset.
+
+    Parâmetros:
+        chave_dataset: o relatório guardado na sessão vale só para este dataset
+                       (e não passa da prévia para o processamento completo)
+
+    IMPORTANTE:
+    - O relatório é calculado uma vez por dataset e guardado em
+      st.session_state (memory_usage deep percorre todas as strings). Não
+      vai para o dataset: ele é compartilhado entre sessões pelo cache
+    """
+    with st.expander("🧠 Memória do dataset"):
+        chave = (chave_dataset, dataset.get('amostra') is not None)
+        guardado = st.session_state.get('relatorio_memoria')
+        if chave_dataset is None or not guardado or guardado['chave'] != chave:
+            guardado = {'chave': chave, 'relatorio': gerar_relatorio_memoria(dataset)}
+            if chave_dataset is not None:
+                st.session_state['relatorio_memoria'] = guardado
+        relatorio = guardado['relatorio']
+        total_linhas = relatorio['total_linhas']
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Memória das tabelas", formatar_mb_br(relatorio['total_bytes']))
+        with col2:
+            st.metric("Linhas", formatar_inteiro_br(total_linhas))
+        with col3:
+            st.metric("Bytes por linha", formatar_inteiro_br(relatorio['total_bytes'] / total_linhas if total_linhas else 0))
+        with col4:
+            processo = memoria_processo()
+            st.metric("RSS do servidor", formatar_mb_br(processo) if processo is not None else "-")
+
+        limite = limite_memoria()
+        if limite is not None:
+            st.caption(f"Limite flexível configurado: {formatar_mb_br(limite)}")
+
+        st.markdown("**Por tabela**")
+        st.dataframe(
+            relatorio['tabelas'],
+            use_container_width=True,
+            hide_index=True,
+            column_config={'BYTES_POR_LINHA': st.column_config.NumberColumn('Bytes/linha', format='%.0f')}
+        )
+
+        st.markdown(f"**{COLUNAS_EM_DESTAQUE} colunas que mais ocupam memória**")
+        st.dataframe(
+            relatorio['colunas'],
+            use_container_width=True,
+            hide_index=True,
+            column_config={'BYTES_POR_LINHA': st.column_config.NumberColumn('Bytes/linha', format='%.0f')}
+        )
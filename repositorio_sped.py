@@ -0,0 +1,485 @@
+"""
+================================================================================
+MÓDULO: Repositório Local Particionado por Empresa e Período - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Guardar os SPEDs de muitos CNPJs e períodos já lidos, em disco, e abrir
+    só o que a análise pede: "cliente A, 2025" lê as partições desse CNPJ e
+    desses meses, e o tempo para abrir não depende do tamanho do acervo.
+
+ESTRUTURA (raiz do repositório, partições no formato Hive):
+    cnpj=<CNPJ>/periodo=<AAAAMM>/registro=<REGISTRO>/dados.parquet
+    cnpj=<CNPJ>/periodo=<AAAAMM>/_sped.json     identificação do SPED
+                                                 (0000, linhas por registro)
+
+FUNCIONAMENTO:
+    1. importar_sped() lê um SPED com os parsers do app, identifica CNPJ
+       (CPF se não houver) e período (DT_INI) pelo registro 0000 e grava
+       uma partição por registro
+    2. catalogo() lista o que existe lendo só os _sped.json (nunca os Parquet)
+    3. carregar_repositorio() faz a poda: monta os caminhos dos CNPJs e
+       períodos escolhidos (sem varrer o acervo) e lê só as colunas da
+       projeção; o resultado é o mesmo dataset de um upload
+       (ingestao.montar_dataset)
+
+IMPORTANTE:
+    - Um CNPJ/período tem um SPED só: importar de novo (retificadora)
+      substitui a partição inteira. A nova é gravada ao lado e trocada
+      por renomeação (leitura nunca vê partição pela metade)
+    - O repositório guarda os SPEDs completos, sem filtros de leitura: a
+      opção de desconsiderar cancelados do app vale para uploads
+    - Streamlit só dentro das funções de interface (o módulo também é
+      usado na linha de comando)
+
+CONFIGURAÇÃO:
+    Variável de ambiente SPED_REPOSITORIO (raiz; sem ela o app não mostra
+    o repositório)
+
+USO:
+    python repositorio_sped.py importar /dados/speds --raiz /dados/repositorio
+    python repositorio_sped.py catalogo --raiz /dados/repositorio
+
+GATILHOS DE MANUTENÇÃO:
+    1. Novos blocos: entram sozinhos via ingestao.processar_conteudo_sped()
+       (prefixo do registro em BLOCOS_POR_PREFIXO)
+    2. Mudança na estrutura de diretórios: caminho_particao() e listar_periodos()
+
+Data de Criação: 19/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from converter_sped import ler_sped_em_disco, listar_entradas
+from ingestao import consolidar_resultados, montar_dataset, processar_conteudo_sped
+from instrumentacao import criar_estatisticas, medir_etapa
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+ARQUIVO_IDENTIFICACAO = '_sped.json'
+ARQUIVO_DADOS = 'dados.parquet'
+
+# Primeiro caractere do registro -> bloco do dataset
+BLOCOS_POR_PREFIXO = {'0': 'dados_0', 'C': 'dados_c', 'E': 'dados_e'}
+
+
+def raiz_repositorio() -> Optional[str]:
+    """
+    Raiz do repositório configurada em SPED_REPOSITORIO (None = desligado).
+    """
+    return os.environ.get('SPED_REPOSITORIO') or None
+
+
+# ============================================================================
+# PARTIÇÕES
+# ============================================================================
+
+def caminho_particao(raiz: str, cnpj: str, periodo: str) -> str:
+    """
+    Diretório da partição de um CNPJ e período (AAAAMM).
+    """
+    return os.path.join(raiz, f'cnpj={cnpj}', f'periodo={periodo}')
+
+
+def _valores_particao(diretorio: str, chave: str) -> List[str]:
+    """
+    Valores das subpartições chave=valor de um diretório, em ordem (sem as
+    temporárias .parcial/.antiga de uma importação em andamento).
+    """
+    if not os.path.isdir(diretorio):
+        return []
+    prefixo = f'{chave}='
+    return sorted(
+        entrada.name[len(prefixo):] for entrada in os.scandir(diretorio)
+        if entrada.is_dir() and entrada.name.startswith(prefixo) and '.' not in entrada.name
+    )
+
+
+def listar_cnpjs(raiz: str) -> List[str]:
+    """
+    CNPJs (ou CPFs) com algum período no repositório.
+    """
+    return _valores_particao(raiz, 'cnpj')
+
+
+def listar_periodos(raiz: str, cnpj: str) -> List[str]:
+    """
+    Períodos (AAAAMM) de um CNPJ, sem olhar os demais.
+    """
+    return _valores_particao(os.path.join(raiz, f'cnpj={cnpj}'), 'periodo')
+
+
+def ler_identificacao(particao: str) -> dict:
+    """
+    Conteúdo do _sped.json de uma partição.
+    """
+    with open(os.path.join(particao, ARQUIVO_IDENTIFICACAO), encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def periodo_de_data(data: str) -> str:
+    """
+    DDMMAAAA -> AAAAMM.
+    """
+    return f'{data[4:8]}{data[2:4]}'
+
+
+def formatar_periodo(periodo: str) -> str:
+    """
+    AAAAMM -> MM/AAAA.
+    """
+    return f'{periodo[4:6]}/{periodo[:4]}'
+
+
+# ============================================================================
+# IMPORTAÇÃO
+# ============================================================================
+
+def identificar_sped(dados_0: Dict[str, pd.DataFrame]) -> dict:
+    """
+    CNPJ (ou CPF), período e nome da empresa pelo registro 0000.
+
+    LEVANTA:
+        ValueError: SPED sem 0000, sem CNPJ/CPF ou com CNPJ/data fora do
+                    formato (viram nomes de diretório)
+    """
+    df_0000 = dados_0.get('0000', pd.DataFrame())
+    if df_0000.empty:
+        raise ValueError('SPED sem registro 0000')
+    abertura = df_0000.iloc[0]
+    cnpj = abertura.get('CNPJ') or abertura.get('CPF')
+    if not cnpj or not cnpj.isdigit():
+        raise ValueError(f'registro 0000 sem CNPJ/CPF válido: {cnpj!r}')
+    periodo = periodo_de_data(abertura['DT_INI'])
+    if len(periodo) != 6 or not periodo.isdigit():
+        raise ValueError(f"registro 0000 com DT_INI inválida: {abertura['DT_INI']!r}")
+    return {
+        'cnpj': cnpj,
+        'periodo': periodo,
+        'nome': abertura.get('NOME', ''),
+        'dt_ini': abertura['DT_INI'],
+        'dt_fin': abertura.get('DT_FIN', ''),
+    }
+
+
+def _trocar_particao(temporaria: str, destino: str):
+    """
+    Coloca a partição nova no lugar da antiga por renomeação.
+    """
+    antiga = None
+    if os.path.exists(destino):
+        antiga = f'{destino}.antiga'
+        shutil.rmtree(antiga, ignore_errors=True)
+        os.replace(destino, antiga)
+    os.replace(temporaria, destino)
+    if antiga is not None:
+        shutil.rmtree(antiga, ignore_errors=True)
+
+
+def importar_sped(raiz: str, conteudo: bytes, nome_origem: str, estatisticas: dict = None) -> dict:
+    """
+    Grava um SPED no repositório (substitui o mesmo CNPJ/período).
+
+    RETORNA:
+        Identificação gravada no _sped.json, com 'substituido' (True se já
+        havia SPED desse CNPJ/período)
+    """
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    dados = consolidar_resultados([(nome_origem, processar_conteudo_sped(conteudo, estatisticas))], estatisticas)
+    identificacao = identificar_sped(dados['dados_0'])
+
+    destino = caminho_particao(raiz, identificacao['cnpj'], identificacao['periodo'])
+    temporaria = f'{destino}.parcial'
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+
+    registros = {}
+    with medir_etapa(estatisticas, 'repositorio.gravacao') as medida:
+        for tabelas in dados.values():
+            for registro, df in tabelas.items():
+                registros[registro] = len(df)
+                if df.empty:
+                    continue
+                diretorio = os.path.join(temporaria, f'registro={registro}')
+                os.makedirs(diretorio)
+                df.to_parquet(os.path.join(diretorio, ARQUIVO_DADOS), index=False)
+                medida['linhas'] += len(df)
+
+    identificacao.update({
+        'arquivo': nome_origem,
+        'bytes': len(conteudo),
+        'sha256': hashlib.sha256(conteudo).hexdigest(),
+        'importado_em': datetime.now().isoformat(timespec='seconds'),
+        'registros': registros,
+        'substituido': os.path.exists(destino),
+    })
+    with open(os.path.join(temporaria, ARQUIVO_IDENTIFICACAO), 'w', encoding='utf-8') as arquivo:
+        json.dump(identificacao, arquivo, ensure_ascii=False)
+
+    _trocar_particao(temporaria, destino)
+    return identificacao
+
+
+def importar_arquivos(raiz: str, caminhos: List[str]) -> List[dict]:
+    """
+    Importa arquivos, ZIPs ou diretórios inteiros (cada .txt é um SPED).
+
+    RETORNA:
+        Um resultado por SPED: identificação ou {'arquivo', 'erro'}
+    """
+    resultados = []
+    for caminho in listar_entradas(caminhos):
+        try:
+            for conteudo in ler_sped_em_disco(caminho):
+                resultados.append(importar_sped(raiz, conteudo, caminho))
+        except Exception as e:
+            resultados.append({'arquivo': caminho, 'erro': f"{type(e).__name__}: {e}"})
+    return resultados
+
+
+# ============================================================================
+# CATÁLOGO E CARGA COM PODA
+# ============================================================================
+
+def catalogo(raiz: str, cnpjs: List[str] = None) -> pd.DataFrame:
+    """
+    Um SPED por linha: CNPJ, nome, período, arquivo de origem, linhas e data
+    da importação (só os _sped.json são lidos).
+    """
+    linhas = []
+    for cnpj in listar_cnpjs(raiz) if cnpjs is None else cnpjs:
+        for periodo in listar_periodos(raiz, cnpj):
+            identificacao = ler_identificacao(caminho_particao(raiz, cnpj, periodo))
+            linhas.append({
+                'CNPJ': cnpj,
+                'NOME': identificacao['nome'],
+                'PERIODO': periodo,
+                'DT_INI': identificacao['dt_ini'],
+                'DT_FIN': identificacao['dt_fin'],
+                'ARQUIVO': identificacao['arquivo'],
+                'LINHAS': sum(identificacao['registros'].values()),
+                'BYTES': identificacao['bytes'],
+                'IMPORTADO_EM': identificacao['importado_em'],
+            })
+    return pd.DataFrame(linhas, columns=['CNPJ', 'NOME', 'PERIODO', 'DT_INI', 'DT_FIN', 'ARQUIVO',
+                                         'LINHAS', 'BYTES', 'IMPORTADO_EM'])
+
+
+def selecionar_particoes(raiz: str, cnpjs: List[str], periodos: List[str] = None) -> List[str]:
+    """
+    Partições dos CNPJs e períodos pedidos (None = todos os períodos do CNPJ).
+
+    Só os diretórios dos CNPJs pedidos são listados: os demais não custam nada.
+    """
+    particoes = []
+    for cnpj in cnpjs:
+        existentes = listar_periodos(raiz, cnpj)
+        escolhidos = existentes if periodos is None else [p for p in existentes if p in set(periodos)]
+        particoes.extend(caminho_particao(raiz, cnpj, periodo) for periodo in escolhidos)
+    return particoes
+
+
+def _ler_registro(particao: str, registro: str, projecao: Optional[dict]) -> pd.DataFrame:
+    """
+    Tabela de um registro da partição, com as colunas da projeção.
+
+    Como nos parsers: registro ausente da projeção = todas as colunas, lista
+    vazia = nenhuma (DataFrame vazio); ARQUIVO_ORIGEM acompanha sempre.
+    """
+    caminho = os.path.join(particao, f'registro={registro}', ARQUIVO_DADOS)
+    pedidas = None if projecao is None else projecao.get(registro)
+    if pedidas is not None and not pedidas:
+        return pd.DataFrame()
+    if pedidas is not None:
+        existentes = pq.ParquetFile(caminho).schema_arrow.names
+        pedidas = [coluna for coluna in existentes if coluna in set(pedidas) | {'ARQUIVO_ORIGEM'}]
+    return pq.read_table(caminho, columns=pedidas).to_pandas()
+
+
+def carregar_repositorio(raiz: str, cnpjs: List[str], periodos: List[str] = None,
+                         projecao: dict = None) -> dict:
+    """
+    Dataset (igual ao de um upload) com só as partições pedidas.
+
+    Parâmetros:
+        periodos: AAAAMM a carregar (None = todos os dos CNPJs)
+        projecao: {registro: [colunas]} do bloco C (projecao_analises.py)
+    """
+    estatisticas = criar_estatisticas()
+    particoes = selecionar_particoes(raiz, cnpjs, periodos)
+
+    listas = {bloco: {} for bloco in BLOCOS_POR_PREFIXO.values()}
+    arquivos = []
+    with medir_etapa(estatisticas, 'repositorio.leitura') as medida:
+        for particao in particoes:
+            identificacao = ler_identificacao(particao)
+            arquivos.append(identificacao['arquivo'])
+            for registro, linhas in identificacao['registros'].items():
+                lista = listas[BLOCOS_POR_PREFIXO[registro[0]]].setdefault(registro, [])
+                if not linhas:
+                    continue
+                df = _ler_registro(particao, registro, projecao)
+                if not df.empty:
+                    lista.append(df)
+                    medida['linhas'] += len(df)
+
+    dados = {
+        bloco: {registro: pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+                for registro, dfs in tabelas.items()}
+        for bloco, tabelas in listas.items()
+    }
+    estatisticas['arquivos'] = len(particoes)
+    return montar_dataset(dados, arquivos, estatisticas, projecao=projecao)
+
+
+def assinatura_particoes(particoes: List[str]) -> str:
+    """
+    Identificação das partições (caminho e data do _sped.json) para a chave
+    do cache: reimportar um período muda a chave.
+    """
+    descricao = [
+        (particao, os.stat(os.path.join(particao, ARQUIVO_IDENTIFICACAO)).st_mtime_ns)
+        for particao in particoes
+    ]
+    return hashlib.sha256(json.dumps(descricao).encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+def selecionar_repositorio() -> Optional[dict]:
+    """
+    Escolha de empresa e períodos do repositório na barra lateral.
+
+    RETORNA:
+        {'raiz', 'cnpj', 'periodos'} ou None (sem repositório ou sem escolha)
+    """
+    import streamlit as st
+
+    raiz = raiz_repositorio()
+    cnpjs = listar_cnpjs(raiz) if raiz else []
+    if not cnpjs:
+        return None
+
+    with st.sidebar:
+        st.markdown("## 🗄️ Repositório")
+        cnpj = st.selectbox(
+            "Empresa (CNPJ)",
+            options=[None] + cnpjs,
+            format_func=lambda valor: "Nenhuma" if valor is None else valor,
+            key="repositorio_cnpj",
+            help="SPEDs já importados: só os períodos escolhidos são lidos do disco."
+        )
+        if cnpj is None:
+            return None
+        periodos = listar_periodos(raiz, cnpj)
+        escolhidos = st.multiselect(
+            "Períodos",
+            options=periodos,
+            default=periodos,
+            format_func=formatar_periodo,
+            key="repositorio_periodos"
+        )
+        if st.session_state.get('excluir_cancelados'):
+            st.caption("O repositório guarda os SPEDs completos: a opção de desconsiderar "
+                       "cancelados vale para uploads.")
+    return {'raiz': raiz, 'cnpj': cnpj, 'periodos': escolhidos or periodos}
+
+
+def obter_dataset_repositorio(selecao: dict, projecao: dict = None):
+    """
+    Dataset da seleção pelo cache compartilhado (cache_datasets.py).
+
+    RETORNA:
+        (chave do dataset, dataset)
+    """
+    import streamlit as st
+
+    from cache_datasets import obter_dataset
+    from projecao_analises import chave_com_projecao
+
+    particoes = selecionar_particoes(selecao['raiz'], [selecao['cnpj']], selecao['periodos'])
+    chave = chave_com_projecao(f"repositorio:{assinatura_particoes(particoes)}", projecao)
+    dataset = obter_dataset(
+        chave,
+        lambda: carregar_repositorio(selecao['raiz'], [selecao['cnpj']], selecao['periodos'], projecao),
+        arquivos=[os.path.basename(particao) for particao in particoes],
+        sessao=st.session_state
+    )
+    return chave, dataset
+
+
+def exibir_importacao_upload(uploaded_files):
+    """
+    Botão da barra lateral que guarda os SPEDs enviados no repositório.
+    """
+    import streamlit as st
+
+    from ingestao import ler_arquivos_sped
+
+    raiz = raiz_repositorio()
+    if not raiz or not st.sidebar.button("💾 Guardar upload no repositório", key="repositorio_importar"):
+        return
+
+    with st.spinner("Gravando no repositório..."):
+        for nome, conteudo in ler_arquivos_sped(uploaded_files):
+            # Um SPED inválido não impede a gravação dos demais
+            try:
+                identificacao = importar_sped(raiz, conteudo, nome)
+            except Exception as e:
+                st.sidebar.error(f"{nome}: {type(e).__name__}: {e}")
+                continue
+            acao = "substituído" if identificacao['substituido'] else "gravado"
+            st.sidebar.success(f"{identificacao['cnpj']} {formatar_periodo(identificacao['periodo'])}: {acao}")
+
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def main(argumentos=None) -> int:
+    """
+    importar: grava SPEDs no repositório; catalogo: lista o conteúdo.
+    """
+    parser = argparse.ArgumentParser(description="Repositório local de SPEDs por CNPJ e período")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    importar = comandos.add_parser('importar', help='Grava arquivos, ZIPs ou diretórios de SPEDs')
+    importar.add_argument('caminhos', nargs='+')
+    importar.add_argument('--raiz', required=True, help='Raiz do repositório')
+    listar = comandos.add_parser('catalogo', help='Lista CNPJs e períodos guardados')
+    listar.add_argument('--raiz', required=True, help='Raiz do repositório')
+    args = parser.parse_args(argumentos)
+
+    if args.comando == 'catalogo':
+        print(catalogo(args.raiz).to_string(index=False))
+        return 0
+
+    falhas = 0
+    for resultado in importar_arquivos(args.raiz, args.caminhos):
+        if resultado.get('erro'):
+            falhas += 1
+            print(f"ERRO {resultado['arquivo']}: {resultado['erro']}")
+        else:
+            acao = 'substituído' if resultado['substituido'] else 'gravado'
+            print(f"{resultado['cnpj']} {formatar_periodo(resultado['periodo'])}: {acao} ({resultado['arquivo']})")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,8 +5,30 @@ Processa registros C100, C110, C113, C170, C190, C195, C197
 
 import pandas as pd
 import io
+import time
 import zipfile
 from datetime import datetime
+from filtros_leitura import (
+    COLUNAS_CANCELADOS, REGISTRO_CANCELADOS, c100_aceito, c100_cancelado, cfop_aceito, preparar_filtro
+)
+from instrumentacao import (
+    INTERVALO_PROGRESSO_SEGUNDOS, criar_estatisticas, medir_etapa, registrar_etapa, registrar_registros
+)
+
+
+# Campos numéricos (vírgula decimal) convertidos após o parse
+COLUNAS_NUMERICAS = {
+    'C100': ['VL_DOC', 'VL_DESC', 'VL_ABAT_NT', 'VL_MERC', 'VL_FRT',
+             'VL_SEG', 'VL_OUT_DA', 'VL_BC_ICMS', 'VL_ICMS',
+             'VL_BC_ICMS_ST', 'VL_ICMS_ST', 'VL_IPI', 'VL_PIS',
+             'VL_COFINS', 'VL_PIS_ST', 'VL_COFINS_ST'],
+    'C170': ['QTD', 'VL_ITEM', 'VL_DESC', 'VL_BC_ICMS', 'ALIQ_ICMS',
+             'VL_ICMS', 'VL_BC_ICMS_ST', 'ALIQ_ST', 'VL_ICMS_ST',
+             'VL_BC_IPI', 'ALIQ_IPI', 'VL_IPI', 'VL_BC_PIS',
+             'ALIQ_PIS', 'VL_PIS', 'VL_BC_COFINS', 'ALIQ_COFINS', 'VL_COFINS'],
+    'C190': ['ALIQ_ICMS', 'VL_OPR', 'VL_BC_ICMS', 'VL_ICMS',
+             'VL_BC_ICMS_ST', 'VL_ICMS_ST', 'VL_RED_BC', 'VL_IPI'],
+}
 
 
 def parse_registro_c100(linha):
@@ -203,11 +225,59 @@ def parse_registro_c197(linha):
         return None
 
 
-def processar_arquivo_sped(conteudo):
+def converter_colunas_numericas(df, colunas):
+    """
+    Converte as colunas de texto com vírgula decimal em números (vazio ou inválido = 0)
+    """
+    for col in colunas:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col].str.replace(',', '.'), errors='coerce').fillna(0)
+
+
+def aplicar_projecao(resultado, projecao):
+    """
+    Mantém só as colunas pedidas em projecao ({registro: [colunas]})
+    
+    Registro ausente da projeção fica com todas as colunas; lista vazia (ou
+    sem nenhuma coluna existente) vira DataFrame vazio, como nos parsers
+    colunar e vetorizado
+    """
+    if projecao is None:
+        return resultado
+    for registro, colunas in projecao.items():
+        df = resultado.get(registro)
+        if df is None:
+            continue
+        colunas = set(colunas)
+        pedidas = [col for col in df.columns if col in colunas]
+        resultado[registro] = df[pedidas] if pedidas else pd.DataFrame()
+    return resultado
+
+
+def processar_arquivo_sped(conteudo, estatisticas=None, progresso=None, projecao=None, filtro=None):
     """
     Processa um arquivo SPED ICMS/IPI e retorna DataFrames
+    
+    estatisticas: dicionário de instrumentacao.criar_estatisticas() que
+    recebe o tempo de cada etapa (decodificação, parse, DataFrames...)
+    progresso: chamada com (bloco, linha_atual, total_linhas) a cada
+    INTERVALO_PROGRESSO_SEGUNDOS; pode levantar exceção para cancelar
+    projecao: {registro: [colunas]} mantidas no resultado (ver
+    aplicar_projecao); aqui as colunas são descartadas só no final, este
+    parser é a referência dos demais
+    filtro: condições avaliadas durante a leitura (filtros_leitura.py);
+    filhos de um C100 recusado nem são lidos; com EXCLUIR_CANCELADOS o
+    resultado ganha o registro C100_CANCELADOS
     """
-    linhas = conteudo.decode('latin-1').split('\n')
+    estatisticas = criar_estatisticas() if estatisticas is None else estatisticas
+    filtro = preparar_filtro(filtro)
+    
+    with medir_etapa(estatisticas, 'bloco_c.decodificacao', len(conteudo)):
+        texto = conteudo.decode('latin-1')
+    with medir_etapa(estatisticas, 'bloco_c.divisao_linhas', len(conteudo)) as medida:
+        linhas = texto.split('\n')
+        medida['linhas'] = len(linhas)
+    del texto
     
     registros_c100 = []
     registros_c110 = []
@@ -216,11 +286,16 @@ def processar_arquivo_sped(conteudo):
     registros_c190 = []
     registros_c195 = []
     registros_c197 = []
+    registros_cancelados = []
     
     # Variáveis para controle de contexto
     ultimo_c100 = None
     
-    for linha in linhas:
+    tempos_registro = {}
+    tipo_atual = None
+    inicio_parse = inicio_tipo = ultimo_aviso = time.perf_counter()
+    
+    for numero_linha, linha in enumerate(linhas):
         if not linha.strip():
             continue
             
@@ -230,11 +305,33 @@ def processar_arquivo_sped(conteudo):
             
         tipo_registro = campos[1]
         
+        # Tempo por registro: o relógio só é lido quando o tipo muda
+        if tipo_registro != tipo_atual:
+            agora = time.perf_counter()
+            tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + agora - inicio_tipo
+            tipo_atual, inicio_tipo = tipo_registro, agora
+            if progresso is not None and agora - ultimo_aviso >= INTERVALO_PROGRESSO_SEGUNDOS:
+                progresso('bloco_c', numero_linha, len(linhas))
+                ultimo_aviso = agora
+        
         if tipo_registro == 'C100':
             registro = parse_registro_c100(linha)
             if registro:
-                registros_c100.append(registro)
-                ultimo_c100 = registro
+                aceito = filtro is None or c100_aceito(filtro, registro)
+                if aceito and filtro is not None and c100_cancelado(filtro, registro):
+                    # Cancelado/denegado/inutilizado: só a linha de auditoria
+                    registros_cancelados.append({campo: registro[campo] for campo in COLUNAS_CANCELADOS})
+                    aceito = False
+                if aceito:
+                    registros_c100.append(registro)
+                    ultimo_c100 = registro
+                else:
+                    # Documento recusado: os filhos também ficam de fora
+                    ultimo_c100 = None
+        
+        elif ultimo_c100 is None:
+            # Filho sem C100 aceito antes dele: nem é lido
+            continue
                 
         elif tipo_registro == 'C110':
             registro = parse_registro_c110(linha)
@@ -250,7 +347,7 @@ def processar_arquivo_sped(conteudo):
                 
         elif tipo_registro == 'C170':
             registro = parse_registro_c170(linha)
-            if registro and ultimo_c100:
+            if registro and ultimo_c100 and (filtro is None or cfop_aceito(filtro, registro['CFOP'])):
                 registro['NUM_DOC_PAI'] = ultimo_c100.get('NUM_DOC', '')
                 registro['COD_PART_PAI'] = ultimo_c100.get('COD_PART', '')
                 registro['DT_DOC_PAI'] = ultimo_c100.get('DT_DOC', '')
@@ -258,7 +355,7 @@ def processar_arquivo_sped(conteudo):
                 
         elif tipo_registro == 'C190':
             registro = parse_registro_c190(linha)
-            if registro and ultimo_c100:
+            if registro and ultimo_c100 and (filtro is None or cfop_aceito(filtro, registro['CFOP'])):
                 registro['NUM_DOC_PAI'] = ultimo_c100.get('NUM_DOC', '')
                 registro['COD_PART_PAI'] = ultimo_c100.get('COD_PART', '')
                 registro['DT_DOC_PAI'] = ultimo_c100.get('DT_DOC', '')
@@ -276,42 +373,32 @@ def processar_arquivo_sped(conteudo):
                 registro['NUM_DOC_PAI'] = ultimo_c100.get('NUM_DOC', '')
                 registros_c197.append(registro)
     
+    fim_parse = time.perf_counter()
+    tempos_registro[tipo_atual] = tempos_registro.get(tipo_atual, 0.0) + fim_parse - inicio_tipo
+    registrar_etapa(estatisticas, 'bloco_c.parse', fim_parse - inicio_parse, len(conteudo), len(linhas))
+    if progresso is not None:
+        progresso('bloco_c', len(linhas), len(linhas))
+    
     # Criar DataFrames
-    df_c100 = pd.DataFrame(registros_c100) if registros_c100 else pd.DataFrame()
-    df_c110 = pd.DataFrame(registros_c110) if registros_c110 else pd.DataFrame()
-    df_c113 = pd.DataFrame(registros_c113) if registros_c113 else pd.DataFrame()
-    df_c170 = pd.DataFrame(registros_c170) if registros_c170 else pd.DataFrame()
-    df_c190 = pd.DataFrame(registros_c190) if registros_c190 else pd.DataFrame()
-    df_c195 = pd.DataFrame(registros_c195) if registros_c195 else pd.DataFrame()
-    df_c197 = pd.DataFrame(registros_c197) if registros_c197 else pd.DataFrame()
+    with medir_etapa(estatisticas, 'bloco_c.dataframes'):
+        df_c100 = pd.DataFrame(registros_c100) if registros_c100 else pd.DataFrame()
+        df_c110 = pd.DataFrame(registros_c110) if registros_c110 else pd.DataFrame()
+        df_c113 = pd.DataFrame(registros_c113) if registros_c113 else pd.DataFrame()
+        df_c170 = pd.DataFrame(registros_c170) if registros_c170 else pd.DataFrame()
+        df_c190 = pd.DataFrame(registros_c190) if registros_c190 else pd.DataFrame()
+        df_c195 = pd.DataFrame(registros_c195) if registros_c195 else pd.DataFrame()
+        df_c197 = pd.DataFrame(registros_c197) if registros_c197 else pd.DataFrame()
     
     # Converter campos numéricos
-    colunas_numericas_c100 = ['VL_DOC', 'VL_DESC', 'VL_ABAT_NT', 'VL_MERC', 'VL_FRT', 
-                               'VL_SEG', 'VL_OUT_DA', 'VL_BC_ICMS', 'VL_ICMS', 
-                               'VL_BC_ICMS_ST', 'VL_ICMS_ST', 'VL_IPI', 'VL_PIS', 
-                               'VL_COFINS', 'VL_PIS_ST', 'VL_COFINS_ST']
-    
-    for col in colunas_numericas_c100:
-        if col in df_c100.columns:
-            df_c100[col] = pd.to_numeric(df_c100[col].str.replace(',', '.'), errors='coerce').fillna(0)
-    
-    colunas_numericas_c170 = ['QTD', 'VL_ITEM', 'VL_DESC', 'VL_BC_ICMS', 'ALIQ_ICMS', 
-                               'VL_ICMS', 'VL_BC_ICMS_ST', 'ALIQ_ST', 'VL_ICMS_ST',
-                               'VL_BC_IPI', 'ALIQ_IPI', 'VL_IPI', 'VL_BC_PIS', 
-                               'ALIQ_PIS', 'VL_PIS', 'VL_BC_COFINS', 'ALIQ_COFINS', 'VL_COFINS']
+    inicio_conversao = time.perf_counter()
+    converter_colunas_numericas(df_c100, COLUNAS_NUMERICAS['C100'])
+    converter_colunas_numericas(df_c170, COLUNAS_NUMERICAS['C170'])
+    converter_colunas_numericas(df_c190, COLUNAS_NUMERICAS['C190'])
     
-    for col in colunas_numericas_c170:
-        if col in df_c170.columns:
-            df_c170[col] = pd.to_numeric(df_c170[col].str.replace(',', '.'), errors='coerce').fillna(0)
+    registrar_etapa(estatisticas, 'bloco_c.conversao_numerica', time.perf_counter() - inicio_conversao,
+                    linhas=len(df_c100) + len(df_c170) + len(df_c190))
     
-    colunas_numericas_c190 = ['ALIQ_ICMS', 'VL_OPR', 'VL_BC_ICMS', 'VL_ICMS', 
-                               'VL_BC_ICMS_ST', 'VL_ICMS_ST', 'VL_RED_BC', 'VL_IPI']
-    
-    for col in colunas_numericas_c190:
-        if col in df_c190.columns:
-            df_c190[col] = pd.to_numeric(df_c190[col].str.replace(',', '.'), errors='coerce').fillna(0)
-    
-    return {
+    resultado = {
         'C100': df_c100,
         'C110': df_c110,
         'C113': df_c113,
@@ -320,6 +407,12 @@ def processar_arquivo_sped(conteudo):
         'C195': df_c195,
         'C197': df_c197
     }
+    if filtro is not None and filtro['cancelados'] is not None:
+        resultado[REGISTRO_CANCELADOS] = pd.DataFrame(registros_cancelados) if registros_cancelados else pd.DataFrame()
+    aplicar_projecao(resultado, projecao)
+    registrar_registros(estatisticas, tempos_registro, resultado)
+    
+    return resultado
 
 
 def processar_multiplos_speds(uploaded_files):
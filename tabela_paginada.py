@@ -0,0 +1,211 @@
+"""
+================================================================================
+MÓDULO: Tabela Paginada - SPED ICMS/IPI
+================================================================================
+
+OBJETIVO:
+    Exibir tabelas grandes (C100, C170, C190, cadastros) enviando ao navegador
+    apenas a página visível, com ordenação feita no servidor.
+
+CONTEXTO:
+    st.dataframe serializa o DataFrame inteiro em Arrow e envia pelo websocket.
+    Com milhões de linhas o navegador trava. Aqui só a fatia da página atual
+    é serializada, então o payload fica limitado ao tamanho da página.
+
+ORDENAÇÃO:
+    - Para cada coluna e sentido é calculada uma única vez a permutação que
+      ordena o DataFrame completo (chave de ordenação). A decrescente é
+      calculada à parte, não invertendo a crescente: vazios continuam no
+      final e empates na ordem original
+    - Para ordenar um subconjunto filtrado basta percorrer essa permutação
+      mantendo só as linhas filtradas: O(n) em vez de O(n log n) por rerun
+    - Datas DDMMAAAA (colunas DT_*) são ordenadas cronologicamente
+
+GATILHOS DE MANUTENÇÃO:
+    1. Para mudar tamanhos de página: ajustar TAMANHOS_PAGINA
+    2. Totais e métricas devem ser calculados sobre o DataFrame filtrado
+       completo, nunca sobre a página exibida
+    3. Colunas VL_* aparecem em R$ só na renderização da página
+       (os dados continuam numéricos)
+
+Data de Criação: 18/10/2026
+Autor: Sistema Lavoratory
+================================================================================
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Dict
+from formatacao import estilizar_moeda_br, formatar_inteiro_br
+
+
+# ============================================================================
+# CONSTANTES E CONFIGURAÇÕES
+# ============================================================================
+
+TAMANHOS_PAGINA = [50, 100, 250, 500, 1000]
+
+OPCAO_SEM_ORDENACAO = '(ordem original)'
+
+
+# ============================================================================
+# CHAVES DE ORDENAÇÃO
+# ============================================================================
+
+def preparar_valores_ordenacao(serie: pd.Series) -> pd.Series:
+    """
+    Converte a coluna para a forma usada na ordenação.
+
+    IMPORTANTE:
+    - Colunas DT_* em DDMMAAAA viram datas (ordem cronológica)
+    - Demais colunas são ordenadas pelo próprio valor
+    """
+    if serie.name and str(serie.name).startswith('DT_') and serie.dtype == object:
+        return pd.to_datetime(serie, format='%d%m%Y', errors='coerce')
+    return serie
+
+
+def calcular_chave_ordenacao(df: pd.DataFrame, coluna: str, ascendente: bool = True) -> np.ndarray:
+    """
+    Calcula a permutação (posições iloc) que ordena o DataFrame pela coluna.
+
+    IMPORTANTE:
+    - Ordenação estável: empates mantêm a ordem original (nos dois sentidos)
+    - Valores vazios/inválidos ficam no final (nos dois sentidos)
+    """
+    valores = preparar_valores_ordenacao(df[coluna]).reset_index(drop=True)
+    return valores.sort_values(ascending=ascendente, kind='stable', na_position='last').index.to_numpy()
+
+
+def obter_chave_ordenacao(df: pd.DataFrame, coluna: str, cache: Dict[tuple, np.ndarray],
+                          ascendente: bool = True) -> np.ndarray:
+    """
+    Retorna a chave de ordenação da coluna no sentido pedido, calculando
+    apenas na primeira vez.
+
+    GATILHO DE MANUTENÇÃO:
+    - O cache pertence ao DataFrame base; criar um novo a cada ingestão
+    """
+    chave_cache = (coluna, ascendente)
+    if chave_cache not in cache or len(cache[chave_cache]) != len(df):
+        cache[chave_cache] = calcular_chave_ordenacao(df, coluna, ascendente)
+    return cache[chave_cache]
+
+
+def ordenar_posicoes(chave: np.ndarray, posicoes: np.ndarray, total: int) -> np.ndarray:
+    """
+    Ordena um subconjunto de posições usando a chave do DataFrame completo.
+    """
+    selecionadas = np.zeros(total, dtype=bool)
+    selecionadas[posicoes] = True
+    return chave[selecionadas[chave]]
+
+
+def fatiar_pagina(df_base: pd.DataFrame, df_filtrado: pd.DataFrame, pagina: int, tamanho: int,
+                  coluna: str = None, ascendente: bool = True,
+                  cache: Dict[tuple, np.ndarray] = None) -> pd.DataFrame:
+    """
+    Retorna apenas as linhas da página pedida, já ordenadas.
+
+    Parâmetros:
+        df_base: DataFrame completo (onde as chaves de ordenação são calculadas)
+        df_filtrado: Subconjunto de df_base (mesmos rótulos de índice)
+        pagina: Número da página, começando em 1
+        tamanho: Linhas por página
+        coluna: Coluna de ordenação (None = ordem do df_filtrado)
+    """
+    inicio = (pagina - 1) * tamanho
+    fim = inicio + tamanho
+
+    if not coluna:
+        return df_filtrado.iloc[inicio:fim]
+
+    cache = {} if cache is None else cache
+    chave = obter_chave_ordenacao(df_base, coluna, cache, ascendente)
+    posicoes = df_base.index.get_indexer(df_filtrado.index)
+    ordem = ordenar_posicoes(chave, posicoes, len(df_base))
+
+    return df_base.iloc[ordem[inicio:fim]]
+
+
+# ============================================================================
+# FUNÇÃO DE EXIBIÇÃO
+# ============================================================================
+
+def exibir_tabela_paginada(df_filtrado: pd.DataFrame, df_base: pd.DataFrame = None,
+                           key_prefix: str = "", cache: Dict[tuple, np.ndarray] = None,
+                           column_config: dict = None):
+    """
+    Exibe a tabela paginada com controles de ordenação e navegação.
+
+    Parâmetros:
+        df_filtrado: Dados a exibir (resultado dos filtros/busca)
+        df_base: DataFrame completo de onde df_filtrado foi filtrado
+        key_prefix: Prefixo único para as keys dos widgets
+        cache: Dicionário de chaves de ordenação do df_base (reaproveitado)
+        column_config: Configuração de colunas repassada ao st.dataframe
+    """
+    df_base = df_filtrado if df_base is None else df_base
+    total = len(df_filtrado)
+
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+
+    with col1:
+        coluna = st.selectbox(
+            "Ordenar por",
+            options=[OPCAO_SEM_ORDENACAO] + list(df_filtrado.columns),
+            key=f"{key_prefix}_ordenar_por"
+        )
+
+    with col2:
+        sentido = st.selectbox(
+            "Sentido",
+            options=['Crescente', 'Decrescente'],
+            key=f"{key_prefix}_sentido"
+        )
+
+    with col3:
+        tamanho = st.selectbox(
+            "Linhas por página",
+            options=TAMANHOS_PAGINA,
+            index=1,
+            key=f"{key_prefix}_tamanho_pagina"
+        )
+
+    total_paginas = max(1, -(-total // tamanho))
+    chave_pagina = f"{key_prefix}_pagina"
+    if st.session_state.get(chave_pagina, 1) > total_paginas:
+        st.session_state[chave_pagina] = total_paginas
+
+    with col4:
+        pagina = st.number_input(
+            f"Página (de {formatar_inteiro_br(total_paginas)})",
+            min_value=1,
+            max_value=total_paginas,
+            step=1,
+            key=chave_pagina
+        )
+
+    df_pagina = fatiar_pagina(
+        df_base,
+        df_filtrado,
+        int(pagina),
+        tamanho,
+        coluna=None if coluna == OPCAO_SEM_ORDENACAO else coluna,
+        ascendente=(sentido == 'Crescente'),
+        cache=cache
+    )
+
+    st.dataframe(
+        estilizar_moeda_br(df_pagina),
+        use_container_width=True,
+        hide_index=True,
+        column_config=column_config
+    )
+
+    inicio = (int(pagina) - 1) * tamanho
+    st.caption(
+        f"Exibindo linhas {formatar_inteiro_br(min(inicio + 1, total))} a "
+        f"{formatar_inteiro_br(min(inicio + tamanho, total))} de {formatar_inteiro_br(total)}"
+    )
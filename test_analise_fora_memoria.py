@@ -0,0 +1,66 @@
+"""
+Testes das análises por partes sobre o Parquet convertido (analise_fora_memoria.py)
+"""
+
+import pandas as pd
+
+from analise_fora_memoria import (
+    acumulador_cfop_particionado, entrada_saida_particionada, evolucao_mensal_particionada,
+    linha_temporal_particionada, listar_bases, listar_particoes, main, resumo_entrada_saida_particionado,
+)
+from calculos_fiscais import (
+    agregar_entrada_saida, agregar_linha_temporal, criar_acumulador_cfop, criar_resumo_entrada_saida,
+    evolucao_mensal_entrada_saida,
+)
+from converter_sped import executar_conversao
+from gerador_sped import gerar_sped
+
+
+def _converter(tmp_path, nome, sementes):
+    entradas = []
+    for semente in sementes:
+        caminho = tmp_path / f'sped_{semente}.txt'
+        caminho.write_bytes(gerar_sped(documentos=40, semente=semente))
+        entradas.append(str(caminho))
+    destino = str(tmp_path / 'bases' / nome)
+    executar_conversao(entradas, destino, processos=1)
+    return destino
+
+
+def _em_memoria(destino, registro):
+    return pd.concat([pd.read_parquet(caminho) for caminho in listar_particoes(destino, registro)],
+                     ignore_index=True)
+
+
+def _comparar(obtido, esperado, chaves):
+    pd.testing.assert_frame_equal(
+        obtido.sort_values(chaves).reset_index(drop=True),
+        esperado.sort_values(chaves).reset_index(drop=True)[list(obtido.columns)],
+        check_dtype=False, check_exact=False, rtol=1e-9
+    )
+
+
+def test_analises_por_lote_iguais_as_em_memoria(tmp_path):
+    destino = _converter(tmp_path, 'filial', [61, 62, 63])
+    c100, c190 = _em_memoria(destino, 'C100'), _em_memoria(destino, 'C190')
+
+    # Lotes pequenos: cada análise soma várias parciais
+    _comparar(acumulador_cfop_particionado(destino, 7), criar_acumulador_cfop(c190), ['CFOP', 'CST_ICMS'])
+    _comparar(resumo_entrada_saida_particionado(destino, 7), criar_resumo_entrada_saida(c100, c190), ['TIPO'])
+    _comparar(entrada_saida_particionada(destino, 7), agregar_entrada_saida(c100), ['IND_OPER'])
+    _comparar(linha_temporal_particionada(destino, 7), agregar_linha_temporal(c100), ['DATA'])
+    assert acumulador_cfop_particionado(destino, 7)['QTD_REGISTROS'].sum() == len(c190)
+
+
+def test_evolucao_mensal_e_linha_de_comando(tmp_path):
+    destino = _converter(tmp_path, 'matriz', [64])
+    c100, c190 = _em_memoria(destino, 'C100'), _em_memoria(destino, 'C190')
+
+    pd.testing.assert_frame_equal(evolucao_mensal_particionada(destino, 5),
+                                  evolucao_mensal_entrada_saida(c100, c190), check_dtype=False)
+
+    saida = tmp_path / 'resultados'
+    assert main([destino, '--saida', str(saida)]) == 0
+    pd.testing.assert_frame_equal(pd.read_parquet(saida / 'acumulador_cfop.parquet'),
+                                  acumulador_cfop_particionado(destino).reset_index(drop=True))
+    assert listar_bases(str(tmp_path / 'bases')) == ['matriz']
@@ -0,0 +1,70 @@
+"""
+Testes do benchmark das análises (benchmark_analises.py) e do filtro sem widgets
+"""
+
+from datetime import date
+
+import pandas as pd
+
+from benchmark_analises import (
+    gerar_dados_analise, ajustar_curva, comparar_resultados, executar_benchmark, montar_relatorio
+)
+from filtros_avancados import aplicar_filtros
+
+
+def test_dados_sinteticos_tem_formato_do_parser():
+    dados = gerar_dados_analise(1_000)
+
+    assert len(dados['C190']) == 1_000
+    assert len(dados['C100']) == 500
+    assert dados['C100']['NUM_DOC'].is_unique
+    assert set(dados['C190']['NUM_DOC_PAI']) == set(dados['C100']['NUM_DOC'])
+    assert round(dados['C100']['VL_DOC'].sum(), 2) == round(dados['C190']['VL_OPR'].sum(), 2)
+    assert dados['C190']['CFOP'].dtype == object
+
+
+def test_curva_recupera_expoente():
+    linhas = [1_000, 10_000, 100_000]
+
+    linear = ajustar_curva(linhas, [n * 1e-6 for n in linhas])
+    quadratica = ajustar_curva(linhas, [n ** 2 * 1e-9 for n in linhas])
+
+    assert abs(linear['expoente'] - 1) < 1e-9
+    assert abs(quadratica['expoente'] - 2) < 1e-9
+    assert ajustar_curva([1_000], [0.1]) is None
+
+
+def test_comparacao_acusa_regressao_acima_do_limite():
+    base = [{'caso': 'a', 'linhas': 10, 'segundos': 1.0, 'memoria_pico_mb': 10.0},
+            {'caso': 'b', 'linhas': 10, 'segundos': 1.0, 'memoria_pico_mb': 10.0}]
+    atual = [{'caso': 'a', 'linhas': 10, 'segundos': 1.1, 'memoria_pico_mb': 10.0},
+             {'caso': 'b', 'linhas': 10, 'segundos': 1.0, 'memoria_pico_mb': 15.0}]
+
+    comparacoes = comparar_resultados(atual, base, limite=0.2)
+
+    assert [c['regressao'] for c in comparacoes] == [False, True]
+
+
+def test_execucao_completa_gera_relatorio():
+    resultados = executar_benchmark([2_000, 4_000], casos=['agregar_entrada_saida'], repeticoes=1)
+    relatorio = montar_relatorio(resultados)
+
+    assert len(relatorio['resultados']) == 2
+    assert relatorio['curvas']['agregar_entrada_saida']['tempo'] is not None
+
+
+def test_aplicar_filtros_sem_widgets():
+    df = pd.DataFrame({
+        'COD_PART': ['P1', 'P2', 'P1'],
+        'VL_DOC': [100.0, 2000.0, 3000.0],
+        'DT_DOC': ['05012025', '10022025', '15032025'],
+    })
+
+    filtrado, filtros = aplicar_filtros(
+        df, participantes=['P1'], operador_valor='>', valor=500.0,
+        data_inicio=date(2025, 3, 1), data_fim=date(2025, 3, 31)
+    )
+
+    assert filtrado.index.tolist() == [2]
+    assert len(filtros) == 3
+    assert aplicar_filtros(df)[0] is df
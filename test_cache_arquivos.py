@@ -0,0 +1,84 @@
+"""
+Testes da ingestão incremental (cache_arquivos.py, ingestao.py e pipeline_ingestao.py)
+"""
+
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from cache_arquivos import _entradas, limpar_cache_arquivos, resumo_cache_arquivos
+from conftest import arquivo_enviado, zip_enviado
+from gerador_sped import gerar_sped
+from ingestao import carregar_dataset
+from pipeline_ingestao import carregar_dataset_pipeline
+
+
+MESES = {
+    'jan.txt': gerar_sped(documentos=12, semente=51),
+    'fev.zip': {'fev_a.txt': gerar_sped(documentos=8, semente=52), 'fev_b.txt': gerar_sped(documentos=9, semente=53)},
+    'mar.txt': gerar_sped(documentos=10, semente=54),
+}
+
+
+def _upload(*nomes):
+    return [zip_enviado(nome, MESES[nome]) if nome.endswith('.zip') else arquivo_enviado(nome, MESES[nome])
+            for nome in nomes]
+
+
+def _comparar(dataset, esperado):
+    for bloco in ('dados_c', 'dados_0', 'dados_e'):
+        assert dataset[bloco].keys() == esperado[bloco].keys()
+        for registro, df in esperado[bloco].items():
+            pd.testing.assert_frame_equal(df, dataset[bloco][registro])
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    limpar_cache_arquivos()
+    yield
+    limpar_cache_arquivos()
+
+
+def test_so_os_arquivos_novos_sao_processados():
+    carregar_dataset(_upload('jan.txt', 'fev.zip'), incremental=True)
+
+    # Novo mês no meio do upload: só ele passa pelos parsers
+    dataset = carregar_dataset(_upload('jan.txt', 'mar.txt', 'fev.zip'), incremental=True)
+    etapas = dataset['estatisticas']['etapas']
+    assert etapas['bloco_c.parse']['chamadas'] == 1
+    assert etapas['incremental.reaproveitados']['chamadas'] == 2
+    _comparar(dataset, carregar_dataset(_upload('jan.txt', 'mar.txt', 'fev.zip')))
+
+    # Arquivo removido: nada é processado
+    dataset = carregar_dataset(_upload('mar.txt', 'jan.txt'), incremental=True)
+    assert 'bloco_c.parse' not in dataset['estatisticas']['etapas']
+    _comparar(dataset, carregar_dataset(_upload('mar.txt', 'jan.txt')))
+    assert resumo_cache_arquivos()['arquivos'] == 3
+
+
+def test_pipeline_incremental_igual_ao_sequencial():
+    carregar_dataset(_upload('fev.zip'), incremental=True)
+
+    dataset = carregar_dataset_pipeline(_upload('jan.txt', 'fev.zip', 'mar.txt'), processos=2,
+                                        incremental=True)
+    assert dataset['estatisticas']['etapas']['bloco_c.parse']['chamadas'] == 2
+    _comparar(dataset, carregar_dataset(_upload('jan.txt', 'fev.zip', 'mar.txt')))
+
+    # Outra projeção é outro resultado: processa de novo
+    projetado = carregar_dataset(_upload('jan.txt'), projecao={'C170': []}, incremental=True)
+    assert projetado['estatisticas']['etapas']['bloco_c.parse']['chamadas'] == 1
+    assert projetado['dados_c']['C170'].empty
+
+
+def test_cache_por_arquivo_nao_e_alterado_pela_consolidacao():
+    dataset = carregar_dataset(_upload('jan.txt'), incremental=True)
+    guardados = [df for entrada in _entradas.values() for _, resultado in entrada['resultados']
+                 for bloco in ('dados_c', 'dados_0') for df in resultado[bloco].values()]
+    assert guardados and all('ARQUIVO_ORIGEM' not in df.columns for df in guardados)
+    assert (dataset['dados_c']['C100']['ARQUIVO_ORIGEM'] == 'jan.txt').all()
+
+    # O hash do arquivo não depende da interface (sem streamlit, sem ciclo)
+    codigo = "import sys, cache_arquivos; assert 'streamlit' not in sys.modules"
+    subprocess.run([sys.executable, '-c', codigo], check=True)
@@ -0,0 +1,156 @@
+"""
+Testes do cache compartilhado de datasets (cache_datasets.py)
+"""
+
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import cache_datasets
+from cache_datasets import (
+    calcular_chave_arquivos, obter_dataset, configurar_orcamento,
+    remover_do_cache, limpar_cache, listar_cache, resumo_cache, medir_objeto
+)
+from analise_entrada_saida import adicionar_classificacao
+from conftest import arquivo_enviado
+
+
+def dataset_com_linhas(linhas: int) -> dict:
+    return {'dados_c': {'C100': pd.DataFrame({'VL_DOC': [1.0] * linhas})}}
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    orcamento = resumo_cache()['orcamento_bytes']
+    limpar_cache()
+    yield
+    limpar_cache()
+    configurar_orcamento(orcamento / cache_datasets.BYTES_POR_MB)
+
+
+def test_chave_depende_do_conteudo_e_do_nome():
+    chave = calcular_chave_arquivos([arquivo_enviado('jan.txt', b'|0000|A|')])
+
+    assert chave == calcular_chave_arquivos([arquivo_enviado('jan.txt', b'|0000|A|')])
+    assert chave != calcular_chave_arquivos([arquivo_enviado('jan.txt', b'|0000|B|')])
+    assert chave != calcular_chave_arquivos([arquivo_enviado('fev.txt', b'|0000|A|')])
+
+
+def test_chave_usa_hash_memorizado_por_file_id():
+    memo = {}
+    arquivo = arquivo_enviado('jan.txt', b'|0000|A|', file_id='id-1')
+    chave = calcular_chave_arquivos([arquivo], memo=memo)
+
+    assert 'id-1' in memo
+    memo['id-1'] = 'outro'
+    assert calcular_chave_arquivos([arquivo], memo=memo) != chave
+
+
+def test_mesma_chave_compartilha_o_mesmo_dataset():
+    chamadas = []
+
+    def carregar():
+        chamadas.append(1)
+        return dataset_com_linhas(10)
+
+    primeiro = obter_dataset('abc', carregar)
+    segundo = obter_dataset('abc', carregar)
+
+    assert primeiro is segundo
+    assert len(chamadas) == 1
+    assert resumo_cache()['bytes_usados'] == medir_objeto(primeiro)
+
+
+def test_remove_menos_usado_quando_passa_do_orcamento():
+    tamanho = medir_objeto(dataset_com_linhas(1000))
+    configurar_orcamento(2.5 * tamanho / cache_datasets.BYTES_POR_MB)
+
+    obter_dataset('a', lambda: dataset_com_linhas(1000))
+    obter_dataset('b', lambda: dataset_com_linhas(1000))
+    obter_dataset('a', lambda: dataset_com_linhas(1000))
+    obter_dataset('c', lambda: dataset_com_linhas(1000))
+
+    assert list(listar_cache()['CHAVE']) == ['c', 'a']
+    assert resumo_cache()['bytes_usados'] <= resumo_cache()['orcamento_bytes']
+
+
+def test_dataset_maior_que_orcamento_nao_fica_em_cache():
+    configurar_orcamento(0.001)
+
+    dataset = obter_dataset('grande', lambda: dataset_com_linhas(10_000))
+
+    assert len(dataset['dados_c']['C100']) == 10_000
+    assert resumo_cache()['entradas'] == 0
+
+
+def test_sessoes_simultaneas_processam_uma_unica_vez():
+    chamadas = []
+
+    def carregar():
+        chamadas.append(1)
+        time.sleep(0.2)
+        return dataset_com_linhas(10)
+
+    resultados = []
+    threads = [
+        threading.Thread(target=lambda: resultados.append(obter_dataset('x', carregar)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(chamadas) == 1
+    assert all(resultado is resultados[0] for resultado in resultados)
+
+
+def test_dataset_fora_do_cache_processado_uma_vez():
+    configurar_orcamento(0.001)
+    chamadas = []
+
+    def carregar():
+        chamadas.append(1)
+        time.sleep(0.2)
+        return dataset_com_linhas(10_000)
+
+    # Sessões chegando enquanto outra ainda espera: todas recebem o mesmo resultado
+    resultados = []
+
+    def sessao(atraso):
+        time.sleep(atraso)
+        resultados.append(obter_dataset('grande', carregar))
+
+    threads = [threading.Thread(target=sessao, args=(atraso,)) for atraso in (0, 0.05, 0.1, 0.15)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(chamadas) == 1
+    assert all(resultado is resultados[0] for resultado in resultados)
+    assert not cache_datasets._carregando
+
+    # Reruns da mesma sessão usam o dataset guardado nela
+    estado_sessao = {}
+    dataset = obter_dataset('grande', carregar, sessao=estado_sessao)
+    assert obter_dataset('grande', carregar, sessao=estado_sessao) is dataset
+    assert len(chamadas) == 2 and resumo_cache()['entradas'] == 0
+
+
+def test_remover_do_cache():
+    obter_dataset('a', lambda: dataset_com_linhas(10))
+
+    assert remover_do_cache('a')
+    assert not remover_do_cache('a')
+    assert listar_cache().empty
+
+
+def test_classificacao_nao_altera_dataframe_compartilhado():
+    df_c190 = pd.DataFrame({'CFOP': ['1102', '5102']})
+
+    resultado = adicionar_classificacao(df_c190)
+
+    assert 'TIPO_OPERACAO' not in df_c190.columns
+    assert list(resultado['TIPO_OPERACAO']) == ['ENTRADA', 'SAÍDA']
@@ -0,0 +1,47 @@
+"""
+Testes do núcleo de cálculos sem interface (calculos_fiscais.py)
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import calculos_fiscais
+
+
+MODULOS_SEM_INTERFACE = ['calculos_fiscais', 'ingestao', 'converter_sped', 'benchmark_analises']
+
+# Sem medir tempo (varia com a máquina): benchmark_parser.py --importacao
+MODULOS_DE_INTERFACE = """
+import json, sys
+for modulo in sys.argv[1:]:
+    __import__(modulo)
+print(json.dumps(sorted(m for m in ('streamlit', 'plotly') if m in sys.modules)))
+"""
+
+
+def _importar_em_processo_novo(modulos):
+    processo = subprocess.run(
+        [sys.executable, '-c', MODULOS_DE_INTERFACE, *modulos],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(calculos_fiscais.__file__))
+    )
+    return json.loads(processo.stdout)
+
+
+def test_nucleo_nao_importa_streamlit_nem_plotly():
+    for modulo in MODULOS_SEM_INTERFACE:
+        assert _importar_em_processo_novo([modulo]) == [], modulo
+
+
+def test_abas_reexportam_as_funcoes_do_nucleo():
+    import acumuladores_cfop
+    import analise_entrada_saida
+    import dashboards_bigfour
+    import filtros_avancados
+
+    assert acumuladores_cfop.criar_acumulador_cfop is calculos_fiscais.criar_acumulador_cfop
+    assert analise_entrada_saida.criar_resumo_entrada_saida is calculos_fiscais.criar_resumo_entrada_saida
+    assert dashboards_bigfour.agregar_top10_cfop is calculos_fiscais.agregar_top10_cfop
+    assert filtros_avancados.aplicar_filtros is calculos_fiscais.aplicar_filtros
@@ -0,0 +1,64 @@
+"""
+Testes da consulta SQL sobre os registros (consulta_sql.py)
+"""
+
+import pandas as pd
+import pytest
+
+import consulta_sql
+from consulta_sql import ConsultaInterrompida, ConsultaRecusada, executar_consulta, tabelas_do_dataset
+from conftest import arquivo_enviado
+from gerador_sped import gerar_sped
+from ingestao import carregar_dataset
+
+
+@pytest.fixture(scope='module')
+def tabelas():
+    return tabelas_do_dataset(carregar_dataset([arquivo_enviado('jan.txt', gerar_sped(documentos=40, semente=71))]))
+
+
+def test_juncao_igual_ao_merge_do_pandas(tabelas):
+    resultado, info = executar_consulta(tabelas, """
+        SELECT p.NOME, SUM(c.VL_DOC) AS VL_DOC
+        FROM C100 c JOIN "0150" p ON p.COD_PART = c.COD_PART
+        GROUP BY p.NOME
+    """)
+    assert not info['truncado']
+
+    esperado = (tabelas['C100'].merge(tabelas['0150'], on='COD_PART')
+                .groupby('NOME', as_index=False)['VL_DOC'].sum())
+    pd.testing.assert_frame_equal(resultado.sort_values('NOME').reset_index(drop=True),
+                                  esperado.sort_values('NOME').reset_index(drop=True), check_dtype=False)
+
+    # Resultado limitado, com aviso de truncamento
+    parcial, info = executar_consulta(tabelas, 'SELECT * FROM C170', limite_linhas=10)
+    assert len(parcial) == 10 and info['truncado']
+
+
+def test_tempo_limite_e_somente_leitura(tabelas, tmp_path):
+    infinita = """
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+        SELECT COUNT(*) FROM n
+    """
+    with pytest.raises(ConsultaInterrompida):
+        executar_consulta(tabelas, infinita, tempo_limite=0.2)
+
+    # Sem criar nem ler arquivos do servidor
+    arquivo = tmp_path / 'copia.db'
+    with pytest.raises(Exception):
+        executar_consulta(tabelas, f"ATTACH DATABASE '{arquivo}' AS copia")
+    assert not arquivo.exists()
+
+
+def test_reserva_sqlite_recusa_copias_grandes(tabelas, monkeypatch):
+    consulta = 'SELECT COUNT(*) AS N FROM C170 JOIN C100 ON C100.NUM_DOC = C170.NUM_DOC_PAI'
+    esperado, _ = executar_consulta(tabelas, consulta)
+
+    monkeypatch.setattr(consulta_sql, 'duckdb', None)
+    resultado, info = executar_consulta(tabelas, consulta)
+    assert info['motor'] == 'sqlite'
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+    monkeypatch.setattr(consulta_sql, 'LIMITE_LINHAS_COPIA_SQLITE', len(tabelas['C170']))
+    with pytest.raises(ConsultaRecusada, match='sem o DuckDB'):
+        executar_consulta(tabelas, consulta)
@@ -0,0 +1,110 @@
+"""
+Testes da conversão em lote para Parquet (converter_sped.py)
+"""
+
+import json
+import os
+import zipfile
+
+import pandas as pd
+
+import converter_sped
+from analise_fora_memoria import resumo_entrada_saida_particionado
+from converter_sped import converter_arquivo, listar_entradas, main, nome_saida, parquet_existentes
+from gerador_sped import gerar_sped
+from sped_parser import processar_arquivo_sped
+
+
+def _preparar_entradas(diretorio):
+    conteudo_a = gerar_sped(documentos=20, semente=1)
+    conteudo_b = gerar_sped(documentos=15, semente=2)
+    os.makedirs(diretorio / 'sub')
+    (diretorio / 'a.txt').write_bytes(conteudo_a)
+    with zipfile.ZipFile(diretorio / 'sub' / 'lote.zip', 'w') as zip_ref:
+        zip_ref.writestr('b.txt', conteudo_b)
+    (diretorio / 'sub' / 'quebrado.zip').write_bytes(b'nao e zip')
+    (diretorio / 'leiame.md').write_text('ignorado')
+    return conteudo_a, conteudo_b
+
+
+def test_listar_entradas_percorre_diretorios(tmp_path):
+    _preparar_entradas(tmp_path)
+    entradas = listar_entradas([str(tmp_path), str(tmp_path / 'a.txt')])
+
+    assert sorted(os.path.basename(e) for e in entradas) == ['a.txt', 'lote.zip', 'quebrado.zip']
+
+
+def test_conversao_grava_parquet_e_reporta_erros(tmp_path):
+    conteudo_a, conteudo_b = _preparar_entradas(tmp_path / 'entrada')
+    destino = tmp_path / 'saida'
+
+    codigo = main([str(tmp_path / 'entrada'), '--destino', str(destino), '--processos', '2', '--resumos'])
+
+    assert codigo == 1
+    relatorio = json.loads((destino / '_relatorio_conversao.json').read_text(encoding='utf-8'))
+    assert relatorio['convertidos'] == 2
+    assert list(relatorio['erros']) == [str(tmp_path / 'entrada' / 'sub' / 'quebrado.zip')]
+
+    c100 = pd.read_parquet(destino / 'C100')
+    esperado = len(processar_arquivo_sped(conteudo_a)['C100']) + len(processar_arquivo_sped(conteudo_b)['C100'])
+    assert len(c100) == esperado
+    assert c100['ARQUIVO_ORIGEM'].nunique() == 2
+    assert 'ARQUIVO_ORIGEM' in pd.read_parquet(destino / 'E110').columns
+    assert not pd.read_parquet(destino / 'resumos' / 'acumulador_cfop').empty
+
+    saida_a = nome_saida(str(tmp_path / 'entrada' / 'a.txt'))
+    assert (destino / '_concluidos' / f'{saida_a}.json').exists()
+
+
+def test_pular_convertidos(tmp_path):
+    _preparar_entradas(tmp_path / 'entrada')
+    destino = tmp_path / 'saida'
+    main([str(tmp_path / 'entrada' / 'a.txt'), '--destino', str(destino), '--processos', '1'])
+
+    main([str(tmp_path / 'entrada'), '--destino', str(destino), '--processos', '1', '--pular-convertidos'])
+
+    relatorio = json.loads((destino / '_relatorio_conversao.json').read_text(encoding='utf-8'))
+    assert relatorio['arquivos'] == 2
+
+
+def test_filtros_da_linha_de_comando(tmp_path):
+    conteudo_a, _ = _preparar_entradas(tmp_path / 'entrada')
+    destino = tmp_path / 'saida'
+
+    main([str(tmp_path / 'entrada' / 'a.txt'), '--destino', str(destino), '--processos', '1',
+          '--ind-oper', '1', '--data-inicial', '10/01/2025', '--cfop', '5102', '6102'])
+
+    c100 = pd.read_parquet(destino / 'C100')
+    assert set(c100['IND_OPER']) == {'1'}
+    assert (c100['DT_DOC'].str[2:4] + c100['DT_DOC'].str[:2] >= '0110').all()
+    assert set(pd.read_parquet(destino / 'C190')['CFOP']) <= {'5102', '6102'}
+    assert len(c100) < len(processar_arquivo_sped(conteudo_a)['C100'])
+
+
+def test_reconversao_nao_deixa_tabelas_antigas(tmp_path, monkeypatch):
+    _preparar_entradas(tmp_path / 'entrada')
+    caminho, destino = str(tmp_path / 'entrada' / 'a.txt'), str(tmp_path / 'saida')
+    saida = nome_saida(caminho)
+    assert converter_arquivo(caminho, destino, resumos=True)['erro'] is None
+    antes = sorted(parquet_existentes(destino, saida))
+    c100 = pd.read_parquet(os.path.join(destino, 'C100'))
+
+    # Falha no meio: a conversão anterior fica inteira, mas sem marcador
+    def falhar(dados):
+        raise RuntimeError('resumo quebrado')
+    with monkeypatch.context() as m:
+        m.setitem(converter_sped.RESUMOS, 'entrada_saida', falhar)
+        assert converter_arquivo(caminho, destino, resumos=True)['erro'] == 'RuntimeError: resumo quebrado'
+    assert sorted(parquet_existentes(destino, saida)) == antes
+    pd.testing.assert_frame_equal(pd.read_parquet(os.path.join(destino, 'C100')), c100)
+    assert not os.path.exists(os.path.join(destino, '_concluidos', f'{saida}.json'))
+    assert not any(nome.endswith('.parcial') for _, _, nomes in os.walk(destino) for nome in nomes)
+
+    # Reconversão com filtro que recusa todos os itens: C170/C190 e resumos somem
+    resultado = converter_arquivo(caminho, destino, resumos=True, filtro={'IND_OPER': ['0'], 'CFOP': ['9999']})
+    assert resultado['erro'] is None
+    assert 'C190' not in resultado['registros'] and 'C170' not in resultado['registros']
+    depois = {os.path.relpath(arquivo, destino) for arquivo in parquet_existentes(destino, saida)}
+    assert depois == {os.path.join(registro, f'{saida}.parquet') for registro in resultado['registros']}
+    assert resumo_entrada_saida_particionado(destino).empty
+    assert os.listdir(os.path.join(destino, 'C190')) == []
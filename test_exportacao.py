@@ -0,0 +1,57 @@
+"""
+Testes da exportação em blocos (exportacao.py)
+"""
+
+import codecs
+import io
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from exportacao import escrever_csv, escrever_xlsx, gerar_csv_em_blocos
+
+
+def _tabela(linhas=25):
+    return pd.DataFrame({
+        'NUM_DOC': [f'{i:06d}' for i in range(linhas)],
+        'CFOP': ['5102' if i % 2 == 0 else '6102' for i in range(linhas)],
+        'TXT_COMPL': ['Operação interna'] * linhas,
+        'VL_DOC': [1234567.5 + i for i in range(linhas)],
+        'VL_ICMS': [np.nan if i % 4 == 0 else i / 4 for i in range(linhas)],
+    })
+
+
+def test_csv_em_varios_blocos_igual_ao_csv_inteiro():
+    df = _tabela()
+    blocos = list(gerar_csv_em_blocos(df, tamanho_bloco=7, encoding='utf-8-sig'))
+    assert len(blocos) == 4
+
+    destino = io.BytesIO()
+    assert escrever_csv(df, destino, encoding='utf-8-sig') == len(destino.getvalue())
+    assert destino.getvalue() == b''.join(blocos)  # o tamanho do bloco não muda o arquivo
+
+    texto = b''.join(blocos).decode('utf-8-sig')
+    linhas = texto.splitlines()
+    assert len(linhas) == len(df) + 1
+    assert linhas[0] == 'NUM_DOC;CFOP;TXT_COMPL;VL_DOC;VL_ICMS'
+    assert linhas[1] == '000000;5102;Operação interna;1234567,5;'
+    assert linhas[2] == '000001;6102;Operação interna;1234568,5;0,25'
+    assert blocos[0].startswith(codecs.BOM_UTF8) and '\ufeff' not in texto  # BOM só no início
+
+    lido = pd.read_csv(io.StringIO(texto), sep=';', decimal=',', dtype={'NUM_DOC': str, 'CFOP': str})
+    pd.testing.assert_frame_equal(lido, df)
+
+
+def test_xlsx_em_varios_blocos_mantem_linhas_e_valores():
+    df = _tabela()
+    destino = io.BytesIO()
+    escrever_xlsx({'C100': df, 'C170': df.iloc[0:0]}, destino, tamanho_bloco=7)
+
+    workbook = load_workbook(io.BytesIO(destino.getvalue()))
+    assert workbook.sheetnames == ['C100']
+    linhas = list(workbook['C100'].iter_rows(values_only=True))
+    assert len(linhas) == len(df) + 1
+    assert linhas[0] == ('NUM_DOC', 'CFOP', 'TXT_COMPL', 'VL_DOC', 'VL_ICMS')
+    assert linhas[1] == ('000000', '5102', 'Operação interna', 1234567.5, None)
+    assert linhas[-2] == ('000023', '6102', 'Operação interna', 1234590.5, 5.75)
@@ -0,0 +1,75 @@
+"""
+Testes dos filtros aplicados na leitura do bloco C (filtros_leitura.py e parsers)
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import parser_vetorizado
+from filtros_leitura import REGISTRO_CANCELADOS, SITUACOES_CANCELADAS, preparar_filtro
+from gerador_sped import gerar_sped
+from parser_colunar import processar_arquivo_sped_colunar
+from parser_vetorizado import processar_arquivo_sped_vetorizado
+from sped_parser import processar_arquivo_sped
+
+
+FILTROS = [
+    {'IND_OPER': {'1'}, 'DT_DOC': (date(2025, 1, 10), date(2025, 1, 20))},
+    {'COD_PART': ['P000090', 'P000027'], 'CFOP': {'5102', '6102'}},
+    {'DT_DOC': (None, date(2025, 1, 5)), 'COD_SIT': {'00'}},
+]
+
+
+def test_filho_de_c100_recusado_fica_de_fora():
+    conteudo = gerar_sped(documentos=40, semente=31)
+    completo = processar_arquivo_sped(conteudo)
+    saidas = processar_arquivo_sped(conteudo, filtro={'IND_OPER': ['1']})
+
+    documentos_saida = set(completo['C100'].loc[completo['C100']['IND_OPER'] == '1', 'NUM_DOC'])
+    assert set(saidas['C100']['NUM_DOC']) == documentos_saida
+    assert set(saidas['C170']['NUM_DOC_PAI']) <= documentos_saida
+    assert len(saidas['C170']) == completo['C170']['NUM_DOC_PAI'].isin(documentos_saida).sum()
+
+    with pytest.raises(ValueError):
+        preparar_filtro({'UF': {'SP'}})
+
+
+def test_parsers_com_filtro_iguais_ao_original(monkeypatch):
+    conteudo = gerar_sped(documentos=150, semente=32)
+    for filtro in FILTROS:
+        legado = processar_arquivo_sped(conteudo, filtro=filtro)
+        assert 0 < len(legado['C100']) < 150
+
+        # Trechos pequenos: C100 recusado em um trecho e filhos no seguinte
+        for tamanho in (parser_vetorizado.TAMANHO_TRECHO, 701):
+            monkeypatch.setattr(parser_vetorizado, 'TAMANHO_TRECHO', tamanho)
+            for parser in (processar_arquivo_sped_colunar, processar_arquivo_sped_vetorizado):
+                resultado = parser(conteudo, filtro=filtro)
+                for registro, df in legado.items():
+                    pd.testing.assert_frame_equal(df, resultado[registro])
+
+
+def test_cancelados_separados_com_os_filhos_de_fora(monkeypatch):
+    conteudo = gerar_sped(documentos=120, semente=33, proporcao_cancelados=0.1)
+    # Documento denegado com itens: os filhos também ficam de fora
+    conteudo = conteudo.replace(b'|55|00|', b'|55|04|', 1)
+    completo = processar_arquivo_sped(conteudo)
+    situacoes = completo['C100']['COD_SIT']
+    cancelados = set(completo['C100'].loc[situacoes.isin(SITUACOES_CANCELADAS), 'NUM_DOC'])
+
+    filtro = {'EXCLUIR_CANCELADOS': True}
+    legado = processar_arquivo_sped(conteudo, filtro=filtro)
+    assert set(legado[REGISTRO_CANCELADOS]['NUM_DOC']) == cancelados
+    assert not legado['C100']['NUM_DOC'].isin(cancelados).any()
+    assert not legado['C190']['NUM_DOC_PAI'].isin(cancelados).any()
+    assert completo['C190']['NUM_DOC_PAI'].isin(cancelados).any()
+
+    for tamanho in (parser_vetorizado.TAMANHO_TRECHO, 555):
+        monkeypatch.setattr(parser_vetorizado, 'TAMANHO_TRECHO', tamanho)
+        for parser in (processar_arquivo_sped_colunar, processar_arquivo_sped_vetorizado):
+            resultado = parser(conteudo, filtro=filtro)
+            assert legado.keys() == resultado.keys()
+            for registro, df in legado.items():
+                pd.testing.assert_frame_equal(df, resultado[registro])
@@ -0,0 +1,55 @@
+"""
+Testes da formatação brasileira de valores (formatacao.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from formatacao import (
+    BYTES_POR_MB, configurar_colunas, estilizar_moeda_br, formatar_mb_br, formatar_moeda_br, formatar_moeda_br_em_lote
+)
+
+
+def test_lote_igual_a_formatacao_celula_a_celula():
+    valores = [0, 0.0, -0.0, 0.004, -0.004, -0.005, 1.5, -1234.5, 999999.999, 1_000_000,
+               -1_000_000.01, 1234567890.126, np.nan, None, 'abc', '42.1']
+    serie = pd.Series(valores, index=[f'l{i}' for i in range(len(valores))], dtype=object)
+
+    lote = formatar_moeda_br_em_lote(serie)
+    assert lote.index.equals(serie.index)
+    assert lote.tolist() == [formatar_moeda_br(valor) for valor in valores]
+    assert lote.tolist()[:10] == [
+        'R$ 0,00', 'R$ 0,00', 'R$ 0,00', 'R$ 0,00', 'R$ 0,00', 'R$ -0,01', 'R$ 1,50', 'R$ -1.234,50',
+        'R$ 1.000.000,00', 'R$ 1.000.000,00',
+    ]
+    assert lote.tolist()[10:] == [
+        'R$ -1.000.000,01', 'R$ 1.234.567.890,13', 'R$ 0,00', 'R$ 0,00', 'R$ 0,00', 'R$ 42,10',
+    ]
+    assert formatar_moeda_br_em_lote(pd.Series([], dtype=float)).empty
+
+    assert formatar_mb_br(0) == '0,0 MB'
+    assert formatar_mb_br(1234.56 * BYTES_POR_MB) == '1.234,6 MB'
+
+
+def test_estilo_e_rotulos_nao_alteram_os_dados():
+    df = pd.DataFrame({
+        'VL_DOC': [1234567.891, -5.0, np.nan],
+        'TOTAL_ICMS': [0.1, 2.0, 3.0],
+        'VL_TEXTO': ['a', 'b', 'c'],
+        'CFOP': ['5102', '6102', '1102'],
+        'QTD': [1000, 2, 3],
+    })
+    original = df.copy()
+
+    html = estilizar_moeda_br(df).to_html()
+    for texto in ('R$ 1.234.567,89', 'R$ -5,00', 'R$ 0,00', 'R$ 0,10', '>1000<', '>5102<', '>a<'):
+        assert texto in html
+    assert 'R$ 1.000' not in html  # QTD não é monetária
+    pd.testing.assert_frame_equal(df, original)
+
+    html = estilizar_moeda_br(df, colunas=['TOTAL_ICMS', 'INEXISTENTE']).to_html()
+    assert 'R$ 0,10' in html and 'R$ -5,00' not in html
+
+    colunas = configurar_colunas({'VL_ICMS': 'Valor do ICMS', 'CFOP': 'CFOP'})
+    assert list(colunas) == ['VL_ICMS', 'CFOP']
+    assert colunas['VL_ICMS']['label'] == 'Valor do ICMS'
@@ -0,0 +1,66 @@
+"""
+Testes do gerador de SPED sintético (gerador_sped.py)
+"""
+
+import io
+from collections import Counter
+
+from gerador_sped import gerar_sped, escrever_sped, documentos_para_tamanho
+from sped_parser import processar_arquivo_sped
+from parser_registros_0 import processar_arquivo_sped_registros_0
+from parser_registros_e import processar_arquivo_sped_registros_e
+
+
+PARAMETROS = {'documentos': 40, 'itens_por_documento': 3, 'c190_por_documento': 2,
+              'participantes': 10, 'produtos': 15, 'proporcao_cancelados': 0.1}
+
+
+def test_mesma_semente_gera_mesmo_arquivo():
+    assert gerar_sped(**PARAMETROS) == gerar_sped(**PARAMETROS)
+    assert gerar_sped(**PARAMETROS) != gerar_sped(semente=7, **PARAMETROS)
+
+
+def test_escrita_em_blocos_igual_a_geracao_em_memoria():
+    destino = io.BytesIO()
+    resultado = escrever_sped(destino, **PARAMETROS)
+
+    assert destino.getvalue() == gerar_sped(**PARAMETROS)
+    assert resultado['bytes'] == len(destino.getvalue())
+
+
+def test_bloco_9_confere_com_as_linhas():
+    linhas = gerar_sped(**PARAMETROS).decode('latin-1').split('\r\n')[:-1]
+    contagem = Counter(linha.split('|')[1] for linha in linhas)
+    declarados = {
+        campos[2]: int(campos[3])
+        for campos in (linha.split('|') for linha in linhas)
+        if campos[1] == '9900'
+    }
+
+    assert declarados == dict(contagem)
+    assert int(linhas[-1].split('|')[2]) == len(linhas)
+
+
+def test_parsers_leem_o_arquivo_gerado():
+    conteudo = gerar_sped(**PARAMETROS)
+    dados_c = processar_arquivo_sped(conteudo)
+    dados_0 = processar_arquivo_sped_registros_0(conteudo)
+    dados_e = processar_arquivo_sped_registros_e(conteudo.decode('utf-8', errors='ignore'))
+
+    c100 = dados_c['C100']
+    validos = c100[c100['COD_SIT'] == '00']
+    assert len(c100) == PARAMETROS['documentos']
+    assert len(dados_c['C170']) == len(validos) * PARAMETROS['itens_por_documento']
+    assert len(dados_c['C190']) == len(validos) * PARAMETROS['c190_por_documento']
+    assert round(c100['VL_DOC'].sum(), 2) == round(dados_c['C190']['VL_OPR'].sum(), 2)
+    assert len(dados_0['0150']) == PARAMETROS['participantes']
+    assert len(dados_0['0200']) == PARAMETROS['produtos']
+    assert len(dados_e['E110']) == 1
+
+
+def test_estimativa_de_tamanho():
+    alvo = 2 * 1024 * 1024
+    documentos = documentos_para_tamanho(alvo, itens_por_documento=3, c190_por_documento=2)
+    tamanho = len(gerar_sped(documentos=documentos, itens_por_documento=3, c190_por_documento=2))
+
+    assert abs(tamanho - alvo) / alvo < 0.05
@@ -0,0 +1,68 @@
+"""
+Testes do índice de busca por trigramas (indice_busca.py)
+"""
+
+import pandas as pd
+
+from indice_busca import (
+    construir_indice_busca,
+    buscar_no_indice,
+    filtrar_por_busca,
+)
+
+
+def criar_cadastro_produtos():
+    return pd.DataFrame({
+        'COD_ITEM': ['P001', 'P002', 'P003', 'ACU', 'P005'],
+        'DESCR_ITEM': [
+            'AÇÚCAR REFINADO 1KG',
+            'Café Torrado',
+            'Doce de açúcar mascavo',
+            'Produto genérico',
+            'CAFÉ',
+        ],
+    })
+
+
+def test_busca_ignora_acento_e_caixa():
+    df = criar_cadastro_produtos()
+    indice = construir_indice_busca(df, ['COD_ITEM', 'DESCR_ITEM'])
+
+    resultado = filtrar_por_busca(df, indice, 'acucar')
+
+    assert set(resultado['COD_ITEM']) == {'P001', 'P003'}
+
+
+def test_busca_ordena_por_relevancia():
+    df = criar_cadastro_produtos()
+    indice = construir_indice_busca(df, ['COD_ITEM', 'DESCR_ITEM'])
+
+    # Campo igual ao termo vem antes de prefixo do campo
+    assert list(buscar_no_indice(indice, 'café')) == [4, 1]
+
+    # Prefixo do campo vem antes de substring no meio do texto
+    assert list(buscar_no_indice(indice, 'açúcar')) == [0, 2]
+
+
+def test_busca_termo_curto_e_vazio():
+    df = criar_cadastro_produtos()
+    indice = construir_indice_busca(df, ['COD_ITEM', 'DESCR_ITEM'])
+
+    assert list(buscar_no_indice(indice, 'ac')) == [3, 0, 2]
+    assert list(buscar_no_indice(indice, '')) == [0, 1, 2, 3, 4]
+    assert len(buscar_no_indice(indice, 'inexistente')) == 0
+
+
+def test_busca_equivale_a_str_contains():
+    df = pd.DataFrame({
+        'COD_PART': [f'{i:05d}' for i in range(500)],
+        'NOME': [f'Fornecedor {i % 37} Ltda' for i in range(500)],
+    })
+    indice = construir_indice_busca(df, ['COD_PART', 'NOME'])
+
+    for termo in ['ltda', 'dor 1', '0012', 'or 36 l']:
+        esperado = set(df.index[
+            df['NOME'].str.contains(termo, case=False, regex=False) |
+            df['COD_PART'].str.contains(termo, case=False, regex=False)
+        ])
+        assert set(buscar_no_indice(indice, termo)) == esperado
@@ -0,0 +1,67 @@
+"""
+Testes da instrumentação da ingestão (instrumentacao.py)
+"""
+
+import logging
+
+from conftest import arquivo_enviado
+from gerador_sped import gerar_sped
+from ingestao import carregar_dataset
+from instrumentacao import (
+    criar_estatisticas, medir_etapa, mesclar_estatisticas, resumo_etapas, resumo_registros
+)
+from sped_parser import processar_arquivo_sped
+
+
+PARAMETROS = {'documentos': 30, 'itens_por_documento': 2, 'c190_por_documento': 2,
+              'participantes': 8, 'produtos': 12}
+
+
+def test_parser_preenche_etapas_e_registros():
+    conteudo = gerar_sped(**PARAMETROS)
+    estatisticas = criar_estatisticas()
+    dados = processar_arquivo_sped(conteudo, estatisticas)
+
+    etapas = estatisticas['etapas']
+    for etapa in ['bloco_c.decodificacao', 'bloco_c.divisao_linhas', 'bloco_c.parse',
+                  'bloco_c.dataframes', 'bloco_c.conversao_numerica']:
+        assert etapas[etapa]['chamadas'] == 1
+    assert etapas['bloco_c.parse']['bytes'] == len(conteudo)
+    assert etapas['bloco_c.divisao_linhas']['linhas'] == conteudo.count(b'\n') + 1
+    for registro, df in dados.items():
+        assert estatisticas['registros'][registro]['registros'] == len(df)
+
+
+def test_dataset_traz_estatisticas_e_log(caplog):
+    conteudo = gerar_sped(**PARAMETROS)
+    with caplog.at_level(logging.INFO, logger='sped.ingestao'):
+        dataset = carregar_dataset([arquivo_enviado('a.txt', conteudo), arquivo_enviado('b.txt', conteudo)], 'abc123')
+
+    estatisticas = dataset['estatisticas']
+    assert estatisticas['arquivos'] == 2
+    assert estatisticas['bytes'] == 2 * len(conteudo)
+    assert estatisticas['etapas']['leitura']['bytes'] == 2 * len(conteudo)
+    assert estatisticas['etapas']['bloco_0.parse']['chamadas'] == 2
+    assert estatisticas['registros']['C100']['registros'] == len(dataset['dados_c']['C100'])
+    assert 'ingestao.total' in estatisticas['etapas']
+
+    assert any('evento=ingestao dataset=abc123 arquivos=2' in m for m in caplog.messages)
+    assert any('etapa=consolidacao.concat' in m for m in caplog.messages)
+
+
+def test_mesclar_e_resumos():
+    a, b = criar_estatisticas(), criar_estatisticas()
+    with medir_etapa(a, 'leitura', 100) as medida:
+        medida['linhas'] = 10
+    with medir_etapa(b, 'leitura', 50):
+        pass
+    b['registros']['C100'] = {'registros': 5, 'segundos': 0.5}
+    b['arquivos'] = 1
+
+    mesclar_estatisticas(a, b)
+
+    assert a['etapas']['leitura']['bytes'] == 150
+    assert a['etapas']['leitura']['chamadas'] == 2
+    assert a['arquivos'] == 1
+    assert list(resumo_etapas(a)['ETAPA']) == ['leitura']
+    assert resumo_registros(a).iloc[0]['REGISTROS_S'] == 10
@@ -3,7 +3,7 @@ Teste das novas funcionalidades: Entrada/Saída e Apuração Mensal
 """
 
 import pandas as pd
-from sped_parser import processar_sped
+from sped_parser import processar_arquivo_sped
 from analise_entrada_saida import (
     classificar_tipo_operacao,
     adicionar_classificacao,
@@ -16,10 +16,10 @@ print("=" * 80)
 
 # Processa arquivo SPED
 print("\n1. Processando arquivo SPED...")
-with open('exemplo_sped.txt', 'r', encoding='utf-8') as f:
+with open('exemplo_sped.txt', 'rb') as f:
     conteudo = f.read()
 
-dados = processar_sped(conteudo)
+dados = processar_arquivo_sped(conteudo)
 
 df_c100 = dados.get('C100', pd.DataFrame())
 df_c190 = dados.get('C190', pd.DataFrame())
@@ -0,0 +1,81 @@
+"""
+Testes do parser colunar do bloco C (parser_colunar.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from gerador_sped import gerar_sped
+from instrumentacao import criar_estatisticas
+from parser_colunar import converter_numerico_bytes, ler_bloco_9, processar_arquivo_sped_colunar
+from sped_parser import converter_colunas_numericas, processar_arquivo_sped
+
+
+def _comparar(conteudo):
+    legado = processar_arquivo_sped(conteudo)
+    colunar = processar_arquivo_sped_colunar(conteudo)
+    assert legado.keys() == colunar.keys()
+    for registro, df in legado.items():
+        pd.testing.assert_frame_equal(df, colunar[registro])
+
+
+def test_igual_ao_parser_original_com_linhas_irregulares():
+    conteudo = gerar_sped(documentos=30, semente=5)
+    irregulares = (
+        b'|C170|1|ITEM|ANTES DO PRIMEIRO C100|1|UN|10,00|0|0|000|5102|||||||||||||||||||||||||||\r\n'
+        b'\r\n'
+        b'|C100|0|1|P1|55|00|1|999|CHAVE|01012025|01012025|100,00\r\n'
+        b'|C113|0|1|P\xc7|55|1||123|01012025|\r\n'
+        b'|C190|000|5102|18|100,00|100,00|18,00|0|0|0|0\r\n'
+    )
+    posicao = conteudo.index(b'|C100|')
+    _comparar(conteudo[:posicao] + irregulares + conteudo[posicao:])
+
+
+def test_bloco_9_confere_e_divergencias():
+    conteudo = gerar_sped(documentos=20, semente=6)
+    bloco_9 = ler_bloco_9(conteudo)
+    estatisticas = criar_estatisticas()
+    dados = processar_arquivo_sped_colunar(conteudo, estatisticas)
+
+    assert bloco_9['contagens']['C100'] == len(dados['C100']) == 20
+    assert bloco_9['total_linhas'] == conteudo.count(b'\n')
+    assert estatisticas['divergencias'] == []
+
+    # Arquivo editado: um C170 a menos do que o 9900 declara
+    inicio = conteudo.index(b'|C170|')
+    editado = conteudo[:inicio] + conteudo[conteudo.index(b'\n', inicio) + 1:]
+    estatisticas = criar_estatisticas()
+    processar_arquivo_sped_colunar(editado, estatisticas)
+    assert {d['registro'] for d in estatisticas['divergencias']} == {'C170', 'QTD_LIN'}
+
+
+def test_sem_bloco_9_cresce_os_blocos():
+    conteudo = gerar_sped(documentos=400, semente=7)
+    sem_bloco_9 = conteudo[:conteudo.index(b'|9001|')]
+    assert ler_bloco_9(sem_bloco_9)['contagens'] == {}
+    _comparar(sem_bloco_9)
+
+
+def test_contagem_do_9900_absurda_nao_aloca_alem_do_arquivo():
+    conteudo = gerar_sped(documentos=30, semente=8)
+    declarado = ler_bloco_9(conteudo)['contagens']['C170']
+    adulterado = conteudo.replace(f'|9900|C170|{declarado}|'.encode(), b'|9900|C170|900000000000|')
+    estatisticas = criar_estatisticas()
+    dados = processar_arquivo_sped_colunar(adulterado, estatisticas)
+    assert len(dados['C170']) == declarado
+    assert {d['registro'] for d in estatisticas['divergencias']} == {'C170'}
+
+
+def test_conversao_numerica_em_bytes_igual_ao_pandas():
+    casos = [
+        [b'1', b'-2', b'30'],
+        [b'1,50', b'', b'3'],
+        [b'1.000,00', b'abc', b'nan', b'2,5'],
+        [b'1e3', b'4'],
+    ]
+    for valores in casos:
+        esperado = pd.DataFrame({'V': [valor.decode('latin-1') for valor in valores]})
+        converter_colunas_numericas(esperado, ['V'])
+        obtido = pd.Series(converter_numerico_bytes(np.array(valores, dtype=object)), name='V')
+        pd.testing.assert_series_equal(esperado['V'], obtido)
@@ -0,0 +1,73 @@
+"""
+Testes do parser vetorizado do bloco C (parser_vetorizado.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+import parser_vetorizado
+from gerador_sped import gerar_sped
+from instrumentacao import criar_estatisticas
+from parser_colunar import converter_numerico_bytes
+from parser_vetorizado import converter_numerico_matriz, processar_arquivo_sped_vetorizado
+from sped_parser import processar_arquivo_sped
+
+
+IRREGULARES = (
+    b'|C170|1|ITEM|ANTES DO PRIMEIRO C100|1|UN|10,00|0|0|000|5102|||||||||||||||||||||||||||\r\n'
+    b'\r\n'
+    b'|C100|0|1|P1|55|00|1|999|CHAVE|01012025|01012025|100,00\r\n'
+    b'|C113|0|1|P\xc7|55|1||123|01012025|\r\n'
+    b'|C190|000|5102|18|100,00|100,00|18,00|0|0|0|0\r\n'
+    b'|C1900|sem tipo valido|\r\n'
+)
+
+
+def _comparar(conteudo):
+    legado = processar_arquivo_sped(conteudo)
+    vetorizado = processar_arquivo_sped_vetorizado(conteudo)
+    assert legado.keys() == vetorizado.keys()
+    for registro, df in legado.items():
+        pd.testing.assert_frame_equal(df, vetorizado[registro])
+
+
+def test_igual_ao_parser_original_em_varios_trechos(monkeypatch):
+    conteudo = gerar_sped(documentos=60, semente=11)
+    posicao = conteudo.index(b'|C100|')
+    conteudo = conteudo[:posicao] + IRREGULARES + conteudo[posicao:]
+
+    _comparar(conteudo)
+    # Trechos pequenos: C100 pai em um trecho e filhos no seguinte
+    monkeypatch.setattr(parser_vetorizado, 'TAMANHO_TRECHO', 997)
+    _comparar(conteudo)
+    # Byte nulo (caminho valor a valor) e arquivo terminando sem '\n' no meio de um C190
+    _comparar(conteudo.replace(b'|ITEM|', b'|IT\x00|') + b'|C190|000|5102|18|1,00')
+
+
+def test_bloco_9_igual_ao_colunar():
+    conteudo = gerar_sped(documentos=20, semente=12)
+    inicio = conteudo.index(b'|C190|')
+    editado = conteudo[:inicio] + conteudo[conteudo.index(b'\n', inicio) + 1:]
+
+    estatisticas = criar_estatisticas()
+    processar_arquivo_sped_vetorizado(editado, estatisticas)
+    assert {d['registro'] for d in estatisticas['divergencias']} == {'C190', 'QTD_LIN'}
+    assert estatisticas['etapas']['bloco_c.parse']['linhas'] == editado.count(b'\n') + 1
+
+
+def test_conversao_aritmetica_igual_a_de_bytes():
+    casos = [
+        [b'1', b'-2', b'30', b'007'],
+        [b'1234,56', b'', b'-0,01', b'18', b',', b'-'],
+        [b'999999999999,99', b'0,1', b'0,3', b'12,345678'],
+    ]
+    for valores in casos:
+        fixos = np.array(valores, dtype='S16')
+        obtido = converter_numerico_matriz(fixos.view(np.uint8).reshape(len(valores), 16))
+        esperado = converter_numerico_bytes(np.array(valores, dtype=object))
+        assert obtido.dtype == esperado.dtype
+        np.testing.assert_array_equal(obtido, esperado)
+
+    # Fora do formato: o chamador usa o caminho geral
+    fixos = np.array([b'1e3', b'4'], dtype='S8')
+    assert converter_numerico_matriz(fixos.view(np.uint8).reshape(2, 8)) is None
@@ -0,0 +1,42 @@
+"""
+Testes do perfilamento sob demanda (perfilamento.py)
+"""
+
+import os
+import pstats
+
+from perfilamento import finalizar_perfil, formatar_pilhas_colapsadas, iniciar_perfil, perfilamento_ativo
+
+
+def _trabalho_lento():
+    fim = sum(range(10))
+    for _ in range(200):
+        fim += sum(i * i for i in range(2000))
+    return fim
+
+
+def test_perfil_grava_pstats_e_pilhas(tmp_path):
+    perfil = iniciar_perfil('teste', intervalo=0.001)
+    _trabalho_lento()
+    diretorio = finalizar_perfil(perfil, diretorio_base=str(tmp_path))
+
+    assert os.path.basename(diretorio).endswith('_teste')
+    assert sorted(os.listdir(diretorio)) == ['perfil.pstats', 'pilhas.collapsed', 'resumo.txt']
+
+    funcoes = {funcao for _, _, funcao in pstats.Stats(os.path.join(diretorio, 'perfil.pstats')).stats}
+    assert '_trabalho_lento' in funcoes
+
+    with open(os.path.join(diretorio, 'pilhas.collapsed'), encoding='utf-8') as arquivo:
+        linhas = arquivo.read().splitlines()
+    assert any('test_perfilamento.py:_trabalho_lento' in linha for linha in linhas)
+    assert all(linha.rsplit(' ', 1)[1].isdigit() for linha in linhas)
+
+
+def test_formato_colapsado_ordena_por_contagem():
+    texto = formatar_pilhas_colapsadas({'a;b': 1, 'a;b;c': 3})
+    assert texto == 'a;b;c 3\na;b 1\n'
+
+
+def test_ativacao_por_variavel_de_ambiente(monkeypatch):
+    monkeypatch.setenv('SPED_PROFILE', '1')
+    assert perfilamento_ativo()
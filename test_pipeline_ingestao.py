@@ -0,0 +1,46 @@
+"""
+Testes da ingestão em pipeline (pipeline_ingestao.py)
+"""
+
+import pandas as pd
+
+from conftest import arquivo_enviado, zip_enviado
+from gerador_sped import gerar_sped
+from ingestao import carregar_dataset
+from pipeline_ingestao import carregar_dataset_pipeline, usar_pipeline
+
+
+def _upload():
+    return [
+        zip_enviado('lote1.zip', {f'sped{i}.txt': gerar_sped(documentos=15 + i, semente=i) for i in range(3)}),
+        arquivo_enviado('avulso.txt', gerar_sped(documentos=10, semente=9)),
+        arquivo_enviado('quebrado.zip', b'nao e zip'),
+        zip_enviado('lote2.zip', {'a.txt': gerar_sped(documentos=12, semente=20), 'leiame.pdf': b'x'}),
+    ]
+
+
+def test_pipeline_igual_ao_sequencial():
+    sequencial = carregar_dataset(_upload())
+    pipeline = carregar_dataset_pipeline(_upload(), processos=2, threads=2, tamanho_fila=1)
+
+    for bloco in ('dados_c', 'dados_0', 'dados_e'):
+        assert sequencial[bloco].keys() == pipeline[bloco].keys()
+        for registro, df in sequencial[bloco].items():
+            pd.testing.assert_frame_equal(df, pipeline[bloco][registro])
+
+    estatisticas = pipeline['estatisticas']
+    assert estatisticas['arquivos'] == 5
+    assert estatisticas['etapas']['zip.descompactacao']['chamadas'] == 4
+    assert estatisticas['etapas']['bloco_c.parse']['chamadas'] == 5
+    assert 'pipeline.espera_fila' in estatisticas['etapas']
+
+
+def test_escolha_do_modo(monkeypatch):
+    pequeno = [arquivo_enviado('a.txt', b'|0000|'), arquivo_enviado('b.txt', b'|0000|')]
+
+    monkeypatch.delenv('SPED_INGESTAO_PIPELINE', raising=False)
+    assert not usar_pipeline(pequeno)
+    monkeypatch.setenv('SPED_INGESTAO_PIPELINE', '1')
+    assert usar_pipeline(pequeno)
+    monkeypatch.setenv('SPED_INGESTAO_PIPELINE', '0')
+    assert not usar_pipeline(pequeno)
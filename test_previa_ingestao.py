@@ -0,0 +1,60 @@
+"""
+Testes da prévia por amostra e da carga completa em segundo plano (previa_ingestao.py)
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+from cache_datasets import dataset_em_cache, limpar_cache, obter_dataset
+from conftest import arquivo_enviado
+from gerador_sped import gerar_sped
+from previa_ingestao import (
+    amostrar_conteudo, carregar_previa, chave_previa, consultar_carga, iniciar_carga_completa,
+)
+from sped_parser import processar_arquivo_sped
+
+
+def test_amostra_mantem_documentos_inteiros():
+    conteudo = gerar_sped(documentos=90, semente=41)
+    completo = processar_arquivo_sped(conteudo)
+
+    for documentos, passo, primeiros in ((10, 1, ['1', '2', '3']), (10, None, ['1', '10', '19'])):
+        amostra, mantidos, total = amostrar_conteudo(conteudo, documentos, passo)
+        assert (mantidos, total) == (10, 90)
+        assert b'|C990|' in amostra and b'|E110|' in amostra and b'|9900|' not in amostra
+
+        parcial = processar_arquivo_sped(amostra)
+        numeros = list(parcial['C100']['NUM_DOC'])
+        assert numeros[:3] == primeiros
+        for registro in ('C170', 'C190'):
+            esperado = completo[registro][completo[registro]['NUM_DOC_PAI'].isin(numeros)]
+            pd.testing.assert_frame_equal(parcial[registro], esperado.reset_index(drop=True))
+
+
+def test_previa_e_carga_completa_em_segundo_plano():
+    limpar_cache()
+    arquivo = arquivo_enviado('jan.txt', gerar_sped(documentos=50, semente=42))
+
+    previa = obter_dataset(chave_previa('upload'), lambda: carregar_previa([arquivo], documentos=5))
+    assert previa['amostra'] == {'documentos': 5, 'total': 50}
+    assert len(previa['dados_c']['C100']) == 5
+
+    liberar = threading.Event()
+
+    def carregar(progresso=None, cancelar=None):
+        liberar.wait(5)
+        return {'dados_c': {'C100': pd.DataFrame({'VL_DOC': [1.0] * 50})}}
+
+    carga = iniciar_carga_completa('upload', carregar)
+    assert iniciar_carga_completa('upload', carregar) is carga
+    assert not carga['concluida']
+
+    liberar.set()
+    limite = time.time() + 5
+    while consultar_carga('upload') is not None and time.time() < limite:
+        time.sleep(0.01)
+    assert consultar_carga('upload') is None
+    assert dataset_em_cache('upload') and not dataset_em_cache(chave_previa('upload'))
+    limpar_cache()
@@ -0,0 +1,61 @@
+"""
+Testes dos eventos de progresso e do cancelamento da ingestão
+"""
+
+import threading
+
+import pytest
+
+from conftest import arquivo_enviado
+from gerador_sped import gerar_sped
+from ingestao import IngestaoCancelada, carregar_dataset
+from pipeline_ingestao import carregar_dataset_pipeline
+
+
+def _upload():
+    return [
+        arquivo_enviado('a.txt', gerar_sped(documentos=20, semente=1)),
+        arquivo_enviado('b.txt', gerar_sped(documentos=10, semente=2)),
+    ]
+
+
+def test_progresso_sequencial():
+    eventos = []
+    carregar_dataset(_upload(), progresso=eventos.append)
+
+    assert [e['sped'] for e in eventos] == sorted(e['sped'] for e in eventos)
+    totais = [e['fracao_total'] for e in eventos]
+    assert totais == sorted(totais)
+    assert totais[-1] == pytest.approx(1.0)
+    assert eventos[-1]['arquivo'] == 'b.txt'
+    assert {e['etapa'] for e in eventos} == {'bloco_c', 'bloco_0', 'bloco_e'}
+
+
+def test_cancelamento_sequencial():
+    cancelar = threading.Event()
+    eventos = []
+
+    def progresso(evento):
+        eventos.append(evento)
+        cancelar.set()
+
+    with pytest.raises(IngestaoCancelada):
+        carregar_dataset(_upload(), progresso=progresso, cancelar=cancelar)
+    assert len(eventos) == 1
+
+
+def test_progresso_e_cancelamento_no_pipeline():
+    eventos = []
+    dataset = carregar_dataset_pipeline(_upload(), processos=2, progresso=eventos.append)
+
+    assert dataset['estatisticas']['arquivos'] == 2
+    assert {e['arquivo'] for e in eventos} == {'a.txt', 'b.txt'}
+    assert eventos[-1]['fracao_total'] == pytest.approx(1.0)
+
+    cancelar = threading.Event()
+    cancelar.set()
+    with pytest.raises(IngestaoCancelada):
+        carregar_dataset_pipeline(_upload(), processos=2, cancelar=cancelar)
+
+    # O pool continua utilizável depois do cancelamento
+    assert carregar_dataset_pipeline(_upload(), processos=2)['estatisticas']['arquivos'] == 2
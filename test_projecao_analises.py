@@ -0,0 +1,45 @@
+"""
+Testes da projeção de colunas do bloco C (projecao_analises.py e parsers)
+"""
+
+import pandas as pd
+
+import parser_vetorizado
+from gerador_sped import gerar_sped
+from parser_colunar import processar_arquivo_sped_colunar
+from parser_vetorizado import processar_arquivo_sped_vetorizado
+from projecao_analises import ANALISES, chave_com_projecao, projecao_para_analises
+from sped_parser import processar_arquivo_sped
+
+
+def test_projecao_das_analises():
+    assert projecao_para_analises(list(ANALISES)) is None
+
+    projecao = projecao_para_analises(['dashboard', 'c170'])
+    assert 'C170' not in projecao
+    assert projecao['C100'] == ['DT_DOC', 'IND_OPER', 'VL_DOC', 'VL_ICMS', 'VL_IPI']
+    assert projecao['C110'] == []
+
+    assert chave_com_projecao('abc', None) == 'abc'
+    assert chave_com_projecao('abc', projecao) != chave_com_projecao('abc', projecao_para_analises(['c170']))
+
+
+def test_parsers_com_projecao_iguais_ao_original(monkeypatch):
+    conteudo = gerar_sped(documentos=80, semente=21)
+    projecao = {
+        'C100': ['NUM_DOC'],
+        'C110': [],
+        'C170': ['CFOP', 'VL_ITEM', 'NUM_DOC_PAI', 'INEXISTENTE'],
+        'C190': ['VL_ICMS', 'DT_DOC_PAI'],
+    }
+    legado = processar_arquivo_sped(conteudo, projecao=projecao)
+    assert list(legado['C170'].columns) == ['VL_ITEM', 'CFOP', 'NUM_DOC_PAI']
+    assert legado['C110'].empty
+    assert len(legado['C197'].columns) == len(processar_arquivo_sped(conteudo)['C197'].columns)
+
+    # Trechos pequenos: pai dos filhos vindo do trecho anterior
+    monkeypatch.setattr(parser_vetorizado, 'TAMANHO_TRECHO', 1499)
+    for parser in (processar_arquivo_sped_colunar, processar_arquivo_sped_vetorizado):
+        resultado = parser(conteudo, projecao=projecao)
+        for registro, df in legado.items():
+            pd.testing.assert_frame_equal(df, resultado[registro])
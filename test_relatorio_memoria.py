@@ -0,0 +1,51 @@
+"""
+Testes do relatório de memória (relatorio_memoria.py)
+"""
+
+import pandas as pd
+
+from conftest import arquivo_enviado, zip_enviado
+from gerador_sped import gerar_sped
+from relatorio_memoria import (
+    FATOR_PICO_INGESTAO, avaliar_memoria_upload, gerar_relatorio_memoria, tamanho_descompactado
+)
+
+
+def test_relatorio_soma_tabelas_e_ordena_colunas():
+    dataset = {
+        'dados_c': {'C100': pd.DataFrame({'CHV_NFE': ['x' * 44] * 100, 'VL_DOC': [1.0] * 100})},
+        'dados_0': {'0150': pd.DataFrame({'NOME': ['abc'] * 10}), '0200': pd.DataFrame()},
+        'dados_e': {},
+    }
+    relatorio = gerar_relatorio_memoria(dataset, colunas_em_destaque=2)
+
+    tabelas = relatorio['tabelas']
+    assert list(tabelas['REGISTRO']) == ['C100', '0150', '0200']
+    assert relatorio['total_linhas'] == 110
+    assert relatorio['total_bytes'] == sum(
+        int(df.memory_usage(index=True, deep=True).sum())
+        for bloco in ('dados_c', 'dados_0') for df in dataset[bloco].values()
+    )
+    assert list(relatorio['colunas']['COLUNA']) == ['CHV_NFE', 'VL_DOC']
+    assert relatorio['colunas'].iloc[1]['BYTES_POR_LINHA'] == 8
+
+
+def test_tamanho_descompactado_conta_txt_dos_zips():
+    conteudo = gerar_sped(documentos=20)
+    arquivos = [zip_enviado('lote.zip', {'a.txt': conteudo, 'leiame.pdf': b'nao conta'}),
+                arquivo_enviado('b.txt', conteudo)]
+
+    assert tamanho_descompactado(arquivos) == 2 * len(conteudo)
+
+
+def test_alerta_com_limite_flexivel(monkeypatch):
+    arquivos = [arquivo_enviado('a.txt', gerar_sped(documentos=20))]
+
+    monkeypatch.delenv('SPED_LIMITE_MEMORIA_MB', raising=False)
+    avaliacao = avaliar_memoria_upload(arquivos)
+    assert avaliacao['pico_estimado'] == arquivos[0].size * FATOR_PICO_INGESTAO
+    assert avaliacao['limite'] is None
+
+    monkeypatch.setenv('SPED_LIMITE_MEMORIA_MB', '0.5')
+    avaliacao = avaliar_memoria_upload(arquivos)
+    assert any('limite configurado' in alerta for alerta in avaliacao['alertas'])
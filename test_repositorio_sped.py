@@ -0,0 +1,58 @@
+"""
+Testes do repositório local por CNPJ e período (repositorio_sped.py)
+"""
+
+import pandas as pd
+
+from conftest import arquivo_enviado
+from gerador_sped import gerar_sped
+from ingestao import carregar_dataset
+from repositorio_sped import (
+    carregar_repositorio, catalogo, importar_sped, listar_cnpjs, listar_periodos, main, selecionar_particoes,
+)
+
+
+def test_carga_com_poda_igual_ao_upload(tmp_path):
+    raiz = str(tmp_path / 'repositorio')
+    speds = {
+        'a_jan.txt': gerar_sped(documentos=20, semente=81, ano=2025, mes=1),
+        'a_fev.txt': gerar_sped(documentos=15, semente=81, ano=2025, mes=2),
+        'a_2024.txt': gerar_sped(documentos=10, semente=81, ano=2024, mes=12),
+        'b_jan.txt': gerar_sped(documentos=25, semente=82, ano=2025, mes=1),
+    }
+    gravados = {nome: importar_sped(raiz, conteudo, nome) for nome, conteudo in speds.items()}
+    cnpj_a = gravados['a_jan.txt']['cnpj']
+    assert len(listar_cnpjs(raiz)) == 2 and listar_periodos(raiz, cnpj_a) == ['202412', '202501', '202502']
+    assert len(catalogo(raiz)) == 4
+
+    # "Cliente A, 2025": só as duas partições, mesmo resultado de enviar os dois arquivos
+    assert len(selecionar_particoes(raiz, [cnpj_a], ['202501', '202502'])) == 2
+    dataset = carregar_repositorio(raiz, [cnpj_a], ['202501', '202502'])
+    esperado = carregar_dataset([arquivo_enviado('a_jan.txt', speds['a_jan.txt']), arquivo_enviado('a_fev.txt', speds['a_fev.txt'])])
+    for bloco in ('dados_c', 'dados_0', 'dados_e'):
+        for registro, df in esperado[bloco].items():
+            pd.testing.assert_frame_equal(dataset[bloco][registro], df, check_dtype=False)
+
+    # Projeção: só as colunas pedidas (e a origem)
+    projetado = carregar_repositorio(raiz, [cnpj_a], ['202501'], projecao={'C100': ['VL_DOC'], 'C170': []})
+    assert list(projetado['dados_c']['C100'].columns) == ['VL_DOC', 'ARQUIVO_ORIGEM']
+    assert projetado['dados_c']['C170'].empty
+
+
+def test_retificadora_substitui_o_periodo(tmp_path, capsys):
+    raiz = str(tmp_path / 'repositorio')
+    entradas = tmp_path / 'speds'
+    entradas.mkdir()
+    (entradas / 'original.txt').write_bytes(gerar_sped(documentos=30, semente=83))
+    assert main(['importar', str(entradas), '--raiz', raiz]) == 0
+
+    retificadora = importar_sped(raiz, gerar_sped(documentos=12, semente=83), 'retificadora.txt')
+    assert retificadora['substituido']
+    assert catalogo(raiz)['ARQUIVO'].tolist() == ['retificadora.txt']
+    dataset = carregar_repositorio(raiz, listar_cnpjs(raiz))
+    assert len(dataset['dados_c']['C100']) == 12
+    assert set(dataset['dados_c']['C100']['ARQUIVO_ORIGEM']) == {'retificadora.txt'}
+
+    (entradas / 'invalido.txt').write_bytes(b'|C001|0|\r\n')
+    assert main(['importar', str(entradas / 'invalido.txt'), '--raiz', raiz]) == 1
+    assert 'ERRO' in capsys.readouterr().out
@@ -0,0 +1,48 @@
+"""
+Testes da ordenação e da paginação no servidor (tabela_paginada.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from tabela_paginada import calcular_chave_ordenacao, fatiar_pagina, ordenar_posicoes
+
+
+def _tabela():
+    return pd.DataFrame({
+        'ID': range(8),
+        'VL_DOC': [30.0, np.nan, 10.0, 30.0, 20.0, np.nan, 10.0, 30.0],
+        'DT_DOC': ['01022025', '15012025', '', '01022025', '31122024', None, '15012025', 'invalida'],
+    }, index=[f'r{i}' for i in range(8)])
+
+
+def test_vazios_no_final_e_empates_estaveis_nos_dois_sentidos():
+    df = _tabela()
+    assert calcular_chave_ordenacao(df, 'VL_DOC').tolist() == [2, 6, 4, 0, 3, 7, 1, 5]
+    assert calcular_chave_ordenacao(df, 'VL_DOC', ascendente=False).tolist() == [0, 3, 7, 4, 2, 6, 1, 5]
+
+    # Datas DDMMAAAA em ordem cronológica; vazias e inválidas no final
+    assert calcular_chave_ordenacao(df, 'DT_DOC').tolist() == [4, 1, 6, 0, 3, 2, 5, 7]
+    assert calcular_chave_ordenacao(df, 'DT_DOC', ascendente=False).tolist() == [0, 3, 1, 6, 4, 2, 5, 7]
+
+    # Subconjunto segue a chave do DataFrame completo
+    chave = calcular_chave_ordenacao(df, 'VL_DOC', ascendente=False)
+    assert ordenar_posicoes(chave, np.array([1, 2, 3, 6]), len(df)).tolist() == [3, 2, 6, 1]
+
+
+def test_ultima_pagina_parcial_e_pagina_fora_do_intervalo():
+    df = _tabela()
+    filtrado = df[df['ID'] != 4]
+    cache = {}
+
+    # 7 linhas em páginas de 3: a última tem só uma (vazia, no final)
+    pagina = fatiar_pagina(df, filtrado, 2, 3, coluna='VL_DOC', ascendente=False, cache=cache)
+    assert pagina.index.tolist() == ['r2', 'r6', 'r1']
+    pagina = fatiar_pagina(df, filtrado, 3, 3, coluna='VL_DOC', ascendente=False, cache=cache)
+    assert pagina.index.tolist() == ['r5']
+    assert set(cache) == {('VL_DOC', False)}
+
+    assert fatiar_pagina(df, filtrado, 2, 3, coluna='VL_DOC', cache=cache)['ID'].tolist() == [3, 7, 1]
+    assert fatiar_pagina(df, filtrado, 3, 3)['ID'].tolist() == [7]
+    assert fatiar_pagina(df, filtrado, 4, 3, coluna='VL_DOC', cache=cache).empty
+    assert fatiar_pagina(df, filtrado, 9, 3).empty